@@ -161,6 +161,8 @@ class UpdateAvatarApi(views.APIView):
 
         src = serializers.CharField()
         alt = serializers.CharField()
+        srcset = serializers.CharField(allow_null=True, required=False)
+        variants = serializers.DictField(required=False)
 
     class InputSerializer(serializers.Serializer):
         """For POST method."""
@@ -214,6 +216,8 @@ class ProfileApi(views.APIView):
 
             src = serializers.CharField()
             alt = serializers.CharField(max_length=255)
+            srcset = serializers.CharField(allow_null=True, required=False)
+            variants = serializers.DictField(required=False)
 
         fullName = serializers.CharField(max_length=300, allow_blank=True)
         email = serializers.EmailField(allow_blank=True)
@@ -6,6 +6,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractUser
 
 from account import models, services
+from common import services as common_services
 from common.models import Image
 
 UserType = TypeVar('UserType', bound=AbstractUser)
@@ -45,7 +46,10 @@ class AccountSelector:
         """
         avatar: Image = profile.avatar
         if (avatar is not None) and (avatar.pk is not None):
+            variant_service = common_services.ImageVariantService()
             return {
                 'src': avatar.img.url,
-                'alt': avatar.description
+                'alt': avatar.description,
+                'srcset': variant_service.get_srcset(avatar),
+                'variants': variant_service.get_urls(avatar),
             }
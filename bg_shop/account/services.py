@@ -169,7 +169,7 @@ class AccountService:
         :return:
         """
         cart_service = order_services.CartService(request=request)
-        anonymous_cart = cart_service.cart
+        anonymous_cart = cart_service.get_items()
         login(*args, request=request, user=user, **kwargs,)
         if anonymous_cart:
             cart_service.merge_carts(session_cart=anonymous_cart)
@@ -1,3 +1,4 @@
+import hashlib
 import io
 import os
 
@@ -40,19 +41,23 @@ class PostUpdateAvatarApiTestCase(TestCase):
         self.base_image_name = "".join(
             choices(ascii_letters+digits, k=randint(9, 10)))
         self.image_name = self.base_image_name + ".png"
-        self.image_path = self.generate_image_path(image_name=self.image_name)
+        self.image_path = self.generate_image_path(
+            self.generate_photo_file(self.image_name))
         self.new_image_name = "new_" + self.image_name
         self.new_image_path = self.generate_image_path(
-            image_name=self.new_image_name)
+            self.generate_photo_file(self.new_image_name))
 
     def tearDown(self) -> None:
         self.remove_file_from_filesystem(self.image_path)
         self.remove_file_from_filesystem(self.new_image_path)
 
     @staticmethod
-    def generate_image_path(image_name):
+    def generate_image_path(image_file: io.BytesIO):
+        """Files are stored by hash of content."""
+        digest = hashlib.sha256(image_file.getvalue()).hexdigest()
         return os.path.join(
-            settings.MEDIA_ROOT, settings.IMAGE_SUBDIR, image_name)
+            settings.MEDIA_ROOT, settings.IMAGE_SUBDIR, digest[:2],
+            f"{digest}.png")
 
     def generate_photo_file(self, file_name: str):
         file = io.BytesIO()
@@ -80,7 +85,7 @@ class PostUpdateAvatarApiTestCase(TestCase):
 
         self.assertContains(
             response=response,
-            text=self.base_image_name,
+            text=os.path.basename(self.image_path),
             status_code=201,
             msg_prefix="Filename isn't in response.",
         )
@@ -93,8 +98,7 @@ class PostUpdateAvatarApiTestCase(TestCase):
 
         expected_src = os.path.join(
             settings.MEDIA_URL,
-            settings.IMAGE_SUBDIR,
-            self.base_image_name,
+            os.path.relpath(self.image_path, settings.MEDIA_ROOT),
         )
         self.assertContains(
             response=response,
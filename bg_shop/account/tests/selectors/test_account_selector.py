@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 
 from account import models, selectors
 from common import models as common_models
+from common.services import ImageVariantService
 
 UserModel = get_user_model()
 
@@ -41,6 +42,8 @@ class GetAccountDataTestCase(TestCase):
             'avatar': {
                 'src': self.avatar.img.url,
                 'alt': self.avatar.description,
+                'srcset': None,
+                'variants': ImageVariantService().get_urls(self.avatar),
             }
         }
         self.assertEqual(data, expected_data, "Data is incorrect.")
@@ -100,7 +103,9 @@ class GetAvatarDataTestCase(TestCase):
         data = self.selector.get_avatar_data(profile)
         expected_data = {
             'src': avatar.img.url,
-            'alt': avatar.description
+            'alt': avatar.description,
+            'srcset': None,
+            'variants': ImageVariantService().get_urls(avatar),
         }
         self.assertEqual(data, expected_data, "Data is incorrect.")
 
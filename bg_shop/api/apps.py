@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Connect signal handlers invalidating cached responses.
+        from . import signals
+
+        from django.conf import settings
+        if settings.METRICS_ENABLED:
+            from . import metrics
+            metrics.install_serializer_timing()
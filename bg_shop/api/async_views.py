@@ -0,0 +1,92 @@
+"""
+Async APIView for read endpoints in ASGI mode.
+
+DRF runs handlers synchronously, so `async def get()` is not awaited
+by APIView. AsyncAPIView awaits the handler in the event loop, and runs
+parts of DRF that may hit db, cache or session (authentication,
+permissions, throttling, exception handling, finalizing of response)
+by sync_to_async. Handlers should use async ORM, sync selectors and
+serializers that make queries are wrapped by sync_to_async.
+
+Under WSGI Django runs async views by async_to_sync, so the same views
+work in both modes (and in tests with the sync test client).
+"""
+
+import asyncio
+from typing import Any, Callable, Type
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from rest_framework import serializers, views
+
+
+class AsyncAPIView(views.APIView):
+    """
+    APIView with `async def` handlers.
+
+    All handlers of the view must be async (Django does not allow
+    views with mixed handlers), sync code of handlers is called
+    by sync_to_async, e.g. `await sync_to_async(service.add)(...)`.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs: Any) -> Callable:
+        """csrf_exempt() of DRF hides that the view is a coroutine."""
+        view = super().as_view(**initkwargs)
+        if cls.view_is_async:
+            markcoroutinefunction(view)
+        return view
+
+    async def dispatch(
+            self,
+            request: HttpRequest,
+            *args: Any,
+            **kwargs: Any,
+    ) -> HttpResponseBase:
+        """
+        The same as APIView.dispatch(), but the handler is awaited.
+        :param request: django request
+        :return: response
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+
+        self.response = await sync_to_async(self.finalize_response)(
+            request, response, *args, **kwargs)
+        return self.response
+
+
+async def serialize(
+        serializer_class: Type[serializers.BaseSerializer],
+        instance: Any,
+        **kwargs: Any,
+) -> Any:
+    """
+    Data of serializer that may hit db (e.g. SerializerMethodField
+    with selectors, or config loaded in __init__).
+    :param serializer_class: serializer
+    :param instance: object or objects to serialize
+    :param kwargs: other arguments of serializer (e.g. many)
+    :return: serializer.data
+    """
+    def get_data() -> Any:
+        return serializer_class(instance, **kwargs).data
+
+    return await sync_to_async(get_data)()
@@ -0,0 +1,197 @@
+"""
+Cache of responses of read-only endpoints.
+
+Cached response is bound to tags (e.g. "product", "sale"), every tag has
+version in Django cache, and versions of all tags of the view are part
+of the cache key. So changing of any model invalidates all responses
+that depend on it by one cache operation (see api.signals).
+"""
+
+import hashlib
+import json
+import uuid
+from typing import Any, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponseNotModified
+from django.http.response import HttpResponseBase
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import request as drf_request
+from rest_framework import response as drf_response
+from rest_framework.renderers import JSONRenderer
+
+from api import utils as api_utils
+
+TAG_VERSION_CACHE_KEY = "api_cache_tag:{tag}"
+RESPONSE_CACHE_KEY = "api_response:{view}:{digest}"
+
+
+def get_tag_versions(tags: Iterable[str]) -> dict[str, str]:
+    """
+    Returns current versions of tags by one cache operation.
+    Sets new versions for absent tags.
+    :param tags: names of tags
+    :return: {tag: version}
+    """
+    keys = {TAG_VERSION_CACHE_KEY.format(tag=tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {
+        key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {tag: versions[key] for key, tag in keys.items()}
+
+
+def invalidate_tags(*tags: str) -> None:
+    """
+    Sets new versions of tags, so responses cached with old versions
+    are not used anymore (they expire by timeout).
+    :param tags: names of tags
+    :return: None
+    """
+    cache.set_many(
+        {TAG_VERSION_CACHE_KEY.format(tag=tag): uuid.uuid4().hex
+         for tag in tags},
+        timeout=None,
+    )
+
+
+class CachedResponseHit(Exception):
+    """Raised by CachedResponseMixin to skip the handler of the view."""
+
+    def __init__(self, entry: dict) -> None:
+        """Save cached entry (data and etag)."""
+        super().__init__()
+        self.entry = entry
+
+
+class CachedResponseMixin:
+    """
+    Caches data of successful GET responses of APIView for anonymous
+    users and supports conditional requests (ETag, If-None-Match -> 304).
+
+    Cache key is based on path, normalized query params, current date
+    (sales depend on it) and versions of `cache_tags`.
+    Changes that bypass model signals (e.g. QuerySet.update() of stock)
+    are visible after `cache_timeout`.
+    Usage:
+        class SomeApi(CachedResponseMixin, views.APIView):
+            cache_tags = ("product", "sale")
+    """
+    cache_tags: tuple[str, ...] = ()
+    cache_timeout: Optional[int] = None  # API_RESPONSE_CACHE_TIMEOUT
+    cache_anonymous_only = True
+
+    def initial(
+            self,
+            request: drf_request.Request,
+            *args: Any,
+            **kwargs: Any,
+    ) -> None:
+        """
+        Checks cache after authentication and permissions.
+        :raise CachedResponseHit: if response is cached
+        """
+        super().initial(request, *args, **kwargs)
+        self.response_cache_key = None
+        if self.is_cacheable(request):
+            self.response_cache_key = self.get_response_cache_key(request)
+            entry = cache.get(self.response_cache_key)
+            if entry is not None:
+                raise CachedResponseHit(entry)
+
+    def handle_exception(self, exc: Exception) -> HttpResponseBase:
+        """Turns cache hit into response."""
+        if isinstance(exc, CachedResponseHit):
+            response = drf_response.Response(data=exc.entry["data"])
+            response.cached_etag = exc.entry["etag"]
+            return response
+        return super().handle_exception(exc)
+
+    def finalize_response(
+            self,
+            request: drf_request.Request,
+            response: HttpResponseBase,
+            *args: Any,
+            **kwargs: Any,
+    ) -> HttpResponseBase:
+        """
+        Caches data of the response (if it is not taken from cache)
+        and sets ETag.
+        :return: response or 304 if client has actual version
+        """
+        response = super().finalize_response(
+            request, response, *args, **kwargs)
+        if getattr(self, "response_cache_key", None) is None \
+                or response.status_code != 200 \
+                or getattr(response, "data", None) is None:
+            return response
+
+        etag = getattr(response, "cached_etag", None)
+        if etag is None:
+            content = JSONRenderer().render(response.data)
+            etag = quote_etag(
+                hashlib.md5(content, usedforsecurity=False).hexdigest())
+            timeout = self.cache_timeout if self.cache_timeout is not None \
+                else settings.API_RESPONSE_CACHE_TIMEOUT
+            # plain structures, without references to serializers
+            cache.set(
+                self.response_cache_key,
+                {"data": json.loads(content), "etag": etag},
+                timeout=timeout,
+            )
+
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    def is_cacheable(self, request: drf_request.Request) -> bool:
+        """
+        Only safe requests of anonymous users (if cache_anonymous_only)
+        are cached.
+        """
+        if request.method not in ("GET", "HEAD"):
+            return False
+        if self.cache_anonymous_only and request.user.is_authenticated:
+            return False
+        return True
+
+    def get_response_cache_key(self, request: drf_request.Request) -> str:
+        """
+        Builds key of cached response.
+        :param request: drf request
+        :return: cache key
+        """
+        params = api_utils.parse_query_params_square_brackets(request)
+        normalized = json.dumps(
+            {
+                "path": request.path,
+                "params": self._normalize_params(params),
+                "date": timezone.now().date().isoformat(),
+                "tags": get_tag_versions(self.cache_tags),
+            },
+            sort_keys=True,
+        )
+        digest = hashlib.md5(
+            normalized.encode(), usedforsecurity=False).hexdigest()
+        return RESPONSE_CACHE_KEY.format(
+            view=self.__class__.__name__, digest=digest)
+
+    @classmethod
+    def _normalize_params(cls, params: Any) -> Any:
+        """
+        Sorts lists of query params (they are used as sets, e.g. tags),
+        so the same query gets the same key in any order of params.
+        """
+        if isinstance(params, dict):
+            return {
+                key: cls._normalize_params(value)
+                for key, value in params.items()
+            }
+        if isinstance(params, list):
+            return sorted(cls._normalize_params(value) for value in params)
+        return params
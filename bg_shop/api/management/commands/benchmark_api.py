@@ -0,0 +1,452 @@
+"""
+Benchmarks API endpoints and services, e.g. on data of generate_scale_data.
+
+By default requests are made by Django test client in this process,
+so number of SQL queries is measured too. With --url requests are sent
+to running server (e.g. local gunicorn), only safe scenarios are used.
+Results are saved as JSON and can be compared with baseline run.
+
+To compare WSGI and ASGI modes, run the same scenarios against both
+servers with several concurrency levels, e.g.
+`--url http://127.0.0.1:8000 --concurrency 1 --concurrency 32
+--label wsgi --output wsgi.json`, then `--label asgi --baseline wsgi.json`.
+"""
+
+import json
+import math
+import platform
+import statistics
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from orders import models as orders_models
+from orders import services as orders_services
+from shop import models as shop_models
+
+User = get_user_model()
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of not empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(
+        latencies: list[float],
+        elapsed: float,
+        errors: int,
+        queries: Optional[list[int]] = None,
+) -> dict[str, Any]:
+    """
+    Statistics of one scenario.
+    :param latencies: seconds of every request
+    :param elapsed: wall time of all requests in seconds
+    :param errors: number of responses with status >= 400
+    :param queries: number of SQL queries of every request
+    :return: {metric: value}, latency in milliseconds
+    """
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+    }
+    for percent in PERCENTILES:
+        result[f"p{percent}_ms"] = round(
+            percentile(latencies, percent) * 1000, 3)
+    if queries:
+        result["queries_mean"] = round(statistics.fmean(queries), 2)
+        result["queries_max"] = max(queries)
+    return result
+
+
+class Scenario:
+    """
+    One benchmarked operation.
+
+    Request scenarios have `path`, service ones have `func` which
+    is called with the user. Not safe scenarios are rolled back.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            path: str = "",
+            method: str = "get",
+            data: Any = None,
+            auth: bool = False,
+            func: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self.name = name
+        self.path = path
+        self.method = method
+        self.data = data
+        self.auth = auth
+        self.func = func
+
+    @property
+    def safe(self) -> bool:
+        """Scenario doesn't change data."""
+        return self.func is None and self.method == "get"
+
+
+class Command(BaseCommand):
+    help = "Measures latency percentiles, SQL queries per request and " \
+           "throughput of API endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=100,
+            help="Measured requests per scenario.",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=5,
+            help="Not measured requests per scenario.",
+        )
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            help="Run only these scenarios (can be repeated).",
+        )
+        parser.add_argument(
+            "--username",
+            help="User of authenticated scenarios "
+                 "(default - first generated one).",
+        )
+        parser.add_argument(
+            "--url",
+            help="Base url of running server, e.g. http://127.0.0.1:8000",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            action="append",
+            help="Parallel requests in --url mode (can be repeated, "
+                 "then every level is measured).",
+        )
+        parser.add_argument(
+            "--label",
+            help="Name of the run, e.g. server mode (wsgi or asgi).",
+        )
+        parser.add_argument(
+            "--no-response-cache",
+            action="store_true",
+            help="Disable cache of responses (client mode only).",
+        )
+        parser.add_argument("--output", help="Save results to JSON file.")
+        parser.add_argument(
+            "--baseline",
+            help="JSON file of previous run to compare with.",
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=None,
+            help="Fail if p95 of any scenario is slower than baseline "
+                 "by more than this percent.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be positive.")
+        options["concurrency"] = options["concurrency"] or [1]
+        if min(options["concurrency"]) < 1:
+            raise CommandError("--concurrency must be positive.")
+        user = self.get_user(options["username"])
+        scenarios = self.get_scenarios(user=user, remote=bool(options["url"]))
+        if options["scenarios"]:
+            unknown = set(options["scenarios"]) \
+                - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(
+                    f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios
+                         if scenario.name in options["scenarios"]]
+
+        results = {}
+        for scenario in scenarios:
+            if options["url"]:
+                levels = options["concurrency"]
+                for concurrency in levels:
+                    # names of single level runs are the same as in client
+                    # mode, so they can be compared
+                    name = scenario.name if len(levels) == 1 \
+                        else f"{scenario.name}@{concurrency}"
+                    results[name] = self.run_remote(
+                        scenario,
+                        base_url=options["url"],
+                        requests=options["requests"],
+                        warmup=options["warmup"],
+                        concurrency=concurrency,
+                    )
+                    self.write_result(name, results[name])
+                continue
+            with override_settings(
+                    **({"API_RESPONSE_CACHE_TIMEOUT": 0}
+                       if options["no_response_cache"] else {})):
+                result = self.run_local(
+                    scenario,
+                    user=user,
+                    requests=options["requests"],
+                    warmup=options["warmup"],
+                )
+            results[scenario.name] = result
+            self.write_result(scenario.name, result)
+
+        report = {
+            "meta": self.get_meta(options),
+            "scenarios": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Results are saved to {options['output']}")
+        if options["baseline"]:
+            self.compare(
+                results,
+                baseline_path=options["baseline"],
+                max_regression=options["max_regression"],
+            )
+
+    @staticmethod
+    def get_user(username: Optional[str]):
+        """User for authenticated scenarios, None if there are no users."""
+        users = User.objects.filter(is_active=True).order_by("pk")
+        if username:
+            user = users.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"User {username} does not exist.")
+            return user
+        return users.filter(username__startswith="scale_").first() \
+            or users.first()
+
+    @staticmethod
+    def get_scenarios(user, remote: bool) -> list[Scenario]:
+        """Scenarios that can be run on current data."""
+        product = shop_models.Product.objects \
+            .filter(is_active=True, count__gt=0) \
+            .order_by("pk") \
+            .first()
+        catalog = reverse("api:shop:catalog")
+        scenarios = [
+            Scenario(f"catalog_{sort}", f"{catalog}?sort={sort}&sortType=dec")
+            for sort in ("rating", "price", "reviews", "date", "popularity")
+        ]
+        scenarios += [
+            Scenario(
+                "catalog_search",
+                f"{catalog}?filter[name]=dragon+castle&sort=relevance"),
+            Scenario(
+                "catalog_deep_page",
+                f"{catalog}?sort=price&sortType=inc&currentPage=100"),
+            Scenario("products_popular", reverse("api:shop:products_popular")),
+            Scenario("products_limited", reverse("api:shop:products_limited")),
+            Scenario("sales", reverse("api:shop:sales")),
+            Scenario("categories", reverse("api:shop:categories")),
+            Scenario("tags", reverse("api:shop:tags")),
+            Scenario("banners", reverse("api:shop:banners")),
+        ]
+        if product is not None:
+            scenarios.append(Scenario(
+                "product_detail",
+                reverse("api:shop:product-detail", kwargs={"id": product.pk}),
+            ))
+        if remote:
+            return scenarios
+
+        basket = reverse("api:orders:basket")
+        scenarios.append(Scenario("cart_get", basket))
+        if product is not None:
+            scenarios.append(Scenario(
+                "cart_add", basket, method="post",
+                data={"id": product.pk, "count": 1}))
+        if user is not None:
+            scenarios += [
+                Scenario("cart_get_user", basket, auth=True),
+                Scenario("orders_history", reverse("api:orders:orders"),
+                         auth=True),
+            ]
+            if product is not None:
+                scenarios.append(Scenario(
+                    "order_confirm",
+                    auth=True,
+                    func=lambda order_user: Command.confirm_order(
+                        user=order_user, product=product),
+                ))
+        return scenarios
+
+    @staticmethod
+    def confirm_order(user, product: shop_models.Product) -> None:
+        """OrderService.confirm of new Order with one Product."""
+        order = orders_models.Order.objects.create(user=user)
+        orders_models.OrderedProduct.objects.create(
+            order=order, product=product, price=product.price, count=1)
+        orders_services.OrderService().confirm(
+            order_id=order.pk,
+            user=user,
+            order_data={
+                "deliveryType": orders_models.Order.DeliveryTypes.ORDINARY,
+                "paymentType": orders_models.Order.PaymentTypes.ONLINE,
+                "address": "benchmark",
+            },
+        )
+
+    def run_local(
+            self,
+            scenario: Scenario,
+            user,
+            requests: int,
+            warmup: int,
+    ) -> dict[str, Any]:
+        """Runs scenario in this process, not safe ones are rolled back."""
+        client = Client(SERVER_NAME="localhost")
+        if scenario.auth:
+            client.force_login(user)
+
+        def call() -> int:
+            if scenario.func is not None:
+                scenario.func(user)
+                return 200
+            response = getattr(client, scenario.method)(
+                scenario.path,
+                data=scenario.data,
+                content_type="application/json",
+            ) if scenario.data is not None \
+                else getattr(client, scenario.method)(scenario.path)
+            return response.status_code
+
+        latencies, queries, errors = [], [], 0
+        elapsed = 0.0
+        for number in range(warmup + requests):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    status = call()
+                    duration = time.perf_counter() - started
+                if not scenario.safe:
+                    transaction.set_rollback(True)
+            if number < warmup:
+                continue
+            elapsed += duration
+            latencies.append(duration)
+            queries.append(len(context.captured_queries))
+            errors += status >= 400
+        return summarize(latencies, elapsed, errors, queries)
+
+    @staticmethod
+    def run_remote(
+            scenario: Scenario,
+            base_url: str,
+            requests: int,
+            warmup: int,
+            concurrency: int,
+    ) -> dict[str, Any]:
+        """Sends requests of safe scenario to running server."""
+        url = urllib.parse.urljoin(base_url, scenario.path)
+
+        def call(_) -> tuple[float, int]:
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as error:
+                status = error.code
+            return time.perf_counter() - started, status
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(call, range(warmup)))
+            started = time.perf_counter()
+            measured = list(executor.map(call, range(requests)))
+            elapsed = time.perf_counter() - started
+        return summarize(
+            [duration for duration, _ in measured],
+            elapsed,
+            sum(status >= 400 for _, status in measured),
+        )
+
+    def write_result(self, name: str, result: dict[str, Any]) -> None:
+        queries = f"{result['queries_mean']:>7} q" \
+            if "queries_mean" in result else ""
+        self.stdout.write(
+            f"{name:<20} p50 {result['p50_ms']:>9.2f} ms  "
+            f"p95 {result['p95_ms']:>9.2f} ms  "
+            f"p99 {result['p99_ms']:>9.2f} ms  "
+            f"{result['throughput']:>8} rps  "
+            f"{result['errors']} err {queries}")
+
+    @staticmethod
+    def get_meta(options: dict) -> dict[str, Any]:
+        """Environment of the run, to know what is compared."""
+        return {
+            "created_at": timezone.now().isoformat(),
+            "mode": "url" if options["url"] else "client",
+            "label": options["label"],
+            "url": options["url"],
+            "requests": options["requests"],
+            "warmup": options["warmup"],
+            "concurrency": options["concurrency"],
+            "response_cache": not options["no_response_cache"],
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "data": {
+                "products": shop_models.Product.objects.count(),
+                "reviews": shop_models.Review.objects.count(),
+                "orders": orders_models.Order.objects.count(),
+                "users": User.objects.count(),
+            },
+        }
+
+    def compare(
+            self,
+            results: dict[str, dict],
+            baseline_path: str,
+            max_regression: Optional[float],
+    ) -> None:
+        """
+        Prints change of p95, throughput and queries against baseline.
+        :raise CommandError: if p95 regression exceeds max_regression
+        """
+        with open(baseline_path) as file:
+            baseline = json.load(file)["scenarios"]
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if base is None:
+                self.stdout.write(f"{name:<20} not in baseline")
+                continue
+            change = (result["p95_ms"] - base["p95_ms"]) \
+                / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+            line = f"{name:<20} p95 {change:+7.1f} %  " \
+                   f"rps {base['throughput']} -> {result['throughput']}"
+            if "queries_mean" in result and "queries_mean" in base:
+                line += f"  queries {base['queries_mean']} -> " \
+                        f"{result['queries_mean']}"
+            self.stdout.write(line)
+            if max_regression is not None and change > max_regression:
+                regressions.append(name)
+        if regressions:
+            raise CommandError(
+                f"p95 regression over {max_regression} %: "
+                f"{', '.join(regressions)}")
@@ -0,0 +1,432 @@
+"""
+Per-endpoint metrics of requests: latency, SQL queries, serializers time.
+
+Every worker keeps metrics in-process (fixed buckets, one histogram
+per URL name), and periodically flushes the snapshot to Django cache.
+Metrics endpoint merges snapshots of all workers and renders them
+in Prometheus text format. Snapshots include stats of pools of db
+connections of workers (common.db.pool).
+Metrics are collected by api.middleware.MetricsMiddleware.
+"""
+
+import bisect
+import contextlib
+import os
+import socket
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpRequest
+
+from common.db import pool
+
+WORKERS_CACHE_KEY = "metrics:workers"
+WORKER_CACHE_KEY = "metrics:worker:{worker}"
+
+METRIC_PREFIX = "bg_shop"
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# {name: (help, buckets)}
+HISTOGRAMS = {
+    "http_request_duration_seconds": (
+        "Latency of requests (all requests).", LATENCY_BUCKETS),
+    "db_queries_per_request": (
+        "Number of SQL queries per request (sampled).", QUERIES_BUCKETS),
+    "db_duration_seconds": (
+        "Time of SQL queries per request (sampled).", LATENCY_BUCKETS),
+    "serializer_duration_seconds": (
+        "Time of DRF serializers per request (sampled).", LATENCY_BUCKETS),
+}
+
+# {stat of common.db.pool: (metric, type, help)}
+DB_POOL_METRICS = {
+    "size": ("db_pool_size", "gauge", "Max connections of pools."),
+    "in_use": (
+        "db_pool_connections_in_use", "gauge",
+        "Connections of pools taken by requests."),
+    "idle": (
+        "db_pool_connections_idle", "gauge", "Idle connections of pools."),
+    "waits": (
+        "db_pool_waits_total", "counter",
+        "Number of times requests waited for a free connection."),
+    "timeouts": (
+        "db_pool_timeouts_total", "counter",
+        "Number of times there was no free connection after timeout."),
+    "created": (
+        "db_pool_connections_created_total", "counter",
+        "Number of opened connections."),
+    "discarded": (
+        "db_pool_connections_discarded_total", "counter",
+        "Number of closed (broken, expired) connections."),
+}
+
+UNRESOLVED_VIEW = "<unresolved>"
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets (like Prometheus one)."""
+
+    def __init__(self, buckets: Iterable[float]) -> None:
+        """:param buckets: sorted upper bounds, +Inf is added implicitly"""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of observations."""
+        return sum(self.counts)
+
+    def observe(self, value: float) -> None:
+        """Adds value to the first bucket that is greater or equal."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def merge(self, counts: list[int], total: float) -> None:
+        """Adds counts of histogram with the same buckets."""
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.sum += total
+
+
+class Sample:
+    """Measurements of one sampled request."""
+
+    def __init__(self) -> None:
+        """Start with zero values."""
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper of db connections, counts queries and time."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+_current_sample: ContextVar[Optional[Sample]] = ContextVar(
+    "metrics_sample", default=None)
+
+
+@contextlib.contextmanager
+def collect(sample: Sample) -> Iterator[Sample]:
+    """
+    Collects SQL queries of all db connections and serializers time
+    into the sample.
+    """
+    token = _current_sample.set(sample)
+    try:
+        with collect_queries(sample):
+            yield sample
+    finally:
+        _current_sample.reset(token)
+
+
+@contextlib.asynccontextmanager
+async def acollect(sample: Sample) -> AsyncIterator[Sample]:
+    """
+    collect() for async views. Connections are per thread and
+    queries of the request are made by thread sensitive sync_to_async
+    (one thread per request), so wrappers are installed in that thread.
+    """
+    token = _current_sample.set(sample)
+    queries = collect_queries(sample)
+    await sync_to_async(queries.__enter__)()
+    try:
+        yield sample
+    finally:
+        await sync_to_async(queries.__exit__)(None, None, None)
+        _current_sample.reset(token)
+
+
+@contextlib.contextmanager
+def collect_queries(sample: Sample) -> Iterator[Sample]:
+    """Collects SQL queries of all db connections of current thread."""
+    with contextlib.ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(sample))
+        yield sample
+
+
+def install_serializer_timing() -> None:
+    """
+    Wraps BaseSerializer.data to measure serialization of sampled
+    requests. Only top level serializers are measured (nested ones
+    are part of them). Not sampled requests only check context var.
+    """
+    from rest_framework import serializers
+
+    for serializer_class in (
+            serializers.BaseSerializer,
+            serializers.Serializer,
+            serializers.ListSerializer,
+    ):
+        data_property = serializer_class.__dict__["data"]
+        if getattr(data_property.fget, "measured", False):
+            continue
+        serializer_class.data = property(_measured(data_property.fget))
+
+
+def _measured(getter):
+    """Decorator of `data` property getter."""
+    def measured_getter(serializer):
+        sample = _current_sample.get()
+        if sample is None or sample.serializer_depth:
+            return getter(serializer)
+        sample.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return getter(serializer)
+        finally:
+            sample.serializer_depth -= 1
+            sample.serializer_time += time.perf_counter() - started
+
+    measured_getter.measured = True
+    return measured_getter
+
+
+def get_view_name(request: HttpRequest) -> str:
+    """Full URL name with namespaces, e.g. `api:shop:catalog`."""
+    match = getattr(request, "resolver_match", None)
+    if match is None or not match.view_name:
+        return UNRESOLVED_VIEW
+    return match.view_name
+
+
+def get_worker_id() -> str:
+    """Unique id of the worker process (host and pid)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class MetricsRegistry:
+    """
+    In-process metrics of one worker.
+
+    Memory is bounded: histograms have fixed buckets, labels are URL
+    names, methods and status codes.
+    """
+
+    def __init__(self) -> None:
+        """Empty registry."""
+        self._lock = threading.Lock()
+        # {(metric, view): Histogram}
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        # {(view, method, status): number of requests}
+        self.requests: dict[tuple[str, str, int], int] = {}
+        # {(alias, stat): value} of pools of db connections
+        self.db_pools: dict[tuple[str, str], int] = {}
+        self.flushed_at = 0.0
+
+    def observe(self, metric: str, view: str, value: float) -> None:
+        """Adds value to histogram of the view."""
+        key = (metric, view)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(HISTOGRAMS[metric][1])
+                self.histograms[key] = histogram
+            histogram.observe(value)
+
+    def observe_request(
+            self,
+            view: str,
+            method: str,
+            status: int,
+            duration: float,
+            sample: Optional[Sample] = None,
+    ) -> None:
+        """
+        Records one request.
+        :param view: URL name
+        :param method: HTTP method
+        :param status: status code of response
+        :param duration: latency in seconds
+        :param sample: measurements if the request is sampled
+        :return: None
+        """
+        key = (view, method, status)
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+        self.observe("http_request_duration_seconds", view, duration)
+        if sample is not None:
+            self.observe("db_queries_per_request", view, sample.queries)
+            self.observe("db_duration_seconds", view, sample.db_time)
+            self.observe(
+                "serializer_duration_seconds", view, sample.serializer_time)
+
+    def snapshot(self) -> dict[str, list]:
+        """
+        Metrics as plain structures, to be stored in cache. Stats of
+        pools are current ones of the process.
+        """
+        db_pools = [
+            [alias, stat, value]
+            for alias, stats in pool.get_stats().items()
+            for stat, value in stats.items()
+        ]
+        with self._lock:
+            return {
+                "histograms": [
+                    [metric, view, list(histogram.counts), histogram.sum]
+                    for (metric, view), histogram
+                    in self.histograms.items()
+                ],
+                "requests": [
+                    [view, method, status, number]
+                    for (view, method, status), number
+                    in self.requests.items()
+                ],
+                "db_pools": db_pools,
+            }
+
+    def merge(self, snapshot: dict[str, list]) -> None:
+        """Adds snapshot (e.g. of other worker) to the registry."""
+        for metric, view, counts, total in snapshot["histograms"]:
+            if metric not in HISTOGRAMS:
+                continue
+            key = (metric, view)
+            with self._lock:
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = Histogram(HISTOGRAMS[metric][1])
+                    self.histograms[key] = histogram
+                histogram.merge(counts, total)
+        for view, method, status, number in snapshot["requests"]:
+            key = (view, method, status)
+            with self._lock:
+                self.requests[key] = self.requests.get(key, 0) + number
+        # pools are summed over workers
+        for alias, stat, value in snapshot.get("db_pools", []):
+            key = (alias, stat)
+            with self._lock:
+                self.db_pools[key] = self.db_pools.get(key, 0) + value
+
+    def flush(self) -> None:
+        """Saves snapshot of the worker to shared cache."""
+        worker = get_worker_id()
+        cache.set(
+            WORKER_CACHE_KEY.format(worker=worker),
+            self.snapshot(),
+            timeout=settings.METRICS_WORKER_TIMEOUT,
+        )
+        workers = cache.get(WORKERS_CACHE_KEY) or []
+        if worker not in workers:
+            # concurrent update can lose worker, it is added by next flush
+            cache.set(WORKERS_CACHE_KEY, workers + [worker], timeout=None)
+        self.flushed_at = time.monotonic()
+
+    def maybe_flush(self) -> None:
+        """Flushes not more often than once in METRICS_FLUSH_INTERVAL."""
+        if time.monotonic() - self.flushed_at \
+                >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+
+registry = MetricsRegistry()
+
+
+def collect_workers() -> tuple[MetricsRegistry, int]:
+    """
+    Merges snapshots of all workers. Snapshot of current worker
+    is flushed first. Workers which snapshots are expired are removed.
+    :return: merged registry and number of workers
+    """
+    registry.flush()
+    workers = cache.get(WORKERS_CACHE_KEY) or []
+    keys = {WORKER_CACHE_KEY.format(worker=worker): worker
+            for worker in workers}
+    snapshots = cache.get_many(keys)
+    alive = [keys[key] for key in snapshots]
+    if len(alive) != len(workers):
+        cache.set(WORKERS_CACHE_KEY, alive, timeout=None)
+
+    merged = MetricsRegistry()
+    for snapshot in snapshots.values():
+        merged.merge(snapshot)
+    return merged, len(alive)
+
+
+def _format_labels(**labels: Any) -> str:
+    """Prometheus labels with escaped values."""
+    escaped = (
+        (name, str(value).replace("\\", r"\\").replace("\n", r"\n")
+         .replace('"', r'\"'))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Integers without fraction, floats in full precision."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(merged: MetricsRegistry, workers: int) -> str:
+    """
+    Renders metrics in Prometheus text exposition format (0.0.4).
+    :param merged: registry with metrics of all workers
+    :param workers: number of workers included
+    :return: text
+    """
+    lines = [
+        f"# HELP {METRIC_PREFIX}_metrics_workers "
+        f"Number of workers included in metrics.",
+        f"# TYPE {METRIC_PREFIX}_metrics_workers gauge",
+        f"{METRIC_PREFIX}_metrics_workers {workers}",
+        f"# HELP {METRIC_PREFIX}_http_requests_total Number of requests.",
+        f"# TYPE {METRIC_PREFIX}_http_requests_total counter",
+    ]
+    for (view, method, status), number in sorted(merged.requests.items()):
+        labels = _format_labels(view=view, method=method, status=status)
+        lines.append(f"{METRIC_PREFIX}_http_requests_total{labels} {number}")
+
+    for metric, (help_text, buckets) in HISTOGRAMS.items():
+        name = f"{METRIC_PREFIX}_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        views = sorted(
+            view for (key_metric, view) in merged.histograms
+            if key_metric == metric)
+        for view in views:
+            histogram = merged.histograms[(metric, view)]
+            cumulative = 0
+            for bound, count in zip(
+                    (*buckets, "+Inf"), histogram.counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_value(bound)
+                labels = _format_labels(view=view, le=le)
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = _format_labels(view=view)
+            lines.append(
+                f"{name}_sum{labels} {_format_value(histogram.sum)}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+    for stat, (metric, metric_type, help_text) in DB_POOL_METRICS.items():
+        aliases = sorted(
+            alias for (alias, key_stat) in merged.db_pools
+            if key_stat == stat)
+        if not aliases:
+            continue
+        name = f"{METRIC_PREFIX}_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for alias in aliases:
+            labels = _format_labels(alias=alias)
+            lines.append(
+                f"{name}{labels} {merged.db_pools[(alias, stat)]}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,79 @@
+import random
+import time
+from typing import Awaitable, Callable, Union
+
+from asgiref.sync import (
+    iscoroutinefunction, markcoroutinefunction, sync_to_async)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse
+
+from api import metrics
+
+
+class MetricsMiddleware:
+    """
+    Records latency of every request, SQL queries and serializers time
+    of sampled requests (METRICS_SAMPLE_RATE) per URL name.
+    See api.metrics, metrics are exported by MetricsView.
+    It should be placed first to include time of other middlewares.
+    Supports ASGI mode (async views are not switched to sync).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        """Disabled if METRICS_ENABLED is False."""
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(
+            self,
+            request: HttpRequest,
+    ) -> Union[HttpResponse, Awaitable[HttpResponse]]:
+        """Measures the request."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sample = None
+        started = time.perf_counter()
+        if random.random() < settings.METRICS_SAMPLE_RATE:
+            with metrics.collect(metrics.Sample()) as sample:
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        metrics.registry.observe_request(
+            view=metrics.get_view_name(request),
+            method=request.method,
+            status=response.status_code,
+            duration=duration,
+            sample=sample,
+        )
+        metrics.registry.maybe_flush()
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Measures the request in ASGI mode."""
+        sample = None
+        started = time.perf_counter()
+        if random.random() < settings.METRICS_SAMPLE_RATE:
+            async with metrics.acollect(metrics.Sample()) as sample:
+                response = await self.get_response(request)
+        else:
+            response = await self.get_response(request)
+        duration = time.perf_counter() - started
+
+        metrics.registry.observe_request(
+            view=metrics.get_view_name(request),
+            method=request.method,
+            status=response.status_code,
+            duration=duration,
+            sample=sample,
+        )
+        # cache can be in db
+        await sync_to_async(metrics.registry.maybe_flush)()
+        return response
@@ -1,10 +1,25 @@
-from typing import Type, Any
+import base64
+import binascii
+import hashlib
+import json
+import math
+from typing import Type, Any, Optional
 
 from collections import OrderedDict
 
+from django.core.cache import cache
+from django.core.exceptions import (
+    EmptyResultSet,
+    FieldDoesNotExist,
+    FieldError,
+    ValidationError,
+)
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
 from django.db import models as db_models
+from django.db.models.constants import LOOKUP_SEP
 from django import views
-from rest_framework import pagination, serializers, response
+from rest_framework import exceptions, pagination, serializers, response
 from rest_framework import request as drf_request
 
 
@@ -65,7 +80,7 @@ class PageNumberPagination(pagination.PageNumberPagination):
         return OrderedDict([
             ('items', data),
             ("currentPage", self.page.number),
-            ("lastPage", self.page.paginator.count)
+            ("lastPage", self.page.paginator.num_pages)
         ])
 
 
@@ -108,4 +123,390 @@ class LimitOffsetPagination(pagination.LimitOffsetPagination):
                     ("results", data),
                 ]
             )
-        )
\ No newline at end of file
+        )
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor (keyset) pagination that keeps `currentPage`/`lastPage` contract.
+
+    Instead of OFFSET, the next page is selected by values of sort keys
+    of the last item: `WHERE (sort_field, pk) > (last_value, last_pk)`,
+    so any page costs the same as the first one. Ordering is taken
+    from queryset (`order_by()` with plain fields, annotations and
+    F().asc()/desc() expressions), pk is appended as a tiebreaker.
+
+    Client without cursor still can request `page_query_param`,
+    in this case OFFSET is used once, then it can follow `nextCursor`
+    and `previousCursor` from the response.
+
+    Number of pages depends on `count_mode`:
+        "exact" - COUNT(*) every request;
+        "cached" - COUNT(*) cached for `count_cache_timeout` seconds
+            by key based on SQL of the query;
+        "approximate" - planner estimate (postgres only), exact count
+            is used if estimate is less than `approximate_count_threshold`;
+        None - no count at all, lastPage is currentPage + 1
+            while there are more items.
+    """
+    page_size = 20
+    page_size_query_param = None
+    max_page_size = None
+    page_query_param = "page"
+    cursor_query_param = "cursor"
+
+    count_mode: Optional[str] = "exact"
+    count_cache_timeout = 60
+    count_cache_key_prefix = "pagination_count"
+    approximate_count_threshold = 10000
+
+    count_modes = ("exact", "cached", "approximate", None)
+
+    def paginate_queryset(
+            self,
+            queryset: db_models.QuerySet,
+            request: drf_request.Request,
+            view: Optional[views.View] = None,
+    ) -> list:
+        """
+        Selects one page of queryset.
+        :param queryset: ordered or not ordered queryset
+        :param request: to get cursor, page number and page size
+        :param view: current view
+        :return: list of objs
+        """
+        if self.count_mode not in self.count_modes:
+            raise ValueError(f"Unknown count_mode: '{self.count_mode}'")
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        cursor = self.decode_cursor(request, queryset)
+
+        if cursor is None:
+            self.page_number = self.get_page_number(request)
+            offset = (self.page_number - 1) * self.page_size
+            queryset = queryset.order_by(*self._order_by(self.ordering))
+            items = list(queryset[offset:offset + self.page_size + 1])
+            self.has_next = len(items) > self.page_size
+            items = items[:self.page_size]
+        else:
+            self.page_number = cursor["p"]
+            reverse = cursor["r"]
+            ordering = self._reverse(self.ordering) if reverse \
+                else self.ordering
+            queryset_page = queryset \
+                .filter(self._after(ordering, cursor["v"])) \
+                .order_by(*self._order_by(ordering))
+            items = list(queryset_page[:self.page_size + 1])
+            has_more = len(items) > self.page_size
+            items = items[:self.page_size]
+            if reverse:
+                items.reverse()
+                # moving back means there is at least the page we came from
+                self.has_next = True
+                if not has_more:
+                    self.page_number = 1
+            else:
+                self.has_next = has_more
+
+        self.items = items
+        self.count = self.get_count(queryset)
+        return items
+
+    def get_page_size(self, request: drf_request.Request) -> int:
+        """Page size from query params limited by max_page_size."""
+        if self.page_size_query_param:
+            try:
+                return pagination._positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_page_number(self, request: drf_request.Request) -> int:
+        """Page number from query params, 1 if it is not valid."""
+        try:
+            return pagination._positive_int(
+                request.query_params[self.page_query_param], strict=True)
+        except (KeyError, ValueError):
+            return 1
+
+    def get_ordering(self, queryset: db_models.QuerySet) -> list[tuple]:
+        """
+        Normalizes ordering of queryset.
+        :param queryset: qs, if it is not ordered, Meta.ordering
+            or pk is used
+        :return: [(field_name, descending, nulls_first), ...]
+            ending with pk
+        """
+        order_by = queryset.query.order_by or queryset.model._meta.ordering
+        ordering = []
+        for item in order_by:
+            if isinstance(item, str):
+                if item == "?":
+                    raise ValueError("Random ordering can't be paginated "
+                                     "by cursor.")
+                descending = item.startswith("-")
+                name = item.lstrip("-")
+                nulls_first = None
+            elif isinstance(item, db_models.expressions.OrderBy) \
+                    and isinstance(item.expression, db_models.F):
+                descending = item.descending
+                name = item.expression.name
+                nulls_first = True if item.nulls_first else \
+                    False if item.nulls_last else None
+            else:
+                raise ValueError(f"Ordering by '{item}' can't be "
+                                 f"paginated by cursor.")
+            if LOOKUP_SEP in name:
+                raise ValueError(f"Ordering by related field '{name}' can't "
+                                 f"be paginated by cursor.")
+            if name == queryset.model._meta.pk.name:
+                name = "pk"
+            if nulls_first is None:
+                # postgres default, set explicitly for other databases
+                nulls_first = descending
+            ordering.append((name, descending, nulls_first))
+            if name == "pk":
+                break
+        else:
+            descending = ordering[0][1] if ordering else False
+            ordering.append(("pk", descending, descending))
+        return ordering
+
+    @staticmethod
+    def _reverse(ordering: list[tuple]) -> list[tuple]:
+        """Opposite ordering, used to move to previous page."""
+        return [
+            (name, not descending, not nulls_first)
+            for name, descending, nulls_first in ordering
+        ]
+
+    @staticmethod
+    def _order_by(
+            ordering: list[tuple],
+    ) -> list[db_models.expressions.OrderBy]:
+        """Expressions for queryset.order_by()."""
+        expressions = []
+        for name, descending, nulls_first in ordering:
+            nulls = {"nulls_first": True} if nulls_first \
+                else {"nulls_last": True}
+            if descending:
+                expressions.append(db_models.F(name).desc(**nulls))
+            else:
+                expressions.append(db_models.F(name).asc(**nulls))
+        return expressions
+
+    @staticmethod
+    def _after(ordering: list[tuple], values: list) -> db_models.Q:
+        """
+        Builds condition selecting rows that go after passed key values.
+        It is (a > x) OR (a = x AND b > y) OR ... taking into account
+        direction and place of NULLs for every key.
+        :param ordering: normalized ordering
+        :param values: values of keys of the last item
+        :return: Q obj
+        """
+        condition = db_models.Q(pk__in=[])
+        equal = db_models.Q()
+        for (name, descending, nulls_first), value in zip(ordering, values):
+            if value is None:
+                after = db_models.Q(**{f"{name}__isnull": False}) \
+                    if nulls_first else None
+                same = db_models.Q(**{f"{name}__isnull": True})
+            else:
+                lookup = "lt" if descending else "gt"
+                after = db_models.Q(**{f"{name}__{lookup}": value})
+                if not nulls_first:
+                    after |= db_models.Q(**{f"{name}__isnull": True})
+                same = db_models.Q(**{name: value})
+            if after is not None:
+                condition |= equal & after
+            equal &= same
+        return condition
+
+    def encode_cursor(
+            self,
+            item: db_models.Model,
+            page_number: int,
+            reverse: bool,
+    ) -> str:
+        """
+        Makes opaque cursor string.
+        :param item: the last (or first if reverse) obj of the page
+        :param page_number: number of the page, cursor points to
+        :param reverse: direction
+        :return: urlsafe base64 string
+        """
+        data = {
+            "v": [getattr(item, name) for name, _, _ in self.ordering],
+            "p": page_number,
+            "r": reverse,
+        }
+        raw = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def get_ordering_fields(
+            queryset: db_models.QuerySet,
+            ordering: list[tuple],
+    ) -> list[Optional[db_models.Field]]:
+        """
+        Finds fields of sort keys (model fields or output fields
+        of annotations) to convert values of cursor.
+        :param queryset: paginated queryset
+        :param ordering: normalized ordering
+        :return: fields, None if field can't be resolved
+        """
+        fields = []
+        for name, _, _ in ordering:
+            try:
+                if name == "pk":
+                    field = queryset.model._meta.pk
+                elif name in queryset.query.annotations:
+                    field = queryset.query.annotations[name].output_field
+                else:
+                    field = queryset.model._meta.get_field(name)
+            except (FieldDoesNotExist, FieldError):
+                field = None
+            fields.append(field)
+        return fields
+
+    def decode_cursor(
+            self,
+            request: drf_request.Request,
+            queryset: db_models.QuerySet,
+    ) -> Optional[dict]:
+        """
+        Parses cursor from query params. Values are converted
+        by fields of the current ordering, so cursor of another
+        ordering doesn't get into the query.
+        :param request: drf request
+        :param queryset: paginated queryset
+        :return: None if there is no cursor in request
+        :raise NotFound: if cursor is invalid
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            cursor = {
+                "v": list(data["v"]),
+                "p": pagination._positive_int(data["p"], strict=True),
+                "r": bool(data["r"]),
+            }
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise exceptions.NotFound("Invalid cursor")
+        if len(cursor["v"]) != len(self.ordering):
+            raise exceptions.NotFound("Invalid cursor")
+        fields = self.get_ordering_fields(queryset, self.ordering)
+        try:
+            cursor["v"] = [
+                field.to_python(value)
+                if field is not None and value is not None else value
+                for field, value in zip(fields, cursor["v"])
+            ]
+        except ValidationError:
+            raise exceptions.NotFound("Invalid cursor")
+        return cursor
+
+    def get_count(self, queryset: db_models.QuerySet) -> Optional[int]:
+        """
+        Counts items depending on count_mode.
+        :param queryset: not sliced queryset
+        :return: number of items or None if count_mode is None
+        """
+        match self.count_mode:
+            case "exact":
+                return queryset.count()
+            case "cached":
+                return self._get_cached_count(queryset)
+            case "approximate":
+                return self._get_approximate_count(queryset)
+        return None
+
+    def _get_cached_count(self, queryset: db_models.QuerySet) -> int:
+        """COUNT(*) cached by SQL of the query."""
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        digest = hashlib.md5(
+            f"{sql}{params}".encode(), usedforsecurity=False).hexdigest()
+        key = f"{self.count_cache_key_prefix}:{digest}"
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, timeout=self.count_cache_timeout)
+        return count
+
+    def _get_approximate_count(self, queryset: db_models.QuerySet) -> int:
+        """
+        Planner estimate of rows number, falls back to COUNT(*)
+        for small results and not postgres databases.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return queryset.count()
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate < self.approximate_count_threshold:
+            return queryset.count()
+        return estimate
+
+    def get_last_page(self) -> int:
+        """Number of the last page, based on count if it is known."""
+        if self.count is None:
+            return self.page_number + 1 if self.has_next else self.page_number
+        last_page = max(1, math.ceil(self.count / self.page_size))
+        # approximate or cached count may be behind actual data
+        if self.has_next:
+            last_page = max(last_page, self.page_number + 1)
+        return max(last_page, self.page_number)
+
+    def get_next_cursor(self) -> Optional[str]:
+        """Cursor to the next page, None for the last page."""
+        if not self.has_next or not self.items:
+            return None
+        return self.encode_cursor(
+            self.items[-1], page_number=self.page_number + 1, reverse=False)
+
+    def get_previous_cursor(self) -> Optional[str]:
+        """Cursor to the previous page, None for the first page."""
+        if self.page_number <= 1 or not self.items:
+            return None
+        return self.encode_cursor(
+            self.items[0], page_number=self.page_number - 1, reverse=True)
+
+    def get_paginated_data(self, data: Any) -> OrderedDict:
+        """
+        Adds new fields to data, without sending response.
+        :param data: main data to send as response later
+        :return: modified data
+        """
+        return OrderedDict([
+            ("items", data),
+            ("currentPage", self.page_number),
+            ("lastPage", self.get_last_page()),
+            ("nextCursor", self.get_next_cursor()),
+            ("previousCursor", self.get_previous_cursor()),
+        ])
+
+    def get_paginated_response(self, data: Any) -> response.Response:
+        """
+        Adds new fields to response
+        :param data: main response data
+        :return: modified response
+        """
+        return response.Response(self.get_paginated_data(data))
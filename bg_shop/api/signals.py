@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models import signals
+
+from api import caching
+from dynamic_config import models as config_models
+from shop import models as shop_models
+
+# {model: tag of cached responses}, see api.caching
+CACHE_TAGS = {
+    shop_models.Product: "product",
+    # reviews change rating of products
+    shop_models.Review: "product",
+    shop_models.Category: "category",
+    shop_models.Sale: "sale",
+    shop_models.Tag: "tag",
+    shop_models.Banner: "banner",
+    config_models.DynamicConfig: "dynamic_config",
+}
+
+# relations that are displayed with products
+M2M_CACHE_TAGS = {
+    shop_models.Product.tags.through: "product",
+    shop_models.Product.images.through: "product",
+}
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    """
+    Invalidates cached responses depending on the changed model.
+    It is repeated after commit, because the response could be cached
+    from old data between save and commit.
+    """
+    tag = CACHE_TAGS.get(sender) or M2M_CACHE_TAGS[sender]
+    caching.invalidate_tags(tag)
+    transaction.on_commit(lambda: caching.invalidate_tags(tag))
+
+
+for model in CACHE_TAGS:
+    signals.post_save.connect(
+        invalidate_cached_responses,
+        sender=model,
+        dispatch_uid=f"api_cache_post_save_{model._meta.label_lower}",
+    )
+    signals.post_delete.connect(
+        invalidate_cached_responses,
+        sender=model,
+        dispatch_uid=f"api_cache_post_delete_{model._meta.label_lower}",
+    )
+for through in M2M_CACHE_TAGS:
+    signals.m2m_changed.connect(
+        invalidate_cached_responses,
+        sender=through,
+        dispatch_uid=f"api_cache_m2m_{through._meta.label_lower}",
+    )
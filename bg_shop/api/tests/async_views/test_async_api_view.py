@@ -0,0 +1,68 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from shop import models as shop_models
+
+
+class AsyncApiViewTestCase(TestCase):
+    fixtures = [
+        "test_category",
+        "test_catalog",
+        "test_user",
+        "test_review",
+        "test_tag",
+    ]
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_product_detail(self):
+        product = await shop_models.Product.objects.afirst()
+        response = await self.async_client.get(
+            reverse("api:shop:product-detail", args=[product.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], product.pk)
+        reviews = await sync_to_async(product.review_set.count)()
+        self.assertEqual(len(response.json()["reviews"]), reviews)
+
+    async def test_not_found(self):
+        response = await self.async_client.get(
+            reverse("api:shop:product-detail", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_concurrent_requests(self):
+        urls = [
+            reverse("api:shop:categories"),
+            reverse("api:shop:catalog"),
+            reverse("api:orders:basket"),
+        ] * 3
+        responses = await asyncio.gather(
+            *(self.async_client.get(url) for url in urls))
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [200] * len(urls),
+        )
+
+    async def test_cart_add_and_get(self):
+        product = await shop_models.Product.objects \
+            .filter(is_active=True, count__gt=0) \
+            .afirst()
+        response = await self.async_client.post(
+            reverse("api:orders:basket"),
+            data={"id": product.pk, "count": 1},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.async_client.get(reverse("api:orders:basket"))
+        self.assertEqual(
+            [item["id"] for item in response.json()], [product.pk])
+
+    def test_method_not_allowed(self):
+        response = self.client.put(reverse("api:shop:categories"))
+        self.assertEqual(response.status_code, 405)
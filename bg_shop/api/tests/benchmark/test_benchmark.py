@@ -0,0 +1,146 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from api.management.commands import benchmark_api
+from orders.models import Order, OrderedProduct
+from shop.models import Category, Product, Review
+
+User = get_user_model()
+
+
+class GenerateScaleDataTestCase(TestCase):
+    options = {
+        "users": 5,
+        "images": 3,
+        "categories": 5,
+        "tags": 4,
+        "products": 20,
+        "reviews": 50,
+        "orders": 10,
+        "stdout": StringIO(),
+    }
+
+    def test_generate_and_clear(self):
+        call_command("generate_scale_data", seed=1, **self.options)
+
+        self.assertEqual(
+            User.objects.filter(username__startswith="scale_").count(), 5)
+        self.assertEqual(Product.objects.filter(
+            title__startswith="scale ").count(), 20)
+        self.assertEqual(Order.objects.filter(comment="scale").count(), 10)
+        self.assertTrue(OrderedProduct.objects.filter(
+            order__comment="scale").exists())
+        subcategory = Category.objects.get(title="scale subcategory 0")
+        self.assertEqual(
+            subcategory.path,
+            f"{subcategory.parent_id}/{subcategory.pk}/")
+        product = Product.objects.filter(review__isnull=False).first()
+        self.assertEqual(product.review_count, product.review_set.count())
+
+        call_command("generate_scale_data", clear=True, stdout=StringIO())
+        self.assertFalse(
+            User.objects.filter(username__startswith="scale_").exists())
+        self.assertFalse(
+            Product.objects.filter(title__startswith="scale ").exists())
+
+    def test_generation_is_deterministic(self):
+        call_command("generate_scale_data", seed=7, **self.options)
+        first = list(Review.objects.order_by("pk").values_list(
+            "product__title", "author__username", "rate"))
+        call_command("generate_scale_data", clear=True, stdout=StringIO())
+
+        call_command("generate_scale_data", seed=7, **self.options)
+        second = list(Review.objects.order_by("pk").values_list(
+            "product__title", "author__username", "rate"))
+        self.assertEqual(first, second)
+
+    def test_generated_data_exists(self):
+        call_command("generate_scale_data", **self.options)
+        with self.assertRaises(CommandError):
+            call_command("generate_scale_data", **self.options)
+
+
+class BenchmarkApiTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            "generate_scale_data",
+            **GenerateScaleDataTestCase.options,
+        )
+
+    def test_percentile(self):
+        values = [0.1 * i for i in range(1, 11)]
+        self.assertEqual(benchmark_api.percentile(values, 50), 0.5)
+        self.assertEqual(benchmark_api.percentile(values, 99), 1.0)
+
+    def test_results_and_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            call_command(
+                "benchmark_api",
+                requests=3,
+                warmup=1,
+                output=output,
+                stdout=StringIO(),
+            )
+            with open(output) as file:
+                report = json.load(file)
+            scenarios = report["scenarios"]
+            self.assertEqual(report["meta"]["data"]["products"], 20)
+            for name in ("catalog_rating", "cart_add", "order_confirm"):
+                self.assertEqual(scenarios[name]["requests"], 3)
+                self.assertEqual(scenarios[name]["errors"], 0)
+                self.assertIn("p99_ms", scenarios[name])
+                self.assertIn("queries_mean", scenarios[name])
+
+            # not safe scenarios are rolled back
+            self.assertFalse(Order.objects.filter(
+                address="benchmark").exists())
+
+            with open(output, "w") as file:
+                for result in scenarios.values():
+                    result["p95_ms"] = 1e-6
+                json.dump(report, file)
+            with self.assertRaises(CommandError):
+                call_command(
+                    "benchmark_api",
+                    requests=1,
+                    warmup=0,
+                    scenario=["tags"],
+                    baseline=output,
+                    max_regression=10,
+                    stdout=StringIO(),
+                )
+
+    def test_concurrency_levels(self):
+        result = benchmark_api.summarize([0.01, 0.02], 0.02, 0)
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.object(benchmark_api.Command, "run_remote",
+                             return_value=result) as run_remote:
+            output = os.path.join(directory, "results.json")
+            call_command(
+                "benchmark_api",
+                url="http://127.0.0.1:8000",
+                concurrency=[1, 16],
+                label="asgi",
+                scenario=["tags"],
+                output=output,
+                stdout=StringIO(),
+            )
+            with open(output) as file:
+                report = json.load(file)
+
+        self.assertEqual(
+            [call.kwargs["concurrency"] for call in run_remote.call_args_list],
+            [1, 16],
+        )
+        self.assertEqual(set(report["scenarios"]), {"tags@1", "tags@16"})
+        self.assertEqual(report["meta"]["label"], "asgi")
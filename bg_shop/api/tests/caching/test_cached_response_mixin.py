@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import permissions, views
+from rest_framework import response as drf_response
+from rest_framework.test import APIRequestFactory
+
+from api.caching import CachedResponseMixin, invalidate_tags
+from shop import models
+
+UserModel = get_user_model()
+
+
+class ExampleApi(CachedResponseMixin, views.APIView):
+    permission_classes = (permissions.AllowAny,)
+    cache_tags = ("example",)
+    calls = 0
+
+    def get(self, request):
+        ExampleApi.calls += 1
+        return drf_response.Response({"calls": ExampleApi.calls})
+
+
+@override_settings(API_RESPONSE_CACHE_TIMEOUT=60)
+class CachedResponseMixinTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        ExampleApi.calls = 0
+        self.factory = APIRequestFactory()
+        self.view = ExampleApi.as_view()
+
+    def _get(self, path="/some/path", **extra):
+        return self.view(self.factory.get(path, **extra))
+
+    def test_response_is_cached(self):
+        first = self._get()
+        second = self._get()
+
+        self.assertEqual(first.data, {"calls": 1})
+        self.assertEqual(second.data, {"calls": 1})
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_query_params_are_normalized(self):
+        self._get("/some/path?tags[]=1&tags[]=2&filter[name]=a&page=1")
+        response = self._get(
+            "/some/path?page=1&filter[name]=a&tags[]=2&tags[]=1")
+        self.assertEqual(response.data, {"calls": 1})
+
+        response = self._get("/some/path?page=2")
+        self.assertEqual(response.data, {"calls": 2})
+
+    def test_not_modified(self):
+        etag = self._get()["ETag"]
+
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_invalidation_by_tag(self):
+        self._get()
+        invalidate_tags("example")
+        self.assertEqual(self._get().data, {"calls": 2})
+
+        invalidate_tags("other")
+        self.assertEqual(self._get().data, {"calls": 2})
+
+    def test_authenticated_users_are_not_cached(self):
+        user = UserModel.objects.create_user(username="user")
+        for _ in range(2):
+            request = self.factory.get("/some/path")
+            request.user = user
+            response = self.view(request)
+        self.assertEqual(response.data, {"calls": 2})
+        self.assertNotIn("ETag", response)
+
+
+@override_settings(API_RESPONSE_CACHE_TIMEOUT=60)
+class ModelSignalsInvalidationTestCase(TestCase):
+    fixtures = [
+        "test_catalog",
+        "test_category",
+        "test_tag",
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("api:shop:catalog")
+
+    def test_admin_edit_of_price_invalidates_catalog(self):
+        self.client.get(self.url)
+        product = models.Product.objects.get(pk=1)
+        product.price = 999
+        product.save()
+
+        response = self.client.get(self.url)
+
+        prices = {
+            item["id"]: item["price"] for item in response.json()["items"]}
+        self.assertEqual(prices[1], 999)
+
+    def test_sales_are_invalidated_by_new_sale(self):
+        url = reverse("api:shop:sales")
+        self.assertEqual(self.client.get(url).json()["items"], [])
+        models.Sale.objects.create(
+            product_id=1,
+            discount=10,
+            date_from="2000-01-01",
+            date_to="2100-01-01",
+        )
+        self.assertEqual(len(self.client.get(url).json()["items"]), 1)
+
+    def test_cached_catalog_does_not_hit_db(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,168 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from api import metrics
+
+
+class HistogramTestCase(TestCase):
+    def test_observe(self):
+        histogram = metrics.Histogram([1, 5])
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.sum, 14.5)
+
+
+class MetricsRegistryTestCase(TestCase):
+    def test_merge_snapshots_of_workers(self):
+        first = metrics.MetricsRegistry()
+        second = metrics.MetricsRegistry()
+        first.observe_request("api:shop:tags", "GET", 200, 0.02)
+        second.observe_request("api:shop:tags", "GET", 200, 0.2)
+
+        merged = metrics.MetricsRegistry()
+        merged.merge(first.snapshot())
+        merged.merge(second.snapshot())
+
+        histogram = merged.histograms[
+            ("http_request_duration_seconds", "api:shop:tags")]
+        self.assertEqual(histogram.count, 2)
+        self.assertEqual(merged.requests[("api:shop:tags", "GET", 200)], 2)
+
+    def test_render_prometheus(self):
+        registry = metrics.MetricsRegistry()
+        sample = metrics.Sample()
+        sample.queries = 3
+        registry.observe_request(
+            "api:shop:tags", "GET", 200, 0.02, sample=sample)
+
+        text = metrics.render_prometheus(registry, workers=1)
+
+        self.assertIn(
+            'bg_shop_http_requests_total'
+            '{view="api:shop:tags",method="GET",status="200"} 1',
+            text,
+        )
+        self.assertIn(
+            'bg_shop_db_queries_per_request_bucket'
+            '{view="api:shop:tags",le="2"} 0',
+            text,
+        )
+        self.assertIn(
+            'bg_shop_db_queries_per_request_bucket'
+            '{view="api:shop:tags",le="5"} 1',
+            text,
+        )
+        self.assertIn(
+            'bg_shop_db_queries_per_request_count{view="api:shop:tags"} 1',
+            text,
+        )
+
+    def test_db_pools_of_workers_are_summed(self):
+        stats = {"default": {"size": 10, "in_use": 2, "timeouts": 1}}
+        merged = metrics.MetricsRegistry()
+        with patch.object(metrics.pool, "get_stats", return_value=stats):
+            merged.merge(metrics.MetricsRegistry().snapshot())
+            merged.merge(metrics.MetricsRegistry().snapshot())
+
+        text = metrics.render_prometheus(merged, workers=2)
+
+        self.assertIn('bg_shop_db_pool_size{alias="default"} 20', text)
+        self.assertIn(
+            'bg_shop_db_pool_connections_in_use{alias="default"} 4', text)
+        self.assertIn(
+            "# TYPE bg_shop_db_pool_timeouts_total counter", text)
+        self.assertIn(
+            'bg_shop_db_pool_timeouts_total{alias="default"} 2', text)
+
+
+@override_settings(METRICS_SAMPLE_RATE=1, METRICS_TOKEN=None)
+class MetricsMiddlewareTestCase(TestCase):
+    fixtures = [
+        "test_tag",
+        "test_category",
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.registry = metrics.MetricsRegistry()
+        patcher = patch("api.metrics.registry", self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sampled_request_is_measured(self):
+        self.client.get(reverse("api:shop:tags"))
+
+        queries = self.registry.histograms[
+            ("db_queries_per_request", "api:shop:tags")]
+        serializer = self.registry.histograms[
+            ("serializer_duration_seconds", "api:shop:tags")]
+        self.assertEqual(queries.count, 1)
+        self.assertGreaterEqual(queries.sum, 1)
+        self.assertGreater(serializer.sum, 0)
+
+    async def test_async_view_is_measured(self):
+        await self.async_client.get(reverse("api:shop:categories"))
+
+        queries = self.registry.histograms[
+            ("db_queries_per_request", "api:shop:categories")]
+        self.assertEqual(queries.count, 1)
+        self.assertGreaterEqual(queries.sum, 1)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_not_sampled_request_has_only_latency(self):
+        self.client.get(reverse("api:shop:tags"))
+
+        self.assertIn(
+            ("http_request_duration_seconds", "api:shop:tags"),
+            self.registry.histograms,
+        )
+        self.assertNotIn(
+            ("db_queries_per_request", "api:shop:tags"),
+            self.registry.histograms,
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint_merges_workers(self):
+        other_worker = metrics.MetricsRegistry()
+        other_worker.observe_request("api:shop:tags", "GET", 200, 0.01)
+        cache.set(
+            metrics.WORKER_CACHE_KEY.format(worker="other:1"),
+            other_worker.snapshot(),
+        )
+        cache.set(metrics.WORKERS_CACHE_KEY, ["other:1"])
+        self.client.get(reverse("api:shop:tags"))
+
+        response = self.client.get(
+            reverse("api:metrics"), HTTP_AUTHORIZATION="Bearer secret")
+
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn("bg_shop_metrics_workers 2", text)
+        self.assertIn(
+            'bg_shop_http_requests_total'
+            '{view="api:shop:tags",method="GET",status="200"} 2',
+            text,
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint_requires_token(self):
+        url = reverse("api:metrics")
+        self.assertEqual(self.client.get(url).status_code, 401)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics_endpoint_without_token_is_not_public(self):
+        url = reverse("api:metrics")
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.client.force_login(get_user_model().objects.create_user(
+            username="admin", is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, 200)
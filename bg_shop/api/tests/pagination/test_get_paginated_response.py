@@ -7,9 +7,11 @@ from rest_framework.views import APIView
 
 from api.pagination import (
     LimitOffsetPagination,
+    PageNumberPagination,
     get_paginated_response,
 )
 from django.contrib.auth import get_user_model
+from rest_framework.request import Request
 
 UserModel = get_user_model()
 
@@ -100,3 +102,19 @@ class GetPaginatedResponseTests(TestCase):
             next_page_response.data,
             "Wrong paginated response.",
         )
+
+
+class PageNumberPaginationTests(TestCase):
+    def test_last_page_is_number_of_pages(self):
+        for i in range(5):
+            UserModel.objects.create_user(username=f"user{i}")
+        paginator = PageNumberPagination()
+        paginator.page_size = 2
+        request = Request(APIRequestFactory().get("/some/path"))
+        paginator.paginate_queryset(
+            UserModel.objects.order_by("id"), request)
+
+        data = paginator.get_paginated_data([])
+
+        self.assertEqual(data["currentPage"], 1)
+        self.assertEqual(data["lastPage"], 3)
@@ -0,0 +1,152 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.pagination import KeysetPagination
+from shop import models
+from shop.selectors import ProductSelector
+
+
+class Pagination(KeysetPagination):
+    page_size = 3
+    page_query_param = "currentPage"
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+        prices = [10, 20, 20, 20, 30, 40, 40, 50]
+        ratings = [None, 4.0, None, 3.5, 4.0, None, 5.0, 1.0]
+        for i, (price, rating) in enumerate(zip(prices, ratings)):
+            models.Product.objects.create(
+                title=f"Product {i}",
+                description="",
+                price=Decimal(price),
+                count=1,
+                release_date="2023-01-01",
+                manufacturer="test",
+                rating_avg=rating,
+            )
+
+    def _paginate(self, queryset, paginator=None, **params):
+        paginator = paginator or Pagination()
+        request = Request(self.factory.get("/", data=params))
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator, page
+
+    def _walk(self, queryset):
+        """Follows nextCursor from the first page to the last one."""
+        paginator, page = self._paginate(queryset)
+        pages = [page]
+        while cursor := paginator.get_next_cursor():
+            paginator, page = self._paginate(queryset, cursor=cursor)
+            pages.append(page)
+        return pages
+
+    def test_pages_match_offset_pagination_for_every_sort(self):
+        selector = ProductSelector()
+        for sort_field in ("rating", "price", "reviews", "date",
+                           "title", "popularity"):
+            for order in ("inc", "dec"):
+                with self.subTest(sort_field=sort_field, order=order):
+                    catalog = selector.get_catalog(
+                        sort_field=sort_field, order=order)
+                    expected = list(
+                        catalog.order_by(
+                            *Pagination._order_by(
+                                Pagination().get_ordering(catalog)))
+                        .values_list("pk", flat=True))
+
+                    pages = self._walk(catalog)
+
+                    self.assertEqual(
+                        [product.pk for page in pages for product in page],
+                        expected,
+                    )
+                    self.assertEqual(len(pages), 3)
+
+    def test_nulls_are_placed_as_in_sort(self):
+        catalog = ProductSelector().get_catalog(sort_field="rating")
+        pages = self._walk(catalog)
+        ratings = [product.rating for page in pages for product in page]
+        self.assertEqual(ratings, [5.0, 4.0, 4.0, 3.5, 1.0, None, None, None])
+
+    def test_previous_cursor_returns_previous_page(self):
+        catalog = ProductSelector().get_catalog(sort_field="price")
+        paginator, first_page = self._paginate(catalog)
+        paginator, _ = self._paginate(
+            catalog, cursor=paginator.get_next_cursor())
+
+        paginator, page = self._paginate(
+            catalog, cursor=paginator.get_previous_cursor())
+
+        self.assertEqual(page, first_page)
+        self.assertEqual(paginator.page_number, 1)
+        self.assertIsNone(paginator.get_previous_cursor())
+
+    def test_page_number_without_cursor(self):
+        catalog = ProductSelector().get_catalog(sort_field="price")
+        paginator, page = self._paginate(catalog, currentPage=3)
+        data = paginator.get_paginated_data([])
+
+        self.assertEqual(len(page), 2)
+        self.assertEqual(data["currentPage"], 3)
+        self.assertEqual(data["lastPage"], 3)
+        self.assertIsNone(data["nextCursor"])
+        self.assertIsNotNone(data["previousCursor"])
+
+    def test_cursor_page_does_not_use_offset(self):
+        catalog = ProductSelector().get_catalog(sort_field="title")
+        paginator, _ = self._paginate(catalog)
+        with self.assertNumQueries(4):  # page, count, images, tags
+            paginator, _ = self._paginate(
+                catalog, cursor=paginator.get_next_cursor())
+        self.assertEqual(paginator.page_number, 2)
+
+    def test_cached_count(self):
+        class CachedPagination(Pagination):
+            count_mode = "cached"
+
+        queryset = models.Product.objects.order_by("pk")
+        self._paginate(queryset, paginator=CachedPagination())
+        models.Product.objects.filter(pk=queryset[0].pk).delete()
+
+        with self.assertNumQueries(1):
+            paginator, _ = self._paginate(
+                queryset, paginator=CachedPagination())
+        self.assertEqual(paginator.count, 8)
+
+    def test_without_count(self):
+        class NoCountPagination(Pagination):
+            count_mode = None
+
+        queryset = models.Product.objects.order_by("pk")
+        with self.assertNumQueries(1):
+            paginator, _ = self._paginate(
+                queryset, paginator=NoCountPagination())
+        self.assertEqual(paginator.get_last_page(), 2)
+
+    def test_invalid_cursor(self):
+        queryset = models.Product.objects.order_by("pk")
+        with self.assertRaises(exceptions.NotFound):
+            self._paginate(queryset, cursor="invalid")
+
+    def test_cursor_of_another_ordering(self):
+        paginator, _ = self._paginate(
+            ProductSelector().get_catalog(sort_field="price"))
+        cursor = paginator.get_next_cursor()
+
+        with self.assertRaises(exceptions.NotFound):
+            self._paginate(
+                ProductSelector().get_catalog(sort_field="date"),
+                cursor=cursor,
+            )
+
+    def test_random_ordering_is_not_supported(self):
+        with self.assertRaises(ValueError):
+            self._paginate(models.Product.objects.order_by("?"))
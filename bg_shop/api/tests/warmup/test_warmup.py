@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from api import warmup
+from dynamic_config import selectors as conf_selectors
+from shop import selectors as shop_selectors
+
+
+class WarmupTestCase(TestCase):
+    fixtures = [
+        "test_category",
+        "test_catalog",
+        "test_tag",
+    ]
+
+    def setUp(self):
+        cache.clear()
+        conf_selectors.DynamicConfigSelector.clear_local_cache()
+        self.addCleanup(
+            conf_selectors.DynamicConfigSelector.clear_local_cache)
+        # closing would break transaction of the test
+        patcher = patch.object(warmup, "close_connections")
+        self.close_connections = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(API_RESPONSE_CACHE_TIMEOUT=60)
+    def test_warmup(self):
+        timings = warmup.warmup()
+
+        self.assertEqual(
+            set(timings), {name for name, _ in warmup.STEPS})
+        self.close_connections.assert_called_once()
+        self.assertIsNotNone(
+            cache.get(shop_selectors.CategorySelector.TREE_CACHE_KEY))
+
+        # caches are primed
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("api:shop:categories"))
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(reverse("api:shop:products_popular"))
+            self.assertEqual(response.status_code, 200)
+
+    def test_failed_step_is_skipped(self):
+        def failed_step():
+            raise RuntimeError("no db")
+
+        steps = (
+            ("dynamic_config", failed_step),
+            ("urls", warmup.populate_urls),
+        )
+        with patch.object(warmup, "STEPS", steps), \
+                self.assertLogs("api.warmup", level="ERROR"):
+            timings = warmup.warmup()
+        self.assertEqual(list(timings), ["urls"])
+
+    def test_populate_urls(self):
+        self.assertGreater(warmup.populate_urls(), 0)
@@ -1,5 +1,7 @@
 from django.urls import path, include
 
+from api import views
+
 app_name = 'api'
 
 urlpatterns = [
@@ -7,4 +9,5 @@ urlpatterns = [
     path("", include("payment.urls")),
     path("", include("shop.urls")),
     path("", include("orders.urls")),
+    path("metrics/", views.MetricsView.as_view(), name="metrics"),
 ]
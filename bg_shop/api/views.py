@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+
+from api import metrics
+
+
+class MetricsView(View):
+    """
+    Exports metrics of all workers in Prometheus text format.
+    Access: METRICS_TOKEN passed as Bearer token or staff user.
+    Without METRICS_TOKEN metrics are available to others only
+    in DEBUG mode.
+    """
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """
+        Merges metrics of workers from shared cache.
+        :param request: request from Prometheus
+        :return: text response
+        """
+        if not settings.METRICS_ENABLED:
+            return HttpResponse(status=404)
+        if not request.user.is_staff:
+            if settings.METRICS_TOKEN:
+                header = request.META.get("HTTP_AUTHORIZATION", "")
+                if not constant_time_compare(
+                        header, f"Bearer {settings.METRICS_TOKEN}"):
+                    return HttpResponse(status=401)
+            elif not settings.DEBUG:
+                # endpoint is not configured for public network
+                return HttpResponse(status=404)
+        merged, workers = metrics.collect_workers()
+        return HttpResponse(
+            metrics.render_prometheus(merged, workers=workers),
+            content_type=self.content_type,
+        )
@@ -0,0 +1,138 @@
+"""
+Warmup of the app before gunicorn forks workers.
+
+Imports modules of all apps, populates URL resolvers and primes caches
+(category tree, DynamicConfig, popular products), so workers start hot
+and share loaded data with the master process copy-on-write.
+Called by config/gunicorn/gunicorn.conf.py.
+"""
+
+import importlib
+import importlib.util
+import logging
+import time
+from typing import Callable, Optional
+
+from django.apps import apps
+from django.core.cache import cache, caches
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import URLResolver, get_resolver, reverse
+
+from common.db import pool
+
+logger = logging.getLogger(__name__)
+
+# submodules of apps that are imported if they exist
+APP_MODULES = (
+    "models",
+    "admin",
+    "urls",
+    "apis",
+    "selectors",
+    "services",
+    "serializers",
+    "filters",
+    "signals",
+    "tasks",
+)
+
+
+def import_app_modules() -> int:
+    """
+    Imports modules of all installed apps (that are not imported
+    by django.setup()).
+    :return: number of imported modules
+    """
+    imported = 0
+    for app_config in apps.get_app_configs():
+        for name in APP_MODULES:
+            module_name = f"{app_config.name}.{name}"
+            if importlib.util.find_spec(module_name) is None:
+                continue
+            importlib.import_module(module_name)
+            imported += 1
+    return imported
+
+
+def populate_urls(resolver: Optional[URLResolver] = None) -> int:
+    """
+    Populates lookups of all URL resolvers (they are built lazily
+    by the first resolve() or reverse()).
+    :param resolver: root resolver by default
+    :return: number of names that can be reversed
+    """
+    resolver = resolver or get_resolver()
+    # property populates the resolver
+    number = len(resolver.reverse_dict)
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            number += populate_urls(pattern)
+    return number
+
+
+def prime_dynamic_config() -> None:
+    """Loads DynamicConfig to in-process and shared cache."""
+    from dynamic_config import selectors
+
+    selectors.DynamicConfigSelector().get_instance()
+
+
+def prime_category_tree() -> None:
+    """Caches serialized tree of CategoryApi."""
+    from shop import apis, selectors
+
+    selector = selectors.CategorySelector()
+    data = apis.CategoryApi.serialize_tree(selector.get_category_tree())
+    cache.set(selector.TREE_CACHE_KEY, data, timeout=None)
+
+
+def prime_popular_products() -> None:
+    """Caches response of ProductPopularApi for anonymous users."""
+    from shop import apis
+
+    request = RequestFactory().get(reverse("api:shop:products_popular"))
+    response = apis.ProductPopularApi.as_view()(request)
+    if response.status_code != 200:
+        raise RuntimeError(f"Response status is {response.status_code}.")
+
+
+STEPS: tuple[tuple[str, Callable], ...] = (
+    ("imports", import_app_modules),
+    ("urls", populate_urls),
+    ("dynamic_config", prime_dynamic_config),
+    ("category_tree", prime_category_tree),
+    ("popular_products", prime_popular_products),
+)
+
+
+def close_connections() -> None:
+    """
+    Connections of db (and idle ones of pools) and cache must not be
+    inherited by forked workers (they would share sockets).
+    """
+    connections.close_all()
+    pool.close_pools()
+    for alias_cache in caches.all(initialized_only=True):
+        alias_cache.close()
+
+
+def warmup() -> dict[str, float]:
+    """
+    Runs all steps. Failed step (e.g. db is not migrated yet) is logged
+    and skipped, it must not prevent start of the server.
+    :return: {step: seconds} of successful steps
+    """
+    timings = {}
+    try:
+        for name, step in STEPS:
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception:
+                logger.exception("Warmup step `%s` failed.", name)
+                continue
+            timings[name] = time.perf_counter() - started
+    finally:
+        close_connections()
+    return timings
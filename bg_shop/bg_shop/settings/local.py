@@ -12,11 +12,7 @@ DATABASE_DIR.mkdir(exist_ok=True)
 # }
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': getenv('POSTGRES_DB'),
-        'USER': getenv('POSTGRES_USER'),
-        'PASSWORD': getenv('POSTGRES_PASSWORD'),
+        **DATABASES['default'],
         'HOST': 'localhost',
-        'PORT': 5432,
     }
 }
\ No newline at end of file
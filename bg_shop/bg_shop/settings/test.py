@@ -19,4 +19,7 @@ DATABASES = {
 #         'HOST': 'localhost',
 #         'PORT': 5432,
 #     }
-# }
\ No newline at end of file
+# }
+# responses are not kept in cache between requests of tests,
+# tests of api.caching enable it by override_settings
+API_RESPONSE_CACHE_TIMEOUT = 0
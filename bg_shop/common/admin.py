@@ -1,7 +1,104 @@
 from django.contrib import admin
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+
 from common import models
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator of big tables for admin change lists.
+
+    COUNT(*) of the whole table on postgres reads all rows,
+    so for unfiltered queryset the estimate from planner statistics
+    is used when the table is big (ESTIMATE_THRESHOLD rows).
+    Filtered querysets and small tables are counted exactly.
+    """
+
+    ESTIMATE_THRESHOLD = 100_000
+
+    @cached_property
+    def count(self) -> int:
+        """Returns the estimate or exact number of objects."""
+        estimate = self._get_estimate()
+        if estimate is not None and estimate >= self.ESTIMATE_THRESHOLD:
+            return estimate
+        return super().count
+
+    def _get_estimate(self):
+        """
+        Gets number of rows of the table from pg_class.reltuples.
+        :return: estimate or None if it can't be used
+        """
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is None or query.where or query.is_sliced:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # -1 or 0 if the table has never been analyzed
+        if row is None or row[0] <= 0:
+            return None
+        return row[0]
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """
+    Inline formset that shows one page of related objects,
+    so change form of an object with many related rows renders
+    a bounded number of forms. Page is set by PaginatedInlineMixin.
+    """
+
+    per_page = 20
+    page_number = 1
+    page_param = "page"
+
+    @property
+    def page(self) -> Page:
+        """Current page of related objects."""
+        if not hasattr(self, "_page"):
+            paginator = Paginator(super().get_queryset(), self.per_page)
+            self._page = paginator.get_page(self.page_number)
+        return self._page
+
+    def get_queryset(self):
+        """Objects of the current page only."""
+        return self.page.object_list
+
+
+class PaginatedInlineMixin:
+    """
+    Mixin for InlineModelAdmin, paginates related objects.
+
+    Page number is passed by `<prefix>-page` GET parameter,
+    links to other pages are rendered under the inline.
+    """
+
+    formset = PaginatedInlineFormSet
+    per_page = 20
+    template = "admin/edit_inline/paginated_tabular.html"
+
+    def get_formset(self, request, obj=None, **kwargs):
+        """Passes page of the request to the formset class."""
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.per_page = self.per_page
+        formset.page_param = f"{formset.get_default_prefix()}-page"
+        formset.page_number = request.GET.get(formset.page_param, 1)
+        return formset
+
+
 @admin.register(models.Image)
 class ImageAdmin(admin.ModelAdmin):
-    ...
+    list_display = ("pk", "description", "img")
+    search_fields = ("description",)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
@@ -0,0 +1,38 @@
+"""PostgreSQL backend with the pool of connections (common.db.pool)."""
+
+from typing import Any
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from common.db import pool
+
+
+class DatabaseWrapper(pool.PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def get_new_connection(self, conn_params: dict) -> Any:
+        """
+        Isolation level of the wrapper is set by the backend when
+        connection is opened, connection from the pool already has it.
+        """
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = IsolationLevel(options.get(
+                "isolation_level", IsolationLevel.READ_COMMITTED))
+        except ValueError:
+            # the backend raises ImproperlyConfigured when connecting
+            pass
+        return super().get_new_connection(conn_params)
+
+    def is_connection_usable(self, connection: Any) -> bool:
+        """Connection is open and the server responds."""
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not connection.autocommit:
+                # the query started transaction
+                connection.rollback()
+        except self.Database.Error:
+            return False
+        return True
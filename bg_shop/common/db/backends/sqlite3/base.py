@@ -0,0 +1,9 @@
+"""SQLite backend with the pool of connections (common.db.pool)."""
+
+from django.db.backends.sqlite3 import base
+
+from common.db import pool
+
+
+class DatabaseWrapper(pool.PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
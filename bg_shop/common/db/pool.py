@@ -0,0 +1,291 @@
+"""
+In-process pool of database connections (one pool per worker process
+and database alias).
+
+Django 4.2 keeps a connection per thread: it is closed after a request
+(CONN_MAX_AGE = 0) or kept by the thread (persistent connections).
+Under ASGI and with many threads that means a new connection for almost
+every request, or as many idle connections as threads. With the pool
+Django still "closes" the connection after a request, but the raw
+connection is returned to the pool and the next request of any thread
+takes it back, the number of open connections of the worker is limited
+by the size of the pool.
+
+Pool is enabled by backends of common.db.backends
+(see DATABASES in settings), options are in the `POOL` key:
+    SIZE - max number of open connections of the worker
+    TIMEOUT - how long (sec) a request waits for a free connection,
+        then PoolTimeout is raised
+    MAX_AGE - connections are reopened after this time (sec),
+        None - unlimited
+"""
+
+import collections
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from django.db.utils import OperationalError
+
+DEFAULT_SIZE = 10
+DEFAULT_TIMEOUT = 5.0
+
+
+class PoolTimeout(OperationalError):
+    """There is no free connection in the pool after timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of raw (DB-API) connections.
+
+    Connections are created lazily by the function passed to acquire(),
+    the last returned connection is taken first (it is most likely
+    alive, and extra connections stay idle and can expire).
+    """
+
+    def __init__(
+            self,
+            size: int = DEFAULT_SIZE,
+            timeout: float = DEFAULT_TIMEOUT,
+            max_age: Optional[float] = None,
+    ) -> None:
+        """
+        :param size: max number of open connections
+        :param timeout: max waiting for a free connection (sec)
+        :param max_age: connections are closed after this time (sec)
+        """
+        self.size = size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.pid = os.getpid()
+        self._condition = threading.Condition()
+        # [(connection, created at)]
+        self._idle: collections.deque = collections.deque()
+        # {id(connection): created at}
+        self._in_use: dict[int, float] = {}
+        # connections that are being opened
+        self._opening = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.created = 0
+        self.discarded = 0
+
+    @property
+    def open(self) -> int:
+        """Number of open connections (idle and in use)."""
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def acquire(
+            self,
+            connect: Callable[[], Any],
+            check: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Takes an idle connection or opens a new one (if the pool is not
+        full), otherwise waits until a connection is released.
+        :param connect: opens new connection
+        :param check: health check of idle connection, broken ones
+            are closed and the next connection is taken
+        :return: raw connection
+        """
+        while True:
+            connection, created_at = self._checkout()
+            if connection is None:
+                break
+            if not self._is_expired(created_at) \
+                    and (check is None or check(connection)):
+                return connection
+            self.release(connection, discard=True)
+
+        try:
+            connection = connect()
+        except BaseException:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._opening -= 1
+            self._in_use[id(connection)] = time.monotonic()
+            self.created += 1
+        return connection
+
+    def _checkout(self) -> tuple[Any, float]:
+        """
+        Reserves a connection.
+        :return: idle connection and its creation time, or None
+            if a new connection may be opened (the place is reserved)
+        """
+        deadline = None
+        with self._condition:
+            while True:
+                if self._idle:
+                    connection, created_at = self._idle.pop()
+                    self._in_use[id(connection)] = created_at
+                    return connection, created_at
+                if self.open < self.size:
+                    self._opening += 1
+                    return None, 0.0
+                if deadline is None:
+                    self.waits += 1
+                    deadline = time.monotonic() + self.timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f"No free connection in the pool of size "
+                        f"{self.size} after {self.timeout} sec.")
+                self._condition.wait(remaining)
+
+    def release(self, connection: Any, discard: bool = False) -> None:
+        """
+        Returns the connection to the pool.
+        :param connection: connection taken by acquire()
+        :param discard: connection is broken, it is closed
+        :return: None
+        """
+        with self._condition:
+            created_at = self._in_use.pop(id(connection), None)
+            if created_at is None:
+                # not from this pool (e.g. the pool was reset after fork)
+                discard = True
+            elif not discard and self._is_expired(created_at):
+                discard = True
+            if discard:
+                self.discarded += 1
+            else:
+                self._idle.append((connection, created_at))
+            self._condition.notify()
+        if discard:
+            self._close(connection)
+
+    def close_idle(self) -> None:
+        """Closes idle connections (e.g. before fork of workers)."""
+        with self._condition:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            self._close(connection)
+
+    def stats(self) -> dict[str, int]:
+        """Current state and counters of the pool."""
+        with self._condition:
+            return {
+                "size": self.size,
+                "in_use": len(self._in_use) + self._opening,
+                "idle": len(self._idle),
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "created": self.created,
+                "discarded": self.discarded,
+            }
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.max_age is not None \
+            and time.monotonic() - created_at >= self.max_age
+
+    @staticmethod
+    def _close(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools: dict[tuple[str, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, settings_dict: dict) -> ConnectionPool:
+    """
+    Pool of the database of current process, created by the first call.
+
+    Pools inherited from the parent process are dropped without closing
+    of connections, their sockets belong to the parent.
+    :param alias: alias of database
+    :param settings_dict: settings of database with optional `POOL`
+    :return: pool
+    """
+    key = (alias, str(settings_dict["NAME"]))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.pid != os.getpid():
+            options = settings_dict.get("POOL") or {}
+            pool = ConnectionPool(
+                size=options.get("SIZE", DEFAULT_SIZE),
+                timeout=options.get("TIMEOUT", DEFAULT_TIMEOUT),
+                max_age=options.get("MAX_AGE"),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def get_stats() -> dict[str, dict[str, int]]:
+    """
+    Stats of pools of current process.
+    :return: {alias: stats} (stats of one alias are summed)
+    """
+    with _pools_lock:
+        pools = [
+            (alias, pool) for (alias, _), pool in _pools.items()
+            if pool.pid == os.getpid()
+        ]
+    stats: dict[str, dict[str, int]] = {}
+    for alias, pool in pools:
+        alias_stats = stats.setdefault(alias, {})
+        for name, value in pool.stats().items():
+            alias_stats[name] = alias_stats.get(name, 0) + value
+    return stats
+
+
+def close_pools() -> None:
+    """Closes idle connections of all pools of current process."""
+    with _pools_lock:
+        pools = [pool for pool in _pools.values()
+                 if pool.pid == os.getpid()]
+    for pool in pools:
+        pool.close_idle()
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mixin of DatabaseWrapper of Django backend: connections are taken
+    from the pool instead of connecting, and returned instead
+    of closing.
+    """
+
+    def get_new_connection(self, conn_params: dict) -> Any:
+        """Connection from the pool (created by the backend)."""
+        check = self.is_connection_usable \
+            if self.settings_dict["CONN_HEALTH_CHECKS"] else None
+        return get_pool(self.alias, self.settings_dict).acquire(
+            connect=lambda: super(
+                PooledDatabaseWrapperMixin, self
+            ).get_new_connection(conn_params),
+            check=check,
+        )
+
+    def is_connection_usable(self, connection: Any) -> bool:
+        """Health check of idle raw connection before it is taken."""
+        return True
+
+    def _close(self) -> None:
+        """
+        Returns the connection to the pool. Open transaction is rolled
+        back, connection with errors is closed. Connection closed inside
+        atomic block is still referenced by the wrapper, so it is closed
+        too.
+        """
+        if self.connection is None:
+            return
+        connection = self.connection
+        discard = self.errors_occurred or self.in_atomic_block
+        if not discard:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+        get_pool(self.alias, self.settings_dict).release(
+            connection, discard=discard)
@@ -0,0 +1,69 @@
+"""Moves existing image files to content addressed names."""
+
+import posixpath
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from common import models, services, storages
+
+
+class Command(BaseCommand):
+    help = "Stores files of Images by content hash, so Images with the " \
+           "same content share one file, old files are deleted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report files that would be moved.",
+        )
+
+    def handle(self, *args, **options):
+        storage = storages.get_image_storage()
+        service = services.StoredFileService()
+        moved = missing = 0
+        names = set()
+        images = models.Image.objects \
+            .exclude(img="") \
+            .order_by("pk") \
+            .only("pk", "img", "variants")
+        for image in images.iterator(chunk_size=500):
+            old_name = image.img.name
+            if storage.is_hash_name(old_name):
+                names.add(old_name)
+                continue
+            if not storage.exists(old_name):
+                missing += 1
+                self.stderr.write(f"Image({image.pk}): {old_name} is missing")
+                continue
+            moved += 1
+            if options["dry_run"]:
+                continue
+
+            with storage.open(old_name, "rb") as file:
+                new_name = storage.save(
+                    posixpath.join(
+                        settings.IMAGE_SUBDIR, posixpath.basename(old_name)),
+                    file,
+                )
+            names.add(new_name)
+            variants = image.variants
+            if variants.get("source") == old_name:
+                # variants are made from the same content
+                variants = {**variants, "source": new_name}
+            with transaction.atomic():
+                models.Image.objects \
+                    .filter(pk=image.pk) \
+                    .update(img=new_name, variants=variants)
+                service.acquire(new_name)
+                service.release(old_name)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{moved} files would be moved, "
+                              f"{missing} are missing.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{moved} files are moved, {len(names)} unique files are "
+            f"stored, {missing} are missing."))
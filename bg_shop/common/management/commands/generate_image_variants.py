@@ -0,0 +1,47 @@
+"""Generates variants of existing Images."""
+
+from django.core.management.base import BaseCommand
+
+from common import models, services, tasks
+
+
+class Command(BaseCommand):
+    help = "Generates resized variants of Images " \
+           "(only missing or outdated ones by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "image_ids",
+            nargs="*",
+            type=int,
+            help="Images to process (all if not passed).",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Regenerate actual variants too.",
+        )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Generate in this process instead of Celery tasks.",
+        )
+
+    def handle(self, *args, **options):
+        service = services.ImageVariantService()
+        images = models.Image.objects.exclude(img="").order_by("pk")
+        if options["image_ids"]:
+            images = images.filter(pk__in=options["image_ids"])
+
+        processed = 0
+        for image in images.iterator(chunk_size=500):
+            if not options["all"] and service.has_actual_variants(image):
+                continue
+            if options["sync"]:
+                processed += service.generate(image) is not None
+            else:
+                tasks.generate_image_variants.delay(image_id=image.pk)
+                processed += 1
+        action = "generated" if options["sync"] else "scheduled"
+        self.stdout.write(self.style.SUCCESS(
+            f"Variants of {processed} images are {action}."))
@@ -0,0 +1,386 @@
+"""
+Generates big deterministic dataset for benchmarks (see benchmark_api).
+
+All objects are created by bulk_create in batches, so signals are not
+sent and denormalized data (ratings, sales, search, category paths)
+is rebuilt by services at the end.
+Generated objects are marked by SCALE_PREFIX and can be removed by --clear.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from account import models as account_models
+from api import caching
+from common import models as common_models
+from orders import models as orders_models
+from orders import services as orders_services
+from shop import models as shop_models
+from shop import services as shop_services
+
+User = get_user_model()
+
+SCALE_PREFIX = "scale"
+# password of all generated users (to sign in during benchmarks)
+SCALE_PASSWORD = "scale-password"
+
+WORDS = (
+    "dragon", "castle", "forest", "empire", "space", "pirate", "train",
+    "dungeon", "kingdom", "island", "robot", "wizard", "farm", "ocean",
+    "city", "galaxy", "treasure", "knight", "zombie", "village", "river",
+    "mountain", "desert", "jungle", "mystery", "detective", "racing",
+    "garden", "tower", "legend",
+)
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Splits iterable into lists of `size` items."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = "Generates deterministic dataset of products, reviews, users " \
+           "and orders for benchmarks (use --scale for smaller one)."
+
+    defaults = {
+        "users": 10_000,
+        "images": 1_000,
+        "categories": 30,
+        "tags": 50,
+        "products": 100_000,
+        "reviews": 1_000_000,
+        "orders": 500_000,
+    }
+
+    def add_arguments(self, parser):
+        for name, default in self.defaults.items():
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=None,
+                help=f"Number of {name} (default {default} * scale).",
+            )
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiplier of default numbers, e.g. 0.01 for quick run.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Only remove previously generated data.",
+        )
+
+    def handle(self, *args, **options):
+        self.rand = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.today = date(2024, 1, 1)
+        if options["clear"]:
+            self.clear()
+            return
+        if User.objects.filter(
+                username__startswith=f"{SCALE_PREFIX}_").exists():
+            raise CommandError(
+                "Generated data already exists, remove it by --clear.")
+
+        numbers = {
+            name: options[name] if options[name] is not None
+            else max(1, int(default * options["scale"]))
+            for name, default in self.defaults.items()
+        }
+        started = time.perf_counter()
+        user_ids = self.step("users", self.create_users, numbers["users"])
+        image_ids = self.step("images", self.create_images, numbers["images"])
+        category_ids = self.step(
+            "categories", self.create_categories, numbers["categories"])
+        tag_ids = self.step("tags", self.create_tags, numbers["tags"])
+        product_ids = self.step(
+            "products",
+            lambda number: self.create_products(
+                number, category_ids=category_ids,
+                tag_ids=tag_ids, image_ids=image_ids),
+            numbers["products"],
+        )
+        self.step(
+            "reviews",
+            lambda number: self.create_reviews(
+                number, user_ids=user_ids, product_ids=product_ids),
+            numbers["reviews"],
+        )
+        self.step(
+            "orders",
+            lambda number: self.create_orders(
+                number, user_ids=user_ids, product_ids=product_ids),
+            numbers["orders"],
+        )
+        self.step("denormalized data", lambda _: self.refresh(), None)
+        self.stdout.write(self.style.SUCCESS(
+            f"Dataset is generated in "
+            f"{time.perf_counter() - started:.1f} s."))
+
+    def step(self, name: str, func: Callable, number):
+        """Runs one step in transaction and reports its time."""
+        started = time.perf_counter()
+        with transaction.atomic():
+            result = func(number)
+        self.stdout.write(
+            f"{name:<18} {number or '':>9} "
+            f"{time.perf_counter() - started:8.1f} s")
+        return result
+
+    def bulk_create(self, model, objs: Iterable) -> None:
+        """Creates objects in batches."""
+        for batch in batched(objs, self.batch_size):
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+
+    def create_users(self, number: int) -> list[int]:
+        password = make_password(SCALE_PASSWORD)
+        self.bulk_create(User, (
+            User(
+                username=f"{SCALE_PREFIX}_user_{i}",
+                email=f"{SCALE_PREFIX}_user_{i}@example.com",
+                password=password,
+            )
+            for i in range(number)
+        ))
+        user_ids = list(
+            User.objects.filter(username__startswith=f"{SCALE_PREFIX}_user_")
+            .order_by("pk").values_list("pk", flat=True))
+        self.bulk_create(account_models.Profile, (
+            account_models.Profile(
+                user_id=user_id, phone_number=f"{9000000000 + i}")
+            for i, user_id in enumerate(user_ids)
+        ))
+        return user_ids
+
+    def create_images(self, number: int) -> list[int]:
+        # rows only, files are not needed to render urls
+        self.bulk_create(common_models.Image, (
+            common_models.Image(
+                description=f"{SCALE_PREFIX} image {i}",
+                img=f"images/{SCALE_PREFIX}/{i}.jpg",
+            )
+            for i in range(number)
+        ))
+        return list(
+            common_models.Image.objects
+            .filter(description__startswith=f"{SCALE_PREFIX} image ")
+            .order_by("pk").values_list("pk", flat=True))
+
+    def create_categories(self, number: int) -> list[int]:
+        """Roots and their subcategories, paths are set explicitly."""
+        roots_number = max(1, number // 5)
+        shop_models.Category.objects.bulk_create(
+            shop_models.Category(
+                title=f"{SCALE_PREFIX} category {i}", sort_index=i)
+            for i in range(roots_number)
+        )
+        roots = list(
+            shop_models.Category.objects
+            .filter(title__startswith=f"{SCALE_PREFIX} category ")
+            .order_by("pk"))
+        shop_models.Category.objects.bulk_create(
+            shop_models.Category(
+                title=f"{SCALE_PREFIX} subcategory {i}",
+                parent=roots[i % roots_number],
+                depth=1,
+                sort_index=i,
+            )
+            for i in range(number - roots_number)
+        )
+        categories = list(
+            shop_models.Category.objects
+            .filter(title__startswith=f"{SCALE_PREFIX} ")
+            .order_by("depth", "pk"))
+        paths = {}
+        for category in categories:
+            category.path = paths.get(category.parent_id, "") \
+                + f"{category.pk}/"
+            paths[category.pk] = category.path
+        shop_models.Category.objects.bulk_update(categories, fields=["path"])
+        return [category.pk for category in categories]
+
+    def create_tags(self, number: int) -> list[int]:
+        self.bulk_create(shop_models.Tag, (
+            shop_models.Tag(name=f"{SCALE_PREFIX} {WORDS[i % len(WORDS)]} {i}")
+            for i in range(number)
+        ))
+        return list(
+            shop_models.Tag.objects
+            .filter(name__startswith=f"{SCALE_PREFIX} ")
+            .order_by("pk").values_list("pk", flat=True))
+
+    def create_products(
+            self,
+            number: int,
+            category_ids: list[int],
+            tag_ids: list[int],
+            image_ids: list[int],
+    ) -> list[int]:
+        rand = self.rand
+        self.bulk_create(shop_models.Product, (
+            shop_models.Product(
+                title=f"{SCALE_PREFIX} {rand.choice(WORDS)} "
+                      f"{rand.choice(WORDS)} {i}",
+                description=" ".join(rand.choices(WORDS, k=30)),
+                category_id=rand.choice(category_ids),
+                price=Decimal(rand.randint(100, 20_000)) / 100,
+                count=rand.randint(0, 500),
+                release_date=self.today
+                - timedelta(days=rand.randint(0, 3650)),
+                sort_index=rand.randint(0, 10),
+                limited_edition=rand.random() < 0.01,
+                manufacturer=f"{SCALE_PREFIX} manufacturer {i % 200}",
+                is_active=rand.random() < 0.95,
+            )
+            for i in range(number)
+        ))
+        product_ids = list(
+            shop_models.Product.objects
+            .filter(title__startswith=f"{SCALE_PREFIX} ")
+            .order_by("pk").values_list("pk", flat=True))
+
+        tags_through = shop_models.Product.tags.through
+        self.bulk_create(tags_through, (
+            tags_through(product_id=product_id, tag_id=tag_id)
+            for product_id in product_ids
+            for tag_id in rand.sample(tag_ids, k=min(3, len(tag_ids)))
+        ))
+        images_through = shop_models.Product.images.through
+        self.bulk_create(images_through, (
+            images_through(product_id=product_id, image_id=image_id)
+            for product_id in product_ids
+            for image_id in rand.sample(image_ids, k=min(2, len(image_ids)))
+        ))
+        self.bulk_create(shop_models.Sale, (
+            shop_models.Sale(
+                product_id=product_id,
+                discount=rand.choice((5, 10, 15, 20, 30)),
+                date_from=self.today - timedelta(days=30),
+                date_to=self.today + timedelta(days=3650),
+            )
+            for product_id in product_ids
+            if rand.random() < 0.05
+        ))
+        self.bulk_create(shop_models.Banner, (
+            shop_models.Banner(product_id=product_id)
+            for product_id in product_ids[:5]
+        ))
+        return product_ids
+
+    def create_reviews(
+            self,
+            number: int,
+            user_ids: list[int],
+            product_ids: list[int],
+    ) -> None:
+        rand = self.rand
+        now = timezone.now()
+        self.bulk_create(shop_models.Review, (
+            shop_models.Review(
+                author_id=rand.choice(user_ids),
+                product_id=rand.choice(product_ids),
+                text=" ".join(rand.choices(WORDS, k=10)),
+                rate=rand.randint(1, 5),
+                date=now - timedelta(minutes=i),
+            )
+            for i in range(number)
+        ))
+
+    def create_orders(
+            self,
+            number: int,
+            user_ids: list[int],
+            product_ids: list[int],
+    ) -> None:
+        """Orders of all statuses except CART, 1-4 products each."""
+        rand = self.rand
+        statuses = orders_models.Order.Statuses
+        now = timezone.now()
+        self.bulk_create(orders_models.Order, (
+            orders_models.Order(
+                user_id=rand.choice(user_ids),
+                created_at=now - timedelta(minutes=i),
+                status=rand.choices(
+                    (statuses.ACCEPTED, statuses.COMPLETED,
+                     statuses.REJECTED, statuses.EDITING),
+                    weights=(40, 40, 10, 10),
+                )[0],
+                city=f"{SCALE_PREFIX} city",
+                address=f"{SCALE_PREFIX} address {i}",
+                paid=rand.random() < 0.8,
+                comment=SCALE_PREFIX,
+            )
+            for i in range(number)
+        ))
+        order_ids = orders_models.Order.objects \
+            .filter(comment=SCALE_PREFIX) \
+            .order_by("pk") \
+            .values_list("pk", flat=True) \
+            .iterator(chunk_size=self.batch_size)
+        self.bulk_create(orders_models.OrderedProduct, (
+            orders_models.OrderedProduct(
+                order_id=order_id,
+                product_id=product_id,
+                price=Decimal(rand.randint(100, 20_000)) / 100,
+                count=rand.randint(1, 3),
+            )
+            for order_id in order_ids
+            for product_id in rand.sample(product_ids, k=rand.randint(1, 4))
+        ))
+
+    @staticmethod
+    def refresh(product_ids=None) -> None:
+        """Rebuilds denormalized data after bulk operations."""
+        shop_services.ReviewService.refresh_product_ratings(
+            product_ids=product_ids)
+        orders_services.OrderedProductService.refresh_product_sales(
+            product_ids=product_ids)
+        shop_services.ProductSearchService.refresh_search(
+            product_ids=product_ids)
+        shop_services.CategoryService.invalidate_tree_cache()
+        caching.invalidate_tags(
+            "product", "category", "sale", "tag", "banner")
+
+    def clear(self) -> None:
+        """Removes generated objects (related ones are deleted by cascade)."""
+        with transaction.atomic():
+            product_ids = list(
+                shop_models.Product.objects
+                .filter(title__startswith=f"{SCALE_PREFIX} ")
+                .values_list("pk", flat=True))
+            # OrderedProduct protects Product
+            orders_models.Order.objects.filter(comment=SCALE_PREFIX).delete()
+            orders_models.OrderedProduct.objects \
+                .filter(product_id__in=product_ids).delete()
+            User.objects.filter(
+                username__startswith=f"{SCALE_PREFIX}_").delete()
+            for batch in batched(product_ids, self.batch_size):
+                shop_models.Product.objects.filter(pk__in=batch).delete()
+            shop_models.Category.objects.filter(
+                title__startswith=f"{SCALE_PREFIX} ").delete()
+            shop_models.Tag.objects.filter(
+                name__startswith=f"{SCALE_PREFIX} ").delete()
+            common_models.Image.objects.filter(
+                description__startswith=f"{SCALE_PREFIX} image ").delete()
+        self.refresh(product_ids=[])
+        self.stdout.write(self.style.SUCCESS("Generated data is removed."))
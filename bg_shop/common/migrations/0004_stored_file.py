@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-18 14:14
+
+import common.storages
+import common.validators
+from django.db import migrations, models
+
+
+def forwards_func(apps, schema_editor):
+    """Count references to existing files (moved by deduplicate_images)."""
+    Image = apps.get_model("common", "Image")
+    StoredFile = apps.get_model("common", "StoredFile")
+    db_alias = schema_editor.connection.alias
+    counts = Image.objects.using(db_alias) \
+        .exclude(img="") \
+        .values("img") \
+        .annotate(count=models.Count("pk")) \
+        .values_list("img", "count")
+    StoredFile.objects.using(db_alias).bulk_create(
+        (StoredFile(name=name, ref_count=count) for name, count in counts),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='name')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='reference count')),
+            ],
+            options={
+                'verbose_name': 'stored file',
+                'verbose_name_plural': 'stored files',
+            },
+        ),
+        migrations.AlterField(
+            model_name='image',
+            name='img',
+            field=models.ImageField(storage=common.storages.get_image_storage, upload_to='images', validators=[common.validators.FileMaxSizeValidator(limit_value=2097152, message='Max file size is 2048.0KB')], verbose_name='image'),
+        ),
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
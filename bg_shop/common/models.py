@@ -3,7 +3,7 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 
-from common import validators
+from common import storages, validators
 
 
 class Image(models.Model):
@@ -19,8 +19,11 @@ class Image(models.Model):
         max_length=255,
         verbose_name=_("description"),
     )
+    # Files are stored by content hash and can be shared by several
+    # Images, see StoredFile.
     img = models.ImageField(
         upload_to=settings.IMAGE_SUBDIR,
+        storage=storages.get_image_storage,
         validators=[
             validators.FileMaxSizeValidator(
                 message=_(
@@ -30,9 +33,44 @@ class Image(models.Model):
         ],
         verbose_name=_("image"),
     )
+    # Resized copies of `img`, made by ImageVariantService in background:
+    # {"source": img name, "items": {name: {"width": int, format: path}}}
+    # Variants are not used if `source` is not the current `img`.
+    variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_("variants"),
+    )
 
     def __str__(self):
         if self.description:
             return f"Image({self.pk}): {self.description[:10]}"
         else:
             return f"Image({self.pk}): "
+
+
+class StoredFile(models.Model):
+    """
+    Reference count of a file in ContentAddressedStorage.
+
+    Maintained by StoredFileService, file is deleted when the last
+    Image that refers to it is deleted or gets other file.
+    """
+
+    class Meta:
+        verbose_name = _("stored file")
+        verbose_name_plural = _("stored files")
+
+    name = models.CharField(
+        unique=True,
+        max_length=255,
+        verbose_name=_("name"),
+    )
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("reference count"),
+    )
+
+    def __str__(self):
+        return f"StoredFile({self.pk}): {self.name} ({self.ref_count})"
@@ -5,9 +5,19 @@ from common import models, services
 
 
 class ImageSerializer(serializers.ModelSerializer):
-    """To reuse in other ModelSerializers"""
+    """
+    To reuse in other ModelSerializers.
+
+    `variants` - urls of resized copies ({name: {"width", format: url}}),
+    `srcset` - webp variants for <img srcset>. Until variants are
+    generated, original is used for all of them and srcset is None.
+    """
     src = serializers.SerializerMethodField()
     alt = serializers.CharField(source="description", max_length=255)
+    srcset = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
+
+    srcset_format = "webp"
 
     def get_src(self, obj: models.Image) -> Optional[str]:
         """Returns image source ulr or None"""
@@ -17,6 +27,17 @@ class ImageSerializer(serializers.ModelSerializer):
         else:
             return None
 
+    def get_srcset(self, obj: models.Image) -> Optional[str]:
+        """Returns srcset of generated variants or None"""
+        return services.ImageVariantService().get_srcset(
+            obj, image_format=self.srcset_format)
+
+    def get_variants(self, obj: models.Image) -> Optional[dict]:
+        """Returns urls of variants or None if there is no image"""
+        if not obj.img:
+            return None
+        return services.ImageVariantService().get_urls(obj)
+
     class Meta:
         model = models.Image
-        fields = ("src", "alt",)
+        fields = ("src", "alt", "srcset", "variants",)
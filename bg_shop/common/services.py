@@ -1,9 +1,22 @@
 """Services for managing common app."""
 
+import io
+import logging
+import posixpath
+from typing import Optional
+
+from django.conf import settings
 from django.db import transaction
+from django.db.models import F
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image as PilImage
+from PIL import ImageOps, UnidentifiedImageError
+
+from common import models, storages
 
-from common import models
+logger = logging.getLogger(__name__)
 
 
 class ImageService:
@@ -20,13 +33,21 @@ class ImageService:
 
     def delete_img(self, instance: models.Image) -> None:
         """
-        Delete img file from filesystem.
+        Detach img file from Image (without saving of Image).
 
+        File is deleted from filesystem if no other Image refers to it
+        (see StoredFileService).
         :param instance: Image obj.
         :return: None
         """
         if instance.pk is not None:
-            instance.img.delete(save=False)
+            ImageVariantService().delete_variants(instance)
+            instance.variants = {}
+            name = StoredFileService.get_stored_name(instance)
+            if name:
+                StoredFileService().release(name)
+            instance.img = None
+            StoredFileService.set_stored_name(instance, None)
 
     def delete_instance(self, instance: models.Image) -> None:
         """
@@ -50,6 +71,259 @@ class ImageService:
         """
         self.delete_img(instance)
         instance.img = new_img
+        instance.variants = {}
         instance.full_clean()
         instance.save()
 
+
+class StoredFileService:
+    """
+    Counts references of Images to files of ContentAddressedStorage.
+
+    Counters are changed when Image gets new file or is deleted
+    (see common.signals), file is deleted after commit when the last
+    reference is released. Files without StoredFile are never deleted.
+    Row of released file is kept with zero count until the file is
+    deleted, and it is locked by acquire(), release() and deletion,
+    so concurrent upload of the same content can't lose the file.
+    """
+    stored_name_attr = "_stored_img_name"
+
+    @classmethod
+    def get_stored_name(cls, image: models.Image) -> Optional[str]:
+        """Name of file that is referenced by saved Image."""
+        return getattr(image, cls.stored_name_attr, None)
+
+    @classmethod
+    def set_stored_name(cls, image: models.Image, name: Optional[str]):
+        """Remembers name of file referenced by Image."""
+        setattr(image, cls.stored_name_attr, name)
+
+    @staticmethod
+    def acquire(name: str) -> None:
+        """
+        Adds reference to file. The row stays locked till the end
+        of transaction, so the file is not deleted meanwhile.
+        :param name: name of file in storage
+        :return: None
+        """
+        with transaction.atomic():
+            stored_file, created = models.StoredFile.objects \
+                .select_for_update() \
+                .get_or_create(name=name, defaults={"ref_count": 1})
+            if not created:
+                models.StoredFile.objects \
+                    .filter(pk=stored_file.pk) \
+                    .update(ref_count=F("ref_count") + 1)
+
+    def release(self, name: str) -> None:
+        """
+        Removes reference to file, deletes file without references
+        after commit.
+        :param name: name of file in storage
+        :return: None
+        """
+        with transaction.atomic():
+            ref_count = models.StoredFile.objects \
+                .select_for_update() \
+                .filter(name=name) \
+                .values_list("ref_count", flat=True) \
+                .first()
+            if not ref_count:
+                return
+            models.StoredFile.objects \
+                .filter(name=name) \
+                .update(ref_count=ref_count - 1)
+        if ref_count == 1:
+            transaction.on_commit(lambda: self._delete_file(name))
+
+    @staticmethod
+    def _delete_file(name: str) -> None:
+        """
+        Deletes file and its row if it was not acquired again.
+        Concurrent acquire() waits for the lock and creates new row,
+        or this waits for acquire() to commit and keeps the file.
+        """
+        with transaction.atomic():
+            # DELETE locks the row and checks ref_count after
+            # concurrent acquire() is committed
+            deleted, _ = models.StoredFile.objects \
+                .filter(name=name, ref_count=0) \
+                .delete()
+            if deleted:
+                storages.get_image_storage().delete(name)
+
+    def sync(self, image: models.Image) -> None:
+        """
+        Moves reference of saved Image from old file to the current one.
+        :param image: saved Image obj
+        :return: None
+        """
+        old_name = self.get_stored_name(image)
+        new_name = image.img.name if image.img else None
+        if new_name == old_name:
+            return
+        if new_name:
+            self.acquire(new_name)
+        if old_name:
+            self.release(old_name)
+        self.set_stored_name(image, new_name)
+
+
+class ImageVariantService:
+    """
+    Makes resized copies of Images (settings.IMAGE_VARIANTS) in every
+    format of settings.IMAGE_VARIANT_FORMATS.
+
+    Variants are generated in background by
+    common.tasks.generate_image_variants, which is scheduled after
+    Image with new file is saved (see common.signals).
+    """
+    pil_formats = {"webp": "WEBP", "jpeg": "JPEG"}
+
+    @staticmethod
+    def has_actual_variants(image: models.Image) -> bool:
+        """Variants are made from the current file of Image."""
+        return bool(image.img) \
+            and image.variants.get("source") == image.img.name \
+            and bool(image.variants.get("items"))
+
+    def schedule(self, image: models.Image) -> None:
+        """
+        Starts generation of variants after commit,
+        so the task sees saved Image.
+        :param image: saved Image obj
+        :return: None
+        """
+        from common import tasks
+
+        image_id = image.pk
+        transaction.on_commit(
+            lambda: tasks.generate_image_variants.delay(image_id=image_id))
+
+    def generate(self, image: models.Image) -> Optional[dict]:
+        """
+        Makes variants of image file and saves their paths
+        (by UPDATE, without signals).
+        Old variants are deleted. Broken files are skipped.
+        Image is not enlarged, so variants of small image can have
+        the same size, they share files of the first one.
+        :param image: Image obj
+        :return: new `variants` value or None if file can't be read
+        """
+        if not image.img:
+            return None
+        try:
+            with image.img.open("rb") as file:
+                source = PilImage.open(file)
+                source.load()
+        except (OSError, UnidentifiedImageError) as error:
+            logger.warning(
+                "Variants of Image(%s) are not generated: %s",
+                image.pk, error)
+            return None
+        source = ImageOps.exif_transpose(source)
+
+        self.delete_variants(image)
+        stem = posixpath.splitext(posixpath.basename(image.img.name))[0]
+        items = {}
+        # {(width, height): item}
+        made = {}
+        for name, size in settings.IMAGE_VARIANTS.items():
+            resized = source.copy()
+            resized.thumbnail(size, PilImage.LANCZOS)
+            if resized.size in made:
+                items[name] = dict(made[resized.size])
+                continue
+            item = {"width": resized.width}
+            for image_format in settings.IMAGE_VARIANT_FORMATS:
+                path = posixpath.join(
+                    settings.IMAGE_VARIANTS_SUBDIR,
+                    str(image.pk),
+                    f"{stem}_{name}.{image_format}",
+                )
+                item[image_format] = default_storage.save(
+                    path, ContentFile(self._encode(resized, image_format)))
+            items[name] = made[resized.size] = item
+
+        variants = {"source": image.img.name, "items": items}
+        models.Image.objects.filter(pk=image.pk).update(variants=variants)
+        image.variants = variants
+        return variants
+
+    def _encode(self, image: PilImage.Image, image_format: str) -> bytes:
+        """Encodes image, transparent background is white in JPEG."""
+        if image_format == "jpeg" and image.mode != "RGB":
+            image = image.convert("RGBA")
+            background = PilImage.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        buffer = io.BytesIO()
+        image.save(
+            buffer,
+            format=self.pil_formats[image_format],
+            quality=settings.IMAGE_VARIANT_QUALITY,
+        )
+        return buffer.getvalue()
+
+    @staticmethod
+    def delete_variants(image: models.Image) -> None:
+        """
+        Deletes files of variants (not the value of `variants` field).
+        :param image: Image obj
+        :return: None
+        """
+        for item in image.variants.get("items", {}).values():
+            for image_format in ImageVariantService.pil_formats:
+                path = item.get(image_format)
+                if path:
+                    default_storage.delete(path)
+
+    def get_urls(self, image: models.Image) -> dict[str, dict]:
+        """
+        URLs of variants, the original is used for every variant
+        until variants are generated.
+        :param image: Image obj with img
+        :return: {name: {"width": int or None, format: url}}
+        """
+        if not self.has_actual_variants(image):
+            url = image.img.url
+            return {
+                name: {
+                    "width": None,
+                    **{image_format: url
+                       for image_format in settings.IMAGE_VARIANT_FORMATS},
+                }
+                for name in settings.IMAGE_VARIANTS
+            }
+        return {
+            name: {
+                key: value if key == "width" else default_storage.url(value)
+                for key, value in item.items()
+            }
+            for name, item in image.variants["items"].items()
+        }
+
+    def get_srcset(
+            self,
+            image: models.Image,
+            image_format: str = "webp",
+    ) -> Optional[str]:
+        """
+        Value of `srcset` attribute of <img> with variants of one format.
+        :param image: Image obj
+        :param image_format: one of settings.IMAGE_VARIANT_FORMATS
+        :return: "url 160w, url 480w, ..." or None
+            if variants are not generated
+        """
+        if image_format not in settings.IMAGE_VARIANT_FORMATS \
+                or not self.has_actual_variants(image):
+            return None
+        # widths must be unique, variants of small image can repeat
+        candidates = {}
+        for item in self.get_urls(image).values():
+            candidates.setdefault(item["width"], item[image_format])
+        return ", ".join(
+            f"{url} {width}w" for width, url in candidates.items())
@@ -1,27 +1,54 @@
-# from django.db.models import signals
-# from django.dispatch import receiver
-#
-# from common import models
-#
-#
-# @receiver(signals.post_delete, sender=models.Image)
-# def post_save_image(sender, instance, *args, **kwargs):
-#     """Clean Old Image file."""
-#     instance.img.delete(save=False)
-#
-#
-# @receiver(signals.pre_save, sender=models.Image)
-# def pre_save_image(sender, instance, *args, **kwargs):
-#     """ instance old image file will delete from os """
-#     try:
-#         old_img = instance.__class__.objects.get(id=instance.id).img.path
-#         # try:
-#         new_img = instance.image.path
-#         # except:
-#         #     new_img = None
-#         if new_img != old_img:
-#             import os
-#             if os.path.exists(old_img):
-#                 os.remove(old_img)
-#     except models.Image.DoesNotExist:
-#         pass
+from django.db import transaction
+from django.db.models import signals
+from django.db.models.fields.files import FieldFile
+from django.dispatch import receiver
+
+from common import models, services
+
+
+@receiver(signals.post_init, sender=models.Image)
+def remember_stored_img_name(sender, instance, **kwargs):
+    """Remember file loaded from db to count references on save."""
+    # deferred img is not loaded here
+    value = instance.__dict__.get("img")
+    if isinstance(value, FieldFile):
+        name = value.name if value._committed else None
+    elif isinstance(value, str):
+        name = value
+    else:
+        # not saved upload
+        name = None
+    services.StoredFileService.set_stored_name(instance, name or None)
+
+
+@receiver(signals.post_save, sender=models.Image)
+def count_img_references(sender, instance, created, **kwargs):
+    """Reference to new file is added, to old one is removed."""
+    if created:
+        # name given to constructor is not referenced yet
+        services.StoredFileService.set_stored_name(instance, None)
+    services.StoredFileService().sync(instance)
+
+
+@receiver(signals.post_delete, sender=models.Image)
+def release_img_reference(sender, instance, **kwargs):
+    """
+    File is deleted if it was the last reference,
+    files of variants belong to the Image and are deleted after commit.
+    """
+    name = services.StoredFileService.get_stored_name(instance)
+    if name:
+        services.StoredFileService().release(name)
+    if instance.variants.get("items"):
+        transaction.on_commit(
+            lambda: services.ImageVariantService.delete_variants(instance))
+
+
+@receiver(signals.post_save, sender=models.Image)
+def schedule_image_variants(sender, instance, **kwargs):
+    """Generate variants of new file of Image in background."""
+    if kwargs.get("raw"):
+        return
+    service = services.ImageVariantService()
+    if instance.img and not service.has_actual_variants(instance):
+        service.schedule(instance)
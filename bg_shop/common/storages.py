@@ -0,0 +1,87 @@
+"""File storages of common app."""
+
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_NAME_RE = re.compile(r"(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$")
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores files by sha256 of their content:
+    `<upload_to>/<first 2 chars of hash>/<hash><ext>`.
+
+    The same content is stored once, saving of existing content only
+    returns its name. Content is streamed to a temporary file in
+    the storage directory while the hash is computed, so the whole file
+    is never kept in memory.
+    Files can be shared by several objects, delete them only by
+    StoredFileService.release().
+    """
+    hash_algorithm = "sha256"
+
+    def get_available_name(self, name, max_length=None):
+        """Name is chosen by _save(), existing file is reused."""
+        return name
+
+    def _save(self, name: str, content: File) -> str:
+        """
+        Writes content to temporary file, then moves it to hash name.
+        :param name: name suggested by FileField (upload_to and file name)
+        :param content: file
+        :return: hash name
+        """
+        directory = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        os.makedirs(self.path(directory), exist_ok=True)
+        if self.directory_permissions_mode is not None:
+            os.chmod(self.path(directory), self.directory_permissions_mode)
+
+        digest = hashlib.new(self.hash_algorithm)
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=self.path(directory), prefix=".upload-")
+        try:
+            with os.fdopen(descriptor, "wb") as temp_file:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            hexdigest = digest.hexdigest()
+            hash_name = posixpath.join(
+                directory, hexdigest[:2], f"{hexdigest}{extension}")
+            if self.exists(hash_name):
+                return hash_name
+            os.makedirs(
+                os.path.dirname(self.path(hash_name)), exist_ok=True)
+            file_move_safe(
+                temp_path, self.path(hash_name), allow_overwrite=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(self.path(hash_name), self.file_permissions_mode)
+            return hash_name
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def is_hash_name(name: str) -> bool:
+        """File is already stored by content hash."""
+        return bool(HASH_NAME_RE.search(name))
+
+
+image_storage = ContentAddressedStorage()
+
+
+def get_image_storage() -> ContentAddressedStorage:
+    """Storage of Image.img, callable keeps it out of migrations."""
+    return image_storage
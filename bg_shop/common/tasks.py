@@ -0,0 +1,19 @@
+"""Celery tasks related to common models."""
+
+from celery import shared_task
+
+from common import models, services
+
+
+@shared_task
+def generate_image_variants(image_id: int) -> bool:
+    """
+    Make resized copies of Image (see ImageVariantService).
+
+    :param image_id: Image.pk.
+    :return: True if variants are generated.
+    """
+    image = models.Image.objects.filter(pk=image_id).first()
+    if image is None:
+        return False
+    return services.ImageVariantService().generate(image) is not None
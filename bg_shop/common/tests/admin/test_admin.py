@@ -0,0 +1,40 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from common import admin as common_admin
+from common import models
+
+
+class EstimatedCountPaginatorTestCase(TestCase):
+    def setUp(self):
+        models.Image.objects.bulk_create(
+            [models.Image(img=f"{i}.png") for i in range(3)])
+        self.queryset = models.Image.objects.order_by("pk")
+
+    def test_count_without_estimate(self):
+        # estimate is available on postgres only
+        paginator = common_admin.EstimatedCountPaginator(self.queryset, 2)
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
+
+    @patch.object(
+        common_admin.EstimatedCountPaginator, "_get_estimate",
+        return_value=1_000_000)
+    def test_estimate_of_big_table(self, mock_get_estimate):
+        paginator = common_admin.EstimatedCountPaginator(self.queryset, 2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 1_000_000)
+
+    @patch.object(
+        common_admin.EstimatedCountPaginator, "_get_estimate",
+        return_value=10)
+    def test_small_table_is_counted(self, mock_get_estimate):
+        paginator = common_admin.EstimatedCountPaginator(self.queryset, 2)
+        self.assertEqual(paginator.count, 3)
+
+    def test_filtered_queryset_is_not_estimated(self):
+        paginator = common_admin.EstimatedCountPaginator(
+            self.queryset.filter(pk__gt=0), 2)
+        self.assertIsNone(paginator._get_estimate())
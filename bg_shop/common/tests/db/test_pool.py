@@ -0,0 +1,251 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import SkipTest
+from unittest.mock import MagicMock, patch
+
+from django.db import DatabaseError
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+from common.db import pool
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    def test_connection_is_reused(self):
+        connection_pool = pool.ConnectionPool(size=2)
+        connect = MagicMock(side_effect=lambda: MagicMock())
+
+        first = connection_pool.acquire(connect)
+        connection_pool.release(first)
+        second = connection_pool.acquire(connect)
+
+        self.assertIs(first, second)
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(
+            connection_pool.stats(),
+            {"size": 2, "in_use": 1, "idle": 0, "waits": 0,
+             "timeouts": 0, "created": 1, "discarded": 0},
+        )
+
+    def test_timeout_when_pool_is_full(self):
+        connection_pool = pool.ConnectionPool(size=1, timeout=0.01)
+        connection_pool.acquire(MagicMock)
+
+        with self.assertRaises(pool.PoolTimeout):
+            connection_pool.acquire(MagicMock)
+        stats = connection_pool.stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertEqual(stats["timeouts"], 1)
+
+    def test_waiting_request_gets_released_connection(self):
+        connection_pool = pool.ConnectionPool(size=1, timeout=5)
+        connection = connection_pool.acquire(MagicMock)
+        acquired = []
+        waiting = threading.Thread(
+            target=lambda: acquired.append(
+                connection_pool.acquire(MagicMock)))
+
+        waiting.start()
+        while not connection_pool.waits:
+            pass
+        connection_pool.release(connection)
+        waiting.join()
+
+        self.assertEqual(acquired, [connection])
+        self.assertEqual(connection_pool.stats()["timeouts"], 0)
+
+    def test_broken_and_expired_connections_are_closed(self):
+        connection_pool = pool.ConnectionPool(size=2, max_age=60)
+        broken = connection_pool.acquire(MagicMock)
+        expired = connection_pool.acquire(MagicMock)
+        connection_pool.release(broken, discard=True)
+        with patch.object(
+                pool.time, "monotonic",
+                return_value=pool.time.monotonic() + 60):
+            connection_pool.release(expired)
+
+        broken.close.assert_called_once()
+        expired.close.assert_called_once()
+        self.assertEqual(connection_pool.stats()["discarded"], 2)
+        self.assertEqual(connection_pool.open, 0)
+
+    def test_failed_health_check(self):
+        connection_pool = pool.ConnectionPool(size=1)
+        stale = connection_pool.acquire(MagicMock)
+        connection_pool.release(stale)
+
+        connection = connection_pool.acquire(
+            MagicMock, check=lambda conn: conn is not stale)
+
+        self.assertIsNot(connection, stale)
+        stale.close.assert_called_once()
+
+    def test_pool_of_parent_process_is_not_used(self):
+        settings_dict = {"NAME": "fork_test", "POOL": {"SIZE": 3}}
+        self.addCleanup(pool._pools.pop, ("fork_test", "fork_test"), None)
+        parent_pool = pool.get_pool("fork_test", settings_dict)
+        idle = parent_pool.acquire(MagicMock)
+        parent_pool.release(idle)
+
+        with patch.object(pool.os, "getpid", return_value=-1):
+            child_pool = pool.get_pool("fork_test", settings_dict)
+
+        self.assertIsNot(child_pool, parent_pool)
+        self.assertEqual(child_pool.size, 3)
+        # socket belongs to the parent
+        idle.close.assert_not_called()
+
+
+class PooledBackendTestMixin:
+    """Tests of backends of common.db.backends with a real database."""
+    # aliases of own ConnectionHandler, pools are separated by NAME
+    alias = "default"
+
+    def get_settings(self) -> dict:
+        raise NotImplementedError
+
+    def setUp(self):
+        settings_dict = self.get_settings()
+        settings_dict["POOL"] = {"SIZE": 2, "TIMEOUT": 0.01}
+        self.handler = ConnectionHandler({self.alias: settings_dict})
+        self.addCleanup(self.close_pool)
+        self.connection = self.handler[self.alias]
+        self.pool = pool.get_pool(
+            self.alias, self.connection.settings_dict)
+
+    def close_pool(self):
+        self.handler.close_all()
+        self.pool.close_idle()
+        pool._pools.pop(
+            (self.alias, str(self.connection.settings_dict["NAME"])), None)
+
+    def query(self, connection, sql, fetch=True):
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchall() if fetch else None
+
+    def test_connection_is_returned_to_pool(self):
+        self.query(self.connection, "SELECT 1")
+        raw_connection = self.connection.connection
+        self.assertEqual(self.pool.stats()["in_use"], 1)
+
+        self.connection.close()
+        self.assertEqual(self.pool.stats()["idle"], 1)
+        self.query(self.connection, "SELECT 1")
+
+        self.assertIs(self.connection.connection, raw_connection)
+        self.assertEqual(self.pool.stats()["created"], 1)
+
+    def test_threads_share_pool(self):
+        self.query(self.connection, "SELECT 1")
+        raw_connection = self.connection.connection
+        self.connection.close()
+        used = []
+
+        def run():
+            connection = self.handler[self.alias]
+            self.query(connection, "SELECT 1")
+            used.append(connection.connection)
+            connection.close()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(used, [raw_connection])
+
+    def test_transaction_is_rolled_back(self):
+        self.query(
+            self.connection, "CREATE TABLE pool_test (id integer)", False)
+        self.addCleanup(
+            self.query, self.connection, "DROP TABLE pool_test", False)
+        self.connection.set_autocommit(False)
+        self.query(
+            self.connection, "INSERT INTO pool_test VALUES (1)", False)
+        self.connection.close()
+
+        self.assertEqual(
+            self.query(self.connection, "SELECT * FROM pool_test"), [])
+
+    def test_timeout_when_pool_is_full(self):
+        self.query(self.connection, "SELECT 1")
+        busy = [self.handler.create_connection(self.alias)
+                for _ in range(2)]
+        self.query(busy[0], "SELECT 1")
+        self.addCleanup(busy[0].close)
+
+        with self.assertRaises(pool.PoolTimeout):
+            self.query(busy[1], "SELECT 1")
+        self.assertEqual(self.pool.stats()["timeouts"], 1)
+
+    def test_connection_with_errors_is_closed(self):
+        self.query(self.connection, "SELECT 1")
+        with self.assertRaises(DatabaseError):
+            self.query(self.connection, "SELECT * FROM not_exists")
+        self.connection.close()
+
+        self.assertEqual(self.pool.stats()["discarded"], 1)
+        self.assertEqual(self.pool.open, 0)
+
+
+class SQLitePooledBackendTestCase(PooledBackendTestMixin, SimpleTestCase):
+    def get_settings(self) -> dict:
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        return {
+            "ENGINE": "common.db.backends.sqlite3",
+            "NAME": os.path.join(directory, "pool.sqlite3"),
+        }
+
+
+class PostgresPooledBackendTestCase(PooledBackendTestMixin, SimpleTestCase):
+    """Runs if Postgres of POSTGRES_* variables is available."""
+
+    def get_settings(self) -> dict:
+        import psycopg2
+
+        settings_dict = {
+            "ENGINE": "common.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB", "postgres"),
+            "USER": os.getenv("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", "postgres"),
+            "HOST": os.getenv("POSTGRES_HOST", "localhost"),
+            "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            "CONN_HEALTH_CHECKS": True,
+        }
+        try:
+            psycopg2.connect(
+                dbname=settings_dict["NAME"],
+                user=settings_dict["USER"],
+                password=settings_dict["PASSWORD"],
+                host=settings_dict["HOST"],
+                port=settings_dict["PORT"],
+                connect_timeout=1,
+            ).close()
+        except psycopg2.OperationalError:
+            raise SkipTest("Postgres is not available.")
+        return settings_dict
+
+    def setUp(self):
+        super().setUp()
+        # type handlers of contrib.postgres look up the alias globally
+        from django.contrib.postgres import signals
+
+        patcher = patch.object(signals, "connections", self.handler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(signals.get_hstore_oids.cache_clear)
+        self.addCleanup(signals.get_citext_oids.cache_clear)
+
+    def test_closed_idle_connection_is_replaced(self):
+        self.query(self.connection, "SELECT 1")
+        raw_connection = self.connection.connection
+        self.connection.close()
+        raw_connection.close()
+
+        self.query(self.connection, "SELECT 1")
+
+        self.assertIsNot(self.connection.connection, raw_connection)
+        self.assertEqual(self.pool.stats()["discarded"], 1)
@@ -1,5 +1,7 @@
+import hashlib
 import io
 import os
+from unittest.mock import patch
 from string import ascii_letters, digits
 from random import choices, randint
 
@@ -9,21 +11,24 @@ from django.test import TestCase
 from django.core.files import File
 from django.conf import settings
 
-from common import models, services
+from common import models, services, tasks
 
 
-def generate_image_file(file_name: str):
+def generate_image_file(file_name: str, color=(155, 0, 0)):
     file = io.BytesIO()
-    image = Image.new('RGBA', size=(100, 100), color=(155, 0, 0))
+    image = Image.new('RGBA', size=(100, 100), color=color)
     image.save(file, 'png')
     file.name = file_name
     file.seek(0)
     return file
 
 
-def generate_image_path(image_name):
+def generate_image_path(image_file: io.BytesIO):
+    """Files are stored by hash of content."""
+    digest = hashlib.sha256(image_file.getvalue()).hexdigest()
     return os.path.join(
-        settings.MEDIA_ROOT, settings.IMAGE_SUBDIR, image_name)
+        settings.MEDIA_ROOT, settings.IMAGE_SUBDIR, digest[:2],
+        f"{digest}.png")
 
 
 def remove_file_from_filesystem(file_path):
@@ -52,9 +57,10 @@ class DeleteImgTestCase(TestCase):
         self.base_image_name = "".join(
             choices(ascii_letters + digits, k=randint(9, 10)))
         self.image_name = self.base_image_name + ".png"
-        self.image_path = generate_image_path(image_name=self.image_name)
+        image_file = generate_image_file(self.image_name)
+        self.image_path = generate_image_path(image_file)
 
-        self.image_file = File(generate_image_file(self.image_name))
+        self.image_file = File(image_file)
 
     def tearDown(self) -> None:
         remove_file_from_filesystem(self.image_path)
@@ -67,7 +73,9 @@ class DeleteImgTestCase(TestCase):
         )
         image.save()
 
-        self.service.delete_img(instance=image)
+        self.assertTrue(os.path.exists(self.image_path))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.delete_img(instance=image)
         self.assertFalse(
             os.path.exists(self.image_path),
             "Image file steel is in a filesystem.",
@@ -84,9 +92,10 @@ class DeleteInstanceTestCase(TestCase):
         self.base_image_name = "".join(
             choices(ascii_letters + digits, k=randint(9, 10)))
         self.image_name = self.base_image_name + ".png"
-        self.image_path = generate_image_path(image_name=self.image_name)
+        image_file = generate_image_file(self.image_name)
+        self.image_path = generate_image_path(image_file)
 
-        self.image_file = File(generate_image_file(self.image_name))
+        self.image_file = File(image_file)
 
     def tearDown(self) -> None:
         remove_file_from_filesystem(self.image_path)
@@ -99,7 +108,9 @@ class DeleteInstanceTestCase(TestCase):
         )
         image.save()
 
-        self.service.delete_instance(instance=image)
+        self.assertTrue(os.path.exists(self.image_path))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.delete_instance(instance=image)
         self.assertFalse(
             os.path.exists(self.image_path),
             "Image file steel is in a filesystem.",
@@ -127,26 +138,31 @@ class UpdateInstanceTestCase(TestCase):
         self.base_image_name = "".join(
             choices(ascii_letters + digits, k=randint(9, 10)))
         self.image_name = self.base_image_name + ".png"
-        self.image_path = generate_image_path(image_name=self.image_name)
         self.new_image_name = "new_" + self.image_name
-        self.new_image_path = generate_image_path(
-            image_name=self.new_image_name)
+        image_file = generate_image_file(self.image_name)
+        new_image_file = generate_image_file(
+            self.new_image_name, color=(0, 155, 0))
+        self.image_path = generate_image_path(image_file)
+        self.new_image_path = generate_image_path(new_image_file)
 
-        self.image_file = File(generate_image_file(self.image_name))
-        self.new_image_file = File(generate_image_file(self.new_image_name))
+        self.image_file = File(image_file)
+        self.new_image_file = File(new_image_file)
 
     def tearDown(self) -> None:
         remove_file_from_filesystem(self.image_path)
         remove_file_from_filesystem(self.new_image_path)
         models.Image.objects.all().delete()
 
-    def test_replaced_img_file_is_deleted_from_filesystem(self):
+    @patch.object(tasks.generate_image_variants, "delay")
+    def test_replaced_img_file_is_deleted_from_filesystem(self, mock_delay):
         image = models.Image(
             description="test_delete_Image_description",
             img=self.image_file,
         )
         image.save()
-        self.service.update_img(instance=image, new_img=self.new_image_file)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.update_img(
+                instance=image, new_img=self.new_image_file)
         self.assertFalse(
             os.path.exists(self.image_path),
             "Image file steel is in a filesystem.",
@@ -155,9 +171,9 @@ class UpdateInstanceTestCase(TestCase):
             os.path.exists(self.new_image_path),
             "New image file is not in a filesystem.",
         )
-        self.assertIn(
-            self.new_image_name,
-            str(image.img),
+        self.assertEqual(
+            image.img.path,
+            self.new_image_path,
             "New image file has not been set as img.",
         )
 
@@ -171,9 +187,9 @@ class UpdateInstanceTestCase(TestCase):
             os.path.exists(self.new_image_path),
             "New image file is not in a filesystem.",
         )
-        self.assertIn(
-            self.new_image_name,
-            str(image.img),
+        self.assertEqual(
+            image.img.path,
+            self.new_image_path,
             "New image file has not been set as img.",
         )
         self.assertTrue(
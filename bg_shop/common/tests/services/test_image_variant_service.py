@@ -0,0 +1,162 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from PIL import Image as PilImage
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from common import models, serializers, services, tasks
+
+
+def generate_image_file(size=(800, 600), mode="RGBA") -> ContentFile:
+    file = io.BytesIO()
+    PilImage.new(mode, size=size, color=(155, 0, 0)).save(file, "png")
+    return ContentFile(file.getvalue(), name="variant_test.png")
+
+
+@override_settings(
+    IMAGE_VARIANTS={"thumbnail": (100, 100), "card": (400, 400)},
+    IMAGE_VARIANT_FORMATS=("webp", "jpeg"),
+)
+class ImageVariantServiceTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.service = services.ImageVariantService()
+        self.image = models.Image.objects.create(
+            description="test", img=generate_image_file())
+
+    def test_generate(self):
+        variants = self.service.generate(self.image)
+
+        self.assertEqual(variants["source"], self.image.img.name)
+        self.assertEqual(
+            models.Image.objects.get(pk=self.image.pk).variants, variants)
+        self.assertEqual(variants["items"]["thumbnail"]["width"], 100)
+        # not upscaled
+        self.assertEqual(variants["items"]["card"]["width"], 400)
+        with PilImage.open(os.path.join(
+                self.media_root,
+                variants["items"]["thumbnail"]["webp"])) as thumbnail:
+            self.assertEqual(thumbnail.format, "WEBP")
+            self.assertEqual(thumbnail.size, (100, 75))
+        with PilImage.open(os.path.join(
+                self.media_root,
+                variants["items"]["card"]["jpeg"])) as card:
+            self.assertEqual(card.format, "JPEG")
+
+    def test_regenerate_replaces_files(self):
+        old_path = self.service.generate(self.image)["items"]["card"]["webp"]
+        new_path = self.service.generate(self.image)["items"]["card"]["webp"]
+        self.assertEqual(old_path, new_path)
+        self.assertEqual(
+            len(os.listdir(os.path.dirname(
+                os.path.join(self.media_root, new_path)))),
+            4,
+        )
+
+    def test_broken_file_is_skipped(self):
+        self.image.img.save(
+            "broken.png", ContentFile(b"not an image"), save=False)
+        self.assertIsNone(self.service.generate(self.image))
+
+    def test_delete_img_deletes_variants(self):
+        variants = self.service.generate(self.image)
+        path = os.path.join(
+            self.media_root, variants["items"]["thumbnail"]["jpeg"])
+        self.assertTrue(os.path.exists(path))
+        services.ImageService().delete_instance(self.image)
+        self.assertFalse(os.path.exists(path))
+
+    def test_deleting_image_deletes_variants(self):
+        variants = self.service.generate(self.image)
+        paths = [
+            os.path.join(self.media_root, item[image_format])
+            for item in variants["items"].values()
+            for image_format in ("webp", "jpeg")
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Image.objects.filter(pk=self.image.pk).delete()
+
+        for path in paths:
+            self.assertFalse(os.path.exists(path))
+
+    def test_serializer_uses_variants(self):
+        data = serializers.ImageSerializer(self.image).data
+        self.assertIsNone(data["srcset"], "Variants are not generated yet.")
+        self.assertEqual(data["variants"]["card"]["webp"], data["src"])
+
+        self.service.generate(self.image)
+        data = serializers.ImageSerializer(self.image).data
+        self.assertTrue(data["variants"]["card"]["webp"].endswith(".webp"))
+        self.assertEqual(
+            data["srcset"],
+            f"{data['variants']['thumbnail']['webp']} 100w, "
+            f"{data['variants']['card']['webp']} 400w",
+        )
+
+    def test_variants_of_small_image_are_not_repeated(self):
+        self.image.img.save(
+            "small.png", generate_image_file(size=(80, 60)), save=False)
+
+        variants = self.service.generate(self.image)
+
+        thumbnail = variants["items"]["thumbnail"]
+        self.assertEqual(thumbnail["width"], 80)
+        self.assertEqual(variants["items"]["card"], thumbnail)
+        self.assertEqual(
+            len(os.listdir(os.path.dirname(
+                os.path.join(self.media_root, thumbnail["webp"])))),
+            2,
+        )
+        srcset = self.service.get_srcset(self.image)
+        self.assertEqual(
+            srcset, f"{default_storage.url(thumbnail['webp'])} 80w")
+
+    def test_outdated_variants_are_not_used(self):
+        self.service.generate(self.image)
+        # other content, files are stored by hash
+        self.image.img.save(
+            "new.png", generate_image_file(size=(640, 480)), save=False)
+        self.assertFalse(self.service.has_actual_variants(self.image))
+        self.assertIsNone(serializers.ImageSerializer(self.image).data[
+            "srcset"])
+
+    @patch.object(tasks.generate_image_variants, "delay")
+    def test_variants_are_scheduled_after_commit(self, mock_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = models.Image.objects.create(img=generate_image_file())
+        mock_delay.assert_called_once_with(image_id=image.pk)
+
+        mock_delay.reset_mock()
+        self.service.generate(image)
+        with self.captureOnCommitCallbacks(execute=True):
+            image.description = "new description"
+            image.save()
+        mock_delay.assert_not_called()
+
+    def test_task(self):
+        self.assertTrue(tasks.generate_image_variants(self.image.pk))
+        self.assertFalse(tasks.generate_image_variants(0))
+
+    def test_command(self):
+        call_command("generate_image_variants", "--sync", stdout=io.StringIO())
+        self.image.refresh_from_db()
+        self.assertTrue(self.service.has_actual_variants(self.image))
+
+        with patch.object(tasks.generate_image_variants, "delay") as delay:
+            call_command("generate_image_variants", stdout=io.StringIO())
+            delay.assert_not_called()
+            call_command(
+                "generate_image_variants", "--all", stdout=io.StringIO())
+            delay.assert_called_once_with(image_id=self.image.pk)
@@ -0,0 +1,189 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+from unittest.mock import patch
+
+from PIL import Image as PilImage
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+    tag,
+)
+
+from common import models, services, storages, tasks
+
+
+def generate_image_file(color=(155, 0, 0), name="test.png") -> ContentFile:
+    file = io.BytesIO()
+    PilImage.new("RGBA", size=(50, 50), color=color).save(file, "png")
+    return ContentFile(file.getvalue(), name=name)
+
+
+@override_settings(IMAGE_VARIANTS={})
+class StoredFileServiceTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        delay_patcher = patch.object(tasks.generate_image_variants, "delay")
+        delay_patcher.start()
+        self.addCleanup(delay_patcher.stop)
+        self.service = services.StoredFileService()
+
+    def test_same_content_is_stored_once(self):
+        first = models.Image.objects.create(
+            img=generate_image_file(name="first.png"))
+        second = models.Image.objects.create(
+            img=generate_image_file(name="second.png"))
+
+        self.assertEqual(first.img.name, second.img.name)
+        self.assertTrue(storages.ContentAddressedStorage.is_hash_name(
+            first.img.name))
+        self.assertEqual(
+            models.StoredFile.objects.get(name=first.img.name).ref_count, 2)
+        # temporary files are not left
+        self.assertEqual(
+            os.listdir(os.path.dirname(os.path.dirname(first.img.path))),
+            [os.path.basename(os.path.dirname(first.img.path))],
+        )
+
+    def test_file_is_deleted_with_last_reference(self):
+        first = models.Image.objects.create(img=generate_image_file())
+        second = models.Image.objects.create(img=generate_image_file())
+        path = first.img.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(
+            models.StoredFile.objects.get(name=second.img.name).ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.ImageService().delete_instance(instance=second)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(models.StoredFile.objects.exists())
+
+    def test_reference_moves_to_new_file(self):
+        image = models.Image.objects.create(img=generate_image_file())
+        old_name = image.img.name
+        image = models.Image.objects.get(pk=image.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.img = generate_image_file(color=(0, 155, 0))
+            image.save()
+        self.assertNotEqual(image.img.name, old_name)
+        self.assertFalse(
+            models.StoredFile.objects.filter(name=old_name).exists())
+        self.assertFalse(os.path.exists(os.path.join(
+            self.media_root, old_name)))
+        self.assertEqual(
+            models.StoredFile.objects.get(name=image.img.name).ref_count, 1)
+
+    def test_file_acquired_again_is_not_deleted(self):
+        image = models.Image.objects.create(img=generate_image_file())
+        name = image.img.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.release(name)
+            self.service.acquire(name)
+        self.assertTrue(os.path.exists(image.img.path))
+
+    def test_file_acquired_before_deletion_is_not_deleted(self):
+        image = models.Image.objects.create(img=generate_image_file())
+        name = image.img.name
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.service.release(name)
+        # row is kept till the file is deleted
+        self.assertEqual(
+            models.StoredFile.objects.get(name=name).ref_count, 0)
+        self.service.acquire(name)
+        for callback in callbacks:
+            callback()
+
+        self.assertTrue(os.path.exists(image.img.path))
+        self.assertEqual(
+            models.StoredFile.objects.get(name=name).ref_count, 1)
+
+    def test_deduplicate_command(self):
+        legacy_storage = FileSystemStorage()
+        legacy_names = [
+            legacy_storage.save(
+                f"{settings.IMAGE_SUBDIR}/{name}",
+                generate_image_file(name=name),
+            )
+            for name in ("legacy1.png", "legacy2.png")
+        ]
+        images = [
+            models.Image.objects.create(img=name) for name in legacy_names]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("deduplicate_images", stdout=io.StringIO())
+
+        names = {image.img.name for image in
+                 models.Image.objects.filter(pk__in=[i.pk for i in images])}
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(storages.ContentAddressedStorage.is_hash_name(name))
+        self.assertEqual(
+            models.StoredFile.objects.get(name=name).ref_count, 2)
+        for legacy_name in legacy_names:
+            self.assertFalse(legacy_storage.exists(legacy_name))
+            self.assertFalse(
+                models.StoredFile.objects.filter(name=legacy_name).exists())
+
+
+@tag("postgres")
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Row locks are needed, run with postgres settings (e.g. settings.local).",
+)
+@override_settings(IMAGE_VARIANTS={})
+class StoredFileConcurrencyTestCase(TransactionTestCase):
+    """File acquired by not committed transaction must not be deleted."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def test_deletion_waits_for_acquire(self):
+        storage = storages.get_image_storage()
+        name = storage.save("images/test.png", generate_image_file())
+        models.StoredFile.objects.create(name=name, ref_count=0)
+        acquired = threading.Event()
+
+        def upload() -> None:
+            try:
+                with transaction.atomic():
+                    services.StoredFileService.acquire(name)
+                    acquired.set()
+                    time.sleep(0.5)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(1) as executor:
+            future = executor.submit(upload)
+            acquired.wait(timeout=5)
+            services.StoredFileService._delete_file(name)
+            future.result()
+
+        self.assertTrue(storage.exists(name))
+        self.assertEqual(
+            models.StoredFile.objects.get(name=name).ref_count, 1)
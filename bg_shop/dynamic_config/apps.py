@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DynamicConfigConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dynamic_config'
+
+    def ready(self):
+        # Implicitly connect signal handlers decorated with @receiver.
+        from . import signals
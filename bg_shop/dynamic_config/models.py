@@ -66,13 +66,13 @@ class DynamicConfig(models.Model):
     def save(self, *args, **kwargs):
         """
         It prevents the creation objects with id other than 1.
+        Cached config is invalidated by post_save signal.
         :param args:
         :param kwargs:
         :return:
         """
         self.pk = 1
         super().save(*args, **kwargs)
-        # todo self.set_to_cache()
 
     # def delete(self, *args, **kwargs):
     #     """To prevent deletion by the django admin."""
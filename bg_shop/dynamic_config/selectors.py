@@ -1,14 +1,79 @@
+import time
+import uuid
 from typing import Any
 
+from django.conf import settings
+from django.core.cache import cache
+
 from dynamic_config import models
 
+VERSION_CACHE_KEY = "dynamic_config:version"
+INSTANCE_CACHE_KEY = "dynamic_config:instance:{version}"
+
+# In-process copy of DynamicConfig shared by all selectors of the worker.
+_local_cache: dict[str, Any] = {
+    "version": None,
+    "config": None,
+    "checked_at": 0.0,
+}
+
+
+class DynamicConfigSelector:
+    """
+    Reads singleton DynamicConfig through two levels of cache.
+
+    Every worker keeps in-process copy of the config and compares its
+    version with version in Django cache not more often than once in
+    DYNAMIC_CONFIG_LOCAL_TTL seconds. Instance itself is also stored in
+    Django cache under versioned key, so db is hit only once after change.
+    Version is changed by DynamicConfigService.invalidate_cache().
+    """
 
-class DynamicConfigSelector:  # todo cache delete cache post_save _signal
     def get_instance(self):
         if not hasattr(self, "config"):
-            self.config = models.DynamicConfig.objects.get(pk=1)
+            self.config = self._get_cached_instance()
         return self.config
 
+    @staticmethod
+    def get_version() -> str:
+        """
+        Returns current version of DynamicConfig from shared cache.
+        Sets new one if it is absent (e.g. cache was cleared).
+        """
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(VERSION_CACHE_KEY)
+        return version
+
+    @classmethod
+    def _get_cached_instance(cls) -> models.DynamicConfig:
+        """
+        Returns DynamicConfig from in-process cache, shared cache or db.
+        :return: DynamicConfig obj
+        """
+        now = time.monotonic()
+        config = _local_cache["config"]
+        if (config is not None) and \
+                (now - _local_cache["checked_at"]
+                 < settings.DYNAMIC_CONFIG_LOCAL_TTL):
+            return config
+
+        version = cls.get_version()
+        if (config is None) or (_local_cache["version"] != version):
+            key = INSTANCE_CACHE_KEY.format(version=version)
+            config = cache.get(key)
+            if config is None:
+                config = models.DynamicConfig.objects.get(pk=1)
+                cache.set(key, config, timeout=None)
+        _local_cache.update(version=version, config=config, checked_at=now)
+        return config
+
+    @staticmethod
+    def clear_local_cache() -> None:
+        """Drops in-process copy, so next call checks shared cache."""
+        _local_cache.update(version=None, config=None, checked_at=0.0)
+
     def get_config(self, key: str) -> Any:
         """
         Returns value of one of DynamicConfig's fields by key.
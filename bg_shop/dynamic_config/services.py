@@ -1,6 +1,9 @@
+import uuid
+
 from django.conf import settings
+from django.core.cache import cache
 
-from dynamic_config import models
+from dynamic_config import models, selectors
 
 
 class DynamicConfigService:
@@ -17,3 +20,15 @@ class DynamicConfigService:
         )
         d_config.save()
 
+    @staticmethod
+    def invalidate_cache() -> None:
+        """
+        Sets new version of DynamicConfig in shared cache.
+
+        Other workers reload config when their in-process copy expires
+        (DYNAMIC_CONFIG_LOCAL_TTL), the current one - immediately.
+        :return: None
+        """
+        cache.set(
+            selectors.VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        selectors.DynamicConfigSelector.clear_local_cache()
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models import signals
+from django.dispatch import receiver
+
+from dynamic_config import models, services
+
+
+@receiver(signals.post_save, sender=models.DynamicConfig)
+@receiver(signals.post_delete, sender=models.DynamicConfig)
+def invalidate_config_cache(sender, **kwargs):
+    """
+    Invalidates cached DynamicConfig when it is changed.
+    It is repeated after commit, because other workers could cache old
+    instance from db between save and commit.
+    """
+    services.DynamicConfigService.invalidate_cache()
+    transaction.on_commit(services.DynamicConfigService.invalidate_cache)
@@ -1,7 +1,8 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.conf import settings
+from django.core.cache import cache
 
-from dynamic_config import selectors
+from dynamic_config import models, selectors, services
 
 
 class GetConfigTestCase(TestCase):
@@ -21,3 +22,49 @@ class GetConfigTestCase(TestCase):
                 msg="A non-existent attribute is accepted."
         ):
             self.selector.get_config(key="non-existent_attribute")
+
+
+class CachedInstanceTestCase(TestCase):
+    def setUp(self) -> None:
+        selectors.DynamicConfigSelector.clear_local_cache()
+
+    def tearDown(self) -> None:
+        # db changes are rolled back, cached instance must be dropped too
+        services.DynamicConfigService.invalidate_cache()
+
+    def test_db_is_hit_once_for_many_selectors(self):
+        selectors.DynamicConfigSelector().get_instance()
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                selectors.DynamicConfigSelector().ordinary_delivery_cost
+
+    def test_instance_is_taken_from_shared_cache(self):
+        selectors.DynamicConfigSelector().get_instance()
+        selectors.DynamicConfigSelector.clear_local_cache()
+        with self.assertNumQueries(0):
+            selectors.DynamicConfigSelector().get_instance()
+
+    def test_save_invalidates_cache(self):
+        selectors.DynamicConfigSelector().get_instance()
+        config = models.DynamicConfig.objects.get(pk=1)
+        config.main_email = "new@mail.com"
+        config.save()
+
+        self.assertEqual(
+            selectors.DynamicConfigSelector().get_config(key="main_email"),
+            "new@mail.com",
+            "Cached config is not invalidated after save."
+        )
+
+    @override_settings(DYNAMIC_CONFIG_LOCAL_TTL=0)
+    def test_version_change_in_other_worker_is_picked_up(self):
+        selectors.DynamicConfigSelector().get_instance()
+        models.DynamicConfig.objects.filter(pk=1).update(
+            main_email="other@mail.com")
+        # as if another process bumped the version
+        cache.set(selectors.VERSION_CACHE_KEY, "new version", timeout=None)
+
+        self.assertEqual(
+            selectors.DynamicConfigSelector().get_config(key="main_email"),
+            "other@mail.com",
+        )
@@ -1,9 +1,15 @@
 from django.contrib import admin
+
+from common import admin as common_admin
 from orders import models
 
 
-class OrderedProductInline(admin.TabularInline):
+class OrderedProductInline(
+        common_admin.PaginatedInlineMixin, admin.TabularInline):
     model = models.OrderedProduct
+    fields = ("product", "count", "price")
+    autocomplete_fields = ("product",)
+    extra = 0
 
 
 @admin.register(models.Order)
@@ -16,12 +22,26 @@ class OrderAdmin(admin.ModelAdmin):
         "status",
         "paid",
         "delivery_type",
+        "total_cost",
         "is_active",
     )
     list_display_links = ('pk', 'created_at',)
+    list_select_related = ("user",)
+    list_filter = ("status", "paid", "delivery_type", "is_active")
+    search_fields = ("=id", "=user__username")
+    autocomplete_fields = ("user",)
+    # backed by "order_created_idx"
+    date_hierarchy = "created_at"
+    show_full_result_count = False
+    paginator = common_admin.EstimatedCountPaginator
 
 
 @admin.register(models.OrderedProduct)
 class OrderedProductAdmin(admin.ModelAdmin):
-    ...
-
+    list_display = ("pk", "order", "product", "count", "price")
+    list_display_links = ("pk", "order")
+    list_select_related = ("order", "product")
+    search_fields = ("=order__id",)
+    autocomplete_fields = ("order", "product")
+    show_full_result_count = False
+    paginator = common_admin.EstimatedCountPaginator
@@ -1,22 +1,27 @@
 """Api View related to cart operations."""
 
-from rest_framework import status, permissions, views
+from asgiref.sync import sync_to_async
+from rest_framework import status, permissions
 from rest_framework import response as drf_response
 from rest_framework import request as drf_request
 from rest_framework import serializers as drf_serializers
 
+from api import async_views
 from orders import services, selectors, serializers
 
 
-class CartApi(views.APIView):
+class CartApi(async_views.AsyncAPIView):
     """
     Logic related to Cart.
 
-    If user is anonymous saves cart in sessions.
+    If user is anonymous saves cart in CartStore (session by default).
     If user is authenticated, saves cart in Order related with the user
-    and that has an editing status, and adds session cart data in the order.
+    and that has a CART status, and adds session cart data in the order.
+    Cart is loaded and saved by one operation, see orders.cart_stores.
     When user logs-in, Account app will save session cart as Order with
     status = CART.
+    Handlers are async (Django does not allow mixed views), CartService
+    is called by sync_to_async.
     """
 
     class InputSerializer(drf_serializers.Serializer):
@@ -27,7 +32,7 @@ class CartApi(views.APIView):
 
     permission_classes = (permissions.AllowAny,)
 
-    def get(
+    async def get(
             self,
             request: drf_request.Request,
             **kwargs
@@ -40,13 +45,13 @@ class CartApi(views.APIView):
         :return:
         """
         selector = selectors.CartSelector(request=request)
-        cart = selector.get_cart()
-        output_serializer = serializers.CartSerializer(cart, many=True)
-        response_data = output_serializer.data
+        cart = await selector.aget_cart()
+        response_data = await async_views.serialize(
+            serializers.CartSerializer, cart, many=True)
         return drf_response.Response(
             data=response_data, status=status.HTTP_200_OK)
 
-    def post(
+    async def post(
             self,
             request: drf_request.Request,
             **kwargs
@@ -62,19 +67,19 @@ class CartApi(views.APIView):
         input_serializer.is_valid(raise_exception=True)
         validated_data = input_serializer.validated_data
         service = services.CartService(request=request)
-        service.add(
+        items = await sync_to_async(service.add)(
             product_id=validated_data.get("id"),
             quantity=validated_data.get("count"),
         )
 
         selector = selectors.CartSelector(request=request)
-        cart = selector.get_cart()
-        output_serializer = serializers.CartSerializer(cart, many=True)
-        response_data = output_serializer.data
+        cart = await selector.aget_cart(items=items)
+        response_data = await async_views.serialize(
+            serializers.CartSerializer, cart, many=True)
         return drf_response.Response(
             data=response_data, status=status.HTTP_200_OK)
 
-    def delete(
+    async def delete(
             self,
             request: drf_request.Request,
             **kwargs
@@ -90,14 +95,14 @@ class CartApi(views.APIView):
         input_serializer.is_valid(raise_exception=True)
         validated_data = input_serializer.validated_data
         service = services.CartService(request=request)
-        service.remove(
+        items = await sync_to_async(service.remove)(
             product_id=validated_data.get("id"),
             quantity=validated_data.get("count"),
         )
 
         selector = selectors.CartSelector(request=request)
-        cart = selector.get_cart()
-        output_serializer = serializers.CartSerializer(cart, many=True)
-        response_data = output_serializer.data
+        cart = await selector.aget_cart(items=items)
+        response_data = await async_views.serialize(
+            serializers.CartSerializer, cart, many=True)
         return drf_response.Response(
             data=response_data, status=status.HTTP_200_OK)
@@ -9,6 +9,7 @@ from rest_framework import serializers as drf_serializers
 from rest_framework import response as drf_response
 from rest_framework import request as drf_request
 
+from api import pagination
 from orders import services, serializers, selectors, models
 from account import validators as acc_validators
 
@@ -17,10 +18,17 @@ class OrdersApi(views.APIView):
     """
     Not for specific orders.
 
-    GET: order history.
+    GET: order history (paginated summaries, products are returned
+        by OrderDetailApi).
     POST: create new order.
     """
 
+    class Pagination(pagination.KeysetPagination):
+        page_query_param = "currentPage"
+        page_size_query_param = "limit"
+        page_size = 10
+        max_page_size = 50
+
     class PostOutputSerializer(drf_serializers.Serializer):
         """Info about created order."""
 
@@ -36,16 +44,23 @@ class OrdersApi(views.APIView):
         """
         Order History of user.
 
-        Get all (active, not status.CART) orders of user as a history.
+        Get active (not status.CART) orders of user as a history,
+        the newest first. Paginated by `currentPage`/`limit` params
+        or by `cursor` (`nextCursor`, `previousCursor` of response).
         :param request:
         :param kwargs:
-        :return:
+        :return: {items: [order summary], currentPage, lastPage,
+            nextCursor, previousCursor}
         """
         selector = selectors.OrderSelector()
-        orders = selector.get_order_history(user=request.user)
-        serializer = serializers.OrderOutputSerializer(orders, many=True)
-        return drf_response.Response(
-            data=serializer.data, status=status.HTTP_200_OK)
+        orders = selector.get_order_summaries(user=request.user)
+        return pagination.get_paginated_response(
+            pagination_class=self.Pagination,
+            serializer_class=serializers.OrderSummarySerializer,
+            queryset=orders,
+            request=request,
+            view=self,
+        )
 
     def post(
             self,
@@ -73,7 +88,9 @@ class OrdersApi(views.APIView):
         validated_data = input_serializer.validated_data
 
         selector = selectors.OrderSelector()
-        cart_order = selector.get_or_create_cart_order(user=request.user)
+        # ordered products are reconciled by one batch, not from cache
+        cart_order = selector.get_or_create_cart_order(
+            user=request.user, prefetch_ordered_products=False)
 
         service = services.OrderService()
         order = service.edit(order=cart_order, products=validated_data)
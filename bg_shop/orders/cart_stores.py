@@ -0,0 +1,209 @@
+"""
+Storages of Cart.
+
+Cart is represented by compact structure {product_id: quantity}.
+Store loads it by one operation and writes the whole structure back
+by one batched operation, so CartService works with plain dict.
+Authenticated users always have cart in db (Order with CART status),
+storage of anonymous carts is set by CART_ANONYMOUS_STORE setting.
+"""
+
+import abc
+from typing import TypeVar
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from rest_framework import request as drf_request
+
+from orders import models, selectors
+
+UserType = TypeVar('UserType', bound=AbstractUser)
+
+
+class CartStore(abc.ABC):
+    """Interface of Cart storage."""
+
+    def __init__(self, request: drf_request.Request) -> None:
+        """Save request for further use."""
+        self.request = request
+
+    @abc.abstractmethod
+    def load(self) -> dict[int, int]:
+        """
+        Load Cart.
+
+        :return: {product_id: quantity}
+        """
+
+    @abc.abstractmethod
+    def save(self, items: dict[int, int]) -> None:
+        """
+        Replace stored Cart with passed one.
+
+        :param items: {product_id: quantity}, quantity must be > 0
+        :return: None
+        """
+
+    def clear(self) -> None:
+        """Remove all items from Cart."""
+        self.save({})
+
+
+class SessionCartStore(CartStore):
+    """
+    Keeps Cart in Django session.
+
+    Format in session is {'product_id': quantity} (keys are str,
+    because session is serialized to json).
+    """
+
+    def load(self) -> dict[int, int]:
+        """Load Cart from session, does not hit db if session is loaded."""
+        cart = self.request.session.get(settings.CART_SESSION_ID) or {}
+        return {int(product_id): qty for product_id, qty in cart.items()}
+
+    def save(self, items: dict[int, int]) -> None:
+        """Rewrite cart in session, it is saved with the session."""
+        self.request.session[settings.CART_SESSION_ID] = {
+            str(product_id): qty for product_id, qty in items.items()}
+        self.request.session.modified = True
+
+
+class CacheCartStore(CartStore):
+    """
+    Keeps Cart in Django cache (CART_CACHE_ALIAS), e.g. local-memory or
+    file based cache, key is based on session key.
+
+    Session is created if it doesn't exist, but it isn't modified
+    by changes of Cart.
+    """
+
+    key_prefix = "cart"
+
+    def get_key(self) -> str:
+        """Get cache key of Cart related to the session."""
+        session = self.request.session
+        if session.session_key is None:
+            session.save()
+        return f"{self.key_prefix}:{session.session_key}"
+
+    @staticmethod
+    def get_cache():
+        """Cache used for carts."""
+        return caches[settings.CART_CACHE_ALIAS]
+
+    def load(self) -> dict[int, int]:
+        """Load Cart from cache."""
+        if self.request.session.session_key is None:
+            return {}
+        return self.get_cache().get(self.get_key()) or {}
+
+    def save(self, items: dict[int, int]) -> None:
+        """Rewrite Cart in cache."""
+        self.get_cache().set(
+            self.get_key(), dict(items), timeout=settings.CART_CACHE_TIMEOUT)
+
+
+class DBCartStore(CartStore):
+    """Keeps Cart as OrderedProducts of Order with CART status."""
+
+    @property
+    def user(self) -> UserType:
+        """Owner of Cart."""
+        return self.request.user
+
+    def load(self) -> dict[int, int]:
+        """Load Cart by one query."""
+        return dict(
+            models.OrderedProduct.objects
+            .filter(
+                order__user_id=self.user.pk,
+                order__status=models.Order.Statuses.CART,
+            )
+            .values_list("product_id", "count")
+        )
+
+    def save(self, items: dict[int, int]) -> None:
+        """
+        Rewrite Cart in db.
+
+        Compares passed Cart with stored one and applies the difference
+        by one DELETE, one UPDATE and one INSERT at most.
+        :param items: {product_id: quantity}
+        :return: None
+        """
+        self._write(items, remove_missing=True)
+
+    def merge(self, items: dict[int, int]) -> None:
+        """
+        Add passed items to Cart in db, replacing quantities of Products
+        that are already in Cart, other Products are kept.
+
+        Cart Order and its lines are loaded once, changes are written
+        by one UPDATE and one INSERT at most.
+        :param items: {product_id: quantity}, quantity must be > 0
+        :return: None
+        """
+        self._write(items, remove_missing=False)
+
+    def _write(self, items: dict[int, int], remove_missing: bool) -> None:
+        """
+        Apply difference between passed items and stored Cart.
+
+        :param items: {product_id: quantity}
+        :param remove_missing: If True, delete stored items
+            that aren't passed.
+        :return: None
+        """
+        with transaction.atomic():
+            order = selectors.OrderSelector().get_or_create_cart_order(
+                user=self.user, prefetch_ordered_products=False)
+            stored = {
+                ord_prod.product_id: ord_prod
+                for ord_prod in order.orderedproduct_set.only(
+                    "pk", "order_id", "product_id", "count")
+            }
+
+            to_delete = []
+            if remove_missing:
+                to_delete = [
+                    ord_prod.pk for product_id, ord_prod in stored.items()
+                    if product_id not in items
+                ]
+            to_update = []
+            to_create = []
+            for product_id, quantity in items.items():
+                ord_prod = stored.get(product_id)
+                if ord_prod is None:
+                    to_create.append(models.OrderedProduct(
+                        order=order, product_id=product_id, count=quantity))
+                elif ord_prod.count != quantity:
+                    ord_prod.count = quantity
+                    to_update.append(ord_prod)
+
+            if to_delete:
+                models.OrderedProduct.objects.filter(pk__in=to_delete).delete()
+            if to_update:
+                models.OrderedProduct.objects.bulk_update(
+                    to_update, fields=["count"])
+            if to_create:
+                models.OrderedProduct.objects.bulk_create(to_create)
+
+
+def get_cart_store(request: drf_request.Request) -> CartStore:
+    """
+    Choose storage of Cart depending on User auth.
+
+    :param request: request with session (and user).
+    :return: DBCartStore for authenticated users, otherwise
+        CART_ANONYMOUS_STORE.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return DBCartStore(request)
+    store_class = import_string(settings.CART_ANONYMOUS_STORE)
+    return store_class(request)
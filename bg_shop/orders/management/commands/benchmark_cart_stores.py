@@ -0,0 +1,100 @@
+"""Compares speed of Cart storages (see orders.cart_stores)."""
+
+import random
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from orders import cart_stores, models, services
+from shop import models as shop_models
+
+User = get_user_model()
+
+BENCHMARK_USERNAME = "cart_store_benchmark"
+
+
+class Command(BaseCommand):
+    help = "Measures add/remove operations of CartService " \
+           "with every CartStore backend."
+
+    stores = {
+        "session": cart_stores.SessionCartStore,
+        "cache": cart_stores.CacheCartStore,
+        "db": cart_stores.DBCartStore,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-n", "--operations",
+            type=int,
+            default=500,
+            help="Number of cart operations for every backend.",
+        )
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=20,
+            help="Number of different products put to the cart.",
+        )
+
+    def handle(self, *args, **options):
+        product_ids = list(
+            shop_models.Product.objects
+            .values_list("pk", flat=True)[:options["products"]])
+        if not product_ids:
+            raise CommandError("There are no products in db.")
+        user = User.objects.create_user(username=BENCHMARK_USERNAME)
+        try:
+            for name, store_class in self.stores.items():
+                elapsed = self.run_operations(
+                    store_class=store_class,
+                    user=user,
+                    product_ids=product_ids,
+                    operations=options["operations"],
+                )
+                per_operation = elapsed / options["operations"] * 1000
+                self.stdout.write(
+                    f"{name:<10} {elapsed:8.3f} s total, "
+                    f"{per_operation:8.3f} ms per operation")
+        finally:
+            models.Order.objects.filter(user=user).delete()
+            user.delete()
+
+    def run_operations(
+            self,
+            store_class: type[cart_stores.CartStore],
+            user,
+            product_ids: list[int],
+            operations: int,
+    ) -> float:
+        """
+        Imitates requests to CartApi: every operation loads session,
+        changes the cart and saves session if it is modified
+        (as SessionMiddleware does).
+        :return: elapsed time in seconds
+        """
+        session_store = import_module(settings.SESSION_ENGINE).SessionStore
+        session = session_store()
+        session.save()
+        factory = RequestFactory()
+        rand = random.Random(0)
+        started = time.perf_counter()
+        for _ in range(operations):
+            request = factory.post("/")
+            request.session = session_store(session.session_key)
+            request.user = user if store_class is cart_stores.DBCartStore \
+                else AnonymousUser()
+            service = services.CartService(request=request)
+            service.store = store_class(request=request)
+            quantity = rand.choice([1, 1, 2, -1])
+            service.update_items(changes={rand.choice(product_ids): quantity})
+            if request.session.modified:
+                request.session.save()
+        elapsed = time.perf_counter() - started
+        session.delete()
+        return elapsed
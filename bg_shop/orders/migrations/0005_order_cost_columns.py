@@ -0,0 +1,95 @@
+# Generated by Django 4.2 on 2026-10-18 14:08
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def forwards_func(apps, schema_editor):
+    """
+    Fill costs of confirmed Orders (all statuses except cart and editing).
+    Delivery settings of the moment of confirmation are unknown,
+    current ones are used.
+    """
+    Order = apps.get_model("orders", "Order")
+    OrderedProduct = apps.get_model("orders", "OrderedProduct")
+    DynamicConfig = apps.get_model("dynamic_config", "DynamicConfig")
+    db_alias = schema_editor.connection.alias
+
+    config = DynamicConfig.objects.using(db_alias).filter(pk=1).first()
+    if config is not None:
+        boundary = config.boundary_of_free_delivery
+        ordinary_cost = config.ordinary_delivery_cost
+        express_charge = config.express_delivery_extra_charge
+    else:
+        boundary = settings.BOUNDARY_OF_FREE_DELIVERY
+        ordinary_cost = settings.ORDINARY_DELIVERY_COST
+        express_charge = settings.EXPRESS_DELIVERY_EXTRA_CHARGE
+
+    cost_field = models.DecimalField(max_digits=12, decimal_places=2)
+    zero = models.Value(Decimal(0), output_field=cost_field)
+    orders = Order.objects.using(db_alias) \
+        .exclude(status__in=("CT", "ED")) \
+        .filter(total_cost__isnull=True)
+    items_total = OrderedProduct.objects \
+        .filter(order=models.OuterRef("pk")) \
+        .values("order") \
+        .annotate(value=models.Sum(
+            models.F("price") * models.F("count"), output_field=cost_field)) \
+        .values("value")
+    orders.update(
+        items_total=Coalesce(
+            models.Subquery(items_total), zero, output_field=cost_field))
+
+    ordinary = models.Case(
+        models.When(
+            items_total__lt=boundary,
+            then=models.Value(Decimal(ordinary_cost)),
+        ),
+        default=zero,
+        output_field=cost_field,
+    ) if boundary is not None else zero
+    express = models.Case(
+        models.When(
+            delivery_type="EX",
+            then=models.Value(Decimal(express_charge or 0)),
+        ),
+        default=zero,
+        output_field=cost_field,
+    )
+    orders.update(delivery_cost=ordinary + express)
+    orders.update(
+        total_cost=models.F("items_total") + models.F("delivery_cost"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_user_created_index'),
+        ('dynamic_config', '0003_alter_dynamicconfig_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='delivery_cost',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True, verbose_name='delivery cost'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='items_total',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True, verbose_name='items total'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_cost',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True, verbose_name='total cost'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+        ),
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
@@ -9,6 +9,20 @@ class Order(models.Model):
     class Meta:
         verbose_name = _("order")
         verbose_name_plural = _("orders")
+        indexes = [
+            # order history of user is paginated by (created_at, pk)
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="order_user_created_idx",
+            ),
+            # revenue by period, e.g. sum of total_cost of completed orders
+            models.Index(
+                fields=["status", "created_at"],
+                name="order_status_created_idx",
+            ),
+            # date hierarchy of admin
+            models.Index(fields=["created_at"], name="order_created_idx"),
+        ]
 
     class DeliveryTypes(models.TextChoices):
         ORDINARY = "OR", _("ordinary")
@@ -80,6 +94,33 @@ class Order(models.Model):
         default=PaymentTypes.ONLINE,
         verbose_name=_("payment_type"),
     )
+    # Costs at the moment of confirmation (see OrderService.confirm),
+    # they don't change when prices or delivery settings are changed.
+    # NULL while Order is not confirmed.
+    items_total = models.DecimalField(
+        null=True,
+        blank=True,
+        max_digits=12,
+        decimal_places=2,
+        editable=False,
+        verbose_name=_("items total"),
+    )
+    delivery_cost = models.DecimalField(
+        null=True,
+        blank=True,
+        max_digits=12,
+        decimal_places=2,
+        editable=False,
+        verbose_name=_("delivery cost"),
+    )
+    total_cost = models.DecimalField(
+        null=True,
+        blank=True,
+        max_digits=12,
+        decimal_places=2,
+        editable=False,
+        verbose_name=_("total cost"),
+    )
 
 
 class OrderedProduct(models.Model):
@@ -1,80 +1,79 @@
 """To get data about Cart (basket) from anywhere."""
 
-from typing import TypeVar
-
-from django.contrib.auth.models import AbstractUser
-from django.conf import settings
-from django.db import models as db_models
+from typing import Optional
 
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
 from rest_framework import request as drf_request
 
-from orders import models
+from orders import cart_stores
 from shop import models as shop_models
 
-UserType = TypeVar('UserType', bound=AbstractUser)
-
 
 class CartSelector:
-    """Depending on User interacts with sessions or with db Order model."""
+    """Depending on User interacts with CartStore or with db Order model."""
 
     def __init__(self, request: drf_request.Request) -> None:
         """
-        Create cart in session.
+        Choose storage of the Cart.
 
         :param request:
         """
         self.request = request
-        self.session = request.session
-        cart = request.session.get(settings.CART_SESSION_ID)
-        if not cart:
-            cart = self.session[settings.CART_SESSION_ID] = {}
-        self.cart = cart
+        self.store = cart_stores.get_cart_store(request=request)
 
-    def get_cart(self) -> list[shop_models.Product]:
+    def get_cart(
+            self,
+            items: Optional[dict[int, int]] = None,
+    ) -> list[shop_models.Product]:
         """
-        Get user's cart from session (if anonymous) or from Order obj.
-
-        Prefetches a lot of related objects for serializer.
-
-        Annotates `quantity_ordered` for every product, if cart is Order.
-        If it isn't adds field `quantity_ordered` to every Product in list,
-        after that output must be passed to serializer directly without
-        any other changes.
-        :return:
+        Get user's Products from Cart.
+
+        Prefetches related objects for serializer and adds attribute
+        `quantity_ordered` to every Product in list, after that output must
+        be passed to serializer directly without any other changes.
+        :param items: {product_id: quantity} if Cart is already loaded
+            (e.g. returned by CartService), otherwise loads it from CartStore
+        :return: list of Products
         """
-        user: UserType = self.request.user
-        if user.is_anonymous:
-            cart_products = shop_models.Product.objects\
-                .filter(id__in=self.cart.keys())
-
-        else:
-            cart_products = shop_models.Product.objects\
-                .filter(
-                    orderedproduct__order__user=user,
-                    orderedproduct__order__status=models.Order.Statuses.CART
-                )\
-                .annotate(
-                    quantity_ordered=db_models.Subquery(
-                        models.OrderedProduct.objects.filter(
-                            product=db_models.OuterRef("pk"),
-                            order__user=user,
-                            order__status=models.Order.Statuses.CART
-                        )
-                        .values("count")
-                    )
-                )
-
-        cart_products = cart_products.prefetch_related("tags")\
-            .prefetch_related("images")\
-            .prefetch_related("review_set")\
-            .prefetch_related("orderedproduct_set")\
-            .prefetch_related("sale_set")
-
-        cart_products = list(cart_products)
-
+        if items is None:
+            items = self.store.load()
+        if not items:
+            return []
+        cart_products = list(self._get_products(items))
+        return self._set_quantities(cart_products, items)
+
+    async def aget_cart(
+            self,
+            items: Optional[dict[int, int]] = None,
+    ) -> list[shop_models.Product]:
+        """Async version of get_cart()."""
+        if items is None:
+            # session or Order with CART status
+            items = await sync_to_async(self.store.load)()
+        if not items:
+            return []
+        cart_products = [
+            product async for product in self._get_products(items)]
+        return self._set_quantities(cart_products, items)
+
+    @staticmethod
+    def _get_products(
+            items: dict[int, int],
+    ) -> QuerySet[shop_models.Product]:
+        """Products of Cart with related objects for serializer."""
+        return shop_models.Product.objects \
+            .filter(id__in=items.keys()) \
+            .prefetch_related("tags") \
+            .prefetch_related("images")
+
+    @staticmethod
+    def _set_quantities(
+            cart_products: list[shop_models.Product],
+            items: dict[int, int],
+    ) -> list[shop_models.Product]:
+        """Adds `quantity_ordered` to every Product."""
         # looks like `annotate` but in is not the same
-        if user.is_anonymous:
-            for product in cart_products:
-                product.quantity_ordered = self.cart[str(product.id)]
-
+        for product in cart_products:
+            product.quantity_ordered = items[product.pk]
         return cart_products
@@ -5,6 +5,7 @@ from typing import TypeVar, Optional
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models as db_models
+from django.db.models.functions import Coalesce
 from django import http
 
 from orders import models, services
@@ -98,57 +99,113 @@ class OrderSelector:
             orders = orders.exclude(status=models.Order.Statuses.CART)
         return orders
 
-    def get_order_history(
+    def get_order_summaries(
             self,
             user: UserType,
-            order_by_date: bool = True,
     ) -> db_models.QuerySet[models.Order]:
         """
-        Get all active Orders related to user for api response.
+        Get active Orders of user for order history, without related objects.
 
-        Prefetches related objects.
+        Number of items and costs are calculated by db, so only one
+        query is needed for a page of Orders. Confirmed Orders have
+        saved costs, costs of other ones are calculated by the same
+        rules as calculate_costs().
         :param user: User obj.
-        :param order_by_date: if True, sorts Orders by created_at descending.
-        :return: queryset of Orders (prefetched: orderedproduct_set',
-            'product', 'sale_set', 'images', 'review_set', 'user', 'profile'.).
+        :return: queryset of Orders sorted by created_at descending,
+            annotated with `item_count`, `order_items_total`,
+            `order_delivery_cost`, `order_total_cost`.
         """
-        orders = self.get_orders_of_user(user=user)
-        if order_by_date:
-            orders = orders.order_by('-created_at')
-        orders = self._prefetch_data(
-            orders_qs=orders,
-            with_user_profile=True,
-            with_images_and_reviews=True
-        )
+        ordered_products = models.OrderedProduct.objects \
+            .filter(order=db_models.OuterRef("pk")) \
+            .values("order")
+        cost_field = db_models.DecimalField(max_digits=12, decimal_places=2)
+        conf_selector = dynamic_selectors.DynamicConfigSelector()
+        orders = self.get_orders_of_user(user=user) \
+            .annotate(
+                item_count=Coalesce(
+                    db_models.Subquery(
+                        ordered_products
+                        .annotate(value=db_models.Sum("count"))
+                        .values("value")
+                    ),
+                    0,
+                ),
+                order_items_total=Coalesce(
+                    "items_total",
+                    db_models.Subquery(
+                        ordered_products
+                        .annotate(value=db_models.Sum(
+                            db_models.F("price") * db_models.F("count"),
+                            output_field=cost_field,
+                        ))
+                        .values("value")
+                    ),
+                    db_models.Value(Decimal(0)),
+                    output_field=cost_field,
+                ),
+            ) \
+            .annotate(
+                order_delivery_cost=Coalesce(
+                    "delivery_cost",
+                    db_models.Case(
+                        db_models.When(
+                            order_items_total__lt=conf_selector
+                            .boundary_of_free_delivery,
+                            then=db_models.Value(
+                                conf_selector.ordinary_delivery_cost),
+                        ),
+                        default=db_models.Value(Decimal(0)),
+                        output_field=cost_field,
+                    )
+                    + db_models.Case(
+                        db_models.When(
+                            delivery_type=models.Order.DeliveryTypes.EXPRESS,
+                            then=db_models.Value(
+                                conf_selector.express_delivery_extra_charge),
+                        ),
+                        default=db_models.Value(Decimal(0)),
+                        output_field=cost_field,
+                    ),
+                    output_field=cost_field,
+                ),
+            ) \
+            .annotate(
+                order_total_cost=Coalesce(
+                    "total_cost",
+                    db_models.F("order_items_total")
+                    + db_models.F("order_delivery_cost"),
+                    output_field=cost_field,
+                ),
+            ) \
+            .order_by("-created_at", "-pk")
         return orders
 
     def _prefetch_data(
             self,
             orders_qs: db_models.QuerySet[models.Order],
-            with_images_and_reviews: bool = False,
+            with_images: bool = False,
             with_user_profile: bool = False,
     ) -> db_models.QuerySet[models.Order]:
         """
         Prefetch related data.
 
         Does prefetch_related for 'orderedproduct_set'
-        and 'product' related with them, also 'sale_set' of each product.
-        Optionally, also prefetches 'images', 'review_set' related with product
+        and 'product' related with them.
+        Sales are not prefetched, use shop PriceSelector to get prices.
+        Optionally, also prefetches 'images' related with product
         and 'user' and 'profile' related with Order.
+        Reviews are not prefetched, rating is stored in Product.
         :param orders_qs: queryset of Orders
-        :param with_images_and_reviews: if True, prefetches 'product__images'
-            and 'product__review_set'.
+        :param with_images: if True, prefetches 'product__images'.
         :param with_user_profile: if True, deos select_related 'user__profile'.
         :return: queryset of Orders (prefetched: orderedproduct_set',
-            'product', 'sale_set', 'images', 'review_set', 'user', 'profile'.).
+            'product', 'images', 'user', 'profile'.).
         """
         ordered_products_prefetch_qs = models.OrderedProduct.objects \
-            .select_related('product') \
-            .prefetch_related("product__sale_set")
-        if with_images_and_reviews:
+            .select_related('product')
+        if with_images:
             ordered_products_prefetch_qs = ordered_products_prefetch_qs \
-                .prefetch_related("product__images") \
-                .prefetch_related("product__review_set")
+                .prefetch_related("product__images")
 
         orders_qs = orders_qs \
             .prefetch_related(
@@ -173,14 +230,14 @@ class OrderSelector:
         :param order_id: pk.
         :param user: User obj.
         :return: Order (prefetched: orderedproduct_set',
-            'product', 'sale_set', 'images', 'review_set', 'user', 'profile'.)
+            'product', 'images', 'user', 'profile'.)
             or None (if not found).
         """
         orders = self.get_orders_of_user(user=user)
         orders = self._prefetch_data(
             orders_qs=orders,
             with_user_profile=True,
-            with_images_and_reviews=True,
+            with_images=True,
         )
         try:
             order = orders.get(pk=order_id)
@@ -217,7 +274,7 @@ class OrderSelector:
         :param user: User obj.
         :param or_404: if True, raise Http404 when the Order not found.
         :return: Order (prefetched: orderedproduct_set',
-            'product', 'sale_set'.)
+            'product'.)
             or None (if not found).
         """
         orders = self.get_orders_of_user(user=user)
@@ -235,33 +292,58 @@ class OrderSelector:
                 order = None
         return order
 
+    def calculate_costs(self, order: models.Order) -> dict[str, Decimal]:
+        """
+        Calculate costs of Order from ordered products and current
+        DynamicConfig (saved costs are ignored).
+
+        Used by OrderService.confirm() to save costs.
+        :param order: Order (orderedproduct_set can be prefetched).
+        :return: {"items_total", "delivery_cost", "total_cost"}
+        """
+        items_total = self._sum_ordered_products(order=order)
+        delivery_cost = self.get_delivery_cost(
+            main_cost=items_total,
+            is_express=(
+                order.delivery_type == models.Order.DeliveryTypes.EXPRESS),
+        )
+        return {
+            "items_total": items_total,
+            "delivery_cost": delivery_cost,
+            "total_cost": items_total + delivery_cost,
+        }
+
     def get_total_cost(self, order: models.Order) -> Decimal:
         """
-        Calculate total cost of Order.
+        Get total cost of Order.
 
         Main total cost - cost of all ordered products (
             taking into account discounts),
         Delivery cost - depends on DynamicConfig.
+        Saved cost is used for confirmed Orders.
         :param order: Order.
         :return: price of entire order.
         """
-        main_cost = self.get_order_main_cost(order=order)
-        is_express = order.delivery_type == models.Order.DeliveryTypes.EXPRESS
-        delivery_cost = self.get_delivery_cost(
-            main_cost=main_cost,
-            is_express=is_express
-        )
-        total_cost = main_cost + delivery_cost
-        return total_cost
+        if order.total_cost is not None:
+            return order.total_cost
+        return self.calculate_costs(order=order)["total_cost"]
 
     def get_order_main_cost(self, order: models.Order) -> Decimal:
         """
-        Calculate cost of ordered products.
+        Get cost of ordered products.
 
         Taking into account discounts.
+        Saved cost is used for confirmed Orders.
         :param order: Order.
         :return: sum of all prices of ordered items.
         """
+        if order.items_total is not None:
+            return order.items_total
+        return self._sum_ordered_products(order=order)
+
+    @staticmethod
+    def _sum_ordered_products(order: models.Order) -> Decimal:
+        """Sum of price * count of ordered products of Order."""
         cost = Decimal()
         for ordered_prod in order.orderedproduct_set.all():
             cost += ordered_prod.price * ordered_prod.count
@@ -282,7 +364,8 @@ class OrderSelector:
         :param is_express: should be passed with `main_cost`,
             if `order` is None.
         :param order: Order obj.
-            If `order` arg is passed, finds other args values from passed obj.
+            If `order` arg is passed, finds other args values from passed obj
+            (or returns saved cost of confirmed Order).
         :return: cost of delivery.
         """
         if order and ((is_express is not None) or (main_cost is not None)):
@@ -294,6 +377,8 @@ class OrderSelector:
                 "If 'order' arg is not passed, "
                 "both 'is_express' and 'main_cost' args are required."
             )
+        if order and order.delivery_cost is not None:
+            return order.delivery_cost
         if order:
             is_express = (
                 order.delivery_type == models.Order.DeliveryTypes.EXPRESS
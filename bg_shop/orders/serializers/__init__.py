@@ -1,5 +1,8 @@
 from orders.serializers.cart_serializer import CartSerializer
-from orders.serializers.order_serializer import OrderOutputSerializer
+from orders.serializers.order_serializer import (
+    OrderOutputSerializer,
+    OrderSummarySerializer,
+)
 from orders.serializers.ordered_product_serializer import (
     OrderedProductOutputSerializer,
     OrderedProductInputSerializer,
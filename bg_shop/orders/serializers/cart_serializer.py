@@ -3,18 +3,20 @@
 from decimal import Decimal
 from typing import Optional
 
-from django.db import models as db_models
 from django.utils import timezone
 
 from rest_framework import serializers
 
 from common import serializers as common_serializers
 from shop import models as shop_models
-from shop import selectors as shop_selectors
+from shop import serializers as shop_serializers
 from dynamic_config import selectors as conf_selectors
 
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(
+        shop_serializers.DiscountedPriceMixin,
+        serializers.ModelSerializer,
+):
     """
     Based on Product obj.
 
@@ -65,12 +67,7 @@ class CartSerializer(serializers.ModelSerializer):
         :param obj: Product.
         :return: discounted price.
         """
-        discounted_price = shop_selectors.ProductSelector()\
-            .get_discounted_price(
-                product=obj,
-                date=self.today,
-        )
-        return discounted_price
+        return self.get_discounted_price(product=obj, date=self.today)
 
     def get_count(self, obj: shop_models.Product) -> int:
         """
@@ -99,8 +96,7 @@ class CartSerializer(serializers.ModelSerializer):
         :param obj:
         :return:
         """
-        if hasattr(obj, 'review_set'):
-            return obj.review_set.count()
+        return obj.review_count
 
     def get_rating(self, obj: shop_models.Product) -> Optional[float]:
         """
@@ -110,10 +106,7 @@ class CartSerializer(serializers.ModelSerializer):
         :return: average rate, rounded to two decimal places
             or None, if there is no reviews.
         """
-        if hasattr(obj, 'review_set'):
-            avg_rating = obj.review_set \
-                .aggregate(db_models.Avg('rate')).get("rate__avg", None)
-            if avg_rating is not None:
-                return round(avg_rating, 2)
-            else:
-                return None
+        if obj.rating_avg is not None:
+            return round(obj.rating_avg, 2)
+        else:
+            return None
@@ -18,8 +18,6 @@ class OrderOutputSerializer(drf_serializers.ModelSerializer):
         - orderedproduct_set
             - product (select_related)
                 - images
-                - review_set
-                - sale_set
         - user (select_related)
             - profile (select_related)
     (e.g qs_orders.prefetch_related(
@@ -86,3 +84,42 @@ class OrderOutputSerializer(drf_serializers.ModelSerializer):
         :return: delivery cost.
         """
         return selectors.OrderSelector().get_delivery_cost(order=obj)
+
+
+class OrderSummarySerializer(drf_serializers.ModelSerializer):
+    """
+    Short representation of Order for order history, without products.
+
+    Orders should be annotated by OrderSelector.get_order_summaries().
+    """
+
+    class Meta:
+        model = models.Order
+        fields = (
+            "id",
+            "createdAt",
+            "deliveryType",
+            "status",
+            "paid",
+            "paymentType",
+            "itemCount",
+            "deliveryCost",
+            "totalCost",
+        )
+
+    createdAt = drf_serializers.DateTimeField(source="created_at")
+    deliveryType = drf_serializers.CharField(source="delivery_type")
+    paymentType = drf_serializers.CharField(source="payment_type")
+    itemCount = drf_serializers.IntegerField(source="item_count")
+    deliveryCost = drf_serializers.DecimalField(
+        source="order_delivery_cost",
+        max_digits=12,
+        decimal_places=2,
+        coerce_to_string=False,
+    )
+    totalCost = drf_serializers.DecimalField(
+        source="order_total_cost",
+        max_digits=12,
+        decimal_places=2,
+        coerce_to_string=False,
+    )
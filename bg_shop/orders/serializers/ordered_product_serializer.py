@@ -2,8 +2,6 @@
 
 from typing import Optional
 
-from django.db import models as db_models
-
 from rest_framework import serializers as drf_serializers
 
 from common import serializers as common_serializers
@@ -21,8 +19,6 @@ class OrderedProductOutputSerializer(drf_serializers.ModelSerializer):
     Following fields should be prefetched:
         - product (select_related)
         - images
-        - review_set
-        - sale_set
     """
 
     class TagSerializer(drf_serializers.Serializer):
@@ -87,8 +83,7 @@ class OrderedProductOutputSerializer(drf_serializers.ModelSerializer):
         :param obj:
         :return:
         """
-        if hasattr(obj.product, 'review_set'):
-            return obj.product.review_set.count()
+        return obj.product.review_count
 
     def get_rating(self, obj: models.OrderedProduct) -> Optional[float]:
         """
@@ -98,13 +93,10 @@ class OrderedProductOutputSerializer(drf_serializers.ModelSerializer):
         :return: average rate, rounded to two decimal places
             or None, if there is no reviews.
         """
-        if hasattr(obj.product, 'review_set'):
-            avg_rating = obj.product.review_set \
-                .aggregate(db_models.Avg('rate')).get("rate__avg", None)
-            if avg_rating is not None:
-                return round(avg_rating, 2)
-            else:
-                return None
+        if obj.product.rating_avg is not None:
+            return round(obj.product.rating_avg, 2)
+        else:
+            return None
 
 
 class OrderedProductInputSerializer(drf_serializers.Serializer):
@@ -1,172 +1,121 @@
-"""Business logic related to Cart (Order.status = Cart, or session.cart)."""
+"""Business logic related to Cart (Order.status = Cart, or CartStore)."""
 
 from django.contrib.auth import get_user_model
-from django.conf import settings
 
 from rest_framework import request as drf_request
 
-from orders import models, services, selectors
+from orders import cart_stores
 from shop import selectors as shop_selectors
 
 User = get_user_model()
 
 
 class CartService:
-    """Business logic related to Cart."""
+    """
+    Business logic related to Cart.
+
+    Cart is loaded from CartStore as {product_id: quantity},
+    changed in memory and saved back by one operation.
+    """
 
     def __init__(self, request: drf_request.Request) -> None:
-        """Save request and session for further use."""
+        """Save request and choose storage of the Cart."""
         self.request = request
-        self.session = request.session
-        cart = request.session.get(settings.CART_SESSION_ID)
-        if not cart:
-            cart = self.session[settings.CART_SESSION_ID] = {}
-        self.cart = cart
+        self.store = cart_stores.get_cart_store(request=request)
+
+    def get_items(self) -> dict[int, int]:
+        """
+        Get content of the Cart.
 
-    def save_session(self) -> None:
-        """Cause session saving."""
-        self.session.modified = True
+        :return: {product_id: quantity}
+        """
+        return self.store.load()
 
     def add(
             self,
             product_id: int,
             quantity: int = 1,
             override_quantity: bool = False,
-    ) -> None:
+    ) -> dict[int, int]:
         """
         Add Product to Cart.
 
-        Depending on User auth, uses session or Order obj.
+        Depending on User auth, uses session (or other CartStore)
+        or Order obj.
         :param product_id: Product.pk
         :param quantity: amount of items to add
         :param override_quantity: If True, replace previous quantity by new one
-        :return:
+        :return: Cart after changes {product_id: quantity}
         """
         is_available = shop_selectors.ProductSelector() \
             .is_available(product_id=product_id)
         if not is_available:
             raise ValueError("Product is unavailable.")
-        if self.request.user.is_anonymous:
-            self._add_to_session(product_id, quantity, override_quantity)
-        else:
-            self._add_to_order(product_id, quantity, override_quantity)
-
-    def _add_to_session(
-            self,
-            product_id: int,
-            quantity: int = 1,
-            override_quantity: bool = False,
-    ) -> None:
-        """
-        Add product to cart stored in session.
-
-        :param product_id: Product.pk
-        :param quantity: amount of items to add
-        :param override_quantity: If True, replace previous quantity by new one
-        :return:
-        """
-        product_id_key = str(product_id)
-        if product_id_key not in self.cart:
-            self.cart[product_id_key] = 0
-        if override_quantity:
-            self.cart[product_id_key] = quantity
-        else:
-            self.cart[product_id_key] += quantity
-        self.save_session()
-
-    def _add_to_order(
-            self,
-            product_id: int,
-            quantity: int = 1,
-            override_quantity: bool = False,
-    ) -> None:
-        """
-        Add product to cart stored in Order.
-
-        :param product_id: Product.pk
-        :param quantity: amount of items to add
-        :param override_quantity: If True, replace previous quantity by new one
-        :return:
-        """
-        cart_order: models.Order = selectors.OrderSelector() \
-            .get_or_create_cart_order(user=self.request.user)
-        service = services.OrderedProductService()
-        service.add_item(
-            order=cart_order,
-            product_id=product_id,
-            quantity=quantity,
-            override_quantity=override_quantity
+        return self.update_items(
+            changes={product_id: quantity},
+            override_quantity=override_quantity,
         )
 
-    def remove(self, product_id: int, quantity: int = 1) -> None:
+    def remove(self, product_id: int, quantity: int = 1) -> dict[int, int]:
         """
         Subtract items from cart.
 
+        If there are less items than `quantity`, removes Product from Cart.
         :param product_id: Product.pk
         :param quantity: amount to subtract.
-        :return: None
-        """
-        if self.request.user.is_anonymous:
-            self._remove_from_session(product_id, quantity)
-        else:
-            self._remove_from_order(product_id, quantity)
-
-    def _remove_from_session(
-            self,
-            product_id: int,
-            quantity: int = 1,
-    ) -> None:
+        :return: Cart after changes {product_id: quantity}
         """
-        Subtract items from cart stored in session.
+        return self.update_items(changes={product_id: -quantity})
 
-        :param product_id: Product.pk
-        :param quantity: amount to subtract.
-        :return: None
-        """
-        product_id_key = str(product_id)
-        if product_id_key in self.cart:
-            self.cart[product_id_key] -= quantity
-            if self.cart[product_id_key] <= 0:
-                del self.cart[product_id_key]
-        self.save_session()
-
-    def _remove_from_order(
+    def update_items(
             self,
-            product_id: int,
-            quantity: int = 1,
-    ) -> None:
+            changes: dict[int, int],
+            override_quantity: bool = False,
+    ) -> dict[int, int]:
         """
-        Subtract items from cart stored in Order.
+        Apply several changes to Cart and save it by one operation.
 
-        :param product_id: Product.pk
-        :param quantity: amount to subtract.
-        :return: None
+        :param changes: {product_id: quantity to add (or subtract if < 0)}
+        :param override_quantity: If True, replace previous quantities
+            by new ones
+        :return: Cart after changes {product_id: quantity}
         """
-        cart_order = selectors.OrderSelector() \
-            .get_or_create_cart_order(user=self.request.user)
-        ord_prod_service = services.OrderedProductService()
-        try:
-            ord_prod_service.reduce_or_delete(
-                order=cart_order,
-                product_id=product_id,
-                quantity=quantity,
-            )
-        except models.OrderedProduct.DoesNotExist:
-            return None
-
-    def merge_carts(self, session_cart: dict[str, int]) -> None:
+        items = self.store.load()
+        for product_id, quantity in changes.items():
+            if not override_quantity:
+                quantity += items.get(product_id, 0)
+            if quantity > 0:
+                items[product_id] = quantity
+            else:
+                items.pop(product_id, None)
+        self.store.save(items)
+        return items
+
+    def merge_carts(self, session_cart: dict[int | str, int]) -> None:
         """
         Transfers cart items from session to Order.
 
         It is used for saving cart when user is logging in.
-        :param session_cart: dict{'product_id': quantity: int,}
+        Quantities from session replace quantities in Order,
+        unavailable Products are skipped. Availability is checked
+        for all Products by one query, and the Cart is written
+        by one batch in one transaction (see DBCartStore.merge).
+        :param session_cart: dict{product_id: quantity: int,}
             to merge with users cart stored into Order
         :return: None
         """
-        for product_id, quantity in session_cart.items():
-            product_id = int(product_id)
-            self._add_to_order(
-                product_id=product_id,
-                quantity=quantity,
-                override_quantity=True,
-            )
+        items = {
+            int(product_id): quantity
+            for product_id, quantity in session_cart.items()
+            if quantity > 0
+        }
+        if not items:
+            return
+        available = shop_selectors.ProductSelector() \
+            .get_available_ids(product_ids=items.keys())
+        items = {
+            product_id: quantity for product_id, quantity in items.items()
+            if product_id in available
+        }
+        if items:
+            cart_stores.DBCartStore(self.request).merge(items)
@@ -2,11 +2,11 @@
 
 from typing import Optional, TypeVar, Any
 
-from django.db import models as db_models
 from django.db import transaction
 from django.contrib.auth.models import AbstractUser
 
 from orders import models, selectors
+from shop import selectors as shop_selectors
 
 import orders.services.ordered_product_services as ord_prod_services
 
@@ -95,28 +95,18 @@ class OrderService:
         """
         Update OrderedProducts related to the Order.
 
-        After this method OrderedProduct and `products` will match each other.
+        After this method OrderedProduct and `products` will match each other,
+        the difference is applied by batch
+        (see OrderedProductService.reconcile).
         :param order: Order obj.
         :param products: information about Products related to OrderedProducts
             (main info is: id, count)
         :return: None
         """
-        ordered_product_service = ord_prod_services.OrderedProductService()
-        simple_products = self._simplify_products(products=products)
-        ordered_products: db_models.QuerySet[models.OrderedProduct] = \
-            order.orderedproduct_set.all().select_related("product") \
-                .prefetch_related("product__sale_set")
-        for ord_prod in ordered_products:
-            if ord_prod.product_id not in simple_products:
-                ord_prod.delete()
-            else:
-                ordered_product_service.refresh_price_from_product(ord_prod, commit=False)
-                ord_prod.count = simple_products.pop(ord_prod.product_id)
-                ord_prod.full_clean()
-                ord_prod.save()
-        for product_id, count in simple_products.items():
-            ordered_product_service.create_ordered_product(
-                order=order, product_id=product_id, quantity=count)
+        ord_prod_services.OrderedProductService().reconcile(
+            order=order,
+            quantities=self._simplify_products(products=products),
+        )
 
     def _simplify_products(self, products: list[dict]) -> dict[int, int]:
         """
@@ -139,8 +129,9 @@ class OrderService:
         """
         Confirm Order.
 
-        Updates Order data, deduct product items, update price of
-        ordered products, and sets Order.status = ACCEPTED.
+        Updates Order data, deduct product items, count them as sold,
+        update price of ordered products, saves costs of Order
+        and sets Order.status = ACCEPTED.
         :param order_id: Order.pk
         :param user: User obj.
         :param order_data: {field: value,}
@@ -160,10 +151,21 @@ class OrderService:
             ordered_products = order.orderedproduct_set.all()
             ordered_product_service.deduct_amount_from_product(
                 ord_prod_qs=ordered_products)
+            ordered_product_service.add_to_product_sales(
+                ord_prod_qs=ordered_products)
+            price_selector = shop_selectors.PriceSelector(
+                products=[ord_prod.product for ord_prod in ordered_products])
             for ord_prod in ordered_products:
                 ordered_product_service.refresh_price_from_product(
-                    ordered_product=ord_prod, commit=True)
-
+                    ordered_product=ord_prod,
+                    commit=True,
+                    price_selector=price_selector,
+                )
+
+            # costs are saved once, they don't depend on later changes
+            # of prices and delivery settings
+            for field, value in selector.calculate_costs(order=order).items():
+                setattr(order, field, value)
             order.status = order.Statuses.ACCEPTED
             order.full_clean()
             order.save()
@@ -193,15 +195,18 @@ class OrderService:
 
         If payment operation is not successful.
         Roll back deduction of products that were reserved
-        when order was confirmed.
+        when order was confirmed, and remove them from sales counters.
         :param order_id:
         :return:
         """
         order = models.Order.objects.get(pk=order_id)
 
         with transaction.atomic():
-            order.status = models.Order.Statuses.REJECTED
             ord_prod_service = ord_prod_services.OrderedProductService()
+            if order.status in ord_prod_service.SOLD_STATUSES:
+                ord_prod_service.subtract_from_product_sales(
+                    ord_prod_qs=order.orderedproduct_set.all())
+            order.status = models.Order.Statuses.REJECTED
             ord_prod_service.return_ordered_products(
                 ord_prod_qs=order.orderedproduct_set.all()
             )
@@ -1,9 +1,24 @@
 """Business logic related to OrderedProduct."""
 
+from typing import Iterable, Optional
+
+from django.core.exceptions import ValidationError
 from django.db import models as db_models
 from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
 
-from orders import models, selectors
+from orders import models
 from shop import models as shop_models
 from shop import selectors as shop_selectors
 
@@ -11,112 +26,92 @@ from shop import selectors as shop_selectors
 class OrderedProductService:
     """Business logic related to OrderedProduct."""
 
-    def create_ordered_product(
-            self,
-            order: models.Order,
-            product_id: int,
-            quantity: int,
-            commit: bool = True,
-    ) -> models.OrderedProduct:
-        """
-        Create new OrderedProduct.
-
-        New OrderedProduct has actual price.
-        :param order: Order obj.
-        :param product_id: Product.pk
-        :param quantity: amount of Product items.
-        :param commit: if True, full_clean() and save().
-        :return: None.
-        """
-        ordered_product = models.OrderedProduct(
-            order=order,
-            product_id=product_id,
-            count=quantity
-        )
-        self.refresh_price_from_product(ordered_product=ordered_product, commit=False)
-        if commit:
-            ordered_product.full_clean()
-            ordered_product.save()
-        return ordered_product
+    # Orders with these statuses are counted in Product.units_sold
+    SOLD_STATUSES = (
+        models.Order.Statuses.ACCEPTED,
+        models.Order.Statuses.COMPLETED,
+    )
 
-    def add_item(
+    def reconcile(
             self,
             order: models.Order,
-            product_id: int,
-            quantity: int,
-            override_quantity: bool = False,
+            quantities: dict[int, int],
     ) -> None:
         """
-        Increase `count` of OrderedProduct or overrides it.
+        Make OrderedProducts of the Order match passed quantities.
 
-        If OrderedProduct doesn't exist creates it.
-        Saves OrderedProduct.
-        :param order: Order obj.
-        :param product_id: Product.pk.
-        :param quantity: `count`
-        :param override_quantity: if True, sets quantity, instead of adding.
+        Compares passed quantities with stored OrderedProducts and applies
+        the difference by one DELETE, one UPDATE and one INSERT at most.
+        Prices of all Products are resolved by one PriceSelector,
+        so the number of queries doesn't depend on the number of Products.
+        :param order: Order obj (saved).
+        :param quantities: {product_id: count}, if some Product doesn't
+            exist or count is invalid, raises ValidationError.
         :return: None.
         """
-        if quantity < 0:
-            return OrderedProductService().reduce_or_delete(
-                order=order,
-                product_id=product_id,
-                quantity=-quantity,
-            )
-        ord_prod_selector = selectors.OrderedProductSelector()
-        ordered_product = ord_prod_selector.get_ordered_product_from_order(
-            order=order,
-            product_id=product_id,
-        )
-        if ordered_product:
-            if override_quantity:
-                ordered_product.count = quantity
-            else:
-                ordered_product.count += quantity
-        else:
-            ordered_product = models.OrderedProduct(
-                order=order,
-                product_id=product_id,
-                count=quantity
-            )
-        ordered_product.save()
-
-    def reduce_or_delete(
-            self,
-            order: models.Order,
-            product_id: int,
-            quantity: int,
-    ) -> None:
-        """
-        Decrease OrderedProduct.count if possible.
+        with transaction.atomic():
+            stored = {
+                ord_prod.product_id: ord_prod
+                for ord_prod in models.OrderedProduct.objects
+                .filter(order=order)
+                .only("pk", "order_id", "product_id", "price", "count")
+            }
+            price_selector = shop_selectors.PriceSelector(
+                products=shop_models.Product.objects
+                .filter(pk__in=quantities.keys())
+                .only("pk", "price"))
+            missing = [
+                product_id for product_id in quantities
+                if not price_selector.is_registered(product_id)
+            ]
+            if missing:
+                raise ValidationError(
+                    {"product": f"Products {missing} do not exist."})
 
-        If `quantity` > OrderedProduct.count, deletes OrderedProduct.
-        :param order: Order obj.
-        :param product_id: Product.pk,
-            if Product is not related to the OrderedProduct raises ValueError.
-        :param quantity: amount to deduct.
-        :return: None.
-        """
-        ord_prod_selector = selectors.OrderedProductSelector()
-        ordered_product = ord_prod_selector.get_ordered_product_from_order(
-            order=order,
-            product_id=product_id,
-        )
-        if ordered_product:
-            if ordered_product.count > quantity:
-                ordered_product.count -= quantity
-                ordered_product.save()
+            to_delete = [
+                ord_prod.pk for product_id, ord_prod in stored.items()
+                if product_id not in quantities
+            ]
+            to_update = []
+            to_create = []
+            for product_id, count in quantities.items():
+                price = price_selector.price_for(product_id=product_id)
+                ord_prod = stored.get(product_id)
+                if ord_prod is None:
+                    ord_prod = models.OrderedProduct(
+                        order=order,
+                        product_id=product_id,
+                        count=count,
+                        price=price,
+                    )
+                    to_create.append(ord_prod)
+                elif ord_prod.count != count or ord_prod.price != price:
+                    ord_prod.count = count
+                    ord_prod.price = price
+                    to_update.append(ord_prod)
+                else:
+                    continue
+                # relations and uniqueness are ensured above,
+                # so validation doesn't hit db
+                ord_prod.full_clean(
+                    exclude=["order", "product"],
+                    validate_unique=False,
+                    validate_constraints=False,
+                )
 
-            else:
-                ordered_product.delete()
-        else:
-            raise models.OrderedProduct.DoesNotExist(
-                f"{order} has no Product with id {product_id}")
+            if to_delete:
+                models.OrderedProduct.objects.filter(pk__in=to_delete).delete()
+            if to_update:
+                models.OrderedProduct.objects.bulk_update(
+                    to_update, fields=["count", "price"])
+            if to_create:
+                models.OrderedProduct.objects.bulk_create(to_create)
 
     def refresh_price_from_product(
             self,
             ordered_product: models.OrderedProduct,
-            commit: bool = True
+            commit: bool = True,
+            price_selector: Optional[shop_selectors.PriceSelector] = None,
     ) -> None:
         """
         Refresh OrderedProduct.price.
@@ -124,11 +119,20 @@ class OrderedProductService:
         Uses related Product.price taking into account discount.
         :param ordered_product: OrderedProduct obj.
         :param commit: If True, full_clean(), save().
+        :param price_selector: PriceSelector with registered products of
+            several OrderedProducts, to load discounts by one query.
+            If None, discount of single product is loaded.
         :return: None.
         """
-        product_selector = shop_selectors.ProductSelector()
-        ordered_product.price = product_selector.get_discounted_price(
-            product=ordered_product.product)
+        if price_selector is None:
+            product_selector = shop_selectors.ProductSelector()
+            ordered_product.price = product_selector.get_discounted_price(
+                product=ordered_product.product)
+        else:
+            if not price_selector.is_registered(ordered_product.product_id):
+                price_selector.add_products([ordered_product.product])
+            ordered_product.price = price_selector.price_for(
+                product_id=ordered_product.product_id)
         if commit:
             ordered_product.full_clean()
             ordered_product.save()
@@ -140,24 +144,38 @@ class OrderedProductService:
         """
         Decrease related Product.count by OrderedProduct.count.
 
+        Locks all related Products by one query (in order of pk, to avoid
+        deadlocks), checks them, and decreases counts by single
+        conditional UPDATE.
         If Product.count is not enough or Product.is_active=False,
         raises ValueError.
         :param ord_prod_qs: queryset of OrderedProduct.
         :return: None.
         """
-        ord_prod_qs.select_related("product").select_for_update(of=("product"))
         with transaction.atomic():
-            for ord_prod in ord_prod_qs:
-                product: shop_models.Product = ord_prod.product
-                if product.count < ord_prod.count:
+            amounts = self._get_amounts(ord_prod_qs=ord_prod_qs)
+            if not amounts:
+                return
+            products = self._lock_products(product_ids=amounts.keys())
+            for product in products:
+                if product.count < amounts[product.pk]:
                     raise ValueError(
                         f"Product({product.pk}).count is less then "
-                        f"OrderedProduct({ord_prod.pk}).count")
+                        f"ordered count ({amounts[product.pk]})")
                 elif not product.is_active:
                     raise ValueError(f"Product({product.pk}) is not active")
-                else:
-                    product.count -= ord_prod.count
-                    product.save()
+            # conditions are repeated in UPDATE in case db ignores locks
+            enough_condition = Q()
+            for product_id, amount in amounts.items():
+                enough_condition |= Q(pk=product_id, count__gte=amount)
+            updated = shop_models.Product.objects \
+                .filter(enough_condition, is_active=True) \
+                .update(count=self._change_count_expression(
+                    amounts=amounts, sign=-1))
+            if updated != len(amounts):
+                raise ValueError(
+                    "Not enough items of ordered products or "
+                    "some products do not exist.")
 
     def return_ordered_products(
             self,
@@ -166,13 +184,148 @@ class OrderedProductService:
         """
         Increase Product.count by OrderedProduct.count.
 
-        To roll back previous deducting.
+        To roll back previous deducting. Locks related Products like
+        deduct_amount_from_product() and updates them by single UPDATE.
         :param ord_prod_qs: queryset of OrderedProduct.
         :return: None.
         """
-        ord_prod_qs.select_related("product").select_for_update(of=("product"))
         with transaction.atomic():
-            for ord_prod in ord_prod_qs:
-                product: shop_models.Product = ord_prod.product
-                product.count += ord_prod.count
-                product.save()
+            amounts = self._get_amounts(ord_prod_qs=ord_prod_qs)
+            if not amounts:
+                return
+            self._lock_products(product_ids=amounts.keys())
+            shop_models.Product.objects \
+                .filter(pk__in=amounts.keys()) \
+                .update(count=self._change_count_expression(
+                    amounts=amounts, sign=1))
+
+    @staticmethod
+    def _get_amounts(
+            ord_prod_qs: db_models.QuerySet[models.OrderedProduct],
+    ) -> dict[int, int]:
+        """
+        Sum ordered counts by Product.
+
+        :param ord_prod_qs: queryset of OrderedProduct.
+        :return: {product_id: count}
+        """
+        amounts: dict[int, int] = {}
+        for product_id, count in ord_prod_qs.values_list(
+                "product_id", "count"):
+            amounts[product_id] = amounts.get(product_id, 0) + count
+        return amounts
+
+    @staticmethod
+    def _lock_products(
+            product_ids: Iterable[int],
+    ) -> list[shop_models.Product]:
+        """
+        Lock Products by SELECT ... FOR UPDATE in deterministic order.
+
+        Must be called inside transaction.
+        :param product_ids: Products to lock.
+        :return: locked Products (only pk, count, is_active are loaded).
+        """
+        return list(
+            shop_models.Product.objects
+            .filter(pk__in=product_ids)
+            .order_by("pk")
+            .only("pk", "count", "is_active")
+            .select_for_update()
+        )
+
+    @staticmethod
+    def _change_count_expression(amounts: dict[int, int], sign: int) -> Case:
+        """
+        Expression for UPDATE, which changes Product.count of every Product.
+
+        :param amounts: {product_id: count}
+        :param sign: 1 to add, -1 to subtract.
+        :return: Case expression.
+        """
+        return Case(
+            *[When(pk=product_id, then=F("count") + sign * amount)
+              for product_id, amount in amounts.items()],
+            default=F("count"),
+        )
+
+    def add_to_product_sales(
+            self,
+            ord_prod_qs: db_models.QuerySet[models.OrderedProduct],
+    ) -> None:
+        """
+        Increase Product.units_sold and Product.order_count.
+
+        Must be called once, when the Order is accepted.
+        :param ord_prod_qs: queryset of OrderedProduct of one Order.
+        :return: None.
+        """
+        self._change_product_sales(ord_prod_qs=ord_prod_qs, sign=1)
+
+    def subtract_from_product_sales(
+            self,
+            ord_prod_qs: db_models.QuerySet[models.OrderedProduct],
+    ) -> None:
+        """
+        Decrease Product.units_sold and Product.order_count.
+
+        To roll back previous adding.
+        :param ord_prod_qs: queryset of OrderedProduct of one Order.
+        :return: None.
+        """
+        self._change_product_sales(ord_prod_qs=ord_prod_qs, sign=-1)
+
+    @classmethod
+    def _change_product_sales(
+            cls,
+            ord_prod_qs: db_models.QuerySet[models.OrderedProduct],
+            sign: int,
+    ) -> None:
+        """
+        Change sales counters of all related Products by single UPDATE.
+
+        :param ord_prod_qs: queryset of OrderedProduct of one Order.
+        :param sign: 1 to add, -1 to subtract.
+        :return: None.
+        """
+        units = cls._get_amounts(ord_prod_qs=ord_prod_qs)
+        if not units:
+            return
+        shop_models.Product.objects.filter(pk__in=units.keys()).update(
+            units_sold=Case(
+                *[When(pk=product_id, then=F("units_sold") + sign * count)
+                  for product_id, count in units.items()],
+                default=F("units_sold"),
+            ),
+            order_count=F("order_count") + sign,
+        )
+
+    @classmethod
+    def refresh_product_sales(
+            cls,
+            product_ids: Optional[Iterable[int]] = None,
+    ) -> int:
+        """
+        Recalculate denormalized sales columns of Products from Orders.
+
+        :param product_ids: Products to refresh, if None refreshes all.
+        :return: number of updated Products.
+        """
+        sold = models.OrderedProduct.objects \
+            .filter(product=OuterRef("pk")) \
+            .filter(order__status__in=cls.SOLD_STATUSES) \
+            .values("product")
+        products = shop_models.Product.objects.all()
+        if product_ids is not None:
+            products = products.filter(pk__in=product_ids)
+        return products.update(
+            units_sold=Coalesce(
+                Subquery(sold.annotate(value=Sum("count")).values("value")),
+                Value(0),
+            ),
+            order_count=Coalesce(
+                Subquery(sold.annotate(
+                    value=Count("order", distinct=True)).values("value")),
+                Value(0),
+            ),
+        )
@@ -0,0 +1,17 @@
+"""Celery tasks related to orders."""
+
+from celery import shared_task
+
+from orders import services
+
+
+@shared_task
+def reconcile_product_sales() -> int:
+    """
+    Recalculate Product.units_sold and Product.order_count from Orders.
+
+    Counters are changed incrementally by OrderService, this periodic task
+    fixes drift (e.g. orders changed in admin).
+    :return: number of updated Products.
+    """
+    return services.OrderedProductService.refresh_product_sales()
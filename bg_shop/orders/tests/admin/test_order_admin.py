@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from orders import models
+from shop import models as shop_models
+
+UserModel = get_user_model()
+
+
+class OrderAdminTestCase(TestCase):
+    def setUp(self):
+        self.admin = UserModel.objects.create_superuser(
+            username="admin", password="password")
+        self.client.force_login(self.admin)
+        self.order = models.Order.objects.create(user=self.admin)
+        products = shop_models.Product.objects.bulk_create([
+            shop_models.Product(
+                title=f"product {i}", release_date="2023-01-01")
+            for i in range(25)
+        ])
+        models.OrderedProduct.objects.bulk_create([
+            models.OrderedProduct(order=self.order, product=product)
+            for product in products
+        ])
+        self.url = reverse(
+            "admin:orders_order_change", args=(self.order.pk,))
+
+    def get_inline_formset(self, response):
+        return response.context["inline_admin_formsets"][0].formset
+
+    def test_ordered_products_are_paginated(self):
+        response = self.client.get(self.url)
+        formset = self.get_inline_formset(response)
+
+        self.assertEqual(len(formset.forms), 20)
+        self.assertContains(response, "orderedproduct_set-page=2")
+
+        response = self.client.get(self.url, {"orderedproduct_set-page": 2})
+        formset = self.get_inline_formset(response)
+
+        self.assertEqual(len(formset.forms), 5)
+
+    def test_changelist(self):
+        url = reverse("admin:orders_order_changelist")
+        for query in ({}, {"q": str(self.order.pk)}, {"q": "admin"}):
+            with self.subTest(query=query):
+                response = self.client.get(url, query)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.context["cl"].result_count, 1)
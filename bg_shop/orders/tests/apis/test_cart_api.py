@@ -1,3 +1,4 @@
+from asgiref.sync import async_to_sync
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import AnonymousUser
@@ -56,7 +57,7 @@ class GetCartApiTestCase(TestCase):
         add_product_to_session_cart(request=request, product_id="1")
         request.user = AnonymousUser()
 
-        response = apis.CartApi.as_view()(request)
+        response = async_to_sync(apis.CartApi.as_view())(request)
         self.assertEqual(response.status_code, 200, "Wrong status code")
         self.assertEqual(
             response.data[0].get("count"),
@@ -71,7 +72,7 @@ class GetCartApiTestCase(TestCase):
         request.user = None
         login(request=request, user=self.user)
 
-        response = apis.CartApi.as_view()(request)
+        response = async_to_sync(apis.CartApi.as_view())(request)
         self.assertEqual(response.status_code, 200, "Wrong status code")
         self.assertEqual(
             response.data[0].get("count"),
@@ -84,7 +85,7 @@ class GetCartApiTestCase(TestCase):
         request = create_session(request)
         request.user = AnonymousUser()
 
-        response = apis.CartApi.as_view()(request)
+        response = async_to_sync(apis.CartApi.as_view())(request)
         self.assertEqual(response.status_code, 200, "Wrong status code")
         self.assertFalse(
             response.data,
@@ -99,7 +100,7 @@ class GetCartApiTestCase(TestCase):
         request.user = None
         login(request=request, user=self.user)
 
-        response = apis.CartApi.as_view()(request)
+        response = async_to_sync(apis.CartApi.as_view())(request)
         self.assertEqual(response.status_code, 200, "Wrong status code")
         self.assertFalse(
             response.data,
@@ -26,7 +26,7 @@ class GetOrderApiTestCase(TestCase):
         self.client.force_login(self.user)
         response = self.client.get(self.url)
         simple_response_data = list(
-            map(lambda order: order["id"], response.data))
+            map(lambda order: order["id"], response.data["items"]))
         self.assertEqual(response.status_code, 200, "Wrong status code.")
         self.assertEqual(
             set(simple_response_data),
@@ -34,6 +34,31 @@ class GetOrderApiTestCase(TestCase):
             "Wrong response data.",
         )
 
+    def test_paginated_summaries(self):
+        orders = models.Order.objects \
+            .exclude(status="CT") \
+            .exclude(is_active=False) \
+            .order_by("-created_at", "-pk")
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, {"limit": 1})
+
+        self.assertEqual(response.status_code, 200, "Wrong status code.")
+        self.assertEqual(response.data["lastPage"], orders.count())
+        self.assertEqual(
+            set(response.data["items"][0]),
+            {"id", "createdAt", "deliveryType", "status", "paid",
+             "paymentType", "itemCount", "deliveryCost", "totalCost"},
+            "Summary must not contain products.",
+        )
+        ids = [response.data["items"][0]["id"]]
+        while response.data["nextCursor"]:
+            response = self.client.get(
+                self.url,
+                {"limit": 1, "cursor": response.data["nextCursor"]},
+            )
+            ids.extend(order["id"] for order in response.data["items"])
+        self.assertEqual(ids, list(orders.values_list("pk", flat=True)))
+
     def test_allow_only_for_authenticated(self):
         response = self.client.get(self.url)
         self.assertEqual(
@@ -0,0 +1,139 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from orders import cart_stores, models
+
+UserModel = get_user_model()
+
+
+def create_request(user=None):
+    request = RequestFactory().get('/')
+    middleware = SessionMiddleware(lambda x: None)
+    middleware.process_request(request)
+    request.user = user or AnonymousUser()
+    return request
+
+
+class SessionCartStoreTestCase(TestCase):
+    def setUp(self):
+        self.request = create_request()
+        self.store = cart_stores.SessionCartStore(self.request)
+
+    def test_load_empty_cart(self):
+        self.assertEqual(self.store.load(), {})
+
+    def test_save_and_load(self):
+        self.request.session.modified = False
+        self.store.save({1: 2, 3: 4})
+
+        self.assertTrue(self.request.session.modified)
+        self.assertEqual(
+            self.request.session[settings.CART_SESSION_ID],
+            {"1": 2, "3": 4},
+        )
+        self.assertEqual(self.store.load(), {1: 2, 3: 4})
+
+
+class CacheCartStoreTestCase(TestCase):
+    def setUp(self):
+        self.request = create_request()
+        self.store = cart_stores.CacheCartStore(self.request)
+
+    def test_load_without_session(self):
+        self.assertEqual(self.store.load(), {})
+
+    def test_save_and_load(self):
+        self.store.save({1: 2})
+
+        self.assertIsNotNone(self.request.session.session_key)
+        self.assertNotIn(settings.CART_SESSION_ID, self.request.session)
+        self.assertEqual(
+            cart_stores.CacheCartStore(self.request).load(), {1: 2})
+
+    def test_clear(self):
+        self.store.save({1: 2})
+        self.store.clear()
+        self.assertEqual(self.store.load(), {})
+
+
+class DBCartStoreTestCase(TestCase):
+    fixtures = [
+        "test_user",
+        "test_product",
+        "test_order",
+        "test_ordered_product",
+    ]
+
+    def setUp(self):
+        # order 1 is a cart with product 1 (3 items) and product 2 (2 items)
+        self.user = UserModel.objects.get(pk=1)
+        self.store = cart_stores.DBCartStore(create_request(user=self.user))
+
+    def test_load_by_one_query(self):
+        with self.assertNumQueries(1):
+            items = self.store.load()
+        self.assertEqual(items, {1: 3, 2: 2})
+
+    def test_save_applies_difference(self):
+        self.store.save({1: 5, 3: 1})
+
+        self.assertEqual(self.store.load(), {1: 5, 3: 1})
+        self.assertEqual(
+            models.Order.objects.get(pk=1).orderedproduct_set.count(), 2)
+
+    def test_save_without_changes_does_not_write(self):
+        with CaptureQueriesContext(connection) as context:
+            self.store.save({1: 3, 2: 2})
+        sql = [query["sql"] for query in context.captured_queries]
+        self.assertEqual(
+            len([q for q in sql if q.startswith("SELECT")]), 2)
+        self.assertFalse(
+            [q for q in sql if q.startswith(("INSERT", "UPDATE", "DELETE"))])
+
+    def test_merge_keeps_other_items(self):
+        with CaptureQueriesContext(connection) as context:
+            self.store.merge({1: 5, 3: 1})
+
+        self.assertEqual(self.store.load(), {1: 5, 2: 2, 3: 1})
+        sql = [query["sql"] for query in context.captured_queries]
+        self.assertFalse([q for q in sql if q.startswith("DELETE")])
+        self.assertEqual(
+            len([q for q in sql if q.startswith(("INSERT", "UPDATE"))]), 2)
+
+    def test_save_creates_cart_order(self):
+        user = UserModel.objects.create_user(username="new_user")
+        store = cart_stores.DBCartStore(create_request(user=user))
+
+        store.save({1: 1})
+
+        self.assertEqual(store.load(), {1: 1})
+
+
+class GetCartStoreTestCase(TestCase):
+    fixtures = [
+        "test_user",
+    ]
+
+    def test_authenticated_user(self):
+        request = create_request(user=UserModel.objects.get(pk=1))
+        self.assertIsInstance(
+            cart_stores.get_cart_store(request), cart_stores.DBCartStore)
+
+    def test_anonymous_user(self):
+        self.assertIsInstance(
+            cart_stores.get_cart_store(create_request()),
+            cart_stores.SessionCartStore,
+        )
+
+    @override_settings(
+        CART_ANONYMOUS_STORE="orders.cart_stores.CacheCartStore")
+    def test_anonymous_store_from_settings(self):
+        self.assertIsInstance(
+            cart_stores.get_cart_store(create_request()),
+            cart_stores.CacheCartStore,
+        )
@@ -73,7 +73,7 @@ class GetCartTestCase(TestCase):
 
         # check that it caches related objects and quantity ordered
         expected_cached_objects = {
-            'tags', 'images', 'review_set', 'orderedproduct_set', 'sale_set'}
+            'tags', 'images'}
         self.assertEqual(
             expected_cached_objects,
             result[0]._prefetched_objects_cache.keys(),
@@ -101,7 +101,7 @@ class GetCartTestCase(TestCase):
 
         # check that it caches related objects and quantity ordered
         expected_cached_objects = {
-            'tags', 'images', 'review_set', 'orderedproduct_set', 'sale_set'}
+            'tags', 'images'}
         self.assertEqual(
             expected_cached_objects,
             result[0]._prefetched_objects_cache.keys(),
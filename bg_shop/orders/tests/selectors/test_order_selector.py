@@ -217,77 +217,72 @@ class GetOrdersOfUserTestCase(TestCase):
         )
 
 
-class GetOrderHistoryTestCase(TestCase):
+class GetOrderSummariesTestCase(TestCase):
     fixtures = [
         "test_user",
-        "test_order",
         "test_product",
-        "test_ordered_product",
     ]
 
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
+        d_conf_services.DynamicConfigService().set_default_config()
         cls.selector = selectors.OrderSelector()
-        cls.user = UserModel.objects.get(pk=1)
 
-    def test_get_all_active_orders_without_cart_with_cashed_data(self):
-        expected_result = models.Order.objects.filter(
+    def setUp(self):
+        self.user = UserModel.objects.get(pk=1)
+        self.express_order = models.Order.objects.create(
             user=self.user,
-            is_active=True,
-        ).exclude(
-            status=models.Order.Statuses.CART,
+            status=models.Order.Statuses.ACCEPTED,
+            delivery_type=models.Order.DeliveryTypes.EXPRESS,
         )
-        result = self.selector.get_order_history(
+        models.OrderedProduct.objects.create(
+            order=self.express_order, product_id=1, count=2, price=50)
+        models.OrderedProduct.objects.create(
+            order=self.express_order, product_id=2, count=1, price=100)
+        self.empty_order = models.Order.objects.create(
             user=self.user,
-            order_by_date=False,
-        )
-        self.assertEqual(
-            set(expected_result),
-            set(result),
-            "Unexpected result",
+            status=models.Order.Statuses.EDITING,
         )
+        models.Order.objects.create(
+            user=self.user, status=models.Order.Statuses.CART)
 
+    def test_costs_are_the_same_as_calculated_by_python(self):
+        summaries = {
+            order.pk: order
+            for order in self.selector.get_order_summaries(user=self.user)
+        }
         self.assertEqual(
-            result[0]._prefetched_objects_cache.keys(),
-            {'orderedproduct_set'},
-            "Ordered products has not been prefetched."
-        )
+            set(summaries), {self.express_order.pk, self.empty_order.pk})
+        for order in (self.express_order, self.empty_order):
+            summary = summaries[order.pk]
+            self.assertEqual(
+                summary.order_total_cost,
+                self.selector.get_total_cost(order=order),
+            )
+            self.assertEqual(
+                summary.order_delivery_cost,
+                self.selector.get_delivery_cost(order=order),
+            )
+        self.assertEqual(summaries[self.express_order.pk].item_count, 3)
+        self.assertEqual(summaries[self.empty_order.pk].item_count, 0)
+
+    def test_saved_costs_are_used(self):
+        models.Order.objects.filter(pk=self.express_order.pk).update(
+            items_total=1, delivery_cost=2, total_cost=3)
+        summary = self.selector.get_order_summaries(user=self.user) \
+            .get(pk=self.express_order.pk)
         self.assertEqual(
-            result[0]._state.fields_cache.keys(),
-            {'user'},
-            "Related User has not been selected."
-        )
-        self.assertIn(
-            'product',
-            result[0].orderedproduct_set.first()._state.fields_cache.keys(),
-            "Related Product has not been selected."
-        )
-        product_cache = result[0].orderedproduct_set.first() \
-            .product._prefetched_objects_cache.keys(),
-        self.assertIn(
-            {'sale_set', "images", "review_set"},
-            product_cache,
-            "objects related to the product has not been prefetched."
+            (summary.order_items_total, summary.order_delivery_cost,
+             summary.order_total_cost),
+            (1, 2, 3),
         )
 
-    def test_order_by_date(self):
-        expected_result = models.Order.objects.filter(
-            user=self.user,
-            is_active=True,
-        ).exclude(
-            status=models.Order.Statuses.CART,
-        ).order_by('-created_at')
-
-        result = self.selector.get_order_history(
-            user=self.user,
-            order_by_date=True,
-        )
-        self.assertEqual(
-            list(expected_result),
-            list(result),
-            "Unexpected result",
-        )
+    def test_one_query_without_related_objects(self):
+        with self.assertNumQueries(1):
+            orders = list(self.selector.get_order_summaries(user=self.user))
+        self.assertEqual(orders, [self.empty_order, self.express_order])
+        self.assertEqual(orders[0]._state.fields_cache, {})
 
 
 class PrefetchDataTestCase(TestCase):
@@ -307,7 +302,7 @@ class PrefetchDataTestCase(TestCase):
     def test_main_data_prefetched(self):
         result = self.selector._prefetch_data(
             orders_qs=models.Order.objects.all(),
-            with_images_and_reviews=False,
+            with_images=False,
             with_user_profile=False,
         )
         self.assertEqual(
@@ -320,24 +315,24 @@ class PrefetchDataTestCase(TestCase):
             result[0].orderedproduct_set.first()._state.fields_cache.keys(),
             "Related Product has not been selected."
         )
-        product_cache = result[0].orderedproduct_set.first() \
-            .product._prefetched_objects_cache.keys(),
-        self.assertIn(
-            {'sale_set'},
-            product_cache,
-            "objects related to the product has not been prefetched."
+        self.assertFalse(
+            hasattr(
+                result[0].orderedproduct_set.first().product,
+                "_prefetched_objects_cache",
+            ),
+            "Sales must not be prefetched, prices are resolved in batch."
         )
 
-    def test_prefetch_images_and_reviews(self):
+    def test_prefetch_images(self):
         result = self.selector._prefetch_data(
             orders_qs=models.Order.objects.all(),
-            with_images_and_reviews=True,
+            with_images=True,
             with_user_profile=False,
         )
 
         product_cache = result[0].orderedproduct_set.first() \
             .product._prefetched_objects_cache.keys()
-        for expected in ("images", "review_set",):
+        for expected in ("images",):
             self.assertIn(
                 expected,
                 product_cache,
@@ -347,7 +342,7 @@ class PrefetchDataTestCase(TestCase):
     def test_prefetch_user_profile(self):
         result = self.selector._prefetch_data(
             orders_qs=models.Order.objects.all(),
-            with_images_and_reviews=False,
+            with_images=False,
             with_user_profile=True,
         )
         self.assertIn(
@@ -364,7 +359,7 @@ class PrefetchDataTestCase(TestCase):
     def test_prefetch_all_data(self):
         result = self.selector._prefetch_data(
             orders_qs=models.Order.objects.all(),
-            with_images_and_reviews=True,
+            with_images=True,
             with_user_profile=True,
         )
 
@@ -378,9 +373,6 @@ class PrefetchDataTestCase(TestCase):
         self.assertTrue(
             hasattr(result.first().orderedproduct_set.first().product,
                     'images'))
-        self.assertTrue(
-            hasattr(result.first().orderedproduct_set.first().product,
-                    'review_set'))
         self.assertTrue(hasattr(result.first(), 'user'))
         self.assertTrue(hasattr(result.first().user, 'profile'))
 
@@ -5,9 +5,11 @@ from datetime import date
 from django.test import TestCase, override_settings
 from django.utils import timezone
 
-from shop.models import Product, Category, Review, Sale
+from shop.models import Product, Category, Sale
+from shop.services import ReviewService
 from orders.serializers import CartSerializer
 from common.models import Image
+from common.services import ImageVariantService
 from dynamic_config.services import DynamicConfigService
 
 
@@ -36,18 +38,20 @@ class CartSerializerTestCase(TestCase):
         )
         self.product.images.add(self.image)
         self.product.quantity_ordered = 3
-        Review.objects.create(
-            author_id=1,
-            product=self.product,
+        review_service = ReviewService()
+        review_service.create_review(
+            user_id=1,
+            product_id=self.product.pk,
             rate=4,
             text='Great product!',
         )
-        Review.objects.create(
-            author_id=1,
-            product=self.product,
+        review_service.create_review(
+            user_id=1,
+            product_id=self.product.pk,
             rate=5,
             text='Excellent!',
         )
+        self.product.refresh_from_db()
         Sale.objects.create(
             product=self.product,
             discount=10,
@@ -71,6 +75,8 @@ class CartSerializerTestCase(TestCase):
                 OrderedDict(
                     src='/media/media/test',
                     alt=None,
+                    srcset=None,
+                    variants=ImageVariantService().get_urls(self.image),
                 ),
             ],
             'tags': [],
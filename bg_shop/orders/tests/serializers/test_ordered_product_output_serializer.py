@@ -7,7 +7,9 @@ from django.utils import timezone
 from orders.models import Order, OrderedProduct
 from orders.serializers import OrderedProductOutputSerializer
 from common.models import Image
+from common.services import ImageVariantService
 from shop.models import Product, Tag, Review
+from shop.services import ReviewService
 
 UserModel = get_user_model()
 
@@ -36,18 +38,20 @@ class OrderedProductOutputSerializerTestCase(TestCase):
         )
         self.image = Image.objects.create(img="/media/test", product=self.product)
         self.product.images.add(self.image)
-        Review.objects.create(
-            author=self.user,
-            product=self.product,
+        review_service = ReviewService()
+        review_service.create_review(
+            user_id=self.user.pk,
+            product_id=self.product.pk,
             rate=4,
             text='Great product!',
         )
-        Review.objects.create(
-            author=self.user,
-            product=self.product,
+        review_service.create_review(
+            user_id=self.user.pk,
+            product_id=self.product.pk,
             rate=5,
             text='Excellent!',
         )
+        self.product.refresh_from_db()
         self.ordered_product = OrderedProduct.objects.create(
             order=self.order, product=self.product, count=2, price=40)
         self.tag1 = Tag.objects.create(name='Tag 1')
@@ -79,7 +83,12 @@ class OrderedProductOutputSerializerTestCase(TestCase):
             "description": self.ordered_product.product.short_description,
             "freeDelivery": True,
             "images": [
-                OrderedDict([('src', '/media/media/test'), ('alt', None)]),
+                OrderedDict([
+                    ('src', '/media/media/test'),
+                    ('alt', None),
+                    ('srcset', None),
+                    ('variants', ImageVariantService().get_urls(self.image)),
+                ]),
             ],
             "tags": [
                 OrderedDict([('id', 1), ('name', 'Tag 1')]),
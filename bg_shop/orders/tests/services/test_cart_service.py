@@ -9,7 +9,7 @@ from rest_framework import request as drf_request
 
 from django.contrib.auth import get_user_model
 
-from orders import models, services
+from orders import cart_stores, models, services
 from shop import models as shop_models
 
 UserModel = get_user_model()
@@ -21,17 +21,27 @@ def create_session(request: drf_request):
     request.session.save()
 
 
-class SaveSessionTestCase(TestCase):
+class UpdateItemsTestCase(TestCase):
     def setUp(self):
         self.request = RequestFactory().get('/')
         create_session(self.request)
         self.service = services.CartService(self.request)
 
-    def test_cart_service_save_session(self):
-        self.request.session.modified = False
-        self.service.save_session()
+    def test_update_items_saves_cart_once(self):
+        self.service.store.save({1: 1, 2: 5})
+        with mock.patch.object(
+                self.service.store, "save",
+                wraps=self.service.store.save) as mock_save:
+            items = self.service.update_items(changes={1: 2, 2: -5, 3: 1})
 
-        self.assertTrue(self.request.session.modified)
+        mock_save.assert_called_once_with({1: 3, 3: 1})
+        self.assertEqual(items, {1: 3, 3: 1})
+
+    def test_update_items_override_quantity(self):
+        self.service.store.save({1: 1, 2: 5})
+        items = self.service.update_items(
+            changes={1: 4, 2: 0}, override_quantity=True)
+        self.assertEqual(items, {1: 4})
 
 
 class CartServiceTestCase(TestCase):
@@ -104,7 +114,7 @@ class CartServiceTestCase(TestCase):
             service.add(product_id=inactive_product.id, quantity=3)
 
 
-class AddToSessionTestCase(TestCase):
+class AddToSessionCartTestCase(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
         self.request = self.factory.get('/')
@@ -114,8 +124,7 @@ class AddToSessionTestCase(TestCase):
     def test_add_to_session(self):
         product_id = 1
         quantity = 2
-        self.cart_service._add_to_session(
-            product_id=product_id, quantity=quantity)
+        self.cart_service.update_items(changes={product_id: quantity})
 
         cart = self.request.session[settings.CART_SESSION_ID]
         self.assertEqual(
@@ -126,9 +135,9 @@ class AddToSessionTestCase(TestCase):
 
     def test_add_to_session_override_quantity(self):
         product_id = 1
-        self.cart_service._add_to_session(product_id=product_id, quantity=2)
-        self.cart_service._add_to_session(
-            product_id=product_id, quantity=3, override_quantity=True)
+        self.cart_service.update_items(changes={product_id: 2})
+        self.cart_service.update_items(
+            changes={product_id: 3}, override_quantity=True)
 
         cart = self.request.session[settings.CART_SESSION_ID]
         self.assertEqual(
@@ -139,8 +148,8 @@ class AddToSessionTestCase(TestCase):
 
     def test_add_to_session_not_override_quantity(self):
         product_id = 1
-        self.cart_service._add_to_session(product_id=product_id, quantity=2)
-        self.cart_service._add_to_session(product_id=product_id, quantity=3)
+        self.cart_service.update_items(changes={product_id: 2})
+        self.cart_service.update_items(changes={product_id: 3})
 
         cart = self.request.session[settings.CART_SESSION_ID]
         self.assertEqual(
@@ -150,70 +159,6 @@ class AddToSessionTestCase(TestCase):
         )
 
 
-class AddToOrderTestCase(TestCase):
-    fixtures = [
-        "test_product",
-    ]
-
-    def setUp(self):
-        self.factory = RequestFactory()
-        self.request = self.factory.get('/')
-        create_session(self.request)
-        self.request.user = UserModel.objects.create_user(
-            username='testuser', password='testpassword')
-        self.product = shop_models.Product.objects.get(pk=1)
-        self.cart_service = services.CartService(self.request)
-
-    def test_add_to_order(self):
-        self.cart_service._add_to_order(product_id=self.product.id,
-                                        quantity=3)
-        order = self.request.user.order_set.first()
-        self.assertEqual(
-            order.orderedproduct_set.first().count,
-            3,
-            "Unexpected amount."
-        )
-        self.assertEqual(
-            order.orderedproduct_set.first().product_id,
-            self.product.id,
-            "Unexpected product id."
-        )
-
-    def test_add_to_order_override_quantity(self):
-        self.cart_service._add_to_order(
-            product_id=self.product.id, quantity=2)
-        self.cart_service._add_to_order(
-            product_id=self.product.id, quantity=3, override_quantity=True, )
-        order = self.request.user.order_set.first()
-        self.assertEqual(
-            order.orderedproduct_set.first().count,
-            3,
-            "Unexpected amount."
-        )
-        self.assertEqual(
-            order.orderedproduct_set.first().product_id,
-            self.product.id,
-            "Unexpected product id."
-        )
-
-    def test_add_to_order_not_override_quantity(self):
-        self.cart_service._add_to_order(
-            product_id=self.product.id, quantity=2)
-        self.cart_service._add_to_order(
-            product_id=self.product.id, quantity=3)
-        order = self.request.user.order_set.first()
-        self.assertEqual(
-            order.orderedproduct_set.first().count,
-            5,
-            "Unexpected amount."
-        )
-        self.assertEqual(
-            order.orderedproduct_set.first().product_id,
-            self.product.id,
-            "Unexpected product id."
-        )
-
-
 class RemoveTestCase(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
@@ -223,24 +168,25 @@ class RemoveTestCase(TestCase):
             username='testuser', password='testpassword')
         self.cart_service = services.CartService(self.request)
 
-    @mock.patch(
-        "orders.services.CartService._remove_from_session", return_value=None)
-    def test_remove_if_anonymous(self, mock_remove_from_session):
+    @mock.patch("orders.services.CartService.update_items", return_value={})
+    def test_remove_if_anonymous(self, mock_update_items):
         self.request.user = AnonymousUser()
         product_id = 1
         quantity = 2
-        self.cart_service.remove(product_id, quantity)
-        mock_remove_from_session.assert_called_once_with(
-            product_id, quantity)
+        cart_service = services.CartService(self.request)
+        cart_service.remove(product_id, quantity)
+        mock_update_items.assert_called_once_with(
+            changes={product_id: -quantity})
 
-    @mock.patch(
-        "orders.services.CartService._remove_from_order", return_value=None)
-    def test_remove_if_authenticated(self, mock_remove_from_order):
+    @mock.patch("orders.services.CartService.update_items", return_value={})
+    def test_remove_if_authenticated(self, mock_update_items):
         product_id = 1
         quantity = 2
         self.cart_service.remove(product_id, quantity)
-        mock_remove_from_order.assert_called_once_with(
-            product_id, quantity)
+        self.assertIsInstance(
+            self.cart_service.store, cart_stores.DBCartStore)
+        mock_update_items.assert_called_once_with(
+            changes={product_id: -quantity})
 
 
 class RemoveFromSessionTestCase(TestCase):
@@ -257,8 +203,7 @@ class RemoveFromSessionTestCase(TestCase):
 
         cart_service = services.CartService(self.request)
         quantity = 2
-        cart_service._remove_from_session(
-            product_id=product_id, quantity=quantity)
+        cart_service.remove(product_id=product_id, quantity=quantity)
 
         cart = self.request.session[settings.CART_SESSION_ID]
         self.assertEqual(cart, {str(product_id): 3})
@@ -267,8 +212,7 @@ class RemoveFromSessionTestCase(TestCase):
         product_id = 1
         quantity = 2
 
-        self.cart_service._remove_from_session(
-            product_id=product_id, quantity=quantity)
+        self.cart_service.remove(product_id=product_id, quantity=quantity)
 
         cart = self.request.session.get(settings.CART_SESSION_ID, {})
         self.assertEqual(cart, {}, "Cart must be empty.")
@@ -279,23 +223,21 @@ class RemoveFromSessionTestCase(TestCase):
         self.request.session.modified = True
         cart_service = services.CartService(self.request)
         quantity = 2
-        cart_service._remove_from_session(
-            product_id=product_id, quantity=quantity)
+        cart_service.remove(product_id=product_id, quantity=quantity)
 
         cart = self.request.session.get(settings.CART_SESSION_ID, {})
         self.assertEqual(cart, {}, "Cart must be empty.")
 
-    @mock.patch('orders.services.CartService.save_session')
-    def test_remove_from_session_save_session_called(self, mock_save_session):
+    @mock.patch('orders.cart_stores.SessionCartStore.save')
+    def test_remove_from_session_save_called(self, mock_save):
         product_id = 1
         self.request.session[settings.CART_SESSION_ID] = {str(product_id): 5}
         self.request.session.modified = True
         cart_service = services.CartService(self.request)
         quantity = 2
-        cart_service._remove_from_session(
-            product_id=product_id, quantity=quantity)
+        cart_service.remove(product_id=product_id, quantity=quantity)
 
-        mock_save_session.assert_called_once()
+        mock_save.assert_called_once_with({product_id: 3})
 
 
 class RemoveFromOrderTestCase(TestCase):
@@ -323,8 +265,7 @@ class RemoveFromOrderTestCase(TestCase):
             count=5,
         )
         quantity = 3
-        self.cart_service._remove_from_order(
-            product_id=product_id, quantity=quantity)
+        self.cart_service.remove(product_id=product_id, quantity=quantity)
 
         ordered_product.refresh_from_db()
         self.assertEqual(ordered_product.count, 2)
@@ -336,8 +277,7 @@ class RemoveFromOrderTestCase(TestCase):
             status=models.Order.Statuses.CART,
         )
         quantity = 3
-        self.cart_service._remove_from_order(
-            product_id=product_id, quantity=quantity)
+        self.cart_service.remove(product_id=product_id, quantity=quantity)
 
         self.assertFalse(order.orderedproduct_set.all())
 
@@ -353,8 +293,7 @@ class RemoveFromOrderTestCase(TestCase):
             count=2,
         )
         quantity = 3
-        self.cart_service._remove_from_order(
-            product_id=product_id, quantity=quantity)
+        self.cart_service.remove(product_id=product_id, quantity=quantity)
 
         with self.assertRaises(
                 models.OrderedProduct.DoesNotExist,
@@ -364,6 +303,10 @@ class RemoveFromOrderTestCase(TestCase):
 
 
 class MergeCartsTestCase(TestCase):
+    fixtures = [
+        "test_product",
+    ]
+
     def setUp(self):
         self.factory = RequestFactory()
         self.request = self.factory.get('/')
@@ -371,21 +314,52 @@ class MergeCartsTestCase(TestCase):
         self.request.user = UserModel.objects.create_user(
             username='testuser', password='testpassword')
         self.cart_service = services.CartService(self.request)
+        self.store = cart_stores.DBCartStore(self.request)
+
+    def test_merge_carts(self):
+        self.store.save({1: 1, 2: 4})
+        session_cart = {'1': 2, '3': 3}
 
-    @mock.patch('orders.services.CartService._add_to_order', return_value=None)
-    def test_merge_carts(self, mock_add_to_order):
-        session_cart = {'1': 2, '2': 3}
         self.cart_service.merge_carts(session_cart)
-        mock_add_to_order.assert_has_calls([
-            mock.call(product_id=1, quantity=2, override_quantity=True),
-            mock.call(product_id=2, quantity=3, override_quantity=True)
+
+        self.assertEqual(self.store.load(), {1: 2, 2: 4, 3: 3})
+
+    def test_merge_carts_skips_unavailable_products(self):
+        # product 4 is inactive, product 100 doesn't exist
+        session_cart = {1: 2, 4: 1, 100: 1}
+
+        self.cart_service.merge_carts(session_cart)
+
+        self.assertEqual(self.store.load(), {1: 2})
+
+    def test_merge_carts_number_of_queries_is_constant(self):
+        self.store.save({1: 1})
+        shop_models.Product.objects.bulk_create([
+            shop_models.Product(
+                title=f"product {i}",
+                release_date="2023-01-01",
+                count=10,
+            )
+            for i in range(20)
         ])
+        session_cart = {
+            str(product_id): 2 for product_id in
+            shop_models.Product.objects.values_list("pk", flat=True)
+        }
 
-    @mock.patch('orders.services.CartService._add_to_order')
-    def test_merge_carts_empty_session_cart(self, mock_add_to_order):
+        # availability, cart order, its lines, UPDATE, INSERT
+        # and savepoint queries of the transaction
+        with self.assertNumQueries(7):
+            self.cart_service.merge_carts(session_cart)
+
+        items = self.store.load()
+        self.assertEqual(len(items), 23)
+        self.assertEqual(set(items.values()), {2})
+
+    def test_merge_carts_empty_session_cart(self):
         session_cart = {}
-        mock_add_to_order.return_value = None
 
-        self.cart_service.merge_carts(session_cart)
+        with self.assertNumQueries(0):
+            self.cart_service.merge_carts(session_cart)
 
-        mock_add_to_order.assert_not_called()
+        self.assertFalse(models.Order.objects.exists())
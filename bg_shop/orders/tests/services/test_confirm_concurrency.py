@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, tag
+
+from orders import models, services
+from shop import models as shop_models
+
+UserModel = get_user_model()
+
+
+@tag("postgres")
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Row locks are needed, run with postgres settings (e.g. settings.local).",
+)
+class ConfirmConcurrencyTestCase(TransactionTestCase):
+    """Many parallel checkouts of the same product must not oversell."""
+    stock = 10
+    orders_number = 40
+
+    def setUp(self):
+        self.product = shop_models.Product.objects.create(
+            title="Hot item",
+            description="",
+            price=10,
+            count=self.stock,
+            release_date="2023-01-01",
+            manufacturer="test",
+        )
+        self.other_product = shop_models.Product.objects.create(
+            title="Other item",
+            description="",
+            price=10,
+            count=self.orders_number,
+            release_date="2023-01-01",
+            manufacturer="test",
+        )
+        self.order_ids = []
+        for i in range(self.orders_number):
+            user = UserModel.objects.create_user(username=f"user{i}")
+            order = models.Order.objects.create(
+                user=user, status=models.Order.Statuses.EDITING)
+            # different order of lines must not lead to deadlocks
+            products = [self.product, self.other_product]
+            if i % 2:
+                products.reverse()
+            for product in products:
+                models.OrderedProduct.objects.create(
+                    order=order, product=product, price=10, count=1)
+            self.order_ids.append(order.pk)
+
+    def _confirm(self, order_id: int) -> bool:
+        order_data = {
+            "deliveryType": models.Order.DeliveryTypes.ORDINARY,
+            "paymentType": models.Order.PaymentTypes.ONLINE,
+            "address": "test address",
+        }
+        try:
+            order = models.Order.objects.get(pk=order_id)
+            services.OrderService().confirm(
+                order_id=order_id, user=order.user, order_data=order_data)
+        except ValueError:
+            return False
+        finally:
+            connection.close()
+        return True
+
+    def test_parallel_confirms_do_not_oversell(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(self._confirm, self.order_ids))
+
+        self.product.refresh_from_db()
+        self.other_product.refresh_from_db()
+        self.assertEqual(sum(results), self.stock)
+        self.assertEqual(self.product.count, 0)
+        self.assertEqual(
+            self.other_product.count, self.orders_number - self.stock)
+        self.assertEqual(
+            models.Order.objects.filter(
+                status=models.Order.Statuses.ACCEPTED).count(),
+            self.stock,
+        )
@@ -1,10 +1,12 @@
-from unittest.mock import patch, ANY, call
+from unittest.mock import patch, ANY
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.http import Http404
 
+from dynamic_config import services as d_conf_services
+from dynamic_config.models import DynamicConfig
 from orders import models, services, selectors
 
 UserModel = get_user_model()
@@ -236,20 +238,8 @@ class OrderServiceUpdateOrderedProductsTestCase(TestCase):
             pk=1
         )
 
-    @patch.object(services.OrderService, '_simplify_products')
-    @patch.object(services.OrderedProductService, 'create_ordered_product')
-    @patch.object(services.OrderedProductService, 'refresh_price_from_product')
-    def test_update_ordered_products(
-            self,
-            mock_refresh_price,
-            mock_create_ordered_product,
-            mock_simplify_products,
-    ):
-        mock_simplify_products.return_value = {
-            1: 4,
-            2: 5,
-            3: 2,
-        }
+    @patch.object(services.OrderedProductService, 'reconcile')
+    def test_update_ordered_products(self, mock_reconcile):
         products = [
             {'id': 1, 'count': 4},
             {'id': 2, 'count': 5},
@@ -257,21 +247,24 @@ class OrderServiceUpdateOrderedProductsTestCase(TestCase):
         ]
         self.order_service.update_ordered_products(
             order=self.order, products=products)
-        ordered_product_1 = models.OrderedProduct.objects.get(pk=1)
-        ordered_product_2 = models.OrderedProduct.objects.get(pk=2)
 
-        self.assertEqual(ordered_product_1.count, 4)
-        self.assertEqual(ordered_product_2.count, 5)
-        mock_simplify_products.assert_called_once_with(products=products)
+        mock_reconcile.assert_called_once_with(
+            order=self.order, quantities={1: 4, 2: 5, 3: 2})
 
-        expected_update_calls = [
-            call(ordered_product_1, commit=False),
-            call(ordered_product_2, commit=False),
+    def test_update_ordered_products_applies_difference(self):
+        # order 1 has product 1 (3 items) and product 2 (2 items)
+        products = [
+            {'id': 1, 'count': 4},
+            {'id': 3, 'count': 2},
         ]
-        mock_refresh_price.assert_has_calls(
-            expected_update_calls, any_order=True)
-        mock_create_ordered_product.assert_called_once_with(
-            order=self.order, product_id=3, quantity=2,)
+        self.order_service.update_ordered_products(
+            order=self.order, products=products)
+
+        self.assertEqual(
+            dict(self.order.orderedproduct_set.values_list(
+                "product_id", "count")),
+            {1: 4, 3: 2},
+        )
 
 
 class OrderServiceSimplifyProductsTestCase(TestCase):
@@ -344,6 +337,7 @@ class OrderServiceConfirmTestCase(TestCase):
             "comment": "This is a test order",
         }
 
+    @patch.object(services.OrderedProductService, "add_to_product_sales")
     @patch.object(services.OrderedProductService, "refresh_price_from_product")
     @patch.object(services.OrderedProductService, "deduct_amount_from_product")
     @patch.object(services.OrderService, "edit", )
@@ -355,7 +349,8 @@ class OrderServiceConfirmTestCase(TestCase):
             mock_parse_order_data,
             mock_edit,
             mock_deduct,
-            mock_refresh_price
+            mock_refresh_price,
+            mock_add_sales,
     ):
 
         order = models.Order.objects.get(pk=self.order_id)
@@ -369,12 +364,54 @@ class OrderServiceConfirmTestCase(TestCase):
 
         mock_deduct.assert_called_once_with(
             ord_prod_qs=ComparableOrderedProductQuerySet(order))
+        mock_add_sales.assert_called_once_with(
+            ord_prod_qs=ComparableOrderedProductQuerySet(order))
         self.assertEqual(
             mock_refresh_price.call_count, len(order.orderedproduct_set.all()))
 
         order.refresh_from_db()
         self.assertEqual(order.status, models.Order.Statuses.ACCEPTED)
 
+    @patch.object(services.OrderedProductService, "add_to_product_sales")
+    @patch.object(services.OrderedProductService, "refresh_price_from_product")
+    @patch.object(services.OrderedProductService, "deduct_amount_from_product")
+    @patch.object(selectors.OrderSelector, "get_editing_order_of_user")
+    def test_confirm_saves_costs(
+            self,
+            mock_get_editing_order_of_user,
+            mock_deduct,
+            mock_refresh_price,
+            mock_add_sales,
+    ):
+        d_conf_services.DynamicConfigService().set_default_config()
+        mock_get_editing_order_of_user.return_value = models.Order.objects \
+            .prefetch_related("orderedproduct_set") \
+            .get(pk=self.order_id)
+        order_data = {
+            "deliveryType": models.Order.DeliveryTypes.EXPRESS,
+            "paymentType": models.Order.PaymentTypes.ONLINE,
+            "address": "123 Main St",
+        }
+        self.order_service.confirm(
+            order_id=self.order_id, user=self.user, order_data=order_data)
+
+        order = models.Order.objects.get(pk=self.order_id)
+        expected_costs = selectors.OrderSelector().calculate_costs(order)
+        self.assertEqual(order.items_total, 200)
+        self.assertEqual(order.items_total, expected_costs["items_total"])
+        self.assertEqual(order.delivery_cost, expected_costs["delivery_cost"])
+        self.assertEqual(order.total_cost, expected_costs["total_cost"])
+
+        # saved costs don't depend on later changes of delivery settings
+        config = DynamicConfig.objects.get(pk=1)
+        config.express_delivery_extra_charge += 100
+        config.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                selectors.OrderSelector().get_total_cost(order=order),
+                expected_costs["total_cost"],
+            )
+
     def test_confirm_nonexisting_order(self):
         with self.assertRaises(Http404):
             self.order_service.confirm(
@@ -489,6 +526,28 @@ class OrderServiceRejectTestCase(TestCase):
             ord_prod_qs=ComparableOrderedProductQuerySet(order=self.order)
         )
 
+    @patch("orders.services.OrderedProductService"
+           ".subtract_from_product_sales")
+    @patch("orders.services.OrderedProductService.return_ordered_products")
+    def test_reject_accepted_order_subtracts_sales(
+            self, mock_return_ord_prod, mock_subtract_sales):
+        self.order.status = models.Order.Statuses.ACCEPTED
+        self.order.save()
+
+        self.order_service.reject(self.order.id)
+
+        mock_subtract_sales.assert_called_once_with(
+            ord_prod_qs=ComparableOrderedProductQuerySet(order=self.order))
+
+    @patch("orders.services.OrderedProductService"
+           ".subtract_from_product_sales")
+    @patch("orders.services.OrderedProductService.return_ordered_products")
+    def test_reject_not_accepted_order_does_not_subtract_sales(
+            self, mock_return_ord_prod, mock_subtract_sales):
+        self.order_service.reject(self.order.id)
+
+        mock_subtract_sales.assert_not_called()
+
     def test_reject_nonexisting_order(self):
         with self.assertRaises(models.Order.DoesNotExist):
             self.order_service.reject(9999)
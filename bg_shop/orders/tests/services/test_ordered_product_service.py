@@ -1,264 +1,96 @@
 from decimal import Decimal
 from unittest.mock import patch
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
 
-from orders import services, models, selectors
+from orders import services, models
 from shop import models as shop_models
 
 
-class CreateOrderedProductTestCase(TestCase):
-    fixtures = [
-        "test_user",
-        "test_product",
-    ]
-
-    def setUp(self):
-        self.order = models.Order.objects.create(user_id=1)
-        self.product_id = 1
-        self.quantity = 3
-        self.service = services.OrderedProductService()
-
-    @patch.object(services.OrderedProductService, 'refresh_price_from_product')
-    def test_create_ordered_product_with_commit_true(self, mock_refresh_price):
-        ordered_product_count_before = models.OrderedProduct.objects.count()
-
-        ordered_product = self.service.create_ordered_product(
-            order=self.order,
-            product_id=self.product_id,
-            quantity=self.quantity,
-            commit=True,
-        )
-
-        ordered_product_count_after = models.OrderedProduct.objects.count()
-        self.assertEqual(
-            ordered_product_count_after, ordered_product_count_before + 1)
-        self.assertEqual(ordered_product.order, self.order)
-        self.assertEqual(ordered_product.product_id, self.product_id)
-        self.assertEqual(ordered_product.count, self.quantity)
-        mock_refresh_price.assert_called_once_with(
-            ordered_product=ordered_product, commit=False)
-
-    @patch.object(services.OrderedProductService, 'refresh_price_from_product')
-    def test_create_ordered_product_with_commit_false(self, mock_refresh_price):
-        ordered_product_count_before = models.OrderedProduct.objects.count()
-
-        ordered_product = self.service.create_ordered_product(
-            order=self.order,
-            product_id=self.product_id,
-            quantity=self.quantity,
-            commit=False,
-        )
-
-        ordered_product_count_after = models.OrderedProduct.objects.count()
-        self.assertEqual(
-            ordered_product_count_after, ordered_product_count_before)
-        with self.assertRaises(models.OrderedProduct.DoesNotExist):
-            models.OrderedProduct.objects.get(
-                order=self.order, product_id=self.product_id)
-        self.assertEqual(ordered_product.order, self.order)
-        self.assertEqual(ordered_product.product_id, self.product_id)
-        self.assertEqual(ordered_product.count, self.quantity)
-        mock_refresh_price.assert_called_once_with(
-            ordered_product=ordered_product, commit=False)
-
-    @patch.object(services.OrderedProductService, 'refresh_price_from_product')
-    def test_create_ordered_product_with_wrong_params(
-            self, mock_refresh_price):
-        ordered_product_count_before = models.OrderedProduct.objects.count()
-        with self.assertRaises(ValidationError):
-            self.service.create_ordered_product(
-                order=self.order,
-                product_id=self.product_id,
-                quantity=(-1),
-                commit=True,
-            )
-        ordered_product_count_after = models.OrderedProduct.objects.count()
-        self.assertEqual(
-            ordered_product_count_after, ordered_product_count_before)
-
-
-class AddItemTestCase(TestCase):
-    fixtures = [
-        "test_user",
-        "test_product",
-        "test_order",
-    ]
-
-    def setUp(self):
-        self.order = models.Order.objects.get(pk=1)
-        self.product_id = 1
-        self.service = services.OrderedProductService()
-
-    @patch.object(services.OrderedProductService, 'reduce_or_delete')
-    @patch.object(
-        selectors.OrderedProductSelector, 'get_ordered_product_from_order')
-    def test_add_item_override_quantity_true(
-            self, mock_get_ordered_product,
-            mock_reduce_or_delete,
-    ):
-        mock_get_ordered_product.return_value = models.OrderedProduct(
-            order=self.order, product_id=self.product_id, count=2
-        )
-        quantity = 3
-        self.service.add_item(
-            order=self.order,
-            product_id=self.product_id,
-            quantity=quantity,
-            override_quantity=True,
-        )
-        ordered_product = models.OrderedProduct.objects.get(
-            order=self.order, product_id=self.product_id)
-        mock_get_ordered_product.assert_called_once_with(
-            order=self.order, product_id=self.product_id)
-        self.assertEqual(ordered_product.count, quantity)
-        mock_reduce_or_delete.assert_not_called()
-
-    @patch.object(services.OrderedProductService, 'reduce_or_delete')
-    @patch.object(
-        selectors.OrderedProductSelector, 'get_ordered_product_from_order')
-    def test_add_item_override_quantity_false(
-            self,
-            mock_get_ordered_product,
-            mock_reduce_or_delete
-    ):
-        mock_get_ordered_product.return_value = models.OrderedProduct(
-            order=self.order, product_id=self.product_id, count=2
-        )
-        quantity = 3
-        self.service.add_item(
-            order=self.order,
-            product_id=self.product_id,
-            quantity=quantity,
-            override_quantity=False,
-        )
-        ordered_product = models.OrderedProduct.objects.get(
-            order=self.order, product_id=self.product_id)
-        mock_get_ordered_product.assert_called_once_with(
-            order=self.order, product_id=self.product_id)
-        self.assertEqual(ordered_product.count, 5)
-        mock_reduce_or_delete.assert_not_called()
-
-    @patch.object(services.OrderedProductService, 'reduce_or_delete')
-    @patch.object(
-        selectors.OrderedProductSelector, 'get_ordered_product_from_order')
-    def test_add_item_with_negative_quantity(
-            self,
-            mock_get_ordered_product,
-            mock_reduce_or_delete
-    ):
-        mock_get_ordered_product.return_value = models.OrderedProduct(
-            order=self.order, product_id=self.product_id, count=5
-        )
-
-        self.service.add_item(
-            order=self.order,
-            product_id=self.product_id,
-            quantity=-4,
-            override_quantity=True,
-        )
-
-        mock_reduce_or_delete.assert_called_once_with(
-            order=self.order, product_id=self.product_id, quantity=4
-        )
-        mock_get_ordered_product.assert_not_called()
-
-    @patch.object(services.OrderedProductService, 'reduce_or_delete')
-    @patch.object(
-        selectors.OrderedProductSelector, 'get_ordered_product_from_order')
-    def test_add_item_without_existing_ordered_product(
-            self,
-            mock_get_ordered_product,
-            mock_reduce_or_delete
-    ):
-        mock_get_ordered_product.return_value = None
-        quantity = 3
-        self.service.add_item(
-            order=self.order,
-            product_id=self.product_id,
-            quantity=quantity,
-            override_quantity=False,
-        )
-        mock_get_ordered_product.assert_called_once_with(
-            order=self.order, product_id=self.product_id)
-        ordered_product = models.OrderedProduct.objects.get(
-            order=self.order, product_id=self.product_id)
-        self.assertEqual(ordered_product.count, quantity)
-        mock_reduce_or_delete.assert_not_called()
-
-
-class ReduceOrDeleteTestCase(TestCase):
+class ReconcileTestCase(TestCase):
     fixtures = [
         "test_user",
         "test_product",
         "test_order",
+        "test_ordered_product",
     ]
 
     def setUp(self):
+        # order 1 has product 1 (3 items) and product 2 (2 items)
         self.order = models.Order.objects.get(pk=1)
-        self.product_id = 1
-        self.quantity = 2
         self.service = services.OrderedProductService()
 
-    @patch.object(
-        selectors.OrderedProductSelector, 'get_ordered_product_from_order')
-    def test_reduce_or_delete_quantity_less_than_ordered_product_count(
-            self, mock_get_ordered_product):
-        ordered_product = models.OrderedProduct.objects.create(
-            order=self.order, product_id=self.product_id, count=3,
+    def get_items(self) -> dict[int, tuple[int, Decimal]]:
+        return {
+            product_id: (count, price) for product_id, count, price in
+            self.order.orderedproduct_set.values_list(
+                "product_id", "count", "price")
+        }
+
+    def test_reconcile_applies_difference(self):
+        shop_models.Sale.objects.create(
+            product_id=3,
+            discount=50,
+            date_from="2000-01-01",
+            date_to="2100-01-01",
         )
-        mock_get_ordered_product.return_value = ordered_product
-        ordered_product_count_before = ordered_product.count
-
-        self.service.reduce_or_delete(
-            order=self.order,
-            product_id=self.product_id,
-            quantity=self.quantity,
-        )
-
-        ordered_product.refresh_from_db()
-        self.assertEqual(
-            ordered_product.count, ordered_product_count_before - self.quantity
-        )
-        mock_get_ordered_product.assert_called_once_with(
-            order=self.order, product_id=self.product_id)
-
-    @patch.object(
-        selectors.OrderedProductSelector, 'get_ordered_product_from_order')
-    def test_reduce_or_delete_quantity_greater_than_ordered_product_count(
-            self, mock_get_ordered_product):
-        ordered_product = models.OrderedProduct.objects.create(
-            order=self.order, product_id=self.product_id, count=self.quantity,
-        )
-        mock_get_ordered_product.return_value = ordered_product
-
-        self.service.reduce_or_delete(
-            order=self.order,
-            product_id=self.product_id,
-            quantity=self.quantity + 1,
-        )
-
-        with self.assertRaises(models.OrderedProduct.DoesNotExist):
-            models.OrderedProduct.objects.get(
-                order=self.order, product_id=self.product_id
+        products = shop_models.Product.objects.in_bulk([1, 3])
+
+        self.service.reconcile(order=self.order, quantities={1: 5, 3: 2})
+
+        self.assertEqual(self.get_items(), {
+            1: (5, products[1].price),
+            3: (2, round(products[3].price / 2, 2)),
+        })
+
+    def test_reconcile_number_of_queries_is_constant(self):
+        def count_queries(quantities):
+            with CaptureQueriesContext(connection) as context:
+                self.service.reconcile(
+                    order=self.order, quantities=quantities)
+            return len(context.captured_queries)
+
+        small = count_queries({1: 1, 3: 1})
+        new_products = shop_models.Product.objects.bulk_create([
+            shop_models.Product(
+                title=f"product {i}",
+                release_date="2023-01-01",
+                price=i,
             )
-        mock_get_ordered_product.assert_called_once_with(
-            order=self.order, product_id=self.product_id)
-
-    @patch.object(
-        selectors.OrderedProductSelector, 'get_ordered_product_from_order')
-    def test_reduce_or_delete_non_existing_ordered_product(
-            self, mock_get_ordered_product):
-        mock_get_ordered_product.return_value = None
-        with self.assertRaises(models.OrderedProduct.DoesNotExist):
-            self.service.reduce_or_delete(
-                order=self.order,
-                product_id=self.product_id,
-                quantity=self.quantity,
-            )
-        mock_get_ordered_product.assert_called_once_with(
-            order=self.order, product_id=self.product_id)
+            for i in range(20)
+        ])
+        quantities = {product.pk: 2 for product in new_products}
+        quantities.update({2: 3, 3: 4})
+        large = count_queries(quantities)
+
+        self.assertEqual(small, large)
+        self.assertEqual(self.get_items().keys(), quantities.keys())
+
+    def test_reconcile_without_changes_does_not_write(self):
+        quantities = {
+            product_id: count for product_id, (count, _) in
+            self.get_items().items()
+        }
+        self.service.reconcile(order=self.order, quantities=quantities)
+
+        with CaptureQueriesContext(connection) as context:
+            self.service.reconcile(order=self.order, quantities=quantities)
+
+        sql = [query["sql"] for query in context.captured_queries]
+        self.assertFalse(
+            [q for q in sql if q.startswith(("INSERT", "UPDATE", "DELETE"))])
+
+    def test_reconcile_with_wrong_params(self):
+        items_before = self.get_items()
+        for quantities in ({1: -1}, {1: 1, 100: 1}):
+            with self.subTest(quantities=quantities):
+                with self.assertRaises(ValidationError):
+                    self.service.reconcile(
+                        order=self.order, quantities=quantities)
+                self.assertEqual(self.get_items(), items_before)
 
 
 class RefreshPriceFromProductTestCase(TestCase):
@@ -377,6 +209,16 @@ class DeductAmountFromProductTestCase(TestCase):
             initial_count_2,
         )
 
+    def test_deduct_amount_query_count_does_not_depend_on_products(self):
+        with CaptureQueriesContext(connection) as one_product:
+            self.service.deduct_amount_from_product(
+                ord_prod_qs=self.ordered_products.filter(pk=1))
+        with CaptureQueriesContext(connection) as two_products:
+            self.service.deduct_amount_from_product(
+                ord_prod_qs=self.ordered_products)
+
+        self.assertEqual(len(one_product), len(two_products))
+
 
 class ReturnOrderedProductsTestCase(TestCase):
     fixtures = [
@@ -416,4 +258,64 @@ class ReturnOrderedProductsTestCase(TestCase):
             ord_prod_qs=models.OrderedProduct.objects.filter(pk=999))
         mock_product_save.assert_not_called()
 
+    def test_return_ordered_products_does_not_save_products(self):
+        with patch.object(shop_models.Product, "save") as mock_product_save:
+            self.service.return_ordered_products(
+                ord_prod_qs=self.ordered_products)
+        mock_product_save.assert_not_called()
 
+
+class ProductSalesTestCase(TestCase):
+    fixtures = [
+        "test_user",
+        "test_product",
+        "test_order",
+        "test_ordered_product",
+    ]
+
+    def setUp(self):
+        self.service = services.OrderedProductService()
+        # order 1 contains product 1 (3 items) and product 2 (2 items)
+        self.ordered_products = models.OrderedProduct.objects.filter(
+            order_id=1)
+
+    def test_add_to_product_sales(self):
+        self.service.add_to_product_sales(ord_prod_qs=self.ordered_products)
+        self.service.add_to_product_sales(ord_prod_qs=self.ordered_products)
+
+        product_1 = shop_models.Product.objects.get(pk=1)
+        product_2 = shop_models.Product.objects.get(pk=2)
+        self.assertEqual(
+            (product_1.units_sold, product_1.order_count), (6, 2))
+        self.assertEqual(
+            (product_2.units_sold, product_2.order_count), (4, 2))
+
+    def test_add_to_product_sales_by_one_query(self):
+        with self.assertNumQueries(2):  # select ordered products, update
+            self.service.add_to_product_sales(
+                ord_prod_qs=self.ordered_products)
+
+    def test_subtract_from_product_sales(self):
+        self.service.add_to_product_sales(ord_prod_qs=self.ordered_products)
+        self.service.subtract_from_product_sales(
+            ord_prod_qs=self.ordered_products)
+
+        product_1 = shop_models.Product.objects.get(pk=1)
+        self.assertEqual(
+            (product_1.units_sold, product_1.order_count), (0, 0))
+
+    def test_refresh_product_sales(self):
+        models.Order.objects.filter(pk__in=[1, 2]).update(
+            status=models.Order.Statuses.ACCEPTED)
+        shop_models.Product.objects.filter(pk=1).update(
+            units_sold=100, order_count=100)
+
+        updated = self.service.refresh_product_sales()
+
+        self.assertEqual(updated, shop_models.Product.objects.count())
+        product_1 = shop_models.Product.objects.get(pk=1)
+        product_3 = shop_models.Product.objects.get(pk=3)
+        self.assertEqual(
+            (product_1.units_sold, product_1.order_count), (6, 2))
+        self.assertEqual(
+            (product_3.units_sold, product_3.order_count), (0, 0))
@@ -0,0 +1,25 @@
+from django.test import TestCase
+
+from orders import models
+from orders.tasks import reconcile_product_sales
+from shop import models as shop_models
+
+
+class ReconcileProductSalesTestCase(TestCase):
+    fixtures = [
+        "test_user",
+        "test_product",
+        "test_order",
+        "test_ordered_product",
+    ]
+
+    def test_reconcile_product_sales(self):
+        models.Order.objects.filter(pk=1).update(
+            status=models.Order.Statuses.COMPLETED)
+
+        updated = reconcile_product_sales()
+
+        self.assertEqual(updated, shop_models.Product.objects.count())
+        product_1 = shop_models.Product.objects.get(pk=1)
+        self.assertEqual(product_1.units_sold, 3)
+        self.assertEqual(product_1.order_count, 1)
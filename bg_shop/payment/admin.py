@@ -1,9 +1,62 @@
 from django.contrib import admin
-from payment import models
+from django.utils.translation import gettext_lazy as _
+
+from common import admin as common_admin
+from payment import models, services
 
 
 @admin.register(models.Payment)
 class PaymentAdmin(admin.ModelAdmin):
-    ...
+    list_display = ("pk", "order", "service", "payment_id")
+    list_display_links = ("pk", "order")
+    list_select_related = ("order",)
+    search_fields = ("=payment_id", "=order__id")
+    autocomplete_fields = ("order",)
+    show_full_result_count = False
+    paginator = common_admin.EstimatedCountPaginator
+
 
+@admin.register(models.WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = (
+        "payment_id",
+        "order_id",
+        "status",
+        "state",
+        "attempts",
+        "received_at",
+        "processed_at",
+    )
+    list_filter = ("state", "status")
+    search_fields = ("=payment_id", "=order_id")
+    # backed by "webhook_event_received_idx"
+    date_hierarchy = "received_at"
+    show_full_result_count = False
+    paginator = common_admin.EstimatedCountPaginator
+    readonly_fields = (
+        "payment_id",
+        "order_id",
+        "status",
+        "payload",
+        "state",
+        "attempts",
+        "error",
+        "received_at",
+        "processed_at",
+    )
+    actions = ["replay_events"]
 
+    @admin.action(description=_("Replay events"))
+    def replay_events(self, request, queryset) -> None:
+        """Returns failed and skipped events to pending."""
+        service = services.WebhookEventService()
+        number = service.replay(
+            states=[
+                models.WebhookEvent.States.FAILED,
+                models.WebhookEvent.States.SKIPPED,
+            ],
+            payment_ids=list(queryset.values_list("payment_id", flat=True)),
+        )
+        service.schedule()
+        self.message_user(
+            request, _("%d events are returned to pending.") % number)
@@ -0,0 +1,101 @@
+"""
+HTTP client of the fake payment service: calls of payment webhooks.
+
+One requests.Session per process keeps a pool of keep-alive connections
+(webhooks of all payments are on the same host), every call has connect
+and read timeouts, so a slow webhook can not block a Celery worker.
+Retries are made by the task (see payment.tasks), the client only
+tells retryable errors from final ones.
+"""
+
+import os
+import threading
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+
+# responses after which the call may succeed later
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class WebhookError(Exception):
+    """Webhook call failed."""
+
+
+class RetryableWebhookError(WebhookError):
+    """Connection error, timeout or temporary error of the webhook."""
+
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+def create_session() -> requests.Session:
+    """Session with pool of connections of PAYMENT_HTTP_POOL_SIZE."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.PAYMENT_HTTP_POOL_SIZE,
+        pool_maxsize=settings.PAYMENT_HTTP_POOL_SIZE,
+        max_retries=0,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Session of current process, created by the first call (connections
+    of the parent process are not used after fork of Celery workers).
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = create_session()
+            _session_pid = os.getpid()
+        return _session
+
+
+def close_session() -> None:
+    """Closes connections of the session."""
+    global _session
+    with _session_lock:
+        if _session is not None and _session_pid == os.getpid():
+            _session.close()
+        _session = None
+
+
+def send_webhook(
+        url: str,
+        body: dict[str, Any],
+) -> requests.Response:
+    """
+    Sends result of payment to the webhook.
+    :param url: webhook url
+    :param body: json payload
+    :return: response with not retryable status
+    :raise RetryableWebhookError: call can be retried
+    """
+    headers = {
+        "PAYMENT_SERVICE_SIGNATURE": settings.PAYMENT_SERVICE_SIGNATURE,
+    }
+    try:
+        response = get_session().post(
+            url,
+            json=body,
+            headers=headers,
+            timeout=(
+                settings.PAYMENT_WEBHOOK_CONNECT_TIMEOUT,
+                settings.PAYMENT_WEBHOOK_READ_TIMEOUT,
+            ),
+        )
+    except (requests.ConnectionError, requests.Timeout) as exc:
+        raise RetryableWebhookError(f"{url}: {exc}") from exc
+    if response.status_code in RETRY_STATUSES:
+        raise RetryableWebhookError(
+            f"{url}: status {response.status_code}")
+    return response
@@ -0,0 +1,154 @@
+"""
+Local fake of the payment webhook for tests and benchmarks
+of payment.tasks.
+
+HTTP server in a background thread answers calls with configured
+latency and failures (random or the first N calls), keeps connections
+alive (HTTP/1.1) and records calls. Repeated calls with the same
+payment_id are answered as successful but are not delivered again,
+like the webhook does.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+WEBHOOK_PATH = "/api/payment/webhook/"
+
+
+class FakePaymentGateway:
+    """
+    Usage:
+        with FakePaymentGateway(latency=0.05, failure_rate=0.2) as gateway:
+            third_party_payment_service(url=gateway.url, ...)
+        gateway.stats()
+    """
+
+    def __init__(
+            self,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            failure_rate: float = 0.0,
+            fail_first: int = 0,
+            failure_status: int = 503,
+            seed: Optional[int] = None,
+    ) -> None:
+        """
+        :param latency: delay of every response (sec)
+        :param jitter: random extra delay up to this value (sec)
+        :param failure_rate: part (0 - 1) of calls answered
+            by failure_status
+        :param fail_first: number of first calls that fail
+        :param failure_status: status of failed calls
+        :param seed: seed of random failures and jitter
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.failure_status = failure_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        # [{"payment_id": ..., "body": ..., "status": ..., "duplicate": ...}]
+        self.calls: list[dict[str, Any]] = []
+        self.delivered: dict[str, dict] = {}
+        self.connections = 0
+
+    @property
+    def url(self) -> str:
+        """Webhook url of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{WEBHOOK_PATH}"
+
+    def start(self) -> "FakePaymentGateway":
+        """Starts server on a free port of localhost."""
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self) -> "FakePaymentGateway":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def stats(self) -> dict[str, int]:
+        """Numbers of calls, failed calls, duplicates and connections."""
+        with self._lock:
+            return {
+                "calls": len(self.calls),
+                "failures": sum(
+                    1 for call in self.calls
+                    if call["status"] == self.failure_status),
+                "delivered": len(self.delivered),
+                "duplicates": sum(
+                    1 for call in self.calls if call["duplicate"]),
+                "connections": self.connections,
+            }
+
+    def handle_call(self, body: dict) -> int:
+        """
+        Sleeps and decides the result of the call.
+        :param body: json payload of the call
+        :return: status of response
+        """
+        payment_id = body.get("payment_id", "")
+        time.sleep(self.latency + self._random.uniform(0, self.jitter))
+        with self._lock:
+            failed = len(self.calls) < self.fail_first \
+                or self._random.random() < self.failure_rate
+            duplicate = not failed and payment_id in self.delivered
+            status = self.failure_status if failed else 200
+            if not failed and not duplicate:
+                self.delivered[payment_id] = body
+            self.calls.append({
+                "payment_id": payment_id,
+                "body": body,
+                "status": status,
+                "duplicate": duplicate,
+            })
+        return status
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with gateway._lock:
+                    gateway.connections += 1
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                status = gateway.handle_call(body)
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
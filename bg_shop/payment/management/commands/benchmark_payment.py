@@ -0,0 +1,117 @@
+"""
+Benchmarks payment.tasks.third_party_payment_service against the local
+fake payment gateway with latency and failures.
+
+Tasks are run eagerly by threads (like Celery workers with threads),
+eager retries are made at once, so backoff delays are not included
+in the time. --new-connections makes a new HTTP session for every call
+to compare with the pool of keep-alive connections.
+"""
+
+import contextlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from api.management.commands.benchmark_api import PERCENTILES, percentile
+from payment import client
+from payment.fake_gateway import FakePaymentGateway
+from payment.tasks import third_party_payment_service
+
+
+class Command(BaseCommand):
+    help = "Measures throughput and retries of payment webhook calls " \
+           "with the fake payment gateway."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-n", "--payments",
+            type=int,
+            default=200,
+            help="Number of payments.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Number of parallel tasks.",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.02,
+            help="Latency of the gateway (sec).",
+        )
+        parser.add_argument(
+            "--jitter",
+            type=float,
+            default=0.01,
+            help="Random extra latency of the gateway (sec).",
+        )
+        parser.add_argument(
+            "--failure-rate",
+            type=float,
+            default=0.1,
+            help="Part (0 - 1) of calls answered by 503.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Seed of random failures.",
+        )
+        parser.add_argument(
+            "--new-connections",
+            action="store_true",
+            help="New connection for every payment.",
+        )
+
+    def handle(self, *args, **options):
+        gateway = FakePaymentGateway(
+            latency=options["latency"],
+            jitter=options["jitter"],
+            failure_rate=options["failure_rate"],
+            seed=options["seed"],
+        )
+        client.close_session()
+
+        def pay(order_id: int) -> tuple[float, bool]:
+            started = time.perf_counter()
+            result = third_party_payment_service.apply(kwargs={
+                "url": gateway.url,
+                "order_id": order_id,
+                "card_number": "12345678",
+                "payment": Decimal("1.00"),
+            })
+            return time.perf_counter() - started, result.successful()
+
+        sessions = mock.patch.object(
+            client, "get_session", client.create_session) \
+            if options["new_connections"] else contextlib.nullcontext()
+
+        with gateway, sessions, override_settings(PAYMENT_WEBHOOK_URL=None):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(options["concurrency"]) as executor:
+                results = list(
+                    executor.map(pay, range(1, options["payments"] + 1)))
+            elapsed = time.perf_counter() - started
+        client.close_session()
+
+        latencies = [latency for latency, _ in results]
+        stats = gateway.stats()
+        self.stdout.write(
+            f"{options['payments']} payments in {elapsed:.3f} s, "
+            f"{options['payments'] / elapsed:.1f} payments/s")
+        self.stdout.write(", ".join(
+            f"p{percent} {percentile(latencies, percent) * 1000:.1f} ms"
+            for percent in PERCENTILES))
+        self.stdout.write(
+            f"calls {stats['calls']}, failed calls {stats['failures']}, "
+            f"delivered {stats['delivered']}, "
+            f"duplicates {stats['duplicates']}, "
+            f"failed payments {sum(1 for _, ok in results if not ok)}, "
+            f"connections {stats['connections']}")
@@ -0,0 +1,62 @@
+"""Reprocesses payment WebhookEvents (see payment.services)."""
+
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from payment import models, services, tasks
+
+STATES = {
+    "failed": models.WebhookEvent.States.FAILED,
+    "skipped": models.WebhookEvent.States.SKIPPED,
+    "pending": models.WebhookEvent.States.PENDING,
+}
+
+
+class Command(BaseCommand):
+    help = "Returns failed (or skipped) webhook events to pending and " \
+           "processes all pending events, e.g. stuck ones which task " \
+           "was lost."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--state",
+            action="append",
+            choices=STATES,
+            help="States of events to replay (can be repeated), "
+                 "default - failed.",
+        )
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=None,
+            help="Only events received more than N minutes ago.",
+        )
+        parser.add_argument(
+            "--payment-id",
+            action="append",
+            help="Only these events (can be repeated).",
+        )
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Process by Celery task instead of this process.",
+        )
+
+    def handle(self, *args, **options):
+        service = services.WebhookEventService()
+        older_than = datetime.timedelta(minutes=options["older_than"]) \
+            if options["older_than"] is not None else None
+        replayed = service.replay(
+            states=[STATES[state] for state in options["state"] or ["failed"]],
+            older_than=older_than,
+            payment_ids=options["payment_id"],
+        )
+        self.stdout.write(f"{replayed} events are returned to pending.")
+
+        if options["enqueue"]:
+            tasks.process_webhook_events.delay()
+            self.stdout.write("Processing is enqueued.")
+        else:
+            processed = service.process_pending()
+            self.stdout.write(f"{processed} events are processed.")
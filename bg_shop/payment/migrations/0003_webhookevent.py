@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0002_remove_payment_code_remove_payment_name_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_id', models.CharField(max_length=255, unique=True, verbose_name='payment id')),
+                ('order_id', models.PositiveIntegerField(db_index=True, verbose_name='order id')),
+                ('status', models.CharField(max_length=20, verbose_name='payment status')),
+                ('payload', models.JSONField(default=dict, verbose_name='payload')),
+                ('state', models.CharField(choices=[('PE', 'pending'), ('PR', 'processed'), ('SK', 'skipped'), ('FA', 'failed')], default='PE', max_length=2, verbose_name='state')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='attempts')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('received_at', models.DateTimeField(auto_now_add=True, verbose_name='received at')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='processed at')),
+            ],
+            options={
+                'verbose_name': 'webhook event',
+                'verbose_name_plural': 'webhook events',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='webhookevent',
+            index=models.Index(fields=['state', 'received_at'], name='webhook_event_state_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0003_webhookevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='webhookevent',
+            index=models.Index(fields=['received_at'], name='webhook_event_received_idx'),
+        ),
+    ]
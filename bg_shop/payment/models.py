@@ -22,3 +22,74 @@ class Payment(models.Model):
         verbose_name=_("service")
     )
     payment_id = models.CharField(max_length=255, verbose_name=_("payment id"))
+
+
+class WebhookEvent(models.Model):
+    """
+    Call of payment webhook, saved as is and applied to the Order later
+    by WebhookEventService (in batches, by Celery task).
+
+    Repeated calls with the same payment_id are dropped by the unique
+    constraint.
+    """
+
+    class Meta:
+        verbose_name = _("webhook event")
+        verbose_name_plural = _("webhook events")
+        indexes = [
+            models.Index(
+                fields=["state", "received_at"],
+                name="webhook_event_state_idx",
+            ),
+            # date hierarchy of admin
+            models.Index(
+                fields=["received_at"],
+                name="webhook_event_received_idx",
+            ),
+        ]
+
+    class States(models.TextChoices):
+        PENDING = "PE", _("pending")
+        PROCESSED = "PR", _("processed")
+        # the transition is not possible (e.g. the order is already paid)
+        SKIPPED = "SK", _("skipped")
+        FAILED = "FA", _("failed")
+
+    payment_id = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name=_("payment id"),
+    )
+    # not a foreign key: events of unknown orders are saved and failed
+    order_id = models.PositiveIntegerField(
+        db_index=True,
+        verbose_name=_("order id"),
+    )
+    status = models.CharField(
+        max_length=20,
+        verbose_name=_("payment status"),
+    )
+    payload = models.JSONField(default=dict, verbose_name=_("payload"))
+    state = models.CharField(
+        max_length=2,
+        choices=States.choices,
+        default=States.PENDING,
+        verbose_name=_("state"),
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_("attempts"),
+    )
+    error = models.TextField(blank=True, verbose_name=_("error"))
+    received_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("received at"),
+    )
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("processed at"),
+    )
+
+    def __str__(self) -> str:
+        return f"{self.payment_id} ({self.get_state_display()})"
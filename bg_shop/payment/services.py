@@ -0,0 +1,187 @@
+"""Business logic related to payment."""
+
+import datetime
+import logging
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from orders import models as order_models
+from orders import services as order_services
+from payment import enums, models
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookEventService:
+    """
+    Calls of payment webhook are saved as WebhookEvents and applied
+    to Orders later in batches, so the webhook responds at once,
+    and repeated or parallel calls do not change the Order twice.
+    """
+    States = models.WebhookEvent.States
+
+    def record(
+            self,
+            payment_id: str,
+            order_id: int,
+            status: str,
+            payload: dict,
+    ) -> bool:
+        """
+        Saves the event and schedules processing after commit.
+        :param payment_id: id of payment in payment system (unique)
+        :param order_id: Order.pk
+        :param status: value of PaymentStatuses
+        :param payload: body of webhook call (without signature)
+        :return: False if the event with payment_id is already saved
+        """
+        event = models.WebhookEvent(
+            payment_id=payment_id,
+            order_id=order_id,
+            status=status,
+            payload=payload,
+        )
+        try:
+            with transaction.atomic():
+                event.save()
+        except IntegrityError:
+            logger.info("Webhook event %s is a duplicate.", payment_id)
+            return False
+        self.schedule()
+        return True
+
+    @staticmethod
+    def schedule() -> None:
+        """Starts processing of pending events after commit."""
+        from payment import tasks
+
+        transaction.on_commit(lambda: tasks.process_webhook_events.delay())
+
+    def process_pending(
+            self,
+            batch_size: Optional[int] = None,
+            max_batches: Optional[int] = None,
+    ) -> int:
+        """
+        Processes pending events batch by batch while there are any.
+        :param batch_size: PAYMENT_WEBHOOK_BATCH_SIZE by default
+        :param max_batches: limit of batches, None - unlimited
+        :return: number of processed events
+        """
+        batch_size = batch_size or settings.PAYMENT_WEBHOOK_BATCH_SIZE
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            processed = self.process_batch(batch_size)
+            total += processed
+            batches += 1
+            if processed < batch_size:
+                break
+        return total
+
+    def process_batch(self, batch_size: int) -> int:
+        """
+        Applies the oldest pending events in one transaction.
+
+        Events are locked with SKIP LOCKED, so parallel tasks take
+        different batches, Orders of the batch are locked (in order
+        of pk). Every event is applied in its own savepoint, an error
+        marks only this event as failed.
+        :param batch_size: max number of events
+        :return: number of processed events
+        """
+        with transaction.atomic():
+            events = list(
+                models.WebhookEvent.objects
+                .select_for_update(skip_locked=True)
+                .filter(state=self.States.PENDING)
+                .order_by("received_at", "pk")[:batch_size]
+            )
+            if not events:
+                return 0
+            orders = {
+                order.pk: order for order in
+                order_models.Order.objects
+                .select_for_update()
+                .filter(pk__in={event.order_id for event in events})
+                .order_by("pk")
+            }
+            now = timezone.now()
+            for event in events:
+                order = orders.get(event.order_id)
+                event.attempts += 1
+                event.error = ""
+                try:
+                    with transaction.atomic():
+                        event.state = self._apply(event, order)
+                except Exception as exc:
+                    logger.exception(
+                        "Webhook event %s failed.", event.payment_id)
+                    event.state = self.States.FAILED
+                    event.error = repr(exc)
+                    if order is not None:
+                        order.refresh_from_db()
+                event.processed_at = now
+            models.WebhookEvent.objects.bulk_update(
+                events, ["state", "attempts", "error", "processed_at"])
+        return len(events)
+
+    def _apply(
+            self,
+            event: models.WebhookEvent,
+            order: Optional[order_models.Order],
+    ) -> str:
+        """
+        Transition of the locked Order by the event.
+        :return: new state of the event
+        """
+        if order is None:
+            event.error = "Order does not exist."
+            return self.States.FAILED
+        if order.paid:
+            # e.g. the second payment of the order
+            event.error = "Order is already paid."
+            return self.States.SKIPPED
+
+        match event.status:
+            case enums.PaymentStatuses.SUCCESS.value:
+                models.Payment.objects.create(
+                    order=order, payment_id=event.payment_id)
+                order.paid = True
+                order.save(update_fields=["paid"])
+            case enums.PaymentStatuses.FAIL.value:
+                if order.status == order_models.Order.Statuses.REJECTED:
+                    event.error = "Order is already rejected."
+                    return self.States.SKIPPED
+                order_services.OrderService().reject(order_id=order.pk)
+                order.status = order_models.Order.Statuses.REJECTED
+            case _:
+                event.error = f"Unknown payment status `{event.status}`."
+                return self.States.FAILED
+        return self.States.PROCESSED
+
+    def replay(
+            self,
+            states: Iterable[str] = (States.FAILED,),
+            older_than: Optional[datetime.timedelta] = None,
+            payment_ids: Optional[Iterable[str]] = None,
+    ) -> int:
+        """
+        Returns events to pending, so they are processed again
+        (e.g. failed ones after a fix, or skipped ones).
+        :param states: states of events to replay
+        :param older_than: only events received before now - older_than
+        :param payment_ids: only these events
+        :return: number of events returned to pending
+        """
+        queryset = models.WebhookEvent.objects.filter(state__in=states)
+        if older_than is not None:
+            queryset = queryset.filter(
+                received_at__lte=timezone.now() - older_than)
+        if payment_ids is not None:
+            queryset = queryset.filter(payment_id__in=payment_ids)
+        return queryset.update(
+            state=self.States.PENDING, error="", processed_at=None)
@@ -1,29 +1,46 @@
 """Celery tasks related to payment."""
 
-import requests
+import logging
+from typing import Optional
 
 from decimal import Decimal
 from celery import shared_task
 from django.conf import settings
 
-from payment import enums
+from payment import client, enums, services
 
+logger = logging.getLogger(__name__)
 
-@shared_task
+
+@shared_task(
+    bind=True,
+    autoretry_for=(client.RetryableWebhookError,),
+    max_retries=settings.PAYMENT_WEBHOOK_MAX_RETRIES,
+    retry_backoff=settings.PAYMENT_WEBHOOK_RETRY_BACKOFF,
+    retry_backoff_max=settings.PAYMENT_WEBHOOK_RETRY_BACKOFF_MAX,
+    retry_jitter=True,
+)
 def third_party_payment_service(
-        url: str, order_id: int, card_number: str, payment: Decimal) -> None:
+        self,
+        url: str,
+        order_id: int,
+        card_number: str,
+        payment: Decimal,
+) -> int:
     """
     Imitation of handling by payment service.
 
     If card_number is even or ends with not 0, then send SUCCESS status,
     otherwise send FAIL.
-    :param url: webhook url.
+    Failed calls of the webhook (connection errors, timeouts, 429, 5xx)
+    are retried with exponential backoff and jitter. Retries send
+    the same payment_id, the webhook skips repeated calls by it.
+    :param url: webhook url (PAYMENT_WEBHOOK_URL is used if it is set).
     :param order_id: Order.pk.
     :param card_number: fake card number. must be 8 numbers.
     :param payment: payment for the goods.
-    :return: None
+    :return: status code of the webhook response.
     """
-    headers = {'PAYMENT_SERVICE_SIGNATURE': settings.PAYMENT_SERVICE_SIGNATURE}
     body = {
         "PAYMENT_SERVICE_SIGNATURE": settings.PAYMENT_SERVICE_SIGNATURE,
         "order_id": order_id,
@@ -37,12 +54,31 @@ def third_party_payment_service(
     card_number = int(card_number)
     if (card_number % 2 == 0) and (card_number % 10 != 0):
         body["status"] = enums.PaymentStatuses.SUCCESS.value
-        print("Accepted")
     else:
         body["status"] = enums.PaymentStatuses.FAIL.value
         body["errors"].append("wrong number")
-        print("Rejected")
 
-    url = "http://app:8000/api/payment/webhook/"  # temp for testing
-    response = requests.post(url, json=body, headers=headers)
-    print(response)  # todo add to log
+    url = settings.PAYMENT_WEBHOOK_URL or url
+    response = client.send_webhook(url, body=body)
+    if response.ok:
+        logger.info(
+            "Payment of order %s: %s.", order_id, body["status"])
+    else:
+        # e.g. 400 - the payload is rejected by the webhook
+        logger.warning(
+            "Payment of order %s: webhook responded %s.",
+            order_id, response.status_code)
+    return response.status_code
+
+
+@shared_task
+def process_webhook_events(max_batches: Optional[int] = None) -> int:
+    """
+    Applies pending WebhookEvents to Orders in batches
+    (see WebhookEventService). Scheduled after every webhook call
+    and periodically for events which task was lost.
+    :param max_batches: limit of batches, None - while there are events.
+    :return: number of processed events.
+    """
+    return services.WebhookEventService().process_pending(
+        max_batches=max_batches)
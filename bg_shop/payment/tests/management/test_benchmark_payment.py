@@ -0,0 +1,23 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class BenchmarkPaymentTestCase(TestCase):
+    def test_payments_are_delivered(self):
+        out = io.StringIO()
+        call_command(
+            "benchmark_payment",
+            "--payments", "10",
+            "--concurrency", "2",
+            "--latency", "0",
+            "--jitter", "0",
+            "--failure-rate", "0.3",
+            "--seed", "1",
+            stdout=out,
+        )
+
+        self.assertIn("10 payments", out.getvalue())
+        self.assertIn("delivered 10,", out.getvalue())
+        self.assertIn("failed payments 0,", out.getvalue())
@@ -0,0 +1,178 @@
+import datetime
+import io
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, tag
+from django.utils import timezone
+
+from orders import models as order_models
+from payment import enums, models, services
+
+UserModel = get_user_model()
+
+SUCCESS = enums.PaymentStatuses.SUCCESS.value
+FAIL = enums.PaymentStatuses.FAIL.value
+States = models.WebhookEvent.States
+
+
+def create_event(order_id, status=SUCCESS, payment_id=None, **kwargs):
+    return models.WebhookEvent.objects.create(
+        payment_id=payment_id or f"{order_id}-{status}",
+        order_id=order_id,
+        status=status,
+        **kwargs,
+    )
+
+
+class WebhookEventServiceTestCase(TestCase):
+    def setUp(self):
+        self.service = services.WebhookEventService()
+        user = UserModel.objects.create_user(username="test_user")
+        self.orders = [
+            order_models.Order.objects.create(user=user) for _ in range(3)]
+
+    def test_events_are_applied(self):
+        paid = create_event(self.orders[0].pk, SUCCESS)
+        rejected = create_event(self.orders[1].pk, FAIL)
+
+        processed = self.service.process_pending()
+
+        self.assertEqual(processed, 2)
+        self.orders[0].refresh_from_db()
+        self.orders[1].refresh_from_db()
+        self.assertTrue(self.orders[0].paid)
+        self.assertEqual(
+            self.orders[1].status, order_models.Order.Statuses.REJECTED)
+        for event in (paid, rejected):
+            event.refresh_from_db()
+            self.assertEqual(event.state, States.PROCESSED)
+            self.assertEqual(event.attempts, 1)
+            self.assertIsNotNone(event.processed_at)
+
+    def test_second_payment_of_order_is_skipped(self):
+        order_id = self.orders[0].pk
+        create_event(order_id, SUCCESS, payment_id="first")
+        second = create_event(order_id, SUCCESS, payment_id="second")
+        late_fail = create_event(order_id, FAIL, payment_id="late")
+
+        self.service.process_pending()
+
+        self.assertEqual(
+            models.Payment.objects.get(order_id=order_id).payment_id,
+            "first")
+        for event in (second, late_fail):
+            event.refresh_from_db()
+            self.assertEqual(event.state, States.SKIPPED)
+            self.assertEqual(event.error, "Order is already paid.")
+
+    def test_failed_event_does_not_stop_batch(self):
+        # Payment exists, but the order is not paid
+        models.Payment.objects.create(
+            order=self.orders[0], payment_id="manual")
+        broken = create_event(self.orders[0].pk, SUCCESS)
+        unknown_order = create_event(999999, SUCCESS)
+        good = create_event(self.orders[1].pk, SUCCESS)
+
+        self.service.process_pending()
+
+        broken.refresh_from_db()
+        unknown_order.refresh_from_db()
+        good.refresh_from_db()
+        self.assertEqual(broken.state, States.FAILED)
+        self.assertIn("IntegrityError", broken.error)
+        self.assertEqual(unknown_order.state, States.FAILED)
+        self.assertEqual(good.state, States.PROCESSED)
+        self.orders[0].refresh_from_db()
+        self.assertFalse(self.orders[0].paid)
+
+    def test_batches(self):
+        for order in self.orders:
+            create_event(order.pk, SUCCESS)
+
+        processed = self.service.process_pending(
+            batch_size=2, max_batches=1)
+
+        self.assertEqual(processed, 2)
+        self.assertEqual(
+            models.WebhookEvent.objects.filter(state=States.PENDING).count(),
+            1)
+        self.assertEqual(self.service.process_pending(batch_size=2), 1)
+
+    def test_record_drops_duplicates(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            first = self.service.record(
+                "payment", self.orders[0].pk, SUCCESS, {})
+            second = self.service.record(
+                "payment", self.orders[0].pk, SUCCESS, {})
+
+        self.assertTrue(first)
+        self.assertFalse(second)
+        self.assertEqual(models.WebhookEvent.objects.count(), 1)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_replay(self):
+        failed = create_event(
+            self.orders[0].pk, SUCCESS, state=States.FAILED, error="error")
+        skipped = create_event(self.orders[1].pk, FAIL, state=States.SKIPPED)
+        recent = create_event(self.orders[2].pk, SUCCESS, state=States.FAILED)
+        models.WebhookEvent.objects.filter(pk__in=[failed.pk, skipped.pk]) \
+            .update(received_at=timezone.now() - datetime.timedelta(hours=1))
+
+        out = io.StringIO()
+        call_command(
+            "replay_webhook_events",
+            "--older-than", "30",
+            "--state", "failed",
+            "--state", "skipped",
+            stdout=out,
+        )
+
+        self.assertIn("2 events are returned to pending.", out.getvalue())
+        self.assertIn("2 events are processed.", out.getvalue())
+        failed.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual(failed.state, States.PROCESSED)
+        self.assertEqual(failed.error, "")
+        self.assertEqual(recent.state, States.FAILED)
+        self.orders[0].refresh_from_db()
+        self.assertTrue(self.orders[0].paid)
+
+
+@tag("postgres")
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Row locks are needed, run with postgres settings (e.g. settings.local).",
+)
+class WebhookEventConcurrencyTestCase(TransactionTestCase):
+    """Parallel tasks must not apply events of the same order twice."""
+    orders_number = 10
+    workers = 4
+
+    def test_parallel_processing(self):
+        user = UserModel.objects.create_user(username="test_user")
+        for i in range(self.orders_number):
+            order = order_models.Order.objects.create(user=user)
+            # two different payments of the same order
+            create_event(order.pk, SUCCESS, payment_id=f"{i}-first")
+            create_event(order.pk, SUCCESS, payment_id=f"{i}-second")
+
+        def process(_) -> int:
+            try:
+                return services.WebhookEventService().process_pending(
+                    batch_size=3)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(self.workers) as executor:
+            processed = sum(executor.map(process, range(self.workers)))
+
+        self.assertEqual(processed, self.orders_number * 2)
+        self.assertEqual(
+            models.Payment.objects.count(), self.orders_number)
+        self.assertEqual(
+            models.WebhookEvent.objects.filter(state=States.SKIPPED).count(),
+            self.orders_number)
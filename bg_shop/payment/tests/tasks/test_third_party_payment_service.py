@@ -1,73 +1,130 @@
 from decimal import Decimal
-from unittest.mock import patch
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.conf import settings
+from payment import client
+from payment.fake_gateway import FakePaymentGateway
 from payment.tasks import third_party_payment_service
 from payment.enums import PaymentStatuses
 
 
+@override_settings(PAYMENT_WEBHOOK_URL=None)
 class ThirdPartyPaymentServiceTestCase(TestCase):
-    @patch("requests.post")
-    def test_success(self, mock_post):
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {
-            "status": PaymentStatuses.SUCCESS.value
-        }
-        order_id = 1
-        card_number = "12345678"
-        payment = Decimal("100.00")
+    def setUp(self):
+        self.gateway = FakePaymentGateway().start()
+        self.addCleanup(self.gateway.stop)
+        self.addCleanup(client.close_session)
+        client.close_session()
 
-        third_party_payment_service(
-            url="http://example.com/api/payment/webhook/",
+    def pay(self, order_id=1, card_number="12345678", **kwargs):
+        return third_party_payment_service(
+            url=self.gateway.url,
             order_id=order_id,
             card_number=card_number,
-            payment=payment,
+            payment=Decimal("100.00"),
+            **kwargs,
         )
+
+    def test_success(self):
+        status = self.pay(order_id=1, card_number="12345678")
+
+        self.assertEqual(status, 200)
         expected_body = {
             "PAYMENT_SERVICE_SIGNATURE": settings.PAYMENT_SERVICE_SIGNATURE,
-            "order_id": order_id,
+            "order_id": 1,
             "status": PaymentStatuses.SUCCESS.value,
             "errors": [],
-            "payment_id": f"{order_id}test_payment_id",
+            "payment_id": "1test_payment_id",
         }
-        fake_url = "http://app:8000/api/payment/webhook/"
-        mock_post.assert_called_once_with(
-            fake_url,
-            json=expected_body,
-            headers={
-                "PAYMENT_SERVICE_SIGNATURE": settings.PAYMENT_SERVICE_SIGNATURE
-            },
-        )
+        self.assertEqual(list(self.gateway.delivered.values()),
+                         [expected_body])
 
-    @patch("requests.post")
-    def test_failure(self, mock_post):
-        mock_post.return_value.status_code = 400
-        mock_post.return_value.json.return_value = {
-            "status": PaymentStatuses.FAIL.value,
-            "errors": ["wrong number"],
-        }
-        order_id = 2
-        card_number = "87654321"
-        payment = Decimal("50.00")
+    def test_failure(self):
+        self.pay(order_id=2, card_number="87654321")
 
-        third_party_payment_service(
-            url="http://example.com/api/payment/webhook/",
-            order_id=order_id,
-            card_number=card_number,
-            payment=payment,
-        )
         expected_body = {
             "PAYMENT_SERVICE_SIGNATURE": settings.PAYMENT_SERVICE_SIGNATURE,
-            "order_id": order_id,
+            "order_id": 2,
             "status": PaymentStatuses.FAIL.value,
             "errors": ["wrong number"],
-            "payment_id": f"{order_id}test_payment_id",
+            "payment_id": "2test_payment_id",
         }
-        fake_url = "http://app:8000/api/payment/webhook/"
-        mock_post.assert_called_once_with(
-            fake_url,
-            json=expected_body,
-            headers={
-                "PAYMENT_SERVICE_SIGNATURE": settings.PAYMENT_SERVICE_SIGNATURE
-            },
+        self.assertEqual(list(self.gateway.delivered.values()),
+                         [expected_body])
+
+    def test_webhook_url_from_settings(self):
+        with override_settings(PAYMENT_WEBHOOK_URL=self.gateway.url):
+            third_party_payment_service(
+                url="http://app:8000/api/payment/webhook/",
+                order_id=1,
+                card_number="12345678",
+                payment=Decimal("100.00"),
+            )
+
+        self.assertEqual(self.gateway.stats()["delivered"], 1)
+
+    def test_connections_are_reused(self):
+        for order_id in range(3):
+            self.pay(order_id=order_id)
+
+        self.assertEqual(self.gateway.stats()["calls"], 3)
+        self.assertEqual(self.gateway.stats()["connections"], 1)
+
+    def test_retries_send_the_same_payment_id(self):
+        self.gateway.fail_first = 2
+
+        result = third_party_payment_service.apply(kwargs={
+            "url": self.gateway.url,
+            "order_id": 1,
+            "card_number": "12345678",
+            "payment": Decimal("100.00"),
+        })
+
+        self.assertEqual(result.get(), 200)
+        payment_ids = [call["payment_id"] for call in self.gateway.calls]
+        self.assertEqual(payment_ids, ["1test_payment_id"] * 3)
+        self.assertEqual(self.gateway.stats()["delivered"], 1)
+
+    def test_repeated_call_is_not_delivered_twice(self):
+        self.pay(order_id=1)
+        self.pay(order_id=1)
+
+        self.assertEqual(self.gateway.stats()["delivered"], 1)
+        self.assertEqual(self.gateway.stats()["duplicates"], 1)
+
+    def test_retries_are_limited(self):
+        self.gateway.fail_first = 100
+
+        result = third_party_payment_service.apply(kwargs={
+            "url": self.gateway.url,
+            "order_id": 1,
+            "card_number": "12345678",
+            "payment": Decimal("100.00"),
+        })
+
+        self.assertTrue(result.failed())
+        self.assertIsInstance(result.result, client.RetryableWebhookError)
+        self.assertEqual(
+            self.gateway.stats()["calls"],
+            third_party_payment_service.max_retries + 1,
         )
+
+    def test_client_error_is_not_retried(self):
+        self.gateway.fail_first = 1
+        self.gateway.failure_status = 400
+
+        result = third_party_payment_service.apply(kwargs={
+            "url": self.gateway.url,
+            "order_id": 1,
+            "card_number": "12345678",
+            "payment": Decimal("100.00"),
+        })
+
+        self.assertEqual(result.get(), 400)
+        self.assertEqual(self.gateway.stats()["calls"], 1)
+
+    @override_settings(PAYMENT_WEBHOOK_READ_TIMEOUT=0.05)
+    def test_slow_webhook_is_timed_out(self):
+        self.gateway.latency = 0.5
+
+        with self.assertRaises(client.RetryableWebhookError):
+            self.pay()
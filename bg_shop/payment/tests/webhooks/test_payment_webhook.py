@@ -1,11 +1,12 @@
 import json
+from unittest.mock import patch
 from django.test import TestCase
 from django.urls import reverse
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from orders import models as order_models
 from payment import models as payment_models
-from payment import enums
+from payment import enums, tasks
 
 User = get_user_model()
 
@@ -15,41 +16,95 @@ class PaymentWebhookTestCase(TestCase):
         self.user = User.objects.create_user(username='testuser',
                                              password='testpassword')
         self.order = order_models.Order.objects.create(user=self.user)
+        # task is run in the test instead of Celery
+        patcher = patch.object(
+            tasks.process_webhook_events, "delay",
+            side_effect=tasks.process_webhook_events)
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
 
-    def test_successful_payment_webhook(self):
-        payload = {
+    def post(self, payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('api:payment:payment-webhook'),
+                                    data=payload,
+                                    content_type='application/json')
+
+    def get_payload(self, status, **kwargs):
+        return {
             "PAYMENT_SERVICE_SIGNATURE": settings.PAYMENT_SERVICE_SIGNATURE,
-            "status": enums.PaymentStatuses.SUCCESS.value,
+            "status": status,
             "order_id": self.order.pk,
-            "payment_id": f"{self.order.pk}test_payment_id"
+            "payment_id": f"{self.order.pk}test_payment_id",
+            **kwargs,
         }
-        response = self.client.post(reverse('api:payment:payment-webhook'),
-                                    data=payload,
-                                    content_type='application/json')
 
-        self.assertEqual(response.status_code, 200)
+    def test_successful_payment_webhook(self):
+        payload = self.get_payload(enums.PaymentStatuses.SUCCESS.value)
+
+        response = self.post(payload)
+
+        self.assertEqual(response.status_code, 202)
         self.order.refresh_from_db()
         self.assertTrue(self.order.paid)
         payment = payment_models.Payment.objects.get(order=self.order)
         self.assertEqual(payment.payment_id, f"{self.order.pk}test_payment_id")
+        event = payment_models.WebhookEvent.objects.get()
+        self.assertEqual(
+            event.state, payment_models.WebhookEvent.States.PROCESSED)
+        self.assertNotIn("PAYMENT_SERVICE_SIGNATURE", event.payload)
 
     def test_failed_payment_webhook(self):
-        payload = {
-            "PAYMENT_SERVICE_SIGNATURE": settings.PAYMENT_SERVICE_SIGNATURE,
-            "status": enums.PaymentStatuses.FAIL.value,
-            "order_id": self.order.pk,
-            "payment_id": f"{self.order.pk}test_payment_id"
-        }
+        payload = self.get_payload(enums.PaymentStatuses.FAIL.value)
 
-        response = self.client.post(reverse('api:payment:payment-webhook'),
-                                    data=payload,
-                                    content_type='application/json')
-        self.assertEqual(response.status_code, 200)
+        response = self.post(payload)
+
+        self.assertEqual(response.status_code, 202)
         self.order.refresh_from_db()
         self.assertFalse(self.order.paid)
         self.assertEqual(self.order.status,
                          order_models.Order.Statuses.REJECTED)
 
+    def test_repeated_call_is_applied_once(self):
+        payload = self.get_payload(enums.PaymentStatuses.SUCCESS.value)
+
+        first = self.post(payload)
+        second = self.post(payload)
+
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 202)
+        self.assertEqual(payment_models.WebhookEvent.objects.count(), 1)
+        self.assertEqual(payment_models.Payment.objects.count(), 1)
+        self.assertEqual(self.delay.call_count, 1)
+
+    def test_response_does_not_wait_for_processing(self):
+        payload = self.get_payload(enums.PaymentStatuses.SUCCESS.value)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                reverse('api:payment:payment-webhook'),
+                data=payload,
+                content_type='application/json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(callbacks), 1)
+        self.order.refresh_from_db()
+        self.assertFalse(self.order.paid)
+
+    def test_invalid_payload(self):
+        payloads = [
+            self.get_payload("unknown"),
+            self.get_payload(
+                enums.PaymentStatuses.SUCCESS.value, order_id="1"),
+            self.get_payload(
+                enums.PaymentStatuses.SUCCESS.value, payment_id=""),
+            [],
+        ]
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                response = self.post(payload)
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(payment_models.WebhookEvent.objects.exists())
+
     def test_invalid_signature(self):
         payload = {
             "PAYMENT_SERVICE_SIGNATURE": "invalid_signature",
@@ -66,3 +121,4 @@ class PaymentWebhookTestCase(TestCase):
         self.assertEqual(response.status_code, 403)
         self.order.refresh_from_db()
         self.assertFalse(self.order.paid)
+        self.assertFalse(payment_models.WebhookEvent.objects.exists())
@@ -5,11 +5,12 @@ import json
 from django.conf import settings
 from django.http import HttpResponse, HttpRequest
 from django.views.decorators.csrf import csrf_exempt
-from django.db import transaction
 
-from orders import models as order_models
-from orders import services as order_services
-from payment import models, enums
+from payment import enums, models, services
+
+PAYMENT_STATUSES = frozenset(status.value for status in enums.PaymentStatuses)
+PAYMENT_ID_MAX_LENGTH = models.WebhookEvent._meta.get_field(
+    "payment_id").max_length
 
 
 @csrf_exempt
@@ -17,38 +18,38 @@ def payment_webhook(request: HttpRequest) -> HttpResponse:
     """
     Handle request from payment system.
 
-    If success, creates Payment for Order and set Order.paid to True,
-    otherwise rejects order.
+    The call is saved as WebhookEvent and applied to Order later
+    by Celery task (if success, creates Payment for Order and set
+    Order.paid to True, otherwise rejects order), see
+    WebhookEventService. Repeated calls with the same payment_id
+    are accepted, but are not applied again.
     :param request: call from payment system after handling payment.
-    :return: response for payment system.
+    :return: 202 for accepted call, 400 for invalid payload,
+        403 for wrong signature.
     """
-    payload = json.loads(request.body)
-    sign = payload.get('PAYMENT_SERVICE_SIGNATURE', None)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return HttpResponse(status=400)
+    if not isinstance(payload, dict):
+        return HttpResponse(status=400)
+    sign = payload.pop('PAYMENT_SERVICE_SIGNATURE', None)
     if sign != settings.PAYMENT_SERVICE_SIGNATURE:
         return HttpResponse(status=403)
 
     status = payload.get("status", None)
     order_id = payload.get("order_id", None)
-    # errors = payload.get("errors", None)
     payment_id = payload.get("payment_id", None)
-
-    order = order_models.Order.objects.get(pk=order_id)
-    if order.paid:
-        return HttpResponse(status=409)
-    with transaction.atomic():
-        match status:
-            case enums.PaymentStatuses.SUCCESS.value:
-                order.paid = True
-                order.full_clean()
-                order.save()
-                payment = models.Payment(
-                    order_id=order_id,
-                    payment_id=payment_id,)
-                payment.full_clean()
-                payment.save()
-            case enums.PaymentStatuses.FAIL.value:
-                order_services.OrderService().reject(order_id=order_id)
-            case _:
-                print(status)  # todo log
-                return HttpResponse(status=400)
-    return HttpResponse(status=200)
+    if status not in PAYMENT_STATUSES \
+            or type(order_id) is not int or order_id <= 0 \
+            or not isinstance(payment_id, str) \
+            or not 0 < len(payment_id) <= PAYMENT_ID_MAX_LENGTH:
+        return HttpResponse(status=400)
+
+    services.WebhookEventService().record(
+        payment_id=payment_id,
+        order_id=order_id,
+        status=status,
+        payload=payload,
+    )
+    return HttpResponse(status=202)
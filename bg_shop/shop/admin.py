@@ -1,20 +1,117 @@
+import io
+
 from django import forms
 from django.db import models as db_models
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.translation import gettext_lazy as _
 
+from common import admin as common_admin
 from shop import models, services
+from shop.services import catalog_services
+
+
+class CatalogImportForm(forms.Form):
+    file = forms.FileField(label=_("file"))
+    format = forms.ChoiceField(
+        label=_("format"),
+        choices=[(fmt, fmt) for fmt in catalog_services.FORMATS],
+    )
 
 
 @admin.register(models.Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'title', 'price', 'count', 'is_active',)
+    """Catalog can be imported and exported by links of change list."""
+    change_list_template = "admin/shop/product/change_list.html"
+    list_display = (
+        'pk', 'title', 'category', 'price', 'count', 'is_active',)
     list_display_links = ('pk', 'title',)
-
-
-class ProductInline(admin.TabularInline):
+    list_select_related = ('category',)
+    list_filter = ('is_active', 'limited_edition',)
+    # title is searched by trigram index on postgres
+    search_fields = ('=id', 'title',)
+    autocomplete_fields = ('category', 'images', 'tags', 'specifications',)
+    show_full_result_count = False
+    paginator = common_admin.EstimatedCountPaginator
+
+    def get_urls(self):
+        """Adds views of import and export of catalog."""
+        urls = [
+            path(
+                "export/",
+                self.admin_site.admin_view(self.export_view),
+                name="shop_product_export",
+            ),
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="shop_product_import",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def export_view(self, request):
+        """Streams all Products, `format` GET parameter - csv or jsonl."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        fmt = request.GET.get("format", "csv")
+        if fmt not in catalog_services.FORMATS:
+            return HttpResponseBadRequest(f"Unknown format `{fmt}`.")
+        service = services.CatalogExportService(fmt=fmt)
+        if isinstance(request, ASGIRequest):
+            content = service.aiter_lines()
+        else:
+            content = service.iter_lines()
+        response = StreamingHttpResponse(
+            content, content_type=catalog_services.CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = \
+            f'attachment; filename="catalog.{fmt}"'
+        return response
+
+    def import_view(self, request):
+        """Form of import, file is read and written by chunks."""
+        if not (self.has_add_permission(request)
+                and self.has_change_permission(request)):
+            raise PermissionDenied
+        form = CatalogImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            service = services.CatalogImportService(
+                fmt=form.cleaned_data["format"])
+            lines = io.TextIOWrapper(
+                form.cleaned_data["file"].file,
+                encoding="utf-8",
+                newline="",
+            )
+            result = service.import_lines(lines)
+            self.message_user(
+                request,
+                _("Products: %(created)d created, %(updated)d updated, "
+                  "%(skipped)d skipped.") % result,
+            )
+            for error in service.errors[:10]:
+                self.message_user(request, error, level=messages.WARNING)
+            return redirect("admin:shop_product_changelist")
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": _("Import catalog"),
+            "form": form,
+        }
+        return TemplateResponse(
+            request, "admin/shop/product/import_catalog.html", context)
+
+
+class ProductInline(common_admin.PaginatedInlineMixin, admin.TabularInline):
     model = models.Product
     fk_name = "category"
+    fields = ('title', 'price', 'count', 'is_active',)
+    readonly_fields = fields
+    show_change_link = True
     extra = 0
     can_delete = False
     max_num = 0
@@ -30,6 +127,7 @@ class CategoryAdmin(admin.ModelAdmin):
     readonly_fields = ("depth",)
     list_display = ('pk', 'title', 'parent_id', 'is_active')
     list_display_links = ('pk', 'title',)
+    search_fields = ('title',)
     actions = ["delete_categories", "mark_as_active", "mark_as_inactive"]
 
     def __init__(self, model, admin_site):
@@ -37,11 +135,6 @@ class CategoryAdmin(admin.ModelAdmin):
         self.obj_depth_for_formfield = None
         self.obj_pk_for_formfield = None
 
-    def get_queryset(self, request):
-        """Cashes related Products."""
-        qs = super().get_queryset(request)
-        return qs.prefetch_related('product_set')
-
     def save_model(self, request, obj, form: forms.Form, change):
         """Overrides for using service instead of model methods."""
         service = services.CategoryService()
@@ -62,22 +155,20 @@ class CategoryAdmin(admin.ModelAdmin):
     @admin.action(description=_("Delete categories"))
     def delete_categories(self, request, queryset) -> None:
         """To bulk delete Categories"""
-        for obj in queryset:
-            self.delete_model(request=request, obj=obj)
+        number = services.CategoryService().delete_many(queryset=queryset)
+        self.message_user(request, _("%d categories are deleted.") % number)
 
     @admin.action(description=_("Mark as active"))
     def mark_as_active(self, request, queryset) -> None:
         """Sets `is_active` field as True"""
-        for obj in queryset:
-            obj.is_active = True
-            obj.save()
+        services.CategoryService().set_active(
+            queryset=queryset, is_active=True)
 
     @admin.action(description=_("Mark as inactive"))
     def mark_as_inactive(self, request, queryset) -> None:
-        """Sets `is_active` field as True"""
-        for obj in queryset:
-            obj.is_active = False
-            obj.save()
+        """Sets `is_active` field as False"""
+        services.CategoryService().set_active(
+            queryset=queryset, is_active=False)
 
     def get_form(self, request, obj=None, **kwargs):
         """Overriden to add new fields to admin form
@@ -105,28 +196,60 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(models.Review)
 class ReviewAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'author', 'product', 'rate')
+    """Keeps denormalized rating of products up to date."""
+    list_display = ('pk', 'author', 'product', 'rate', 'date')
     list_display_links = ('pk',)
+    list_select_related = ('author', 'product')
+    autocomplete_fields = ('author', 'product')
+    show_full_result_count = False
+    paginator = common_admin.EstimatedCountPaginator
+
+    def save_model(self, request, obj, form: forms.Form, change):
+        """Overrides to recalculate rating of the changed products."""
+        super().save_model(request, obj, form, change)
+        product_ids = {obj.product_id}
+        if change and "product" in form.initial:
+            product_ids.add(form.initial["product"])
+        services.ReviewService.refresh_product_ratings(
+            product_ids=product_ids)
+
+    def delete_model(self, request, obj):
+        """Overrides for using service instead of model methods."""
+        services.ReviewService().delete_review(review=obj)
+
+    def delete_queryset(self, request, queryset):
+        """Overrides for using service instead of queryset methods."""
+        services.ReviewService().delete_reviews(queryset=queryset)
 
 
 @admin.register(models.Sale)
 class SaleAdmin(admin.ModelAdmin):
     list_display = ('pk', 'product', 'discount', 'date_from', 'date_to',)
     list_display_links = ('pk', 'product')
+    list_select_related = ('product',)
+    autocomplete_fields = ('product',)
+    show_full_result_count = False
 
 
 @admin.register(models.Specification)
 class SpecificationAdmin(admin.ModelAdmin):
     list_display = ('pk', 'name', 'value')
     list_display_links = ('pk', 'name')
+    search_fields = ('name', 'value')
+    show_full_result_count = False
 
 
 @admin.register(models.Tag)
 class TagAdmin(admin.ModelAdmin):
-    ...
+    list_display = ('pk', 'name')
+    list_display_links = ('pk', 'name')
+    search_fields = ('name',)
+    show_full_result_count = False
 
 
 @admin.register(models.Banner)
 class BannerAdmin(admin.ModelAdmin):
     list_display = ('pk', 'product',)
     list_display_links = ('pk', 'product')
+    list_select_related = ('product',)
+    autocomplete_fields = ('product',)
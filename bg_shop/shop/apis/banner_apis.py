@@ -2,15 +2,17 @@ from rest_framework import status, permissions, views
 from rest_framework import response as drf_response
 from rest_framework import request as drf_request
 
+from api import caching
 from shop import selectors
 from shop import serializers as shop_serializers
 
 
-class BannerApi(views.APIView):
+class BannerApi(caching.CachedResponseMixin, views.APIView):
     """
     Banners are products for prioritized displaying.
     """
     permission_classes = (permissions.AllowAny,)
+    cache_tags = ("banner", "product", "sale", "dynamic_config")
 
     def get(self, request: drf_request.Request) -> drf_response.Response:
         """
@@ -1,23 +1,26 @@
 from collections import OrderedDict
 
-from rest_framework import serializers, permissions, views
+from asgiref.sync import sync_to_async
+from rest_framework import serializers, permissions
 from rest_framework import response as drf_response
 from rest_framework import request as drf_request
 
+from api import async_views, caching
 from api import utils as api_utils
 from api import pagination
 from shop import selectors
 from shop import serializers as shop_serializers
 
 
-class CatalogApi(views.APIView):
+class CatalogApi(caching.CachedResponseMixin, async_views.AsyncAPIView):
     """
     For getting all active products with using filters and sort params.
     """
-    class Pagination(pagination.PageNumberPagination):
+    class Pagination(pagination.KeysetPagination):
         page_query_param = "currentPage"
         page_size_query_param = "limit"
         max_page_size = 50
+        count_mode = "cached"
 
     class QueryParamsSerializer(serializers.Serializer):
         """
@@ -36,6 +39,8 @@ class CatalogApi(views.APIView):
         # it's better to remove nested query params and rewrite frontend
         filter = FilterSerializer(required=False, allow_null=True,)
         currentPage = serializers.IntegerField(required=False, allow_null=True)
+        # `nextCursor` or `previousCursor` from previous response
+        cursor = serializers.CharField(required=False, allow_blank=True)
         sort = serializers.ChoiceField(
             choices=[
                 "rating",
@@ -43,7 +48,8 @@ class CatalogApi(views.APIView):
                 "reviews",
                 "date",
                 "title",
-                "popularity"
+                "popularity",
+                "relevance",
             ],
             required=False,
             allow_blank=True)
@@ -54,8 +60,13 @@ class CatalogApi(views.APIView):
         tags = serializers.ListField(child=serializers.IntegerField(), required=False)
 
     permission_classes = (permissions.AllowAny,)
+    cache_tags = (
+        "product", "sale", "category", "tag", "dynamic_config")
 
-    def get(self, request: drf_request.Request) -> drf_response.Response:
+    async def get(
+            self,
+            request: drf_request.Request,
+    ) -> drf_response.Response:
         """
         Filters must be nested in `filter` url query param using
         square brackets notation.
@@ -82,13 +93,15 @@ class CatalogApi(views.APIView):
         if tags := validated_params.get('tags', None):
             filter_params['tags'] = tags
 
-        catalog = selector.get_catalog(
+        # filters of categories and search hit db
+        catalog = await sync_to_async(selector.get_catalog)(
             filters=filter_params,
             sort_field=validated_params.get("sort", None),
             order=validated_params.get("sortType", None),
         )
 
-        return pagination.get_paginated_response(
+        # keyset pagination (with cached count) and serializer are sync
+        return await sync_to_async(pagination.get_paginated_response)(
             pagination_class=self.Pagination,
             serializer_class=output_serializer,
             queryset=catalog,
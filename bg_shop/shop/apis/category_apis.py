@@ -1,12 +1,17 @@
-from rest_framework import serializers, status, permissions, views
+import json
+
+from django.core.cache import cache
+from rest_framework import serializers, status, permissions
+from rest_framework.renderers import JSONRenderer
 from rest_framework import response as drf_response
 from rest_framework import request as drf_request
 
+from api import async_views, caching
 from shop import models, selectors
 from common import serializers as common_serializers
 
 
-class CategoryApi(views.APIView):
+class CategoryApi(caching.CachedResponseMixin, async_views.AsyncAPIView):
     """
     For representing of Category tree in a header.
     """
@@ -16,7 +21,11 @@ class CategoryApi(views.APIView):
         image = common_serializers.ImageSerializer(allow_null=True)
 
         def get_subcategories(self, obj):
-            if subcategories := obj.category_set.all():
+            # set by CategorySelector.get_category_tree
+            subcategories = getattr(obj, "subcategories", None)
+            if subcategories is None:
+                subcategories = obj.category_set.all()
+            if subcategories:
                 return CategoryApi.OutputSerializer(
                     subcategories, many=True,).data
             else:
@@ -28,16 +37,33 @@ class CategoryApi(views.APIView):
             depth = 10
 
     permission_classes = (permissions.AllowAny,)
+    cache_tags = ("category",)
 
-    def get(self, request: drf_request.Request) -> drf_response.Response:
+    async def get(
+            self,
+            request: drf_request.Request,
+    ) -> drf_response.Response:
         """
-        Returns tree of categories and subcategories.
+        Returns tree of active categories and subcategories.
+        Serialized tree is cached until any Category is changed.
         :param request: request
         :return: drf response
         """
         selector = selectors.CategorySelector()
-        categories = selector.get_root_categories_queryset()
-        serializer = self.OutputSerializer(
-            instance=categories, many=True)
-        return drf_response.Response(
-            data=serializer.data, status=status.HTTP_200_OK)
+        data = await cache.aget(selector.TREE_CACHE_KEY)
+        if data is None:
+            categories = await selector.aget_category_tree()
+            # the tree is loaded, serializer does not hit db
+            data = self.serialize_tree(categories)
+            await cache.aset(selector.TREE_CACHE_KEY, data, timeout=None)
+        return drf_response.Response(data=data, status=status.HTTP_200_OK)
+
+    @classmethod
+    def serialize_tree(cls, categories: list[models.Category]) -> list:
+        """
+        Serialized tree (it is cached, and primed by api.warmup).
+        :param categories: root categories from get_category_tree()
+        :return: plain structures, without references to the serializer
+        """
+        serializer = cls.OutputSerializer(instance=categories, many=True)
+        return json.loads(JSONRenderer().render(serializer.data))
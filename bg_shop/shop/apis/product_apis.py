@@ -6,14 +6,16 @@ from rest_framework import serializers as drf_serializers
 from rest_framework import response as drf_response
 from rest_framework import request as drf_request
 
-from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch
+from django.http import Http404
 from django.utils import timezone
 
+from api import async_views, caching
 from shop import models, selectors, serializers
 from common import serializers as common_serializers
 
 
-class ProductDetailApi(views.APIView):
+class ProductDetailApi(async_views.AsyncAPIView):
     """Detailed view of each product."""
 
     class OutputSerializer(drf_serializers.ModelSerializer):
@@ -91,7 +93,7 @@ class ProductDetailApi(views.APIView):
 
     permission_classes = (permissions.AllowAny,)
 
-    def get(
+    async def get(
             self,
             request: drf_request.Request,
             **kwargs
@@ -101,16 +103,26 @@ class ProductDetailApi(views.APIView):
         :param request:
         :return:
         """
-        instance = get_object_or_404(models.Product, pk=kwargs.get('id'))
-        serializer = self.OutputSerializer(
-            instance=instance)
+        queryset = models.Product.objects \
+            .prefetch_related("images", "tags") \
+            .prefetch_related(Prefetch(
+                "review_set",
+                queryset=models.Review.objects.select_related("author"),
+            ))
+        try:
+            instance = await queryset.aget(pk=kwargs.get('id'))
+        except models.Product.DoesNotExist:
+            raise Http404
+        # price and rating are selected by sync selectors
+        data = await async_views.serialize(self.OutputSerializer, instance)
         return drf_response.Response(
-            data=serializer.data, status=status.HTTP_200_OK)
+            data=data, status=status.HTTP_200_OK)
 
 
-class ProductPopularApi(views.APIView):
+class ProductPopularApi(caching.CachedResponseMixin, views.APIView):
     """Represents the best-selling products"""
     permission_classes = (permissions.AllowAny,)
+    cache_tags = ("product", "sale", "dynamic_config")
 
     def get(self, request: drf_request.Request) -> drf_response.Response:
         """
@@ -127,9 +139,10 @@ class ProductPopularApi(views.APIView):
             data=output_serializer.data, status=status.HTTP_200_OK)
 
 
-class ProductLimitedApi(views.APIView):
+class ProductLimitedApi(caching.CachedResponseMixin, views.APIView):
     """Represents products that are marked as limited"""
     permission_classes = (permissions.AllowAny,)
+    cache_tags = ("product", "sale", "dynamic_config")
 
     def get(self, request: drf_request.Request) -> drf_response.Response:
         """
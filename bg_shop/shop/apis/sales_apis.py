@@ -5,16 +5,18 @@ from rest_framework import serializers as drf_serializers
 from rest_framework import response as drf_response
 from rest_framework import request as drf_request
 
+from api import caching
 from api import pagination
 from shop import models, selectors
 from common import serializers as common_serializers
 
 
-class SalesApi(views.APIView):
+class SalesApi(caching.CachedResponseMixin, views.APIView):
     """Represents all active sales"""
-    class Pagination(pagination.PageNumberPagination):
+    class Pagination(pagination.KeysetPagination):
         page_query_param = "currentPage"
         page_size = 20
+        count_mode = "cached"
 
     class OutputSerializer(drf_serializers.Serializer):
         """For Sale model"""
@@ -34,6 +36,7 @@ class SalesApi(views.APIView):
             return sale_price
 
     permission_classes = (permissions.AllowAny,)
+    cache_tags = ("sale", "product")
 
     def get(self, request: drf_request.Request) -> drf_response.Response:
         """
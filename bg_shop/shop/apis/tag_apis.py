@@ -3,10 +3,11 @@ from rest_framework import serializers as drf_serializers
 from rest_framework import response as drf_response
 from rest_framework import request as drf_request
 
+from api import caching
 from shop import selectors
 
 
-class TagApi(views.APIView):
+class TagApi(caching.CachedResponseMixin, views.APIView):
     """Represents Tags to display in the catalog."""
     class QueryParamsSerializer(drf_serializers.Serializer):
         category = drf_serializers.IntegerField(required=False)
@@ -16,6 +17,7 @@ class TagApi(views.APIView):
         name = drf_serializers.CharField()
 
     permission_classes = (permissions.AllowAny,)
+    cache_tags = ("tag", "product", "category")
 
     def get(self, request: drf_request.Request) -> drf_response.Response:
         """
@@ -13,8 +13,8 @@ class BaseProductFilter(django_filters.FilterSet):
     It is necessary to annotate Product object with freeDelivery
     to use this filter.
     """
-    name = django_filters.CharFilter(
-        field_name='title', lookup_expr='icontains')
+    # full-text search, see ProductSearchSelector
+    name = django_filters.CharFilter(method="filter_search",)
     minPrice = django_filters.NumberFilter(
         field_name='price', lookup_expr='gte')
     maxPrice = django_filters.NumberFilter(
@@ -32,6 +32,20 @@ class BaseProductFilter(django_filters.FilterSet):
         model = models.Product
         fields = ()
 
+    def filter_search(self, queryset, name, value: str) -> db_models.QuerySet:
+        """
+        Full-text search by title, description, manufacturer, tags
+        and specifications.
+        :param queryset: qs of Products
+        :param name: doesn't meter
+        :param value: text entered by user
+        :return: filtered qs annotated with `search_rank`
+        """
+        if value:
+            return selectors.ProductSearchSelector().search(
+                queryset=queryset, query=value)
+        return queryset
+
     def filter_free_delivery(
             self, queryset, name, value: bool) -> db_models.QuerySet:
         """
@@ -0,0 +1,50 @@
+"""Streams catalog to CSV or JSON Lines file (see catalog_services)."""
+
+from django.core.management.base import BaseCommand
+
+from shop import services
+from shop.services import catalog_services
+
+
+class Command(BaseCommand):
+    help = "Exports Products with categories, tags, specifications " \
+           "and image references by chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default="-",
+            help="Output file, `-` - stdout (default).",
+        )
+        parser.add_argument(
+            "--format",
+            choices=catalog_services.FORMATS,
+            default=None,
+            help="Format of output, by default it is chosen by extension "
+                 "of the file (csv if unknown).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Products read by one query (CATALOG_CHUNK_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] \
+            or ("jsonl" if path.endswith(".jsonl") else "csv")
+        service = services.CatalogExportService(
+            fmt=fmt, chunk_size=options["chunk_size"])
+        if path == "-":
+            for line in service.iter_lines():
+                self.stdout.write(line, ending="")
+            return
+        number = -1 if fmt == "csv" else 0  # without header
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            for line in service.iter_lines():
+                file.write(line)
+                number += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"{number} products are exported to {path}."))
@@ -0,0 +1,53 @@
+"""Loads catalog from CSV or JSON Lines file (see catalog_services)."""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shop import services
+from shop.services import catalog_services
+
+
+class Command(BaseCommand):
+    help = "Imports Products with categories, tags, specifications " \
+           "and image references by chunks (rows with id are updated)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Input file, `-` - stdin.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=catalog_services.FORMATS,
+            default=None,
+            help="Format of input, by default it is chosen by extension "
+                 "of the file (csv if unknown).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Rows written in one transaction (CATALOG_CHUNK_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] \
+            or ("jsonl" if path.endswith(".jsonl") else "csv")
+        service = services.CatalogImportService(
+            fmt=fmt, chunk_size=options["chunk_size"])
+        if path == "-":
+            result = service.import_lines(sys.stdin)
+        else:
+            try:
+                with open(path, encoding="utf-8", newline="") as file:
+                    result = service.import_lines(file)
+            except OSError as exc:
+                raise CommandError(exc)
+
+        for error in service.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            "Products: {created} created, {updated} updated, "
+            "{skipped} skipped.".format(**result)))
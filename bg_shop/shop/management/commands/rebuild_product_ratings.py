@@ -0,0 +1,25 @@
+"""Recalculates denormalized rating columns of Products."""
+
+from django.core.management.base import BaseCommand
+
+from shop import services
+
+
+class Command(BaseCommand):
+    help = "Recalculates rating_sum, review_count and rating_avg " \
+           "of Products from Reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "product_ids",
+            nargs="*",
+            type=int,
+            help="Products to refresh (all if not passed).",
+        )
+
+    def handle(self, *args, **options):
+        product_ids = options["product_ids"] or None
+        updated = services.ReviewService.refresh_product_ratings(
+            product_ids=product_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f"Ratings of {updated} products are rebuilt."))
@@ -0,0 +1,25 @@
+"""Rebuilds search data of Products."""
+
+from django.core.management.base import BaseCommand
+
+from shop import services
+
+
+class Command(BaseCommand):
+    help = "Recalculates search_keywords and search_vector of Products."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "product_ids",
+            nargs="*",
+            type=int,
+            help="Products to refresh (all if not passed).",
+        )
+
+    def handle(self, *args, **options):
+        product_ids = options["product_ids"] or None
+        updated = services.ProductSearchService.refresh_search(
+            product_ids=product_ids)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Search data of {updated} products is rebuilt."))
@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-18 13:26
+
+from django.db import migrations, models
+
+
+def forwards_func(apps, schema_editor):
+    """Fill denormalized rating columns from existing reviews."""
+    Product = apps.get_model("shop", "Product")
+    Review = apps.get_model("shop", "Review")
+    db_alias = schema_editor.connection.alias
+    stats = Review.objects.using(db_alias) \
+        .values("product_id") \
+        .annotate(
+            rating_sum=models.Sum("rate"),
+            review_count=models.Count("id"),
+            rating_avg=models.Avg("rate"),
+        )
+    for row in stats:
+        Product.objects.using(db_alias) \
+            .filter(pk=row["product_id"]) \
+            .update(
+                rating_sum=row["rating_sum"],
+                review_count=row["review_count"],
+                rating_avg=row["rating_avg"],
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_alter_category_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='average rating'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.IntegerField(default=0, editable=False, verbose_name='rating sum'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='review_count',
+            field=models.IntegerField(db_index=True, default=0, editable=False, verbose_name='review count'),
+        ),
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
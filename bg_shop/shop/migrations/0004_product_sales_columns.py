@@ -0,0 +1,46 @@
+# Generated by Django 4.2 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+def forwards_func(apps, schema_editor):
+    """Fill denormalized sales columns from accepted and completed orders."""
+    Product = apps.get_model("shop", "Product")
+    OrderedProduct = apps.get_model("orders", "OrderedProduct")
+    db_alias = schema_editor.connection.alias
+    stats = OrderedProduct.objects.using(db_alias) \
+        .filter(order__status__in=["AC", "CO"]) \
+        .values("product_id") \
+        .annotate(
+            units_sold=models.Sum("count"),
+            order_count=models.Count("order_id", distinct=True),
+        )
+    for row in stats:
+        Product.objects.using(db_alias) \
+            .filter(pk=row["product_id"]) \
+            .update(
+                units_sold=row["units_sold"],
+                order_count=row["order_count"],
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_payment_type'),
+        ('shop', '0003_product_rating_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='order_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='order count'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='units_sold',
+            field=models.IntegerField(db_index=True, default=0, editable=False, verbose_name='units sold'),
+        ),
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 13:39
+
+from django.db import migrations, models
+
+
+def forwards_func(apps, schema_editor):
+    """Fill materialized paths of existing categories."""
+    Category = apps.get_model("shop", "Category")
+    db_alias = schema_editor.connection.alias
+    parents = dict(
+        Category.objects.using(db_alias).values_list("id", "parent_id"))
+
+    def get_path(category_id, visited=()):
+        parent_id = parents[category_id]
+        if parent_id is None or parent_id in visited:
+            return f"{category_id}/"
+        return get_path(parent_id, visited + (category_id,)) \
+            + f"{category_id}/"
+
+    for category_id in parents:
+        Category.objects.using(db_alias) \
+            .filter(pk=category_id) \
+            .update(path=get_path(category_id))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0004_product_sales_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255, verbose_name='path'),
+        ),
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2 on 2026-10-18 13:53
+
+from collections import defaultdict
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def create_indexes(apps, schema_editor):
+    """GIN indexes exist only on postgres, other db use InvertedIndex."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS shop_product_search_vector_gin "
+        "ON shop_product USING gin (search_vector)")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS shop_product_title_trgm "
+        "ON shop_product USING gin (title gin_trgm_ops)")
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "DROP INDEX IF EXISTS shop_product_search_vector_gin")
+    schema_editor.execute("DROP INDEX IF EXISTS shop_product_title_trgm")
+
+
+def forwards_func(apps, schema_editor):
+    """Fill search keywords and vector of existing products."""
+    Product = apps.get_model("shop", "Product")
+    db_alias = schema_editor.connection.alias
+    keywords = defaultdict(list)
+    tags = Product.tags.through.objects.using(db_alias) \
+        .order_by("tag__name") \
+        .values_list("product_id", "tag__name")
+    for product_id, name in tags:
+        keywords[product_id].append(name)
+    specifications = Product.specifications.through.objects.using(db_alias) \
+        .order_by("specification__name", "specification__value") \
+        .values_list(
+            "product_id", "specification__name", "specification__value")
+    for product_id, name, value in specifications:
+        keywords[product_id].extend((name, value))
+    for product_id, product_keywords in keywords.items():
+        Product.objects.using(db_alias) \
+            .filter(pk=product_id) \
+            .update(search_keywords=" ".join(product_keywords))
+
+    if schema_editor.connection.vendor == "postgresql":
+        SearchVector = django.contrib.postgres.search.SearchVector
+        config = settings.PRODUCT_SEARCH_CONFIG
+        Product.objects.using(db_alias).update(
+            search_vector=(
+                SearchVector("title", weight="A", config=config)
+                + SearchVector(
+                    "manufacturer", "search_keywords",
+                    weight="B", config=config)
+                + SearchVector("description", weight="C", config=config)
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0005_category_path'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='search_keywords',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='search keywords'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='search vector'),
+        ),
+        migrations.RunPython(create_indexes, drop_indexes),
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
@@ -56,6 +57,43 @@ class Product(models.Model):
             "Unselect this instead of deleting products."
         ),
     )
+    # Denormalized review statistics, maintained by ReviewService.
+    # Use `rebuild_product_ratings` command to recalculate them.
+    rating_sum = models.IntegerField(
+        default=0, editable=False, verbose_name=_("rating sum"))
+    review_count = models.IntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        verbose_name=_("review count"),
+    )
+    rating_avg = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name=_("average rating"),
+    )
+    # Denormalized sales statistics (only accepted and completed orders),
+    # maintained by OrderedProductService and reconciled by celery beat.
+    units_sold = models.IntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        verbose_name=_("units sold"),
+    )
+    order_count = models.IntegerField(
+        default=0, editable=False, verbose_name=_("order count"))
+    # Search data, maintained by ProductSearchService (see signals).
+    # Use `rebuild_search_index` command to recalculate them.
+    search_keywords = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name=_("search keywords"),
+    )
+    search_vector = SearchVectorField(
+        null=True, editable=False, verbose_name=_("search vector"))
 
     @property
     def short_description(self):
@@ -73,6 +111,7 @@ class Category(models.Model):
     MAX_DEPTH - how many edges can be between node and root
     (or level, counted from 0).
     Parent's depth must be lower than node's one (to avoid circular reference).
+    `path` is materialized path of the node (see CategoryService).
     """
     class Meta:
         verbose_name = _("category")
@@ -104,6 +143,16 @@ class Category(models.Model):
         default=0,
         verbose_name=_("depth")
     )
+    # Materialized path: ids of ancestors and own id, e.g. "1/5/12/".
+    # Maintained by CategoryService (on post_save), used to get
+    # all descendants by one query.
+    path = models.CharField(
+        max_length=255,
+        default="",
+        editable=False,
+        db_index=True,
+        verbose_name=_("path"),
+    )
     sort_index = models.SmallIntegerField(
         default=0, verbose_name=_("sort index"))
     is_active = models.BooleanField(
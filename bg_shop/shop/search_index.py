@@ -0,0 +1,156 @@
+"""
+Pure Python full-text index.
+
+It is a stand-in for postgres full-text search of Products
+(see ProductSearchSelector) on databases without tsvector and pg_trgm,
+e.g. SQLite in tests. Tokens are produced the same way as `simple`
+text search configuration does: lowercased words without stemming.
+"""
+
+import bisect
+import re
+from typing import Iterable, Optional
+
+TOKEN_RE = re.compile(r"\w+")
+
+# the same as default weights of postgres ts_rank
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """
+    Splits text into lowercased words.
+    :param text: any text
+    :return: list of tokens in original order
+    """
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def trigrams(word: str) -> set[str]:
+    """Trigrams of the word, padded as pg_trgm does ("  w", " wo", ...)."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(first: str, second: str) -> float:
+    """
+    Trigram similarity of two words (like pg_trgm similarity()).
+    :return: from 0 (nothing in common) to 1 (equal)
+    """
+    first_trigrams = trigrams(first)
+    second_trigrams = trigrams(second)
+    common = len(first_trigrams & second_trigrams)
+    return common / len(first_trigrams | second_trigrams)
+
+
+class InvertedIndex:
+    """
+    Maps every term to documents containing it.
+
+    Usage:
+        index = InvertedIndex()
+        index.add(doc_id=1, fields={"A": "title", "C": "description"})
+        index.search("titl")  # {1: 1.0}
+    """
+
+    def __init__(self) -> None:
+        # {term: {doc_id: sum of weights of fields containing the term}}
+        self._postings: dict[str, dict[int, float]] = {}
+        self._sorted_terms: Optional[list[str]] = None
+
+    def __len__(self) -> int:
+        """Number of terms."""
+        return len(self._postings)
+
+    def add(self, doc_id: int, fields: dict[str, str]) -> None:
+        """
+        Adds document to the index.
+        :param doc_id: id of document (Product.pk)
+        :param fields: {weight: text}, weight is one of WEIGHTS keys
+        :return: None
+        """
+        for weight, text in fields.items():
+            for term in set(tokenize(text)):
+                postings = self._postings.setdefault(term, {})
+                postings[doc_id] = postings.get(doc_id, 0.0) + WEIGHTS[weight]
+        self._sorted_terms = None
+
+    def _get_sorted_terms(self) -> list[str]:
+        """Vocabulary sorted for prefix search by bisect."""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        return self._sorted_terms
+
+    def match_terms(
+            self,
+            token: str,
+            threshold: float,
+    ) -> dict[str, float]:
+        """
+        Finds terms which starts with the token. If there are no such terms
+        (e.g. because of typo), terms similar to the token are taken.
+        :param token: one word of query
+        :param threshold: min similarity of terms for fuzzy matching
+        :return: {term: factor of rank}, factor is 1 for prefix matches
+        """
+        terms = self._get_sorted_terms()
+        matched = {}
+        i = bisect.bisect_left(terms, token)
+        while i < len(terms) and terms[i].startswith(token):
+            matched[terms[i]] = 1.0
+            i += 1
+        if matched:
+            return matched
+
+        for term in terms:
+            term_similarity = similarity(token, term)
+            if term_similarity >= threshold:
+                matched[term] = term_similarity
+        return matched
+
+    def search(
+            self,
+            query: str,
+            threshold: float = 0.3,
+    ) -> dict[int, float]:
+        """
+        Finds documents containing every word of the query.
+        :param query: text entered by user
+        :param threshold: min similarity for fuzzy matching of words
+        :return: {doc_id: rank}
+        """
+        scores: Optional[dict[int, float]] = None
+        for token in tokenize(query):
+            token_scores: dict[int, float] = {}
+            for term, factor in self.match_terms(token, threshold).items():
+                for doc_id, weight in self._postings[term].items():
+                    token_scores[doc_id] = max(
+                        token_scores.get(doc_id, 0.0), weight * factor)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    doc_id: score + token_scores[doc_id]
+                    for doc_id, score in scores.items()
+                    if doc_id in token_scores
+                }
+            if not scores:
+                break
+        return scores or {}
+
+    @classmethod
+    def build(
+            cls,
+            documents: Iterable[tuple[int, dict[str, str]]],
+    ) -> "InvertedIndex":
+        """
+        Creates index from documents.
+        :param documents: iterable of (doc_id, {weight: text})
+        :return: filled index
+        """
+        index = cls()
+        for doc_id, fields in documents:
+            index.add(doc_id=doc_id, fields=fields)
+        return index
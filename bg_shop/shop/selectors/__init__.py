@@ -4,3 +4,5 @@ from shop.selectors.review_selelctors import ReviewSelector
 from shop.selectors.banner_selectors import BannerSelector
 from shop.selectors.sales_selectors import SaleSelector
 from shop.selectors.tag_selectors import TagSelector
+from shop.selectors.price_selectors import PriceSelector
+from shop.selectors.search_selectors import ProductSearchSelector
@@ -1,11 +1,15 @@
-from typing import Optional
+from typing import Iterable, Optional
 from django.db import models as db_models
+from django.db.models.functions import Length
 
 from shop import models
 
 
 class CategorySelector:
     """Category has self reference to implement tree structure."""
+    # serialized tree for the header, see CategoryApi
+    TREE_CACHE_KEY = "shop:category_tree"
+
     @staticmethod
     def get_root_categories_queryset(
             only_active: bool = True) -> db_models.QuerySet:
@@ -44,28 +48,105 @@ class CategorySelector:
             only_active: bool = True,
     ) -> list[models.Category]:
         """
-        Returns all subcategories recursively.
+        Returns all subcategories at any depth by one query
+        (uses materialized path).
         :param category_id: start of chain
-        :param only_active: for checking is_active attribute
-        :return: tree of categories with one root category
+        :param only_active: if True, ignores inactive categories and
+            all their descendants
+        :return: descendants of the category, parents go before children
         """
+        category_path = models.Category.objects \
+            .filter(pk=category_id) \
+            .exclude(path="") \
+            .values("path")
+        descendants = models.Category.objects \
+            .filter(path__startswith=db_models.Subquery(category_path)) \
+            .exclude(pk=category_id) \
+            .order_by(Length("path"), "pk")
+        if not only_active:
+            return list(descendants)
         result = list()
-        children = self.get_subcategories(
-                category_id=category_id, only_active=only_active)
-        result.extend(list(children))
-        for child in children:
-            sub_descendants = self.get_all_descendants(
-                category_id=child.id, only_active=only_active)
-            result.extend(sub_descendants)
+        active_ids = {category_id}
+        for descendant in descendants:
+            if descendant.is_active and descendant.parent_id in active_ids:
+                active_ids.add(descendant.pk)
+                result.append(descendant)
         return result
 
     def get_category_and_subcategory_ids(self, parent_id: int) -> list[int]:
+        """
+        Returns id of the category and ids of all its active descendants.
+        :param parent_id: Category.pk
+        :return: list of ids
+        """
         ids = [parent_id, ]
-        subcategories = self.get_subcategories(category_id=parent_id)
-        subcategories_ids = subcategories.values_list("id", flat=True,)
-        ids.extend(subcategories_ids)
+        descendants = self.get_all_descendants(category_id=parent_id)
+        ids.extend(descendant.pk for descendant in descendants)
         return ids
 
+    @staticmethod
+    def get_category_tree_queryset(
+            only_active: bool = True,
+    ) -> db_models.QuerySet:
+        """
+        Categories for get_category_tree(), parents go before children.
+        :param only_active: if True, ignores inactive categories
+        :return: queryset
+        """
+        queryset = models.Category.objects \
+            .select_related("image") \
+            .order_by(Length("path"), "pk")
+        if only_active:
+            queryset = queryset.filter(is_active=True)
+        return queryset
+
+    @classmethod
+    def get_category_tree(
+            cls,
+            only_active: bool = True,
+    ) -> list[models.Category]:
+        """
+        Returns root categories, every category in the tree has attribute
+        `subcategories` (list of children). Loads all by one query.
+        :param only_active: if True, ignores inactive categories and
+            all their descendants
+        :return: list of root categories
+        """
+        return cls._build_tree(
+            cls.get_category_tree_queryset(only_active=only_active))
+
+    @classmethod
+    async def aget_category_tree(
+            cls,
+            only_active: bool = True,
+    ) -> list[models.Category]:
+        """Async version of get_category_tree()."""
+        queryset = cls.get_category_tree_queryset(only_active=only_active)
+        return cls._build_tree([category async for category in queryset])
+
+    @staticmethod
+    def _build_tree(
+            categories: Iterable[models.Category],
+    ) -> list[models.Category]:
+        """
+        Links categories to their parents.
+        :param categories: parents go before children
+        :return: list of root categories
+        """
+        roots = list()
+        nodes: dict[int, models.Category] = dict()
+        for category in categories:
+            category.subcategories = list()
+            if category.parent_id is None:
+                roots.append(category)
+            elif category.parent_id in nodes:
+                nodes[category.parent_id].subcategories.append(category)
+            else:
+                # parent is inactive
+                continue
+            nodes[category.pk] = category
+        return roots
+
     # def get_category_tree(
     #         self,
     #         start_node_id: int = None,
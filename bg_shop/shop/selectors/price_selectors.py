@@ -0,0 +1,128 @@
+import datetime
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db.models import Max
+from django.utils import timezone
+
+from shop import models
+
+
+def apply_discount(price: Decimal, discount: int) -> Decimal:
+    """
+    Calculates price after discount.
+    :param price: original price
+    :param discount: percent (0 - 100)
+    :return: discounted price rounded to two decimal places
+    """
+    discounted_price = Decimal(1 - discount * 0.01) * Decimal(price)
+    return round(discounted_price, 2)
+
+
+class PriceSelector:
+    """
+    Resolves discounted prices for a batch of products.
+
+    It is meant to live during one request (or one service call).
+    Products are registered first, then active Sales of all registered
+    products are loaded by one query per date, and the best discount
+    is picked in memory.
+    Usage:
+        selector = PriceSelector(products=page)
+        selector.price_for(product_id=page[0].pk)
+    """
+
+    def __init__(
+            self,
+            products: Iterable[models.Product] = (),
+            date: Optional[datetime.date] = None,
+    ) -> None:
+        """
+        :param products: Products to register for batch loading
+        :param date: default date for price_for(), if None - today
+        """
+        self.date = date or timezone.now().date()
+        self._prices: dict[int, Decimal] = {}
+        # {date: {product_id: max discount}}
+        self._discounts: dict[datetime.date, dict[int, int]] = {}
+        # {date: product ids which discounts are loaded}
+        self._loaded: dict[datetime.date, set[int]] = {}
+        self.add_products(products)
+
+    def add_products(self, products: Iterable[models.Product]) -> None:
+        """
+        Registers products, it does not hit db.
+        :param products: Product objs (price is taken from them)
+        :return: None
+        """
+        for product in products:
+            self._prices[product.pk] = product.price
+
+    def is_registered(self, product_id: int) -> bool:
+        """Checks if Product was passed to add_products()."""
+        return product_id in self._prices
+
+    def price_for(
+            self,
+            product_id: int,
+            date: Optional[datetime.date] = None,
+    ) -> Decimal:
+        """
+        Returns price of registered Product taking into account
+        the biggest discount of Sales which are active on the date.
+        :param product_id: Product.pk, must be registered by add_products()
+        :param date: if None, uses date passed in __init__
+        :return: discounted price or original price
+        """
+        if date is None:
+            date = self.date
+        original_price = self._prices[product_id]
+        discount = self.discount_for(product_id=product_id, date=date)
+        if discount:
+            return apply_discount(price=original_price, discount=discount)
+        else:
+            return Decimal(original_price)
+
+    def discount_for(
+            self,
+            product_id: int,
+            date: Optional[datetime.date] = None,
+    ) -> Optional[int]:
+        """
+        Returns the biggest discount of Sales active on the date.
+        Loads discounts of all registered products that are not loaded yet.
+        :param product_id: Product.pk
+        :param date: if None, uses date passed in __init__
+        :return: discount in percent or None
+        """
+        if date is None:
+            date = self.date
+        loaded = self._loaded.setdefault(date, set())
+        if product_id not in loaded:
+            not_loaded = set(self._prices) - loaded
+            not_loaded.add(product_id)
+            self._load_discounts(product_ids=not_loaded, date=date)
+        return self._discounts[date].get(product_id)
+
+    def _load_discounts(
+            self,
+            product_ids: set[int],
+            date: datetime.date,
+    ) -> None:
+        """
+        Loads the biggest discount for every product by one query.
+        :param product_ids: Products to load
+        :param date: date when Sales must be active
+        :return: None
+        """
+        discounts = models.Sale.objects \
+            .filter(
+                product_id__in=product_ids,
+                date_from__lte=date,
+                date_to__gte=date,
+            ) \
+            .values("product_id") \
+            .annotate(max_discount=Max("discount")) \
+            .values_list("product_id", "max_discount")
+        self._discounts.setdefault(date, {}).update(discounts)
+        self._loaded[date].update(product_ids)
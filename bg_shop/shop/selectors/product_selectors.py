@@ -1,23 +1,18 @@
 import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Optional
 
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.db.models import (
     Avg,
-    Count,
-    Sum,
     QuerySet,
-    Subquery,
-    OuterRef,
     F,
 )
-from django.utils import timezone
 
 from shop import models
 from shop import filters as shop_filters
-from orders import models as order_models
+from shop.selectors import price_selectors
 from dynamic_config import selectors as conf_selectors
 
 User = get_user_model()
@@ -53,6 +48,19 @@ class ProductSelector:
             raise AttributeError("None of arguments was passed. "
                                  "It required to pass one of them.")
 
+    def get_available_ids(self, product_ids: Iterable[int]) -> set[int]:
+        """
+        Filter ids of products that are active and count > 0,
+        by one query.
+        :param product_ids: ids of Products to check.
+        :return: set of ids of available Products.
+        """
+        return set(
+            models.Product.objects
+            .filter(pk__in=product_ids, is_active=True, count__gt=0)
+            .values_list("pk", flat=True)
+        )
+
     def get_rating(self, product_id: int) -> float:
         """
         Returns average rete of all Reviews for this Product.
@@ -97,6 +105,8 @@ class ProductSelector:
         qs = self.get_active_products()
         qs = self._prefetch_for_product_short_serializer(query_set=qs)
         qs = shop_filters.BaseProductFilter(data=filters, queryset=qs).qs
+        if not sort_field and "search_rank" in qs.query.annotations:
+            sort_field = "relevance"
         if sort_field:
             qs = self._sort_catalog(
                 query_set=qs, sort_field=sort_field, order=order)
@@ -111,10 +121,8 @@ class ProductSelector:
         :param query_set:
         :return:
         """
-        query_set = query_set.prefetch_related("review_set") \
-            .prefetch_related("images") \
-            .prefetch_related("tags") \
-            .prefetch_related("sale_set")
+        query_set = query_set.prefetch_related("images") \
+            .prefetch_related("tags")
         return query_set
 
     def _sort_catalog(
@@ -132,28 +140,29 @@ class ProductSelector:
             "reviews",
             "date",
             "title",
-            "popularity"
+            "popularity",
+            "relevance" (only with search, otherwise newest are first)
         :param order: `dec` or `inc` (decrease, increase)
         :return: sorted qs
         """
         match sort_field:
             case "popularity":
-                # sales - number of products sold. Subquery
-                sales = order_models.OrderedProduct.objects \
-                    .filter(product=OuterRef("pk")) \
-                    .filter(order__status__in=[
-                        order_models.Order.Statuses.ACCEPTED,
-                        order_models.Order.Statuses.COMPLETED
-                    ]) \
-                    .values("product") \
-                    .annotate(sales=Sum("count")).values("sales")
-                query_set = query_set.annotate(popularity=Subquery(sales))
+                # denormalized, see OrderedProductService
+                query_set = query_set.annotate(popularity=F("units_sold"))
             case 'rating':
-                query_set = query_set.annotate(rating=Avg('review__rate'))
+                # denormalized, see ReviewService
+                query_set = query_set.annotate(rating=F("rating_avg"))
             case 'reviews':
-                query_set = query_set.annotate(reviews=Count('review'))
+                query_set = query_set.annotate(reviews=F("review_count"))
             case 'date':
                 query_set = query_set.annotate(date=F("release_date"))
+            case 'relevance':
+                # see ProductSearchSelector
+                if "search_rank" in query_set.query.annotations:
+                    query_set = query_set.annotate(
+                        relevance=F("search_rank"))
+                else:
+                    sort_field = "pk"
 
         if (order is None) or (order == 'dec'):
             query_set = query_set.order_by(F(sort_field).desc(nulls_last=True))
@@ -202,21 +211,8 @@ class ProductSelector:
             product: models.Product,
             date: Optional[datetime.date] = None,
     ) -> Decimal:
-        """It is better to prefetch Sale objects related to product.
-        Uses active sale with the biggest discount"""
-        if date is None:
-            date = timezone.now().date()
-        sale = product.sale_set.filter(
-            date_from__lte=date,
-            date_to__gte=date,
-        ) \
-            .order_by("-discount") \
-            .first()
-        original_price = Decimal(product.price)
-        if sale:
-            discounted_price = Decimal(
-                1 - sale.discount * 0.01) * original_price
-            discounted_price = round(discounted_price, 2)
-            return discounted_price
-        else:
-            return original_price
+        """Uses active sale with the biggest discount.
+        To get prices of many products use PriceSelector directly."""
+        price_selector = price_selectors.PriceSelector(
+            products=[product], date=date)
+        return price_selector.price_for(product_id=product.pk)
@@ -0,0 +1,159 @@
+import uuid
+from typing import Any
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, QuerySet, Value, When
+
+from shop import models
+from shop.search_index import InvertedIndex, tokenize
+
+INDEX_VERSION_CACHE_KEY = "product_search:version"
+
+# In-process InvertedIndex of all Products, used instead of postgres
+# full-text search on other databases.
+_local_index: dict[str, Any] = {
+    "version": None,
+    "index": None,
+}
+
+
+class ProductSearchSelector:
+    """
+    Full-text search of Products.
+
+    On postgres Products are matched by `search_vector` (GIN index), every
+    word of the query is used as a prefix. Products which titles are
+    similar to the query (pg_trgm, GIN index) are matched too, so typos
+    don't lead to empty result.
+    On other databases in-process InvertedIndex is used instead, it is
+    rebuilt when version is changed by
+    ProductSearchService.invalidate_index().
+    Search data of Products is maintained by ProductSearchService.
+    """
+
+    def search(
+            self,
+            queryset: QuerySet[models.Product],
+            query: str,
+    ) -> QuerySet[models.Product]:
+        """
+        Filters Products matching the query.
+        :param queryset: qs of Products, it can be already filtered
+        :param query: text entered by user
+        :return: qs annotated with `search_rank` (greater is better)
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return self._nothing_found(queryset)
+        if connections[queryset.db].vendor == "postgresql":
+            return self._search_by_vector(
+                queryset=queryset, query=query, tokens=tokens)
+        return self._search_by_index(queryset=queryset, query=query)
+
+    @staticmethod
+    def _nothing_found(
+            queryset: QuerySet[models.Product],
+    ) -> QuerySet[models.Product]:
+        """Empty qs, annotated as result of search."""
+        return queryset \
+            .annotate(search_rank=Value(0.0, output_field=FloatField())) \
+            .none()
+
+    @staticmethod
+    def _search_by_vector(
+            queryset: QuerySet[models.Product],
+            query: str,
+            tokens: list[str],
+    ) -> QuerySet[models.Product]:
+        """Postgres full-text search with trigram fallback."""
+        # tokens contain only word characters, so raw query is safe
+        search_query = SearchQuery(
+            " & ".join(f"{token}:*" for token in tokens),
+            search_type="raw",
+            config=settings.PRODUCT_SEARCH_CONFIG,
+        )
+        return queryset \
+            .filter(
+                Q(search_vector=search_query)
+                | Q(title__trigram_word_similar=query)
+            ) \
+            .annotate(
+                search_rank=(
+                    SearchRank(F("search_vector"), search_query)
+                    + TrigramWordSimilarity(query, "title")
+                ),
+            )
+
+    def _search_by_index(
+            self,
+            queryset: QuerySet[models.Product],
+            query: str,
+    ) -> QuerySet[models.Product]:
+        """Search by InvertedIndex, ranks are passed to db by CASE."""
+        ranks = self.get_index().search(
+            query, threshold=settings.PRODUCT_SEARCH_SIMILARITY_THRESHOLD)
+        if not ranks:
+            return self._nothing_found(queryset)
+        return queryset \
+            .filter(pk__in=ranks) \
+            .annotate(
+                search_rank=Case(
+                    *(When(pk=pk, then=Value(rank))
+                      for pk, rank in ranks.items()),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                ),
+            )
+
+    @staticmethod
+    def get_version() -> str:
+        """
+        Returns current version of search data from shared cache.
+        Sets new one if it is absent (e.g. cache was cleared).
+        """
+        version = cache.get(INDEX_VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(INDEX_VERSION_CACHE_KEY)
+        return version
+
+    @classmethod
+    def get_index(cls) -> InvertedIndex:
+        """
+        Returns in-process index, rebuilds it if version is changed.
+        :return: InvertedIndex of all Products
+        """
+        version = cls.get_version()
+        if _local_index["index"] is None or _local_index["version"] != version:
+            _local_index.update(version=version, index=cls.build_index())
+        return _local_index["index"]
+
+    @staticmethod
+    def build_index() -> InvertedIndex:
+        """
+        Builds index of all Products by one query.
+        Weights are the same as in ProductSearchService.get_search_vector().
+        """
+        rows = models.Product.objects.values_list(
+            "pk", "title", "manufacturer", "search_keywords", "description")
+        return InvertedIndex.build(
+            (pk, {
+                "A": title,
+                "B": f"{manufacturer} {keywords}",
+                "C": description,
+            })
+            for pk, title, manufacturer, keywords, description
+            in rows.iterator()
+        )
+
+    @staticmethod
+    def clear_local_index() -> None:
+        """Drops in-process index, so it is rebuilt by next search."""
+        _local_index.update(version=None, index=None)
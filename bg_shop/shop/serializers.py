@@ -1,8 +1,9 @@
+import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Optional
 
-from django.utils import timezone
 from django.db import models as db_models
+from django.utils import timezone
 
 from rest_framework import serializers
 from shop import models, selectors
@@ -10,7 +11,43 @@ from common import serializers as common_serializers
 from dynamic_config import selectors as conf_selectors
 
 
-class ProductShortSerializer(serializers.ModelSerializer):
+class DiscountedPriceMixin:
+    """
+    Resolves prices of all serialized Products by one query.
+    Products are taken from instance of the root serializer,
+    so with `many=True` the whole list (page) is priced at once.
+    """
+
+    def get_discounted_price(
+            self,
+            product: models.Product,
+            date: Optional[datetime.date] = None,
+    ) -> Decimal:
+        """
+        Price of Product taking into account the biggest active discount.
+        :param product: Product obj, that is being serialized
+        :param date: date of sale, if None - today
+        :return: discounted price
+        """
+        price_selector = getattr(self, "_price_selector", None)
+        if price_selector is None:
+            price_selector = self._price_selector = \
+                selectors.PriceSelector(date=date)
+        if not price_selector.is_registered(product.pk):
+            price_selector.add_products(self._get_products_to_price(product))
+        return price_selector.price_for(product_id=product.pk, date=date)
+
+    def _get_products_to_price(
+            self, product: models.Product) -> Iterable[models.Product]:
+        """Products of the root serializer or only the passed one."""
+        instance = getattr(self.root, "instance", None)
+        if isinstance(instance, (list, tuple, db_models.QuerySet)):
+            return [*instance, product]
+        return [product]
+
+
+class ProductShortSerializer(
+        DiscountedPriceMixin, serializers.ModelSerializer):
     """Represents Product obj for displaying on cards. Product obj must
     be annotated with additional fields: date, freeDelivery, rating."""
     class Meta:
@@ -48,12 +85,7 @@ class ProductShortSerializer(serializers.ModelSerializer):
         self.today = timezone.now().date()
 
     def get_price(self, obj) -> Decimal:
-        discounted_price = selectors.ProductSelector()\
-            .get_discounted_price(
-                product=obj,
-                date=self.today
-            )
-        return discounted_price
+        return self.get_discounted_price(product=obj, date=self.today)
 
     def get_freeDelivery(self, obj) -> bool:
         if self.boundary_of_free_delivery:
@@ -62,14 +94,10 @@ class ProductShortSerializer(serializers.ModelSerializer):
             return False
 
     def get_reviews(self, obj) -> int:
-        if hasattr(obj, 'review_set'):
-            return obj.review_set.count()
+        return obj.review_count
 
     def get_rating(self, obj) -> Optional[float]:
-        if hasattr(obj, 'review_set'):
-            avg_rating = obj.review_set \
-                .aggregate(db_models.Avg('rate')).get("rate__avg", None)
-            if avg_rating is not None:
-                return round(avg_rating, 2)
-            else:
-                return None
+        if obj.rating_avg is not None:
+            return round(obj.rating_avg, 2)
+        else:
+            return None
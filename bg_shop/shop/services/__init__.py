@@ -1,2 +1,7 @@
+from shop.services.catalog_services import (
+    CatalogExportService,
+    CatalogImportService,
+)
 from shop.services.category_services import CategoryService
 from shop.services.review_services import ReviewService
+from shop.services.search_services import ProductSearchService
@@ -0,0 +1,597 @@
+"""
+Import and export of catalog: Products with category, tags,
+specifications and image references, in CSV or JSON Lines.
+
+Both directions are streaming, rows are read and written by chunks
+of CATALOG_CHUNK_SIZE, so memory doesn't depend on the size of catalog.
+Row in JSON Lines:
+    {"id": 1, "title": "Catan", "description": "...", "price": "10.50",
+     "count": 5, "release_date": "2023-01-01", "sort_index": 0,
+     "limited_edition": false, "manufacturer": "Kosmos",
+     "is_active": true, "category": "Strategy", "tags": ["family"],
+     "specifications": [{"name": "players", "value": "3-4"}],
+     "images": ["images/catan.jpg"]}
+In CSV the same columns are used, lists are joined by LIST_SEPARATOR,
+specification is written as "name=value".
+Category is referenced by title, image - by name of its file
+(images are not created by import, files are uploaded separately).
+"""
+
+import csv
+import itertools
+import json
+from collections import defaultdict
+from typing import AsyncIterator, Iterable, Iterator, Optional, Union
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Prefetch, QuerySet
+
+from api import caching
+from common import models as common_models
+from shop import models
+from shop.services.category_services import CategoryService
+from shop.services.search_services import ProductSearchService
+
+FORMATS = ("csv", "jsonl")
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/jsonl",
+}
+LIST_SEPARATOR = "|"
+SPECIFICATION_SEPARATOR = "="
+# fields of Product that are written as is
+PRODUCT_FIELDS = (
+    "title",
+    "description",
+    "price",
+    "count",
+    "release_date",
+    "sort_index",
+    "limited_edition",
+    "manufacturer",
+    "is_active",
+)
+RELATION_COLUMNS = ("category", "tags", "specifications", "images")
+COLUMNS = ("id", *PRODUCT_FIELDS, *RELATION_COLUMNS)
+# tags of cached API responses changed by import (see api.caching)
+CACHE_TAGS = ("product", "tag", "category")
+
+
+def check_format(fmt: str) -> str:
+    """
+    :param fmt: name of format
+    :return: the same name
+    :raises ValueError: if format is not supported
+    """
+    if fmt not in FORMATS:
+        raise ValueError(
+            f"Unknown format `{fmt}`, use one of: {', '.join(FORMATS)}.")
+    return fmt
+
+
+class _Echo:
+    """File-like object for csv.writer, returns written line."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class CatalogExportService:
+    """
+    Streams Products as lines of CSV or JSON Lines.
+
+    Products are read by QuerySet.iterator(chunk_size), related objects
+    are prefetched per chunk, so a chunk costs a constant number
+    of queries and only one chunk is kept in memory.
+    Usage:
+        service = CatalogExportService(fmt="jsonl")
+        response = StreamingHttpResponse(service.iter_lines())
+    """
+
+    def __init__(
+            self,
+            fmt: str = "csv",
+            chunk_size: Optional[int] = None,
+    ) -> None:
+        """
+        :param fmt: one of FORMATS
+        :param chunk_size: CATALOG_CHUNK_SIZE by default
+        """
+        self.fmt = check_format(fmt)
+        self.chunk_size = chunk_size or settings.CATALOG_CHUNK_SIZE
+
+    @staticmethod
+    def prepare_queryset(queryset: QuerySet) -> QuerySet:
+        """Loads only exported data, in stable order."""
+        return queryset \
+            .order_by("pk") \
+            .select_related("category") \
+            .only("pk", *PRODUCT_FIELDS, "category", "category__title") \
+            .prefetch_related(
+                Prefetch("tags", models.Tag.objects.only("name")),
+                Prefetch(
+                    "specifications",
+                    models.Specification.objects.only("name", "value")),
+                Prefetch("images", common_models.Image.objects.only("img")),
+            )
+
+    def iter_rows(
+            self,
+            queryset: Optional[QuerySet] = None,
+    ) -> Iterator[dict]:
+        """
+        Reads Products by chunks.
+        :param queryset: Products to export, all Products if None
+        :return: iterator of rows (see module docstring)
+        """
+        if queryset is None:
+            queryset = models.Product.objects.all()
+        queryset = self.prepare_queryset(queryset)
+        for product in queryset.iterator(chunk_size=self.chunk_size):
+            row = {"id": product.pk}
+            for field in PRODUCT_FIELDS:
+                row[field] = getattr(product, field)
+            row["category"] = product.category.title \
+                if product.category is not None else None
+            row["tags"] = [tag.name for tag in product.tags.all()]
+            row["specifications"] = [
+                {"name": specification.name, "value": specification.value}
+                for specification in product.specifications.all()
+            ]
+            row["images"] = [image.img.name for image in product.images.all()]
+            yield row
+
+    def iter_lines(
+            self,
+            queryset: Optional[QuerySet] = None,
+    ) -> Iterator[str]:
+        """
+        Serializes Products line by line (CSV starts with header).
+        :param queryset: Products to export, all Products if None
+        :return: iterator of lines
+        """
+        rows = self.iter_rows(queryset)
+        if self.fmt == "jsonl":
+            for row in rows:
+                yield json.dumps(
+                    row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+            return
+        writer = csv.writer(_Echo())
+        yield writer.writerow(COLUMNS)
+        for row in rows:
+            row["tags"] = LIST_SEPARATOR.join(row["tags"])
+            row["specifications"] = LIST_SEPARATOR.join(
+                f"{item['name']}{SPECIFICATION_SEPARATOR}{item['value']}"
+                for item in row["specifications"]
+            )
+            row["images"] = LIST_SEPARATOR.join(row["images"])
+            yield writer.writerow([row[column] for column in COLUMNS])
+
+    async def aiter_lines(
+            self,
+            queryset: Optional[QuerySet] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Async version of iter_lines() for responses in ASGI mode
+        (sync iterator of StreamingHttpResponse is read into memory
+        there). Lines are made by chunks in the thread of sync code.
+        """
+        lines = self.iter_lines(queryset)
+        get_chunk = sync_to_async(
+            lambda: list(itertools.islice(lines, self.chunk_size)))
+        while chunk := await get_chunk():
+            for line in chunk:
+                yield line
+
+
+class CatalogImportService:
+    """
+    Imports Products from lines of CSV or JSON Lines by chunks.
+
+    Every chunk is written in its own transaction by a constant number
+    of queries: rows with id are upserted (INSERT ... ON CONFLICT UPDATE,
+    ids are kept), rows without id are inserted, relations to tags,
+    specifications and images are replaced by the passed ones.
+    Row with id of existing Product may be partial: only passed columns
+    are updated (by bulk_update per set of columns), others are kept.
+    Tags and specifications are resolved by in-memory maps loaded once,
+    missing ones are created by bulk_create. Missing categories are
+    created as root categories.
+    Invalid rows are skipped, first `max_errors` messages are
+    kept in `errors`.
+    Usage:
+        service = CatalogImportService(fmt="csv")
+        with open(path, newline="") as file:
+            result = service.import_lines(file)
+    """
+
+    max_errors = 100
+
+    def __init__(
+            self,
+            fmt: str = "csv",
+            chunk_size: Optional[int] = None,
+    ) -> None:
+        """
+        :param fmt: one of FORMATS
+        :param chunk_size: CATALOG_CHUNK_SIZE by default
+        """
+        self.fmt = check_format(fmt)
+        self.chunk_size = chunk_size or settings.CATALOG_CHUNK_SIZE
+        self.errors: list[str] = []
+        self.result = {"created": 0, "updated": 0, "skipped": 0}
+        # {title: pk}, {name: pk}, {(name, value): pk}, {file name: pk}
+        self._categories: Optional[dict[str, int]] = None
+        self._tags: Optional[dict[str, int]] = None
+        self._specifications: Optional[dict[tuple[str, str], int]] = None
+        self._images: dict[str, Optional[int]] = {}
+
+    def import_lines(self, lines: Iterable[str]) -> dict[str, int]:
+        """
+        Imports all rows.
+        :param lines: e.g. file opened in text mode (newline="" for CSV)
+        :return: {"created": int, "updated": int, "skipped": int}
+        """
+        rows = self.read(lines)
+        while chunk := list(itertools.islice(rows, self.chunk_size)):
+            with transaction.atomic():
+                self._import_chunk(chunk)
+        return self.result
+
+    def read(self, lines: Iterable[str]) -> Iterator[tuple[int, dict]]:
+        """
+        Parses lines, invalid ones are reported and skipped.
+        :param lines: lines of CSV (with header) or JSON Lines
+        :return: iterator of (line number, row)
+        """
+        if self.fmt == "csv":
+            reader = csv.DictReader(lines)
+            for data in reader:
+                try:
+                    yield reader.line_num, self._parse_csv_row(data)
+                except ValidationError as exc:
+                    self._skip(reader.line_num, exc)
+            return
+        for line_num, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise ValidationError("Row must be an object.")
+            except (ValueError, ValidationError) as exc:
+                self._skip(line_num, exc)
+                continue
+            yield line_num, data
+
+    @staticmethod
+    def _parse_csv_row(data: dict) -> dict:
+        """
+        Converts CSV row to the structure of JSON Lines row.
+        Empty cells of not text fields mean default values.
+        """
+        row = {}
+        for column, value in data.items():
+            if column is None:
+                raise ValidationError("Row has more cells than header.")
+            if value is None:
+                continue
+            if column in ("tags", "images"):
+                value = [item for item in value.split(LIST_SEPARATOR) if item]
+            elif column == "specifications":
+                items = []
+                for item in value.split(LIST_SEPARATOR):
+                    if not item:
+                        continue
+                    name, separator, item_value = item.partition(
+                        SPECIFICATION_SEPARATOR)
+                    if not separator:
+                        raise ValidationError(
+                            f"Specification `{item}` must be "
+                            f"`name{SPECIFICATION_SEPARATOR}value`.")
+                    items.append({"name": name, "value": item_value})
+                value = items
+            elif value == "" and column not in (
+                    "title", "description", "manufacturer"):
+                value = None
+            row[column] = value
+        return row
+
+    @staticmethod
+    def _get_id(data: dict) -> Optional[int]:
+        """
+        :return: id of the row or None
+        :raises ValidationError: if id is not an integer
+        """
+        product_id = data.get("id")
+        if product_id is None:
+            return None
+        try:
+            return int(product_id)
+        except (TypeError, ValueError):
+            raise ValidationError({"id": "Id must be an integer."})
+
+    def _build(
+            self,
+            data: dict,
+            product_id: Optional[int],
+            partial: bool,
+    ) -> tuple[models.Product, tuple[str, ...], dict]:
+        """
+        Makes unsaved Product from the row and validates it
+        without db queries (except of creating missing Category).
+        :param data: row
+        :param product_id: id of the row
+        :param partial: the Product exists, so missing columns are kept
+        :return: (Product, fields to write, {"tags": [...],
+            "specifications": [...], "images": [...]} - passed ones)
+        :raises ValidationError: if the row is invalid
+        """
+        product = models.Product(pk=product_id)
+        fields = tuple(
+            field for field in (*PRODUCT_FIELDS, "category")
+            if not partial or field in data)
+        for field in PRODUCT_FIELDS:
+            value = data.get(field)
+            if value is not None:
+                setattr(product, field, value)
+        product.full_clean(
+            exclude=[
+                "id",
+                "category",
+                *(field for field in PRODUCT_FIELDS if field not in fields),
+            ],
+            validate_unique=False,
+            validate_constraints=False,
+        )
+        category = data.get("category")
+        if category:
+            product.category_id = self._get_category_id(title=category)
+
+        try:
+            relations = {
+                "tags": [str(name) for name in data.get("tags") or ()],
+                "specifications": [
+                    (str(item["name"]), str(item["value"]))
+                    for item in data.get("specifications") or ()
+                ],
+                "images": [str(name) for name in data.get("images") or ()],
+            }
+        except (TypeError, KeyError):
+            raise ValidationError(
+                "Tags and images must be lists of names, "
+                "specifications - list of {name, value}.")
+        if partial:
+            relations = {
+                key: value for key, value in relations.items()
+                if key in data}
+        return product, fields, relations
+
+    def _import_chunk(self, rows: list[tuple[int, dict]]) -> None:
+        """Writes one chunk of rows (in transaction)."""
+        parsed = []
+        for line_num, data in rows:
+            try:
+                parsed.append((line_num, data, self._get_id(data)))
+            except ValidationError as exc:
+                self._skip(line_num, exc)
+        existing = set(
+            models.Product.objects
+            .filter(pk__in={pk for *_, pk in parsed if pk is not None})
+            .values_list("pk", flat=True))
+
+        # rows with the same id: the last one wins
+        with_id: dict[int, tuple[int, models.Product, dict]] = {}
+        fields_by_id: dict[int, tuple[str, ...]] = {}
+        without_id: list[tuple[int, models.Product, dict]] = []
+        for line_num, data, product_id in parsed:
+            try:
+                product, fields, relations = self._build(
+                    data, product_id, partial=product_id in existing)
+            except ValidationError as exc:
+                self._skip(line_num, exc)
+                continue
+            if product_id is None:
+                without_id.append((line_num, product, relations))
+            else:
+                with_id[product_id] = (line_num, product, relations)
+                fields_by_id[product_id] = fields
+
+        if with_id:
+            full, partial = [], defaultdict(list)
+            for product_id, (_, product, _) in with_id.items():
+                fields = fields_by_id[product_id]
+                if len(fields) == len(PRODUCT_FIELDS) + 1:
+                    full.append(product)
+                # the row has only id, nothing to update
+                elif fields:
+                    partial[fields].append(product)
+            if full:
+                models.Product.objects.bulk_create(
+                    full,
+                    update_conflicts=True,
+                    unique_fields=["id"],
+                    update_fields=[*PRODUCT_FIELDS, "category"],
+                )
+            # upsert inserts all columns, so it can't be used for them
+            for fields, products in partial.items():
+                models.Product.objects.bulk_update(products, fields)
+            updated = len(existing.intersection(with_id))
+            self.result["updated"] += updated
+            self.result["created"] += len(with_id) - updated
+            # before inserting rows without id, they get ids from sequence
+            self._reset_sequence()
+        if without_id:
+            models.Product.objects.bulk_create(
+                [product for _, product, _ in without_id])
+            self.result["created"] += len(without_id)
+
+        entries = [*with_id.values(), *without_id]
+        if entries:
+            self._replace_relations(entries)
+            ProductSearchService.refresh_search(
+                product_ids=[product.pk for _, product, _ in entries])
+            # bulk queries don't send signals of api.signals,
+            # repeated after commit as there
+            caching.invalidate_tags(*CACHE_TAGS)
+            transaction.on_commit(
+                lambda: caching.invalidate_tags(*CACHE_TAGS))
+
+    def _replace_relations(
+            self,
+            entries: list[tuple[int, models.Product, dict]],
+    ) -> None:
+        """
+        Replaces passed tags, specifications and images of saved
+        Products by one DELETE and one INSERT per relation.
+        """
+        tag_ids = self._get_tag_ids(names={
+            name for *_, rel in entries for name in rel.get("tags", ())})
+        specification_ids = self._get_specification_ids(keys={
+            key for *_, rel in entries
+            for key in rel.get("specifications", ())})
+        image_ids = self._get_image_ids(names={
+            name for *_, rel in entries for name in rel.get("images", ())})
+
+        tags_through = models.Product.tags.through
+        specifications_through = models.Product.specifications.through
+        images_through = models.Product.images.through
+        tags, specifications, images = [], [], []
+        for line_num, product, relations in entries:
+            for tag_id in {
+                    tag_ids[name] for name in relations.get("tags", ())}:
+                tags.append(
+                    tags_through(product_id=product.pk, tag_id=tag_id))
+            for specification_id in {
+                    specification_ids[key]
+                    for key in relations.get("specifications", ())}:
+                specifications.append(specifications_through(
+                    product_id=product.pk,
+                    specification_id=specification_id,
+                ))
+            for name in dict.fromkeys(relations.get("images", ())):
+                image_id = image_ids.get(name)
+                if image_id is None:
+                    self._add_error(
+                        line_num, f"Image `{name}` does not exist.")
+                    continue
+                images.append(
+                    images_through(product_id=product.pk, image_id=image_id))
+
+        for relation, through, objs in (
+                ("tags", tags_through, tags),
+                ("specifications", specifications_through, specifications),
+                ("images", images_through, images),
+        ):
+            product_ids = [
+                product.pk for _, product, relations in entries
+                if relation in relations]
+            if product_ids:
+                through.objects.filter(product_id__in=product_ids).delete()
+            if objs:
+                through.objects.bulk_create(objs)
+
+    def _get_category_id(self, title: str) -> int:
+        """Finds Category by title, creates root Category if missing."""
+        if self._categories is None:
+            self._categories = dict(
+                models.Category.objects.values_list("title", "pk"))
+        if title not in self._categories:
+            category = CategoryService().update_or_create(
+                instance=None, title=title)
+            self._categories[title] = category.pk
+        return self._categories[title]
+
+    def _get_tag_ids(self, names: set[str]) -> dict[str, int]:
+        """Resolves names of tags, creates missing ones by one INSERT."""
+        if self._tags is None:
+            # names are not unique, the oldest tag is used
+            self._tags = dict(
+                models.Tag.objects
+                .order_by("-pk")
+                .values_list("name", "pk"))
+        missing = [name for name in names if name not in self._tags]
+        if missing:
+            created = models.Tag.objects.bulk_create(
+                [models.Tag(name=name) for name in missing])
+            self._tags.update((tag.name, tag.pk) for tag in created)
+        return self._tags
+
+    def _get_specification_ids(
+            self,
+            keys: set[tuple[str, str]],
+    ) -> dict[tuple[str, str], int]:
+        """
+        Resolves (name, value) of specifications, creates missing ones
+        by one INSERT.
+        """
+        if self._specifications is None:
+            self._specifications = {
+                (name, value): pk for name, value, pk in
+                models.Specification.objects
+                .values_list("name", "value", "pk")
+            }
+        missing = [key for key in keys if key not in self._specifications]
+        if missing:
+            created = models.Specification.objects.bulk_create([
+                models.Specification(name=name, value=value)
+                for name, value in missing
+            ])
+            self._specifications.update(
+                ((item.name, item.value), item.pk) for item in created)
+        return self._specifications
+
+    def _get_image_ids(self, names: set[str]) -> dict[str, Optional[int]]:
+        """
+        Resolves file names of images (there can be many images,
+        so only names of the chunk are loaded).
+        :return: {name: Image.pk or None if it doesn't exist}
+        """
+        unknown = [name for name in names if name not in self._images]
+        if unknown:
+            self._images.update(dict.fromkeys(unknown))
+            # several Images can share a file, the oldest one is used
+            self._images.update(
+                common_models.Image.objects
+                .filter(img__in=unknown)
+                .order_by("-pk")
+                .values_list("img", "pk"))
+        return self._images
+
+    def _reset_sequence(self) -> None:
+        """
+        Ids of Products were set explicitly, so the sequence of ids
+        (postgres) is moved after the max id (as loaddata does).
+        It is done in every chunk with ids, otherwise next rows
+        without id could get already used ids.
+        """
+        connection = connections[models.Product.objects.db]
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [models.Product])
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def _skip(self, line_num: int, error: Exception) -> None:
+        """Reports invalid row."""
+        self.result["skipped"] += 1
+        self._add_error(line_num, error)
+
+    def _add_error(self, line_num: int, error: Union[Exception, str]) -> None:
+        """Keeps message of the error with number of the line."""
+        if len(self.errors) >= self.max_errors:
+            return
+        if isinstance(error, ValidationError):
+            if hasattr(error, "error_dict"):
+                error = "; ".join(
+                    f"{field}: {' '.join(messages)}"
+                    for field, messages in error.message_dict.items())
+            else:
+                error = " ".join(error.messages)
+        self.errors.append(f"line {line_num}: {error}")
@@ -1,8 +1,13 @@
 from typing import Optional
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q, QuerySet, Value
+from django.db.models.functions import Concat, Substr
 
+from api import caching
 from shop import models, selectors
 
 User = get_user_model()
@@ -118,24 +123,114 @@ class CategoryService:
 
     def delete(self, instance: models.Category, hard: bool = False) -> None:
         """
-        Deactivates all descendants (all children recursively),
+        Deactivates all descendants (found by materialized path),
         but doesn't change their depth.
         :param instance: Category obj to delete
         :param hard: if True, deletes from database,
         if False, sets is_active=False
         :return: None
         """
-        descendants = selectors.CategorySelector()\
-            .get_all_descendants(category_id=instance.pk)
-        for descendant in descendants:
-            descendant.is_active = False
-            descendant.save()
+        descendants = selectors.CategorySelector().get_all_descendants(
+            category_id=instance.pk, only_active=False)
+        models.Category.objects \
+            .filter(pk__in=[descendant.pk for descendant in descendants]) \
+            .update(is_active=False)
+        self.invalidate_tree_cache()
         if hard:
             instance.delete()
         else:
             instance.is_active = False
             instance.save()
 
+    def delete_many(self, queryset: QuerySet[models.Category]) -> int:
+        """
+        Deletes Categories from database and deactivates all their
+        descendants (as delete(hard=True)) by a constant number of queries.
+        :param queryset: Categories to delete
+        :return: number of deleted Categories
+        """
+        categories = dict(queryset.values_list("pk", "path"))
+        condition = Q()
+        for path in categories.values():
+            if path:
+                condition |= Q(path__startswith=path)
+        if condition:
+            models.Category.objects \
+                .filter(condition) \
+                .exclude(pk__in=categories) \
+                .update(is_active=False)
+        self.invalidate_bulk_changes()
+        _, deleted = models.Category.objects \
+            .filter(pk__in=categories) \
+            .delete()
+        return deleted.get(models.Category._meta.label, 0)
+
+    def set_active(
+            self,
+            queryset: QuerySet[models.Category],
+            is_active: bool,
+    ) -> int:
+        """
+        Sets `is_active` of Categories by one UPDATE.
+        :param queryset: Categories to change
+        :param is_active: new value
+        :return: number of changed Categories
+        """
+        number = queryset.update(is_active=is_active)
+        self.invalidate_bulk_changes()
+        return number
+
+    @staticmethod
+    def refresh_path(instance: models.Category) -> None:
+        """
+        Updates materialized path of saved Category (it contains pk,
+        so it is called on post_save). If path is changed,
+        rewrites paths of all descendants by one UPDATE.
+        :param instance: saved Category
+        :return: None
+        """
+        parent_path = ""
+        if instance.parent_id is not None:
+            parent_path = models.Category.objects \
+                .filter(pk=instance.parent_id) \
+                .values_list("path", flat=True) \
+                .first() or ""
+        old_path = instance.path
+        new_path = f"{parent_path}{instance.pk}/"
+        if old_path == new_path:
+            return
+        models.Category.objects \
+            .filter(pk=instance.pk) \
+            .update(path=new_path)
+        if old_path:
+            models.Category.objects \
+                .filter(path__startswith=old_path) \
+                .exclude(pk=instance.pk) \
+                .update(path=Concat(
+                    Value(new_path),
+                    Substr("path", len(old_path) + 1),
+                ))
+        instance.path = new_path
+
+    @staticmethod
+    def invalidate_tree_cache() -> None:
+        """Deletes cached category tree (see CategoryApi)."""
+        cache.delete(selectors.CategorySelector.TREE_CACHE_KEY)
+
+    def invalidate_bulk_changes(self) -> None:
+        """
+        QuerySet.update() doesn't send signals of shop.signals and
+        api.signals, so after it cached tree and cached API responses
+        of categories are invalidated here, now and after commit.
+        :return: None
+        """
+        def invalidate():
+            self.invalidate_tree_cache()
+            caching.invalidate_tags("category")
+
+        invalidate()
+        transaction.on_commit(invalidate)
+
     @staticmethod
     def get_max_depth():
         """Returns MAX_DEPTH constant, that defines nesting.
@@ -1,6 +1,20 @@
-from typing import Optional
+from typing import Iterable, Optional
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
 from django.utils import timezone
 
 from shop import models
@@ -20,6 +34,7 @@ class ReviewService:
     ) -> models.Review:
         """
         Creates new Review obj.
+        Updates denormalized rating of the Product in the same transaction.
         :param user_id: author's id
         :param product_id: for which Product.
         :param text: content
@@ -40,5 +55,97 @@ class ReviewService:
             review.date = timezone.now()
         if commit:
             review.full_clean()
-            review.save()
+            with transaction.atomic():
+                review.save()
+                self._add_rate(product_id=product_id, rate=rate)
         return review
+
+    def delete_review(self, review: models.Review) -> None:
+        """
+        Deletes Review obj.
+        Rating of the Product is updated in the same transaction
+        by post_delete receiver (see shop.signals).
+        :param review: Review to delete
+        :return: None
+        """
+        review.delete()
+
+    def delete_reviews(self, queryset) -> None:
+        """
+        Deletes all reviews in queryset, rating of related Products
+        is updated by post_delete receiver (see shop.signals).
+        :param queryset: qs of Reviews
+        :return: None
+        """
+        queryset.delete()
+
+    @staticmethod
+    def _add_rate(product_id: int, rate: int) -> None:
+        """
+        Adds one rate to rating of the Product using single UPDATE.
+        Right side of UPDATE uses old values of columns.
+        :param product_id: Product.pk
+        :param rate: rate of new Review
+        :return: None
+        """
+        models.Product.objects.filter(pk=product_id).update(
+            rating_sum=F("rating_sum") + rate,
+            review_count=F("review_count") + 1,
+            rating_avg=(
+                Cast(F("rating_sum") + rate, output_field=FloatField())
+                / (F("review_count") + 1)
+            ),
+        )
+
+    @staticmethod
+    def subtract_rate(product_id: int, rate: int) -> None:
+        """
+        Removes one rate from rating of the Product using single UPDATE.
+        Called on deleting of any Review (including cascade deletion
+        with its author), see shop.signals.
+        :param product_id: Product.pk
+        :param rate: rate of deleted Review
+        :return: None
+        """
+        models.Product.objects.filter(pk=product_id).update(
+            rating_sum=F("rating_sum") - rate,
+            review_count=F("review_count") - 1,
+            rating_avg=Case(
+                When(review_count__lte=1, then=Value(None)),
+                default=(
+                    Cast(F("rating_sum") - rate, output_field=FloatField())
+                    / (F("review_count") - 1)
+                ),
+                output_field=FloatField(),
+            ),
+        )
+
+    @staticmethod
+    def refresh_product_ratings(
+            product_ids: Optional[Iterable[int]] = None,
+    ) -> int:
+        """
+        Recalculates denormalized rating columns from Reviews.
+        :param product_ids: Products to refresh, if None refreshes all.
+        :return: number of updated Products
+        """
+        reviews = models.Review.objects \
+            .filter(product=OuterRef("pk")) \
+            .values("product")
+        products = models.Product.objects.all()
+        if product_ids is not None:
+            products = products.filter(pk__in=product_ids)
+        return products.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(value=Sum("rate")).values("value")),
+                0,
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(value=Count("id")).values("value")),
+                0,
+            ),
+            rating_avg=Subquery(
+                reviews.annotate(value=Avg("rate")).values("value"),
+                output_field=FloatField(),
+            ),
+        )
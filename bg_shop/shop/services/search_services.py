@@ -0,0 +1,101 @@
+import uuid
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from shop import models, selectors
+from shop.selectors import search_selectors
+
+
+class ProductSearchService:
+    """
+    Keeps search data of Products up to date (see ProductSearchSelector).
+
+    `search_keywords` is denormalized text of related tags and
+    specifications, `search_vector` (postgres only) is built from title,
+    manufacturer, keywords and description.
+    """
+    indexed_fields = frozenset({"title", "description", "manufacturer"})
+
+    @staticmethod
+    def get_search_vector() -> SearchVector:
+        """Weighted vector, the most important is title."""
+        config = settings.PRODUCT_SEARCH_CONFIG
+        return (
+            SearchVector("title", weight="A", config=config)
+            + SearchVector(
+                "manufacturer", "search_keywords", weight="B", config=config)
+            + SearchVector("description", weight="C", config=config)
+        )
+
+    @classmethod
+    def refresh_search(
+            cls,
+            product_ids: Optional[Iterable[int]] = None,
+    ) -> int:
+        """
+        Rebuilds search data of Products.
+        Keywords are collected by two queries, changed ones are saved
+        by bulk update, then vector is updated by one UPDATE.
+        :param product_ids: Products to refresh, if None - all Products
+        :return: number of refreshed Products
+        """
+        products = models.Product.objects.all()
+        tags = models.Product.tags.through.objects \
+            .order_by("tag__name") \
+            .values_list("product_id", "tag__name")
+        specifications = models.Product.specifications.through.objects \
+            .order_by("specification__name", "specification__value") \
+            .values_list(
+                "product_id", "specification__name", "specification__value")
+        if product_ids is not None:
+            product_ids = list(product_ids)
+            products = products.filter(pk__in=product_ids)
+            tags = tags.filter(product_id__in=product_ids)
+            specifications = specifications.filter(
+                product_id__in=product_ids)
+
+        keywords = defaultdict(list)
+        for product_id, name in tags:
+            keywords[product_id].append(name)
+        for product_id, name, value in specifications:
+            keywords[product_id].extend((name, value))
+
+        to_update = []
+        refreshed = 0
+        for product in products.only("pk", "search_keywords"):
+            refreshed += 1
+            product_keywords = " ".join(keywords.get(product.pk, ()))
+            if product.search_keywords != product_keywords:
+                product.search_keywords = product_keywords
+                to_update.append(product)
+        if to_update:
+            models.Product.objects.bulk_update(
+                to_update, fields=["search_keywords"], batch_size=500)
+
+        if connections[products.db].vendor == "postgresql":
+            products.update(search_vector=cls.get_search_vector())
+        cls.invalidate_index()
+        return refreshed
+
+    @staticmethod
+    def invalidate_index() -> None:
+        """
+        Sets new version of search data, so in-process indexes
+        of all workers are rebuilt. It is repeated after commit,
+        because the index could be built from old data before commit.
+        """
+        def set_new_version():
+            cache.set(
+                search_selectors.INDEX_VERSION_CACHE_KEY,
+                uuid.uuid4().hex,
+                timeout=None,
+            )
+            selectors.ProductSearchSelector.clear_local_index()
+
+        set_new_version()
+        transaction.on_commit(set_new_version)
@@ -0,0 +1,95 @@
+from django.db import transaction
+from django.db.models import signals
+from django.dispatch import receiver
+
+from shop import models, services
+
+
+@receiver(signals.post_save, sender=models.Review)
+def refresh_rating_on_raw_review_save(sender, instance, raw, **kwargs):
+    """
+    Fixtures (loaddata) save reviews bypassing ReviewService,
+    so denormalized rating of the Product is recalculated here.
+    """
+    if raw:
+        services.ReviewService.refresh_product_ratings(
+            product_ids=[instance.product_id])
+
+
+@receiver(signals.post_delete, sender=models.Review)
+def subtract_rate_of_deleted_review(sender, instance, **kwargs):
+    """
+    Any deletion of Review (by service, queryset or cascade from
+    User or Product) updates rating in the transaction of deletion.
+    """
+    services.ReviewService.subtract_rate(
+        product_id=instance.product_id, rate=instance.rate)
+
+
+@receiver(signals.post_save, sender=models.Category)
+def refresh_category_path(sender, instance, **kwargs):
+    """Path contains pk, so it can be set only after saving."""
+    services.CategoryService.refresh_path(instance=instance)
+
+
+@receiver(signals.post_save, sender=models.Category)
+@receiver(signals.post_delete, sender=models.Category)
+def invalidate_category_tree(sender, **kwargs):
+    """
+    Any change of categories invalidates cached tree.
+    It is repeated after commit, because the tree could be cached
+    from old data between save and commit.
+    """
+    services.CategoryService.invalidate_tree_cache()
+    transaction.on_commit(services.CategoryService.invalidate_tree_cache)
+
+
+@receiver(signals.post_save, sender=models.Product)
+def refresh_product_search(sender, instance, update_fields, **kwargs):
+    """Fixtures (raw) are indexed too, saving only other fields is skipped."""
+    if update_fields is not None and \
+            not services.ProductSearchService.indexed_fields & update_fields:
+        return
+    services.ProductSearchService.refresh_search(product_ids=[instance.pk])
+
+
+@receiver(signals.post_delete, sender=models.Product)
+def invalidate_product_search(sender, **kwargs):
+    services.ProductSearchService.invalidate_index()
+
+
+@receiver(signals.m2m_changed, sender=models.Product.tags.through)
+@receiver(signals.m2m_changed, sender=models.Product.specifications.through)
+def refresh_product_search_keywords(
+        sender, instance, action, reverse, pk_set, **kwargs):
+    """Tags and specifications are part of search keywords of Product."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        product_ids = [instance.pk]
+    else:
+        # pk_set is None on clearing from the Tag side, refresh all
+        product_ids = pk_set
+    services.ProductSearchService.refresh_search(product_ids=product_ids)
+
+
+@receiver(signals.post_save, sender=models.Tag)
+@receiver(signals.post_save, sender=models.Specification)
+def refresh_related_products_search(sender, instance, created, raw, **kwargs):
+    """Renaming of tag or specification changes keywords of its Products."""
+    if created or raw:
+        return
+    product_ids = list(instance.product_set.values_list("pk", flat=True))
+    if product_ids:
+        services.ProductSearchService.refresh_search(product_ids=product_ids)
+
+
+@receiver(signals.pre_delete, sender=models.Tag)
+@receiver(signals.pre_delete, sender=models.Specification)
+def refresh_related_products_search_on_delete(sender, instance, **kwargs):
+    """Relations are deleted with the instance, so refresh after commit."""
+    product_ids = list(instance.product_set.values_list("pk", flat=True))
+    if product_ids:
+        transaction.on_commit(
+            lambda: services.ProductSearchService.refresh_search(
+                product_ids=product_ids))
@@ -0,0 +1,158 @@
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shop import models
+
+UserModel = get_user_model()
+
+
+class ChangeListTestCase(TestCase):
+    def setUp(self):
+        self.admin = UserModel.objects.create_superuser(
+            username="admin", password="password")
+        self.client.force_login(self.admin)
+        self.category = models.Category.objects.create(title="category")
+
+    def create_products(self, number):
+        models.Product.objects.bulk_create([
+            models.Product(
+                title=f"product {i}",
+                release_date="2023-01-01",
+                category=self.category,
+            )
+            for i in range(number)
+        ])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_number_of_queries_does_not_depend_on_rows(self):
+        url = reverse("admin:shop_product_changelist")
+        self.create_products(2)
+        small = self.count_queries(url)
+        self.create_products(20)
+        large = self.count_queries(url)
+
+        self.assertEqual(small, large)
+
+    def test_change_forms_do_not_render_all_related_rows(self):
+        self.create_products(30)
+        models.Tag.objects.bulk_create(
+            [models.Tag(name=f"tag {i}") for i in range(30)])
+        product = models.Product.objects.first()
+
+        response = self.client.get(
+            reverse("admin:shop_product_change", args=(product.pk,)))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "tag 1<")
+
+        # inline shows the first page of products
+        response = self.client.get(
+            reverse("admin:shop_category_change", args=(self.category.pk,)))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "product 1<")
+        self.assertNotContains(response, "product 25<")
+
+    def test_search(self):
+        products = models.Product.objects.bulk_create([
+            models.Product(title=title, release_date="2023-01-01")
+            for title in ("alpha", "beta", "alpha beta")
+        ])
+        url = reverse("admin:shop_product_changelist")
+        queries = (
+            ("alpha", 2),
+            ("alpha beta", 1),
+            (str(products[1].pk), 1),
+            ("none", 0),
+        )
+        for query, number in queries:
+            with self.subTest(query=query):
+                response = self.client.get(url, {"q": query})
+                self.assertEqual(response.context["cl"].result_count, number)
+
+
+class CategoryActionsTestCase(TestCase):
+    fixtures = [
+        "test_category",
+    ]
+
+    def setUp(self):
+        self.admin = UserModel.objects.create_superuser(
+            username="admin", password="password")
+        self.client.force_login(self.admin)
+        self.url = reverse("admin:shop_category_changelist")
+
+    def run_action(self, action, pks):
+        return self.client.post(self.url, {
+            "action": action,
+            "_selected_action": pks,
+        })
+
+    def test_mark_as_inactive_and_active(self):
+        self.run_action("mark_as_inactive", [1, 2])
+        self.assertEqual(
+            set(models.Category.objects
+                .filter(is_active=False).values_list("pk", flat=True)),
+            {1, 2, 3},
+        )
+
+        self.run_action("mark_as_active", [1, 3])
+        self.assertEqual(
+            set(models.Category.objects
+                .filter(is_active=True).values_list("pk", flat=True)),
+            {1, 3},
+        )
+
+    def test_delete_categories(self):
+        response = self.run_action("delete_categories", [1])
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(models.Category.objects.filter(pk=1).exists())
+        # category 2 is a child of category 1
+        self.assertFalse(models.Category.objects.get(pk=2).is_active)
+
+
+class CatalogViewsTestCase(TestCase):
+    fixtures = [
+        "test_product",
+    ]
+
+    def setUp(self):
+        self.admin = UserModel.objects.create_superuser(
+            username="admin", password="password")
+        self.client.force_login(self.admin)
+
+    def test_export_is_streamed(self):
+        url = reverse("admin:shop_product_export")
+
+        response = self.client.get(url, {"format": "jsonl"})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/jsonl")
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), models.Product.objects.count())
+        self.assertEqual(
+            self.client.get(url, {"format": "xml"}).status_code, 400)
+
+    def test_import(self):
+        content = (
+            "title,description,price,release_date,manufacturer,tags\n"
+            "Catan,trading,10.50,2023-01-01,Kosmos,family|trading\n"
+        )
+        file = SimpleUploadedFile("catalog.csv", content.encode())
+        url = reverse("admin:shop_product_import")
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        response = self.client.post(url, {"file": file, "format": "csv"})
+
+        self.assertRedirects(
+            response, reverse("admin:shop_product_changelist"))
+        product = models.Product.objects.get(title="Catan")
+        self.assertEqual(product.tags.count(), 2)
@@ -3,6 +3,8 @@ from decimal import Decimal
 from collections import OrderedDict
 from unittest.mock import patch
 
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
@@ -44,6 +46,10 @@ class CatalogApiGetTestCase(TestCase):
         super().setUpClass()
         cls.url = reverse("api:shop:catalog")
 
+    def setUp(self):
+        # count of pages is cached by pagination
+        cache.clear()
+
     @patch('shop.selectors.ProductSelector.get_catalog')
     @patch('api.pagination.get_paginated_response')
     def test_get(
@@ -78,8 +84,9 @@ class CatalogApiGetTestCase(TestCase):
         factory = APIRequestFactory()
         request = factory.get(self.url, data=params)
 
+        # async view
         view = CatalogApi.as_view()
-        response = view(request)
+        response = async_to_sync(view)(request)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         mock_get_catalog.assert_called_once_with(
@@ -129,9 +136,35 @@ class CatalogApiGetTestCase(TestCase):
                     ('reviews', 0),
                     ('rating', None)
                 ]),
+                # matched by description, so it is less relevant
+                OrderedDict([
+                    ('id', 5),
+                    ('category', 1),
+                    ('price', Decimal('1.00')),
+                    ('count', 119),
+                    ('date', '2022-11-08'),
+                    ('title', 'T-item 5'),
+                    ('description', 'test description 5...'),
+                    ('freeDelivery', False),
+                    ('images', []),
+                    ('tags', [
+                        OrderedDict([
+                            ('id', 2),
+                            ('name', 'test tag 2')
+                        ]),
+                        OrderedDict([
+                            ('id', 3),
+                            ('name', 'test tag 3')
+                        ])
+                    ]),
+                    ('reviews', 0),
+                    ('rating', None)
+                ]),
             ]),
             ('currentPage', 1),
-            ('lastPage', 1)
+            ('lastPage', 1),
+            ('nextCursor', None),
+            ('previousCursor', None),
         ])
 
         response = self.client.get(self.url, data=params)
@@ -1,11 +1,10 @@
-from unittest.mock import patch
-
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 
 from shop import models
 from shop.apis import CategoryApi
+from shop.services import CategoryService
 
 
 class CategoryApiGetTestCase(TestCase):
@@ -18,15 +17,13 @@ class CategoryApiGetTestCase(TestCase):
         super().setUpClass()
         cls.url = reverse("api:shop:categories")
 
-    @patch('shop.selectors.CategorySelector.get_root_categories_queryset')
-    def test_get(self, mock_get_root_categories_queryset):
-        categories = models.Category.objects.filter(parent=None)
-        mock_get_root_categories_queryset.return_value = categories
+    def setUp(self):
+        CategoryService.invalidate_tree_cache()
 
+    def test_get(self):
         response = self.client.get(self.url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        mock_get_root_categories_queryset.assert_called_once_with()
         self.assertListEqual(
             response.data,
             [
@@ -43,15 +40,25 @@ class CategoryApiGetTestCase(TestCase):
                         }
                     ],
                 },
-                {
-                    "id": 3,
-                    "title": "Party",
-                    "image": None,
-                    "subcategories": [],
-                },
             ],
         )
 
+    def test_tree_is_cached(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 1)
+
+    def test_cache_is_invalidated_on_category_change(self):
+        self.client.get(self.url)
+        CategoryService().update_or_create(
+            instance=models.Category.objects.get(pk=3), is_active=True)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            [category["id"] for category in response.data], [1, 3])
+
 
 class CategoryApiOutputSerializerTestCase(TestCase):
     @classmethod
@@ -0,0 +1,45 @@
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from shop import models
+
+
+class CatalogCommandsTestCase(TestCase):
+    fixtures = [
+        "test_product",
+    ]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_export_and_import_file(self):
+        for name in ("catalog.csv", "catalog.jsonl"):
+            with self.subTest(name=name):
+                path = os.path.join(self.directory, name)
+                number = models.Product.objects.count()
+                out = io.StringIO()
+
+                call_command("export_catalog", path, stdout=out)
+                self.assertIn(
+                    f"{number} products are exported", out.getvalue())
+                models.Product.objects.update(title="changed")
+                call_command("import_catalog", path, stdout=out)
+
+                self.assertIn(
+                    f"0 created, {number} updated, 0 skipped", out.getvalue())
+                self.assertFalse(
+                    models.Product.objects.filter(title="changed").exists())
+
+    def test_export_to_stdout(self):
+        out = io.StringIO()
+
+        call_command("export_catalog", "--format", "jsonl", stdout=out)
+
+        self.assertEqual(
+            len(out.getvalue().splitlines()), models.Product.objects.count())
@@ -85,3 +85,57 @@ class GetAllDescendantsTestCase(TestCase):
         for descendant in descendants:
             self.assertTrue(descendant.is_active)
             self.assertIn(descendant.pk, expected_descendants_ids)
+
+    def test_get_deep_descendants_by_one_query(self):
+        selector = CategorySelector()
+        grandchild = Category.objects.create(title="grandchild", parent_id=2)
+
+        with self.assertNumQueries(1):
+            descendants = selector.get_all_descendants(1)
+
+        self.assertEqual([c.pk for c in descendants], [2, grandchild.pk])
+
+    def test_descendants_of_inactive_category_are_ignored(self):
+        selector = CategorySelector()
+        grandchild = Category.objects.create(title="grandchild", parent_id=2)
+        Category.objects.filter(pk=2).update(is_active=False)
+
+        self.assertEqual(selector.get_all_descendants(1), [])
+        self.assertEqual(
+            [c.pk for c in selector.get_all_descendants(1, only_active=False)],
+            [2, grandchild.pk],
+        )
+
+
+class GetCategoryAndSubcategoryIdsTestCase(TestCase):
+    fixtures = [
+        "test_category",
+    ]
+
+    def test_get_ids_at_any_depth(self):
+        grandchild = Category.objects.create(title="grandchild", parent_id=2)
+        ids = CategorySelector().get_category_and_subcategory_ids(parent_id=1)
+        self.assertEqual(ids, [1, 2, grandchild.pk])
+
+
+class GetCategoryTreeTestCase(TestCase):
+    fixtures = [
+        "test_category",
+    ]
+
+    def test_get_category_tree(self):
+        grandchild = Category.objects.create(title="grandchild", parent_id=2)
+
+        with self.assertNumQueries(1):
+            roots = CategorySelector.get_category_tree()
+
+        self.assertEqual([c.pk for c in roots], [1])
+        self.assertEqual([c.pk for c in roots[0].subcategories], [2])
+        self.assertEqual(
+            [c.pk for c in roots[0].subcategories[0].subcategories],
+            [grandchild.pk],
+        )
+
+    def test_get_category_tree_with_inactive(self):
+        roots = CategorySelector.get_category_tree(only_active=False)
+        self.assertEqual([c.pk for c in roots], [1, 3])
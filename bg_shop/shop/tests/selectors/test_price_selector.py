@@ -0,0 +1,78 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from shop.models import Product
+from shop.selectors import PriceSelector
+from shop.selectors.price_selectors import apply_discount
+
+
+class ApplyDiscountTestCase(TestCase):
+    def test_apply_discount(self):
+        self.assertEqual(
+            apply_discount(price=Decimal("50.00"), discount=16),
+            Decimal("42.00"),
+        )
+
+    def test_apply_zero_discount(self):
+        self.assertEqual(
+            apply_discount(price=Decimal("50.00"), discount=0),
+            Decimal("50.00"),
+        )
+
+
+class PriceSelectorTestCase(TestCase):
+    fixtures = [
+        "test_product",
+        "test_sale",
+    ]
+
+    def setUp(self):
+        self.products = list(Product.objects.order_by("pk"))
+
+    def test_price_for_takes_biggest_discount(self):
+        # sales id=1 (10%) and id=5 (16%) are active for product 1
+        selector = PriceSelector(
+            products=self.products, date=date(2023, 7, 19))
+        self.assertEqual(selector.price_for(product_id=1), Decimal("42.00"))
+
+    def test_price_for_without_active_sale(self):
+        selector = PriceSelector(
+            products=self.products, date=date(2023, 7, 19))
+        self.assertEqual(selector.price_for(product_id=2), Decimal("40"))
+
+    def test_price_for_with_explicit_date(self):
+        selector = PriceSelector(
+            products=self.products, date=date(2023, 7, 19))
+        # only sale id=6 (20%) is active
+        self.assertEqual(
+            selector.price_for(product_id=1, date=date(2023, 5, 20)),
+            Decimal("40.00"),
+        )
+        self.assertEqual(selector.price_for(product_id=1), Decimal("42.00"))
+
+    def test_discounts_loaded_by_one_query(self):
+        selector = PriceSelector(
+            products=self.products, date=date(2023, 7, 19))
+        with self.assertNumQueries(1):
+            for product in self.products:
+                selector.price_for(product_id=product.pk)
+
+    def test_product_added_later_is_loaded_lazily(self):
+        selector = PriceSelector(
+            products=self.products[:1], date=date(2023, 7, 19))
+        selector.price_for(product_id=1)
+        self.assertFalse(selector.is_registered(product_id=3))
+
+        selector.add_products(self.products[2:3])
+        with self.assertNumQueries(1):
+            price = selector.price_for(product_id=3)
+        self.assertEqual(price, Decimal("142.50"))
+        with self.assertNumQueries(0):
+            selector.price_for(product_id=1)
+
+    def test_price_for_not_registered_product(self):
+        selector = PriceSelector(date=date(2023, 7, 19))
+        with self.assertRaises(KeyError):
+            selector.price_for(product_id=1)
@@ -9,6 +9,7 @@ from django.db.models import QuerySet
 from shop.models import Product, Review, Sale
 from shop.selectors import ProductSelector
 from orders import models as order_models
+from orders.services import OrderedProductService
 
 
 class GetActiveProductsTestCase(TestCase):
@@ -66,6 +67,22 @@ class IsAvailableTestCase(TestCase):
             self.selector.is_available()
 
 
+class GetAvailableIdsTestCase(TestCase):
+    fixtures = [
+        "test_product",
+    ]
+
+    def test_get_available_ids(self):
+        # product 4 is inactive, product 100 doesn't exist
+        Product.objects.filter(pk=3).update(count=0)
+        selector = ProductSelector()
+
+        with self.assertNumQueries(1):
+            result = selector.get_available_ids(product_ids=[1, 2, 3, 4, 100])
+
+        self.assertEqual(result, {1, 2})
+
+
 class GetRatingTestCase(TestCase):
     fixtures = [
         "test_user",
@@ -233,10 +250,10 @@ class PrefetchForProductShortSerializerTestCase(TestCase):
         queryset = self.selector._prefetch_for_product_short_serializer(
             products)
         prefetched_obj = queryset.first()._prefetched_objects_cache
-        self.assertIn("review_set", prefetched_obj)
+        self.assertNotIn("review_set", prefetched_obj)
         self.assertIn("images", prefetched_obj)
         self.assertIn("tags", prefetched_obj)
-        self.assertIn("sale_set", prefetched_obj)
+        self.assertNotIn("sale_set", prefetched_obj)
 
 
 class SortCatalogTestCase(TestCase):
@@ -320,13 +337,14 @@ class SortCatalogTestCase(TestCase):
         for order in orders:
             order.status = order_models.Order.Statuses.COMPLETED
             order.save()
+        OrderedProductService.refresh_product_sales()
         queryset = self.selector._sort_catalog(
             Product.objects.all(),
             sort_field="popularity",
         )
         self.assertEqual(
             list(queryset.values_list("popularity", flat=True)),
-            [6, 4, None, None]
+            [6, 4, 0, 0]
         )
 
     def test_wrong_order_arg_rises_exception(self):
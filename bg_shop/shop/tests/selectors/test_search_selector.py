@@ -0,0 +1,102 @@
+from django.test import TestCase
+
+from shop.models import Product, Tag
+from shop.search_index import InvertedIndex, similarity, tokenize
+from shop.selectors import ProductSearchSelector, ProductSelector
+
+
+class InvertedIndexTestCase(TestCase):
+    def setUp(self):
+        self.index = InvertedIndex.build([
+            (1, {"A": "Carcassonne", "C": "Tile-laying game"}),
+            (2, {"A": "Catan", "B": "strategy game"}),
+            (3, {"A": "Game of thrones", "C": "Card game"}),
+        ])
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("Tile-laying GAME, 2-4 players"),
+            ["tile", "laying", "game", "2", "4", "players"],
+        )
+
+    def test_similarity(self):
+        self.assertEqual(similarity("catan", "catan"), 1.0)
+        self.assertGreater(similarity("catan", "catna"), 0.3)
+        self.assertEqual(similarity("catan", "dixit"), 0.0)
+
+    def test_search_by_prefix(self):
+        self.assertEqual(set(self.index.search("ca")), {1, 2, 3})
+
+    def test_every_word_must_match(self):
+        self.assertEqual(set(self.index.search("game card")), {3})
+
+    def test_ranks_depend_on_weights(self):
+        ranks = self.index.search("game")
+        self.assertEqual(sorted(ranks, key=ranks.get, reverse=True), [3, 2, 1])
+
+    def test_search_with_typo(self):
+        self.assertEqual(set(self.index.search("carcasone")), {1})
+
+    def test_nothing_found(self):
+        self.assertEqual(self.index.search("dixit"), {})
+        self.assertEqual(self.index.search(""), {})
+
+
+class ProductSearchSelectorTestCase(TestCase):
+    fixtures = [
+        "test_tag",
+        "test_product",
+    ]
+
+    def setUp(self):
+        self.selector = ProductSearchSelector()
+
+    def _search(self, query):
+        qs = self.selector.search(
+            queryset=Product.objects.all(), query=query)
+        return list(qs.order_by("-search_rank", "pk")
+                    .values_list("pk", flat=True))
+
+    def test_search_by_title(self):
+        self.assertEqual(self._search("item 2"), [2])
+
+    def test_title_is_more_relevant_than_manufacturer(self):
+        Product.objects.filter(pk=3).update(title="Manufacturer")
+        Product.objects.get(pk=3).save()
+        self.assertEqual(self._search("manufacturer")[0], 3)
+
+    def test_search_by_tag(self):
+        Tag.objects.create(name="cooperative").product_set.add(4)
+        self.assertEqual(self._search("cooperative"), [4])
+
+    def test_index_is_rebuilt_after_change(self):
+        self.assertEqual(self._search("dixit"), [])
+        product = Product.objects.get(pk=1)
+        product.title = "Dixit"
+        product.save()
+        self.assertEqual(self._search("dixit"), [1])
+
+    def test_index_is_not_rebuilt_without_changes(self):
+        self._search("item")
+        with self.assertNumQueries(1):
+            self._search("item")
+
+    def test_empty_query(self):
+        self.assertEqual(self._search("?!"), [])
+
+    def test_catalog_is_sorted_by_relevance(self):
+        Product.objects.filter(pk=1).update(
+            description="the best item in the shop")
+        Product.objects.get(pk=1).save(update_fields=["description"])
+        catalog = ProductSelector().get_catalog(filters={"name": "best"})
+        self.assertEqual(list(catalog.values_list("pk", flat=True)), [1])
+
+        catalog = ProductSelector().get_catalog(
+            filters={"name": "item", "minPrice": 45},
+            sort_field="price",
+            order="inc",
+        )
+        self.assertEqual(
+            [product.price for product in catalog],
+            sorted(product.price for product in catalog),
+        )
@@ -2,11 +2,14 @@ from unittest.mock import MagicMock, patch, PropertyMock
 from collections import OrderedDict
 from decimal import Decimal
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 
 from shop.models import Product, Review
 from shop.serializers import ProductShortSerializer
+from shop.services import ReviewService
 
 UserModel = get_user_model()
 
@@ -56,11 +59,10 @@ class ProductShortSerializerTestCase(TestCase):
     def test_get_reviews_with_reviews(self):
         serializer = ProductShortSerializer()
 
-        mock_review_set = MagicMock()
-        mock_product = MagicMock(review_set=mock_review_set)
+        mock_product = MagicMock(review_count=2)
         result = serializer.get_reviews(mock_product)
 
-        self.assertEqual(result, mock_review_set.count())
+        self.assertEqual(result, 2)
 
     def test_get_reviews_without_reviews(self):
         serializer = ProductShortSerializer()
@@ -77,8 +79,11 @@ class ProductShortSerializerTestCase(TestCase):
         )
         product = Product.objects.get(pk=1)
 
-        Review.objects.create(product=product, rate=4, author=user)
-        Review.objects.create(product=product, rate=5, author=user)
+        ReviewService().create_review(
+            user_id=user.pk, product_id=product.pk, text=None, rate=4)
+        ReviewService().create_review(
+            user_id=user.pk, product_id=product.pk, text=None, rate=5)
+        product.refresh_from_db()
 
         serializer.review_set = MagicMock(spec=Review.objects)
         serializer.review_set.count.return_value = 2
@@ -127,3 +132,23 @@ class GeneralProductSerializationTestCase(TestCase):
 
         serializer = ProductShortSerializer(product)
         self.assertEqual(serializer.data, expected_data)
+
+
+class ProductShortSerializerQueriesTestCase(TestCase):
+    fixtures = [
+        "test_product",
+        "test_sale",
+    ]
+
+    def _count_sale_queries(self, queryset) -> int:
+        with CaptureQueriesContext(connection) as context:
+            ProductShortSerializer(queryset, many=True).data
+        return len(
+            [q for q in context.captured_queries if "shop_sale" in q["sql"]])
+
+    def test_sales_loaded_by_one_query_for_many_products(self):
+        one_product = Product.objects.filter(pk=1)
+        all_products = Product.objects.all()
+
+        self.assertEqual(self._count_sale_queries(one_product), 1)
+        self.assertEqual(self._count_sale_queries(all_products), 1)
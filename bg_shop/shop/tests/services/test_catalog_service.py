@@ -0,0 +1,267 @@
+import json
+from decimal import Decimal
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+
+from api import caching
+from common import models as common_models
+from shop import models
+from shop.services import CatalogExportService, CatalogImportService
+
+
+def make_row(**kwargs) -> dict:
+    return {
+        "title": "Catan",
+        "description": "trading",
+        "price": "10.50",
+        "count": 5,
+        "release_date": "2023-01-01",
+        "manufacturer": "Kosmos",
+        **kwargs,
+    }
+
+
+def to_jsonl(rows) -> list[str]:
+    return [json.dumps(row) + "\n" for row in rows]
+
+
+class CatalogImportServiceTestCase(TestCase):
+    fixtures = [
+        "test_product",
+        "test_tag",
+        "test_specification",
+    ]
+
+    def setUp(self):
+        self.image = common_models.Image.objects.create(
+            img="images/catan.jpg")
+
+    def test_import_creates_products_with_relations(self):
+        row = make_row(
+            category="Strategy",
+            tags=["test tag 1", "new tag"],
+            specifications=[
+                {"name": "test1", "value": "1"},
+                {"name": "players", "value": "3-4"},
+            ],
+            images=["images/catan.jpg"],
+        )
+        service = CatalogImportService(fmt="jsonl")
+
+        result = service.import_lines(to_jsonl([row]))
+
+        self.assertEqual(
+            result, {"created": 1, "updated": 0, "skipped": 0})
+        product = models.Product.objects.get(title="Catan")
+        self.assertEqual(product.price, Decimal("10.50"))
+        self.assertEqual(product.category.title, "Strategy")
+        self.assertEqual(product.category.path, f"{product.category.pk}/")
+        self.assertEqual(
+            set(product.tags.values_list("name", flat=True)),
+            {"test tag 1", "new tag"})
+        self.assertIn(1, product.specifications.values_list("pk", flat=True))
+        self.assertEqual(list(product.images.all()), [self.image])
+        self.assertIn("new tag", product.search_keywords)
+        self.assertEqual(models.Tag.objects.filter(name="new tag").count(), 1)
+
+    def test_rows_with_id_are_upserted(self):
+        product = models.Product.objects.get(pk=1)
+        product.tags.add(1)
+        rows = [
+            make_row(id=1, title="renamed", tags=["test tag 2"]),
+            make_row(id=1000),
+        ]
+
+        result = CatalogImportService(fmt="jsonl").import_lines(
+            to_jsonl(rows))
+
+        self.assertEqual(
+            result, {"created": 1, "updated": 1, "skipped": 0})
+        product.refresh_from_db()
+        self.assertEqual(product.title, "renamed")
+        self.assertEqual(list(product.tags.values_list("pk", flat=True)), [2])
+        self.assertTrue(models.Product.objects.filter(pk=1000).exists())
+        # sequence of ids is moved after imported ones
+        self.assertGreater(models.Product.objects.create(
+            **make_row(count=1, price=1)).pk, 1000)
+
+    def test_partial_rows_keep_missing_columns(self):
+        product = models.Product.objects.get(pk=1)
+        product.category = models.Category.objects.create(title="Family")
+        product.save()
+        product.tags.add(1)
+        rows = [
+            {"id": 1, "title": "renamed", "images": ["images/catan.jpg"]},
+            {"id": 2},
+        ]
+
+        result = CatalogImportService(fmt="jsonl").import_lines(
+            to_jsonl(rows))
+
+        self.assertEqual(
+            result, {"created": 0, "updated": 2, "skipped": 0})
+        updated = models.Product.objects.get(pk=1)
+        self.assertEqual(updated.title, "renamed")
+        for field in ("price", "count", "is_active", "category_id"):
+            self.assertEqual(
+                getattr(updated, field), getattr(product, field))
+        self.assertEqual(list(updated.tags.values_list("pk", flat=True)), [1])
+        self.assertEqual(list(updated.images.all()), [self.image])
+
+    def test_partial_rows_of_new_products_are_validated(self):
+        service = CatalogImportService(fmt="jsonl")
+
+        result = service.import_lines(
+            to_jsonl([{"id": 1000, "title": "new"}]))
+
+        self.assertEqual(
+            result, {"created": 0, "updated": 0, "skipped": 1})
+        self.assertFalse(models.Product.objects.filter(pk=1000).exists())
+
+    def test_cached_responses_are_invalidated(self):
+        tags = ("product", "tag", "category")
+        versions = caching.get_tag_versions(tags)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CatalogImportService(fmt="jsonl").import_lines(
+                to_jsonl([make_row(id=1)]))
+
+        new_versions = caching.get_tag_versions(tags)
+        for name in tags:
+            self.assertNotEqual(new_versions[name], versions[name])
+
+    def test_invalid_rows_are_skipped(self):
+        lines = [
+            *to_jsonl([make_row(price="-1"), make_row(release_date=None)]),
+            "not json\n",
+            *to_jsonl([make_row(images=["unknown.jpg"]), make_row()]),
+        ]
+        service = CatalogImportService(fmt="jsonl")
+
+        result = service.import_lines(lines)
+
+        self.assertEqual(
+            result, {"created": 2, "updated": 0, "skipped": 3})
+        errors = sorted(service.errors)
+        self.assertEqual(len(errors), 4)
+        self.assertTrue(errors[0].startswith("line 1: price"))
+        self.assertTrue(errors[1].startswith("line 2: release_date"))
+        self.assertTrue(errors[2].startswith("line 3: "))
+        self.assertIn("unknown.jpg", errors[3])
+
+    def test_number_of_queries_does_not_depend_on_rows(self):
+        def count_queries(number, offset):
+            rows = [
+                make_row(
+                    id=2000 + offset + i,
+                    tags=[f"tag {offset + i}"],
+                    specifications=[{"name": "n", "value": str(i)}],
+                    images=["images/catan.jpg"],
+                )
+                for i in range(number)
+            ]
+            service = CatalogImportService(fmt="jsonl", chunk_size=100)
+            with CaptureQueriesContext(connection) as context:
+                service.import_lines(to_jsonl(rows))
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(3, 0), count_queries(30, 100))
+
+
+@tag("postgres")
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Ids are taken from sequence, run with postgres settings "
+    "(e.g. settings.local).",
+)
+class CatalogImportSequenceTestCase(TestCase):
+    """Rows without id must not get ids of imported rows."""
+
+    def test_rows_with_and_without_id(self):
+        next_id = models.Product.objects.create(**make_row()).pk + 1
+        rows = [
+            make_row(title="first", id=next_id),
+            make_row(title="second"),
+            make_row(title="third", id=next_id + 2),
+            make_row(title="fourth"),
+        ]
+
+        result = CatalogImportService(fmt="jsonl", chunk_size=2) \
+            .import_lines(to_jsonl(rows))
+
+        self.assertEqual(
+            result, {"created": 4, "updated": 0, "skipped": 0})
+        self.assertEqual(
+            models.Product.objects.get(title="first").pk, next_id)
+        self.assertEqual(
+            models.Product.objects.get(title="third").pk, next_id + 2)
+        self.assertGreater(
+            models.Product.objects.get(title="second").pk, next_id)
+        self.assertGreater(
+            models.Product.objects.get(title="fourth").pk, next_id + 2)
+
+
+class CatalogExportServiceTestCase(TestCase):
+    fixtures = [
+        "test_category",
+        "test_product",
+        "test_tag",
+        "test_specification",
+    ]
+
+    def setUp(self):
+        product = models.Product.objects.get(pk=1)
+        product.category_id = 1
+        product.save()
+        product.tags.add(1, 2)
+        product.specifications.add(1)
+        product.images.add(
+            common_models.Image.objects.create(img="images/catan.jpg"))
+
+    def test_jsonl(self):
+        lines = list(CatalogExportService(fmt="jsonl").iter_lines())
+
+        self.assertEqual(len(lines), models.Product.objects.count())
+        row = json.loads(lines[0])
+        self.assertEqual(row["id"], 1)
+        self.assertEqual(row["price"], "50.00")
+        self.assertEqual(row["category"], "test Strategy")
+        self.assertEqual(row["tags"], ["test tag 1", "test tag 2"])
+        self.assertEqual(
+            row["specifications"], [{"name": "test1", "value": "1"}])
+        self.assertEqual(row["images"], ["images/catan.jpg"])
+
+    def test_chunks_cost_constant_number_of_queries(self):
+        service = CatalogExportService(fmt="csv", chunk_size=2)
+        # products and, per chunk, tags, specifications and images
+        with self.assertNumQueries(1 + 3 * 2):
+            lines = list(service.iter_lines(
+                models.Product.objects.filter(pk__in=[1, 2, 3])))
+        self.assertEqual(len(lines), 4)
+
+    def test_aiter_lines(self):
+        async def collect():
+            service = CatalogExportService(fmt="jsonl")
+            return [line async for line in service.aiter_lines()]
+
+        self.assertEqual(
+            async_to_sync(collect)(),
+            list(CatalogExportService(fmt="jsonl").iter_lines()),
+        )
+
+    def test_round_trip(self):
+        for fmt in ("csv", "jsonl"):
+            with self.subTest(fmt=fmt):
+                lines = list(CatalogExportService(fmt=fmt).iter_lines())
+                models.Product.tags.through.objects.all().delete()
+                models.Product.objects.update(title="changed")
+
+                result = CatalogImportService(fmt=fmt).import_lines(lines)
+
+                self.assertEqual(result["skipped"], 0)
+                self.assertEqual(
+                    list(CatalogExportService(fmt=fmt).iter_lines()), lines)
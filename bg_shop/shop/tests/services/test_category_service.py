@@ -3,6 +3,7 @@ from unittest.mock import patch, call
 from django.test import TestCase
 from django.core.exceptions import ValidationError
 
+from api import caching
 from shop.models import Category
 from shop.services import CategoryService
 
@@ -260,6 +261,50 @@ class DeleteTestCase(TestCase):
         self.assertTrue(subcategory.is_active)
 
 
+class BulkActionsTestCase(TestCase):
+    fixtures = [
+        "test_category",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.service = CategoryService()
+
+    def test_delete_many(self):
+        # category 2 is a child of category 1
+        grandchild = Category.objects.create(title="grandchild", parent_id=2)
+
+        # relations of deleted categories are set to NULL by two UPDATEs
+        with self.assertNumQueries(6):
+            number = self.service.delete_many(
+                queryset=Category.objects.filter(pk__in=[2, 3]))
+
+        self.assertEqual(number, 2)
+        self.assertEqual(
+            set(Category.objects.values_list("pk", flat=True)),
+            {1, grandchild.pk},
+        )
+        grandchild.refresh_from_db()
+        self.assertFalse(grandchild.is_active)
+        self.assertTrue(Category.objects.get(pk=1).is_active)
+
+    @patch.object(CategoryService, "invalidate_tree_cache")
+    def test_set_active(self, mock_invalidate):
+        version = caching.get_tag_versions(["category"])["category"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                number = self.service.set_active(
+                    queryset=Category.objects.all(), is_active=False)
+
+        self.assertEqual(number, 3)
+        self.assertFalse(Category.objects.filter(is_active=True).exists())
+        self.assertEqual(mock_invalidate.call_count, 2)
+        self.assertNotEqual(
+            caching.get_tag_versions(["category"])["category"], version)
+
+
 class GetMaxDepthTestCase(TestCase):
 
     @classmethod
@@ -272,3 +317,24 @@ class GetMaxDepthTestCase(TestCase):
         max_depth = self.service.get_max_depth()
         self.assertEqual(max_depth, Category.MAX_DEPTH)
 
+
+class RefreshPathTestCase(TestCase):
+    fixtures = [
+        "test_category",
+    ]
+
+    def test_path_is_set_on_save(self):
+        category = Category.objects.create(title="grandchild", parent_id=2)
+        category.refresh_from_db()
+        self.assertEqual(category.path, f"1/2/{category.pk}/")
+
+    def test_paths_of_descendants_are_rewritten(self):
+        grandchild = Category.objects.create(title="grandchild", parent_id=2)
+        CategoryService().update_or_create(
+            instance=Category.objects.get(pk=2),
+            parent=Category.objects.get(pk=3),
+        )
+
+        grandchild.refresh_from_db()
+        self.assertEqual(grandchild.path, f"3/2/{grandchild.pk}/")
+        self.assertEqual(grandchild.depth, 2)
@@ -1,8 +1,9 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.utils import timezone
 from unittest.mock import patch
 
-from shop.models import Review
+from shop.models import Product, Review
 from shop.services import ReviewService
 
 
@@ -92,3 +93,99 @@ class CreateReviewTestCase(TestCase):
         with self.assertRaises(Review.DoesNotExist):
             Review.objects.get(author_id=user_id, product_id=product_id)
 
+
+class ProductRatingTestCase(TestCase):
+    fixtures = [
+        "test_user",
+        "test_product",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.service = ReviewService()
+
+    def test_create_review_updates_product_rating(self):
+        self.service.create_review(
+            user_id=1, product_id=2, text=None, rate=4)
+        self.service.create_review(
+            user_id=1, product_id=2, text=None, rate=5)
+
+        product = Product.objects.get(pk=2)
+        self.assertEqual(product.rating_sum, 9)
+        self.assertEqual(product.review_count, 2)
+        self.assertEqual(product.rating_avg, 4.5)
+
+    def test_create_review_with_commit_false_does_not_update_rating(self):
+        self.service.create_review(
+            user_id=1, product_id=2, text=None, rate=4, commit=False)
+
+        product = Product.objects.get(pk=2)
+        self.assertEqual(product.review_count, 0)
+        self.assertIsNone(product.rating_avg)
+
+    def test_delete_review_updates_product_rating(self):
+        first = self.service.create_review(
+            user_id=1, product_id=2, text=None, rate=4)
+        second = self.service.create_review(
+            user_id=1, product_id=2, text=None, rate=2)
+
+        self.service.delete_review(review=first)
+        product = Product.objects.get(pk=2)
+        self.assertEqual(product.rating_sum, 2)
+        self.assertEqual(product.review_count, 1)
+        self.assertEqual(product.rating_avg, 2)
+
+        self.service.delete_review(review=second)
+        product = Product.objects.get(pk=2)
+        self.assertEqual(product.rating_sum, 0)
+        self.assertEqual(product.review_count, 0)
+        self.assertIsNone(product.rating_avg)
+
+    def test_delete_reviews(self):
+        self.service.create_review(
+            user_id=1, product_id=1, text=None, rate=4)
+        self.service.create_review(
+            user_id=1, product_id=2, text=None, rate=2)
+        self.service.create_review(
+            user_id=1, product_id=2, text=None, rate=3)
+
+        self.service.delete_reviews(
+            queryset=Review.objects.filter(rate__lt=3))
+
+        self.assertEqual(Product.objects.get(pk=1).review_count, 1)
+        product = Product.objects.get(pk=2)
+        self.assertEqual(product.review_count, 1)
+        self.assertEqual(product.rating_avg, 3)
+
+    def test_deleting_author_updates_product_rating(self):
+        user = get_user_model().objects.create_user(username="reviewer")
+        self.service.create_review(
+            user_id=1, product_id=2, text=None, rate=2)
+        self.service.create_review(
+            user_id=user.pk, product_id=2, text=None, rate=5)
+
+        user.delete()
+
+        product = Product.objects.get(pk=2)
+        self.assertEqual(product.rating_sum, 2)
+        self.assertEqual(product.review_count, 1)
+        self.assertEqual(product.rating_avg, 2)
+
+    def test_refresh_product_ratings(self):
+        Review.objects.create(author_id=1, product_id=1, rate=3)
+        Review.objects.create(author_id=1, product_id=1, rate=4)
+        Product.objects.filter(pk=2).update(
+            rating_sum=10, review_count=1, rating_avg=10)
+
+        updated = self.service.refresh_product_ratings()
+
+        self.assertEqual(updated, Product.objects.count())
+        product = Product.objects.get(pk=1)
+        self.assertEqual(product.rating_sum, 7)
+        self.assertEqual(product.review_count, 2)
+        self.assertEqual(product.rating_avg, 3.5)
+        product = Product.objects.get(pk=2)
+        self.assertEqual(product.rating_sum, 0)
+        self.assertEqual(product.review_count, 0)
+        self.assertIsNone(product.rating_avg)
@@ -0,0 +1,54 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from shop.models import Product, Specification, Tag
+from shop.services import ProductSearchService
+
+
+class ProductSearchServiceTestCase(TestCase):
+    fixtures = [
+        "test_tag",
+        "test_product",
+    ]
+
+    def test_keywords_contain_tags_and_specifications(self):
+        product = Product.objects.get(pk=1)
+        product.tags.add(1, 2)
+        product.specifications.add(
+            Specification.objects.create(name="players", value="2-4"))
+
+        product.refresh_from_db()
+        self.assertEqual(
+            product.search_keywords, "test tag 1 test tag 2 players 2-4")
+
+    def test_keywords_are_refreshed_on_tag_rename(self):
+        tag = Tag.objects.get(pk=1)
+        tag.product_set.add(1, 2)
+
+        tag.name = "family"
+        tag.save()
+
+        self.assertEqual(
+            list(Product.objects.filter(pk__in=[1, 2])
+                 .values_list("search_keywords", flat=True)),
+            ["family", "family"],
+        )
+
+    def test_refresh_search_of_all_products(self):
+        Product.tags.through.objects.create(product_id=3, tag_id=3)
+        self.assertEqual(ProductSearchService.refresh_search(), 4)
+        self.assertEqual(
+            Product.objects.get(pk=3).search_keywords, "test tag 3")
+
+    def test_saving_not_indexed_fields_is_skipped(self):
+        product = Product.objects.get(pk=1)
+        with self.assertNumQueries(1):
+            product.save(update_fields=["count"])
+
+    def test_rebuild_search_index_command(self):
+        Product.tags.through.objects.create(product_id=2, tag_id=1)
+        call_command("rebuild_search_index", "2", stdout=StringIO())
+        self.assertEqual(
+            Product.objects.get(pk=2).search_keywords, "test tag 1")
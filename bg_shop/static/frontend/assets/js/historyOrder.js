@@ -1,10 +1,13 @@
 var mix = {
 	methods: {
-		getHistoryOrder() {
-			this.getData("/api/orders/")
+		getHistoryOrder(cursor = null) {
+			const params = cursor ? {cursor} : {}
+			this.getData("/api/orders/", params)
 				.then(data => {
 					console.log(data)
-					this.orders = data
+					// next pages are added to already shown orders
+					this.orders = cursor ? [...this.orders, ...data.items] : data.items
+					this.nextCursor = data.nextCursor
 				}).catch((error) => {
                     this.orders = []
                     console.warn('error:', error.response.data)
@@ -23,6 +26,7 @@ var mix = {
 	data() {
 		return {
 			orders: [],
+			nextCursor: null,
 		}
 	}
 }
\ No newline at end of file
@@ -48,10 +48,10 @@ var mix = {
             })
         },
 		getLastOrder() {
-			this.getData("/api/orders/")
+			this.getData("/api/orders/", {limit: 1})
 				.then(data => {
-				    if (data){
-				        this.order = data[0]
+				    if (data && data.items.length){
+				        this.order = data.items[0]
 				    }
 				}).catch(() => {
 				this.order = {}
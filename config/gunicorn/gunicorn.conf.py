@@ -0,0 +1,112 @@
+"""
+Gunicorn configuration: `gunicorn -c config/gunicorn/gunicorn.conf.py`
+(run from the directory of manage.py).
+
+Settings are read from environment:
+    GUNICORN_BIND - default 0.0.0.0:8000
+    GUNICORN_WORKER_CLASS - gthread (default), sync or uvicorn
+        (uvicorn.workers.UvicornWorker, serves bg_shop.asgi)
+    GUNICORN_APP - bg_shop.wsgi or bg_shop.asgi (by worker class)
+    GUNICORN_WORKERS - by CPU count: 2 * CPU + 1 for sync workers,
+        CPU + 1 for threaded and async ones
+    GUNICORN_THREADS - threads of gthread worker, default 4
+    GUNICORN_MAX_REQUESTS, GUNICORN_MAX_REQUESTS_JITTER - recycling
+        of workers (leaks of memory), default 1000 and 100
+    GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE
+    GUNICORN_PRELOAD - load the app in master before fork, default 1
+    GUNICORN_WARMUP - run api.warmup before fork, default 1
+
+With preload the app is warmed up once in master (imports, URL
+resolvers, caches), then objects are frozen by gc.freeze(), so garbage
+collector of workers does not touch them and memory pages stay shared
+copy-on-write. Without preload every worker is warmed up after start.
+"""
+
+import gc
+import os
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+
+
+def get_cpu_count() -> int:
+    """CPUs available to the process (respects affinity of container)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return value == "1" if value else default
+
+
+cpu_count = get_cpu_count()
+_worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = WORKER_CLASSES.get(_worker_class, _worker_class)
+is_asgi = worker_class.startswith("uvicorn")
+wsgi_app = os.getenv(
+    "GUNICORN_APP", "bg_shop.asgi" if is_asgi else "bg_shop.wsgi")
+
+if worker_class == "sync":
+    workers = env_int("GUNICORN_WORKERS", 2 * cpu_count + 1)
+    threads = 1
+else:
+    workers = env_int("GUNICORN_WORKERS", cpu_count + 1)
+    threads = env_int("GUNICORN_THREADS", 4) \
+        if worker_class == "gthread" else 1
+
+max_requests = env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+timeout = env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = env_int("GUNICORN_KEEPALIVE", 5)
+
+preload_app = env_bool("GUNICORN_PRELOAD", True)
+warmup_app = env_bool("GUNICORN_WARMUP", True)
+
+# heartbeat files of workers in memory, not on (overlay) disk
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def _warmup(log) -> None:
+    """Runs api.warmup, the app (and Django) must be loaded."""
+    from api import warmup
+
+    timings = warmup.warmup()
+    log.info(
+        "Warmup is done: %s",
+        ", ".join(f"{step} {seconds:.3f}s"
+                  for step, seconds in timings.items()) or "no steps",
+    )
+
+
+def when_ready(server) -> None:
+    """Master is started, the app is preloaded, workers are not forked."""
+    if preload_app and warmup_app:
+        _warmup(server.log)
+    if preload_app:
+        # objects of master are not tracked by gc of workers
+        gc.freeze()
+
+
+def post_worker_init(worker) -> None:
+    """Worker loaded the app (without preload)."""
+    if not preload_app and warmup_app:
+        _warmup(worker.log)